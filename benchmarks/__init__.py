@@ -0,0 +1 @@
+"""框架性能基准测试模块"""
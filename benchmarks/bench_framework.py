@@ -0,0 +1,507 @@
+"""框架开销基准测试
+
+测量框架自身各组件单个用例的CPU开销和内存分配，
+并与保存的JSON基线对比，发现性能回退时以非零状态码退出。
+
+用法:
+    python -m benchmarks.bench_framework                    # 运行并与基线对比
+    python -m benchmarks.bench_framework --update-baseline  # 运行并更新基线
+    python -m benchmarks.bench_framework --only e2e --threshold 0.3
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.stub_server import StubServer
+from core.api_executor import APIExecutor
+from core.case_loader import CaseLoader, TestCase
+from core.data_extractor import DataExtractor
+from core.data_manager import DataManager
+from core.performance_executor import PerformanceExecutor
+from core.request_builder import RequestBuilder
+from utils.assertions import Assertions
+from utils.logger import Logger
+
+# 基线文件路径
+BASELINE_FILE = Path(__file__).parent / "baselines" / "framework.json"
+
+# 默认回退阈值：ops/sec 下降或内存分配增长超过20%视为回退
+DEFAULT_THRESHOLD = 0.2
+
+# 内存分配的绝对容差（字节），避免极小分配量的抖动被判定为回退
+ALLOC_TOLERANCE_BYTES = 1024
+
+
+@dataclass
+class BenchmarkResult:
+    """单项基准测试结果
+
+    Attributes:
+        name: 基准测试名称
+        ops_per_sec: 每秒可处理的用例数
+        mean_us: 单个用例的平均耗时（微秒）
+        alloc_peak_bytes: 单个用例的内存分配峰值（字节）
+        rounds: 计时轮数
+        iterations: 每轮迭代次数
+    """
+    name: str
+    ops_per_sec: float
+    mean_us: float
+    alloc_peak_bytes: int
+    rounds: int
+    iterations: int
+
+
+@dataclass
+class _Benchmark:
+    """已注册的基准测试"""
+    name: str
+    factory: Callable
+    iterations: int
+    units: int = 1  # 每次操作包含的用例数，用于换算单用例开销
+    budget_ms: float = None  # 单次操作的耗时预算（毫秒），超出时视为失败，与基线无关
+
+
+_BENCHMARKS: Dict[str, _Benchmark] = {}
+
+
+def benchmark(name: str, iterations: int, units: int = 1, budget_ms: float = None):
+    """注册基准测试的装饰器
+
+    被装饰的函数接收 BenchContext，返回一个无参的操作函数
+
+    Args:
+        name: 基准测试名称
+        iterations: 每轮迭代次数
+        units: 每次操作包含的用例数
+        budget_ms: 单次操作的耗时预算（毫秒，可选）
+    """
+    def decorator(factory: Callable) -> Callable:
+        _BENCHMARKS[name] = _Benchmark(name, factory, iterations, units, budget_ms)
+        return factory
+    return decorator
+
+
+class BenchContext:
+    """基准测试上下文
+
+    持有桩服务、临时目录和共享组件
+    """
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix="bench_")
+        self.tmp_path = Path(self._tmp_dir.name)
+
+    def new_data_manager(self, name: str = "extract_data.yaml") -> DataManager:
+        """创建使用临时文件的数据管理器"""
+        data_manager = DataManager(str(self.tmp_path / name))
+        data_manager.update({"user_id": 1001, "token": "bench-token"})
+        return data_manager
+
+    def cleanup(self):
+        self._tmp_dir.cleanup()
+
+
+def make_case(case_id: str = "BENCH_001", **overrides) -> TestCase:
+    """构建基准测试用例"""
+    fields = dict(
+        case_id=case_id,
+        module="bench",
+        api_name="基准接口",
+        url="/api/users/${user_id}",
+        pre_condition='{"token": "data.token", "item_id": "data.items.0.id"}',
+        method="POST",
+        param_type="json",
+        params='{"name": "bench", "token": "${token}", "tags": ["a", "${user_id}"], "meta": {"owner": "${user_id}"}}',
+        expected_result='{"code": 200, "message": "success"}',
+        is_run="Y",
+        headers='{"Authorization": "Bearer ${token}"}',
+        expected_status=200
+    )
+    fields.update(overrides)
+    return TestCase(**fields)
+
+
+# ==================== 组件基准 ====================
+
+@benchmark("request_builder.build", iterations=2000)
+def bench_request_builder(ctx: BenchContext):
+    builder = RequestBuilder(ctx.base_url, ctx.new_data_manager())
+    case = make_case()
+    return lambda: builder.build(case)
+
+
+@benchmark("api_executor.execute", iterations=300)
+def bench_api_executor(ctx: BenchContext):
+    executor = APIExecutor(timeout=5)
+    url = ctx.base_url + "/api/users/1001"
+    headers = {"Content-Type": "application/json"}
+    params = {"name": "bench"}
+    return lambda: executor.execute(url, "POST", headers, params, "json")
+
+
+@benchmark("data_extractor.extract_and_save", iterations=300)
+def bench_data_extractor(ctx: BenchContext):
+    from benchmarks.stub_server import DEFAULT_BODY
+    extractor = DataExtractor(ctx.new_data_manager())
+    rules = json.loads(make_case().pre_condition)
+    return lambda: extractor.extract_and_save(DEFAULT_BODY, rules)
+
+
+@benchmark("assertions.assert_response_body", iterations=5000)
+def bench_assertions(ctx: BenchContext):
+    from benchmarks.stub_server import DEFAULT_BODY
+    assertions = Assertions()
+    expected = json.loads(make_case().expected_result)
+    return lambda: assertions.assert_response_body(DEFAULT_BODY, expected)
+
+
+_LOADER_ROWS = 200
+
+
+@benchmark("case_loader.load_cases", iterations=5, units=_LOADER_ROWS)
+def bench_case_loader(ctx: BenchContext):
+    import openpyxl
+
+    workbook_path = ctx.tmp_path / "bench_cases.xlsx"
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "Sheet1"
+    sheet.append(["测试用例ID", "模块", "接口名称", "请求地址", "前置条件", "请求方法",
+                  "请求参数类型", "请求参数", "期望结果", "是否运行", "请求头", "状态码",
+                  "性能配置", "最大响应时间"])
+    case = make_case()
+    for i in range(_LOADER_ROWS):
+        sheet.append([f"BENCH_{i:04d}", case.module, case.api_name, case.url, case.pre_condition,
+                      case.method, case.param_type, case.params, case.expected_result, "Y",
+                      case.headers, 200, "{}", 0])
+    workbook.save(workbook_path)
+    workbook.close()
+
+    loader = CaseLoader(str(workbook_path), "Sheet1")
+    return loader.load_cases
+
+
+# ==================== 端到端基准 ====================
+
+_ANALYTICS_SAMPLES = 1_000_000
+
+
+@benchmark("analytics.calculate_statistics", iterations=2, units=_ANALYTICS_SAMPLES)
+def bench_analytics(ctx: BenchContext):
+    import random
+    from core.performance_executor import PerformanceResult
+
+    rng = random.Random(0)
+    result = PerformanceResult(start_time=1.0)
+    for i in range(_ANALYTICS_SAMPLES):
+        result.record_sample(f"BENCH_{i % 100:03d}", rng.lognormvariate(-3, 0.7),
+                             rng.random() > 0.01, timestamp=1.0 + i / 10000)
+    return result.calculate_statistics
+
+
+@benchmark("e2e.single_case", iterations=200)
+def bench_e2e_single_case(ctx: BenchContext):
+    data_manager = ctx.new_data_manager("e2e_data.yaml")
+    builder = RequestBuilder(ctx.base_url, data_manager)
+    executor = APIExecutor(timeout=5)
+    extractor = DataExtractor(data_manager)
+    assertions = Assertions()
+    case = make_case()
+
+    def run():
+        url, method, headers, params = builder.build(case)
+        response = executor.execute(url, method, headers, params, case.param_type)
+        assertions.assert_status_code(response['status_code'], case.expected_status)
+        assertions.assert_response_body(response['body'], json.loads(case.expected_result))
+        extractor.extract_and_save(response['body'], json.loads(case.pre_condition))
+
+    return run
+
+
+_E2E_PERF_CASES = 50
+
+
+@benchmark("e2e.performance_executor", iterations=3, units=_E2E_PERF_CASES)
+def bench_e2e_performance_executor(ctx: BenchContext):
+    executor = PerformanceExecutor(max_workers=4, duration=0)
+    executor.configure(ctx.base_url, ctx.new_data_manager("perf_data.yaml"))
+    cases = [make_case(f"BENCH_{i:03d}", url="/api/users/1001") for i in range(_E2E_PERF_CASES)]
+    return lambda: executor.execute_concurrent_test(cases, iterations=1)
+
+
+# ==================== 启动基准 ====================
+
+# 项目根目录（子进程的工作目录）
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# 只在特定代码路径使用的重量级依赖（Excel、Allure、YAML、NumPy），导入框架模块时不应加载
+LAZY_MODULES = ('openpyxl', 'allure', 'yaml', 'numpy')
+
+# 导入框架模块后检查没有提前创建全局配置、配置日志系统或加载重量级依赖
+_STARTUP_SCRIPT = (
+    "import sys\n"
+    "import core.api_executor, core.case_loader, core.performance_executor, "
+    "core.request_builder, utils.assertions, utils.logger, utils.performance_reporter\n"
+    "import config.settings\n"
+    "assert config.settings._settings is None, '导入时创建了全局配置'\n"
+    "assert not utils.logger.Logger._configured, '导入时配置了日志系统'\n"
+    f"loaded = [m for m in {LAZY_MODULES!r} if m in sys.modules]\n"
+    "assert not loaded, f'导入时加载了 {loaded}'\n"
+)
+
+
+def _run_quiet(command: List[str]):
+    """在项目根目录运行子进程，失败时输出其错误信息"""
+    completed = subprocess.run(command, cwd=str(PROJECT_ROOT), capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} 失败:\n{completed.stdout[-2000:]}{completed.stderr[-2000:]}")
+
+
+@benchmark("startup.import_core", iterations=5, budget_ms=150)
+def bench_startup_import_core(ctx: BenchContext):
+    """python -c "import core" 的耗时（包含解释器自身的启动）"""
+    command = [sys.executable, "-c", "import core"]
+    return lambda: _run_quiet(command)
+
+
+@benchmark("startup.import", iterations=3, budget_ms=800)
+def bench_startup_import(ctx: BenchContext):
+    """新解释器导入框架模块的耗时（近似 pytest-xdist 工作进程和子进程的启动开销）"""
+    command = [sys.executable, "-c", _STARTUP_SCRIPT]
+    return lambda: _run_quiet(command)
+
+
+@benchmark("startup.pytest_collect", iterations=2, budget_ms=3000)
+def bench_startup_pytest_collect(ctx: BenchContext):
+    """pytest 收集性能测试模块的耗时（只压测、不读取Excel的运行路径）"""
+    command = [sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider",
+               "tests/test_performance.py"]
+    return lambda: _run_quiet(command)
+
+
+# ==================== 执行与对比 ====================
+
+def run_benchmark(bench: _Benchmark, ctx: BenchContext,
+                  rounds: int = 5, scale: float = 1.0) -> BenchmarkResult:
+    """执行单项基准测试
+
+    先预热，再计时多轮取中位数；最后单独测量一次操作的内存分配峰值
+
+    Args:
+        bench: 已注册的基准测试
+        ctx: 基准测试上下文
+        rounds: 计时轮数
+        scale: 迭代次数缩放系数
+
+    Returns:
+        BenchmarkResult: 基准测试结果
+    """
+    op = bench.factory(ctx)
+    iterations = max(1, int(bench.iterations * scale))
+
+    # 预热
+    for _ in range(max(1, iterations // 10)):
+        op()
+
+    round_times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            op()
+        round_times.append(time.perf_counter() - start)
+
+    per_case = statistics.median(round_times) / (iterations * bench.units)
+
+    # 内存分配峰值（单独测量，避免tracemalloc影响计时）
+    tracemalloc.start()
+    try:
+        baseline_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchmarkResult(
+        name=bench.name,
+        ops_per_sec=1.0 / per_case if per_case > 0 else 0.0,
+        mean_us=per_case * 1e6,
+        alloc_peak_bytes=max(0, peak - baseline_current) // bench.units,
+        rounds=rounds,
+        iterations=iterations
+    )
+
+
+def compare_with_baseline(results: List[BenchmarkResult], baseline: Dict[str, Dict],
+                          threshold: float) -> List[str]:
+    """与基线对比，返回回退描述列表
+
+    Args:
+        results: 本次基准测试结果
+        baseline: 基线数据 {名称: 结果字典}
+        threshold: 回退阈值（比例）
+
+    Returns:
+        回退描述列表，为空表示没有回退
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if not base:
+            continue
+
+        base_ops = base.get('ops_per_sec', 0)
+        if base_ops and result.ops_per_sec < base_ops * (1 - threshold):
+            regressions.append(
+                f"{result.name}: ops/sec {base_ops:.1f} -> {result.ops_per_sec:.1f} "
+                f"({(result.ops_per_sec / base_ops - 1) * 100:+.1f}%)"
+            )
+
+        base_alloc = base.get('alloc_peak_bytes', 0)
+        if (result.alloc_peak_bytes > base_alloc * (1 + threshold)
+                and result.alloc_peak_bytes - base_alloc > ALLOC_TOLERANCE_BYTES):
+            regressions.append(
+                f"{result.name}: 内存分配峰值 {base_alloc}B -> {result.alloc_peak_bytes}B"
+            )
+
+    return regressions
+
+
+def parse_budgets(items: List[str]) -> Dict[str, float]:
+    """解析命令行的耗时预算覆盖（NAME=MS）
+
+    Raises:
+        ValueError: 格式不正确、基准不存在或预算不是正数
+    """
+    budgets = {}
+    for item in items or []:
+        name, sep, value = item.partition('=')
+        name = name.strip()
+        if not sep or name not in _BENCHMARKS:
+            raise ValueError(f"耗时预算应为 NAME=MS 且 NAME 为已注册的基准: {item}")
+        try:
+            budget_ms = float(value)
+        except ValueError:
+            raise ValueError(f"耗时预算不是数值: {item}")
+        if budget_ms <= 0:
+            raise ValueError(f"耗时预算必须是正数: {item}")
+        budgets[name] = budget_ms
+    return budgets
+
+
+def check_budgets(results: List[BenchmarkResult], overrides: Dict[str, float] = None) -> List[str]:
+    """检查耗时预算，返回超出预算的描述列表
+
+    Args:
+        results: 基准测试结果
+        overrides: 覆盖注册时预算的 {基准名称: 毫秒}（命令行 --budget）
+    """
+    overrides = overrides or {}
+    violations = []
+    for result in results:
+        budget_ms = overrides.get(result.name, _BENCHMARKS[result.name].budget_ms)
+        if budget_ms is not None and result.mean_us / 1000 > budget_ms:
+            violations.append(f"{result.name}: {result.mean_us / 1000:.0f}ms 超出预算 {budget_ms:g}ms")
+    return violations
+
+
+def load_baseline(path: Path) -> Dict[str, Dict]:
+    """加载基线文件，不存在时返回空字典"""
+    if not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('benchmarks', {})
+
+
+def save_baseline(path: Path, results: List[BenchmarkResult]):
+    """保存基线文件（合并已有的其他基准项）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    benchmarks = load_baseline(path)
+    benchmarks.update({r.name: asdict(r) for r in results})
+    data = {
+        'python': sys.version.split()[0],
+        'updated_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'benchmarks': benchmarks
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="框架开销基准测试")
+    parser.add_argument("--only", default=None, help="只运行名称包含该字符串的基准测试")
+    parser.add_argument("--baseline", default=str(BASELINE_FILE), help="基线文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果更新基线")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="回退阈值（比例），默认0.2")
+    parser.add_argument("--rounds", type=int, default=5, help="计时轮数")
+    parser.add_argument("--scale", type=float, default=1.0, help="迭代次数缩放系数")
+    parser.add_argument("--budget", action="append", default=[], metavar="NAME=MS",
+                        help="覆盖基准的耗时预算（毫秒），可重复，如 --budget startup.import=1200")
+    args = parser.parse_args(argv)
+
+    try:
+        budgets = parse_budgets(args.budget)
+    except ValueError as e:
+        print(e)
+        return 2
+
+    # 关闭控制台日志，只保留文件日志，避免终端输出干扰计时
+    Logger.setup(console=False)
+
+    selected = [b for name, b in _BENCHMARKS.items() if not args.only or args.only in name]
+    if not selected:
+        print(f"没有匹配的基准测试: {args.only}")
+        return 2
+
+    results = []
+    with StubServer() as server:
+        ctx = BenchContext(server.base_url)
+        try:
+            for bench in selected:
+                result = run_benchmark(bench, ctx, rounds=args.rounds, scale=args.scale)
+                results.append(result)
+                print(f"{result.name:<36} {result.ops_per_sec:>12.1f} ops/s "
+                      f"{result.mean_us:>12.1f} us/op {result.alloc_peak_bytes:>10d} B/op")
+        finally:
+            ctx.cleanup()
+
+    # 耗时预算是绝对值，不依赖基线；超出预算时仍与基线对比并按需更新基线，两类问题一起报告
+    violations = check_budgets(results, budgets)
+
+    baseline_path = Path(args.baseline)
+    baseline = load_baseline(baseline_path)
+
+    regressions = []
+    if args.update_baseline or not baseline:
+        save_baseline(baseline_path, results)
+        print(f"基线已保存: {baseline_path}")
+    else:
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项性能回退（阈值 {args.threshold:.0%}）:")
+            for item in regressions:
+                print(f"  - {item}")
+        else:
+            print(f"\n未发现性能回退（阈值 {args.threshold:.0%}）")
+
+    if violations:
+        print(f"\n{len(violations)} 项超出耗时预算:")
+        for item in violations:
+            print(f"  - {item}")
+
+    return 1 if violations or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
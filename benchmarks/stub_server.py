@@ -0,0 +1,98 @@
+"""本地桩服务 - 为基准测试提供稳定、低延迟的HTTP接口"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+
+# 默认响应体：覆盖常见的嵌套结构，便于断言和数据提取
+DEFAULT_BODY = {
+    "code": 200,
+    "message": "success",
+    "data": {
+        "id": 1001,
+        "token": "bench-token-0123456789",
+        "user": {"id": 1, "name": "bench", "roles": ["admin", "user"]},
+        "items": [{"id": i, "name": f"item-{i}", "price": i * 1.5} for i in range(20)]
+    }
+}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """桩服务请求处理器
+
+    所有方法都返回同一个JSON响应体，支持keep-alive
+    """
+
+    protocol_version = "HTTP/1.1"
+    # 响应头和响应体分两次写出，关闭Nagle算法避免与延迟ACK叠加产生约40ms的停顿
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        # 读取并丢弃请求体，保证连接可以复用
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+
+        payload = self.server.payload
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_PUT = _reply
+    do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        """关闭默认的访问日志"""
+        return
+
+
+class StubServer:
+    """本地HTTP桩服务
+
+    在随机端口启动，用作上下文管理器:
+
+        with StubServer() as server:
+            requests.get(server.base_url + "/api/test")
+    """
+
+    def __init__(self, body: Dict[str, Any] = None, host: str = "127.0.0.1", port: int = 0):
+        """初始化桩服务
+
+        Args:
+            body: 响应体（默认使用 DEFAULT_BODY）
+            host: 监听地址
+            port: 监听端口，0表示随机分配
+        """
+        self.body = body if body is not None else DEFAULT_BODY
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.payload = json.dumps(self.body, ensure_ascii=False).encode('utf-8')
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """桩服务的base_url"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -1,12 +1,151 @@
-"""配置加载器"""
-import yaml
+"""配置加载器
+
+配置文件读取后解析为当前环境的不可变快照（EnvironmentSnapshot），属性访问直接读取快照字段，
+不再逐次查找嵌套字典或重建路径对象。启用热加载后由后台线程检查配置文件的修改时间，
+文件变化时重新解析并整体替换快照，长时间运行的测试无需重启即可切换阈值或 base_url。
+快照中的嵌套配置为只读结构，Settings 的属性（如 settings.performance）返回普通 dict / list 副本。
+
+全局配置实例 settings 在首次访问时才创建（读取配置文件），
+带时间戳的报告目录和日志文件在首次使用对应路径时才创建，
+仅导入模块的脚本和 pytest-xdist 工作进程不会产生这些开销和空目录
+"""
+import os
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional
 from utils.path_helper import PathHelper
 
+# 项目根目录
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def _freeze(value: Any) -> Any:
+    """递归转换为只读结构（dict → 只读映射，list → tuple）"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """递归复制为普通结构（只读映射 → dict，tuple → list），调用方修改不影响快照"""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+# 以字典形式通过 Settings 属性提供的配置段
+_SECTION_FIELDS = ('http', 'default_headers', 'performance', 'performance_report', 'hot_reload', 'attachments')
+
+
+@dataclass(frozen=True)
+class EnvironmentSnapshot:
+    """解析后的当前环境配置（不可变）
+
+    同一次测试中需要多个字段时应先取 settings.snapshot，保证各字段来自同一版本的配置
+
+    Attributes:
+        version: 快照版本号，每次重新加载加1
+        env: 当前环境名称
+        base_url: 当前环境的base_url
+        timeout: 请求超时时间（秒）
+        transport: HTTP传输层
+        default_headers: 默认请求头
+        http: HTTP连接配置
+        excel_path: Excel文件或目录的绝对路径
+        excel_sheet_name: Excel sheet名称
+        extract_data_path: 提取数据文件的绝对路径
+        log_level: 日志级别
+        log_format: 日志格式
+        performance: 性能测试配置
+        performance_report: 性能报告配置
+        hot_reload: 热加载配置
+        attachments: 测试报告附件策略
+    """
+    version: int
+    env: str
+    base_url: str
+    timeout: int
+    transport: str
+    default_headers: Mapping[str, str]
+    http: Mapping[str, Any]
+    excel_path: str
+    excel_sheet_name: str
+    extract_data_path: str
+    log_level: str
+    log_format: str
+    performance: Mapping[str, Any]
+    performance_report: Mapping[str, Any]
+    hot_reload: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    attachments: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    # 各配置段的普通字典形式，创建快照时构建一次，Settings 的属性直接返回
+    _sections: Dict[str, Dict[str, Any]] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, '_sections', {name: _thaw(getattr(self, name)) for name in _SECTION_FIELDS})
+
+    def section(self, name: str) -> Dict[str, Any]:
+        """获取配置段的普通字典形式（每个快照只构建一次，多次读取返回同一对象，调用方需要修改时应先复制）
+
+        Args:
+            name: 配置段名称（http、default_headers、performance、performance_report、hot_reload、attachments）
+
+        Returns:
+            配置段字典
+        """
+        return self._sections[name]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], version: int = 1) -> 'EnvironmentSnapshot':
+        """解析配置字典
+
+        Args:
+            config: 配置文件内容
+            version: 快照版本号
+
+        Returns:
+            EnvironmentSnapshot 实例
+        """
+        config = config or {}
+        env = (config.get('env') or {}).get('current', 'dev')
+        environment = (config.get('environments') or {}).get(env) or {}
+        excel = config.get('excel') or {}
+        log = config.get('log') or {}
+
+        return cls(
+            version=version,
+            env=env,
+            base_url=environment.get('base_url', ''),
+            timeout=environment.get('timeout', 30),
+            transport=environment.get('transport', 'requests'),
+            default_headers=_freeze(environment.get('headers') or {}),
+            http=_freeze(config.get('http') or {}),
+            # 转换为绝对路径
+            excel_path=str(PROJECT_ROOT / excel.get('file_path', 'data/test_cases/test_cases.xlsx')),
+            excel_sheet_name=excel.get('sheet_name', 'Sheet1'),
+            extract_data_path=str(
+                PROJECT_ROOT / (config.get('extract') or {}).get('file_path', 'data/extract_data/extract_data.yaml')
+            ),
+            log_level=log.get('level', 'INFO'),
+            log_format=log.get('format', '%(asctime)s - %(name)s - %(levelname)s - %(message)s'),
+            performance=_freeze(config.get('performance') or {}),
+            performance_report=_freeze(config.get('performance_report') or {}),
+            hot_reload=_freeze(config.get('hot_reload') or {}),
+            attachments=_freeze(config.get('attachments') or {})
+        )
+
 
 class Settings:
-    """配置管理类"""
+    """配置管理类
+
+    属性读取当前快照；热加载时整体替换快照，读取方不会看到新旧混合的配置。
+    字典类型的属性（performance 等）在创建快照时构建一次，同一快照的多次读取返回同一字典，需要修改时先复制
+    """
 
     def __init__(self, config_path: str = None):
         """初始化配置
@@ -15,42 +154,32 @@ class Settings:
             config_path: 配置文件路径，默认为 config/config.yaml
         """
         self.config_path = config_path or self._get_default_config_path()
+        self._mtime = self._stat_mtime()
         self._config = self._load_config()
+        self._snapshot = EnvironmentSnapshot.from_config(self._config)
 
-        # 初始化时创建带时间戳的目录
-        self._init_timestamped_dirs()
-
-    def _init_timestamped_dirs(self):
-        """初始化带时间戳的目录和文件"""
-        # 获取项目根目录
-        project_root = Path(__file__).parent.parent
-
-        # HTML报告：直接在html目录下创建带时间戳的文件
-        self._html_report_file = PathHelper.create_timestamped_file(
-            str(project_root / "reports" / "html"),
-            filename="report",
-            extension="html"
-        )
+        # 带时间戳的目录和文件，首次访问时创建
+        self._html_report_file: Optional[Path] = None
+        self._allure_report_dir: Optional[Path] = None
+        self._log_file: Optional[Path] = None
+        self._paths_lock = threading.Lock()
 
-        # Allure报告：创建带时间戳的子目录
-        self._allure_report_dir = PathHelper.create_timestamped_dir(
-            str(project_root / "reports" / "allure"),
-            prefix="allure"
-        )
-
-        # 日志文件：直接在logs目录下创建带时间戳的文件
-        self._log_file = PathHelper.create_timestamped_file(
-            str(project_root / "logs"),
-            filename="api-log",
-            extension="log"
-        )
+        # 热加载
+        self._listeners: List[Callable[[EnvironmentSnapshot, EnvironmentSnapshot], None]] = []
+        self._reload_lock = threading.Lock()
+        self._watch_stop = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
 
     def _get_default_config_path(self) -> str:
         """获取默认配置文件路径"""
-        # 获取项目根目录
-        current_dir = Path(__file__).parent
-        project_root = current_dir.parent
-        return str(project_root / "config" / "config.yaml")
+        return str(PROJECT_ROOT / "config" / "config.yaml")
+
+    def _stat_mtime(self) -> Optional[int]:
+        """配置文件的修改时间（纳秒），文件不存在时返回None"""
+        try:
+            return os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return None
 
     def _load_config(self) -> Dict[str, Any]:
         """加载YAML配置文件
@@ -58,6 +187,8 @@ class Settings:
         Returns:
             配置字典
         """
+        import yaml
+
         try:
             with open(self.config_path, 'r', encoding='utf-8') as f:
                 return yaml.safe_load(f)
@@ -66,79 +197,251 @@ class Settings:
         except yaml.YAMLError as e:
             raise ValueError(f"配置文件格式错误: {e}")
 
+    @property
+    def snapshot(self) -> EnvironmentSnapshot:
+        """当前环境的配置快照"""
+        return self._snapshot
+
     @property
     def env(self) -> str:
         """获取当前环境"""
-        return self._config.get('env', {}).get('current', 'dev')
+        return self._snapshot.env
 
     @property
     def base_url(self) -> str:
         """获取当前环境的base_url"""
-        return self._config.get('environments', {}).get(self.env, {}).get('base_url', '')
+        return self._snapshot.base_url
 
     @property
     def timeout(self) -> int:
         """获取超时时间"""
-        return self._config.get('environments', {}).get(self.env, {}).get('timeout', 30)
+        return self._snapshot.timeout
+
+    @property
+    def transport(self) -> str:
+        """获取当前环境的HTTP传输层（requests / httpx）"""
+        return self._snapshot.transport
+
+    @property
+    def http(self) -> Dict[str, Any]:
+        """获取HTTP连接配置（DNS缓存、TLS会话复用）"""
+        return self._snapshot.section('http')
 
     @property
     def default_headers(self) -> Dict[str, str]:
         """获取默认请求头"""
-        return self._config.get('environments', {}).get(self.env, {}).get('headers', {})
+        return self._snapshot.section('default_headers')
 
     @property
     def excel_path(self) -> str:
-        """获取Excel文件路径"""
-        path_str = self._config.get('excel', {}).get('file_path', 'data/test_cases/test_cases.xlsx')
-        # 转换为绝对路径
-        project_root = Path(__file__).parent.parent
-        return str(project_root / path_str)
+        """获取Excel文件路径（绝对路径）"""
+        return self._snapshot.excel_path
 
     @property
     def excel_sheet_name(self) -> str:
         """获取Excel sheet名称"""
-        return self._config.get('excel', {}).get('sheet_name', 'Sheet1')
+        return self._snapshot.excel_sheet_name
 
     @property
     def extract_data_path(self) -> str:
-        """获取提取数据存储路径"""
-        path_str = self._config.get('extract', {}).get('file_path', 'data/extract_data/extract_data.yaml')
-        # 转换为绝对路径
-        project_root = Path(__file__).parent.parent
-        return str(project_root / path_str)
+        """获取提取数据存储路径（绝对路径）"""
+        return self._snapshot.extract_data_path
 
     @property
     def log_level(self) -> str:
         """获取日志级别"""
-        return self._config.get('log', {}).get('level', 'INFO')
+        return self._snapshot.log_level
 
     @property
     def log_format(self) -> str:
         """获取日志格式"""
-        return self._config.get('log', {}).get(
-            'format',
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        return self._snapshot.log_format
+
+    @property
+    def performance(self) -> Dict[str, Any]:
+        """获取性能测试配置"""
+        return self._snapshot.section('performance')
+
+    @property
+    def performance_report(self) -> Dict[str, Any]:
+        """获取性能报告配置"""
+        return self._snapshot.section('performance_report')
+
+    @property
+    def hot_reload(self) -> Dict[str, Any]:
+        """获取热加载配置"""
+        return self._snapshot.section('hot_reload')
+
+    @property
+    def attachments(self) -> Dict[str, Any]:
+        """获取测试报告附件策略"""
+        return self._snapshot.section('attachments')
 
     @property
     def log_file(self) -> str:
-        """获取日志文件路径（带时间戳）"""
+        """获取日志文件路径（带时间戳，首次访问时创建目录）"""
+        if self._log_file is None:
+            with self._paths_lock:
+                if self._log_file is None:
+                    # 日志文件：直接在logs目录下创建带时间戳的文件
+                    self._log_file = PathHelper.create_timestamped_file(
+                        str(PROJECT_ROOT / "logs"),
+                        filename="api-log",
+                        extension="log"
+                    )
         return str(self._log_file)
 
     @property
     def html_report_file(self) -> str:
-        """获取HTML报告文件路径（带时间戳）"""
+        """获取HTML报告文件路径（带时间戳，首次访问时创建目录）"""
+        if self._html_report_file is None:
+            with self._paths_lock:
+                if self._html_report_file is None:
+                    # HTML报告：直接在html目录下创建带时间戳的文件
+                    self._html_report_file = PathHelper.create_timestamped_file(
+                        str(PROJECT_ROOT / "reports" / "html"),
+                        filename="report",
+                        extension="html"
+                    )
         return str(self._html_report_file)
 
     @property
     def allure_report_dir(self) -> str:
-        """获取Allure报告目录路径（带时间戳）"""
+        """获取Allure报告目录路径（带时间戳，首次访问时创建）"""
+        if self._allure_report_dir is None:
+            with self._paths_lock:
+                if self._allure_report_dir is None:
+                    # Allure报告：创建带时间戳的子目录
+                    self._allure_report_dir = PathHelper.create_timestamped_dir(
+                        str(PROJECT_ROOT / "reports" / "allure"),
+                        prefix="allure"
+                    )
         return str(self._allure_report_dir)
 
-    def reload(self):
-        """重新加载配置文件"""
-        self._config = self._load_config()
+    def reload(self) -> EnvironmentSnapshot:
+        """重新加载配置文件并替换快照，通知已注册的监听器
+
+        监听器逐个调用，某个监听器抛出的异常只记录日志，不影响其他监听器和已替换的快照
+
+        Returns:
+            新的配置快照
+
+        Raises:
+            FileNotFoundError: 配置文件不存在
+            ValueError: 配置文件格式错误
+        """
+        with self._reload_lock:
+            self._mtime = self._stat_mtime()
+            config = self._load_config()
+            old = self._snapshot
+            new = EnvironmentSnapshot.from_config(config, old.version + 1)
+            self._config = config
+            self._snapshot = new
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(old, new)
+            except Exception as e:
+                from utils.logger import get_logger
+                get_logger(__name__).error(
+                    f"配置变化监听器执行失败（配置已更新到版本 {new.version}）: {getattr(listener, '__qualname__', listener)}: {e}"
+                )
+        return new
+
+    def add_listener(self, listener: Callable[[EnvironmentSnapshot, EnvironmentSnapshot], None]):
+        """注册配置变化监听器
+
+        Args:
+            listener: 回调函数，参数为 (旧快照, 新快照)，在重新加载的线程中调用
+        """
+        with self._reload_lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[EnvironmentSnapshot, EnvironmentSnapshot], None]):
+        """移除配置变化监听器"""
+        with self._reload_lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def check_for_changes(self) -> bool:
+        """配置文件的修改时间变化时重新加载
+
+        Returns:
+            是否重新加载了配置
+        """
+        mtime = self._stat_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self.reload()
+        return True
+
+    def start_watching(self, interval: float = None):
+        """启动后台线程监视配置文件，修改后自动重新加载（已在监视时忽略）
+
+        Args:
+            interval: 检查间隔（秒），默认使用配置中的 hot_reload.interval
+        """
+        if self._watch_thread is not None:
+            return
+        interval = interval or self._snapshot.hot_reload.get('interval', 2.0)
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(
+            target=self._watch, args=(interval,), name="config-watcher", daemon=True
+        )
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        """停止监视配置文件"""
+        thread = self._watch_thread
+        if thread is None:
+            return
+        self._watch_stop.set()
+        thread.join()
+        self._watch_thread = None
+
+    def _watch(self, interval: float):
+        """监视线程主循环"""
+        from utils.logger import get_logger
+
+        logger = get_logger(__name__)
+        while not self._watch_stop.wait(interval):
+            try:
+                if self.check_for_changes():
+                    snapshot = self._snapshot
+                    logger.info(
+                        f"配置文件已重新加载（版本 {snapshot.version}）: "
+                        f"环境={snapshot.env}, base_url={snapshot.base_url}"
+                    )
+            except (FileNotFoundError, ValueError) as e:
+                # 保存到一半或格式错误时保留旧配置，下次文件变化时再试
+                logger.warning(f"配置文件重新加载失败，继续使用当前配置: {e}")
+            except Exception as e:
+                # 其他异常不终止监视线程，否则之后的修改都不会再生效
+                logger.error(f"配置文件监视异常: {e}")
+
+
+# 全局配置实例（首次访问时创建）
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """获取全局配置实例，首次调用时读取配置文件
+
+    Returns:
+        Settings 实例
+    """
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
 
 
-# 全局配置实例
-settings = Settings()
+def __getattr__(name: str) -> Any:
+    """兼容 from config.settings import settings：访问时才创建全局配置实例"""
+    if name == 'settings':
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
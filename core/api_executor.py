@@ -1,12 +1,568 @@
-"""接口执行器 - 执行HTTP请求"""
+"""接口执行器 - 执行HTTP请求
+
+请求通过可替换的传输层（Transport）发送:
+    requests: 默认，基于 requests + urllib3 连接池（HTTP/1.1）
+    httpx:    基于 httpx，支持 HTTP/2 多路复用（需要安装 httpx[http2]）
+
+无论使用哪种传输层，execute 返回的响应字典格式和抛出的异常类型都相同。
+新建连接时使用DNS解析缓存和TLS会话复用（见 core/connection_cache.py），减少重连的解析和握手开销
+
+超时分为连接超时、读取超时和整个请求的总期限（RequestTimeout）；超过总期限的请求立即关闭连接，
+抛出 DeadlineExceeded，不再等待剩余的响应体
+"""
 import json
-from typing import Dict, Any
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from http import cookiejar
+from typing import Dict, Any, Optional, Tuple, Union
 import requests
+from requests.adapters import HTTPAdapter, DEFAULT_CA_BUNDLE_PATH
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, DecodeError, NewConnectionError, ProtocolError, ReadTimeoutError
 
-from utils.logger import get_logger
+from core.connection_cache import DNSCache, ResumingSSLContext, TLSSessionCache, create_ssl_context
+from utils.logger import get_logger, Logger
 
 logger = get_logger(__name__)
 
+# 当前线程内建立连接的耗时（TCP连接和TLS握手），由连接类写入、执行器读取
+_connect_timing = threading.local()
+
+
+def _reset_connect_timing():
+    """重置当前线程的连接耗时"""
+    _connect_timing.connect = 0.0
+    _connect_timing.tls = 0.0
+
+
+def _add_connect_timing(phase: str, seconds: float):
+    """累加当前线程的连接耗时"""
+    setattr(_connect_timing, phase, getattr(_connect_timing, phase, 0.0) + seconds)
+
+
+class _TimedConnectionMixin:
+    """记录TCP连接耗时（包含DNS解析）的连接混入类
+
+    设置了 dns_cache 时先从缓存取得地址，依次尝试连接，全部失败时清除该缓存条目
+    """
+
+    dns_cache: Optional[DNSCache] = None
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            if self.dns_cache is None:
+                return super()._new_conn()
+            return self._new_conn_cached()
+        finally:
+            _add_connect_timing('connect', time.perf_counter() - start)
+
+    def _new_conn_cached(self):
+        host = self._dns_host
+        addresses = self.dns_cache.resolve(host, self.port)
+        if not addresses:
+            return super()._new_conn()
+
+        last_error = None
+        for address in addresses:
+            # 只替换建立TCP连接使用的地址，SNI和证书校验仍使用原主机名
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                last_error = e
+            finally:
+                self._dns_host = host
+
+        self.dns_cache.invalidate(host, self.port)
+        raise last_error
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    """记录连接耗时的HTTP连接"""
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    """记录连接耗时和TLS握手耗时的HTTPS连接"""
+
+    def connect(self):
+        start = time.perf_counter()
+        connect_before = getattr(_connect_timing, 'connect', 0.0)
+        try:
+            super().connect()
+        finally:
+            # 整个connect耗时扣除TCP连接部分即为TLS握手耗时
+            tcp_time = getattr(_connect_timing, 'connect', 0.0) - connect_before
+            _add_connect_timing('tls', max(time.perf_counter() - start - tcp_time, 0.0))
+
+    def close(self):
+        # 关闭前保存TLS会话，供之后新建的连接恢复
+        context = self.ssl_context
+        if self.sock is not None and isinstance(context, ResumingSSLContext) and context.session_cache is not None:
+            server_name = self.server_hostname or getattr(self, '_tunnel_host', None) or self.host
+            context.session_cache.update(server_name.rstrip('.'), self.sock)
+        super().close()
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """使用计时连接的HTTP适配器
+
+    连接池复用连接，新建连接时记录TCP连接和TLS握手耗时，
+    可选使用DNS解析缓存，以及共享的 SSLContext 恢复TLS会话
+    """
+
+    def __init__(self, dns_cache: DNSCache = None, tls_cache: TLSSessionCache = None, **kwargs):
+        """初始化适配器
+
+        Args:
+            dns_cache: DNS解析缓存（可选）
+            tls_cache: TLS会话缓存（可选）
+            **kwargs: HTTPAdapter 的参数（pool_connections、pool_maxsize 等）
+        """
+        # HTTPAdapter.__init__ 中会调用 init_poolmanager，需要先设置
+        self.dns_cache = dns_cache
+        self.ssl_context = create_ssl_context(tls_cache, DEFAULT_CA_BUNDLE_PATH) if tls_cache is not None else None
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.ssl_context is not None:
+            kwargs['ssl_context'] = self.ssl_context
+        super().init_poolmanager(*args, **kwargs)
+
+        http_pool, https_pool = _TimedHTTPConnectionPool, _TimedHTTPSConnectionPool
+        if self.dns_cache is not None:
+            # 每个适配器使用自己的缓存，连接类按适配器派生
+            attrs = {'dns_cache': self.dns_cache}
+            http_pool = type('_CachedHTTPConnectionPool', (http_pool,), {
+                'ConnectionCls': type('_CachedHTTPConnection', (_TimedHTTPConnection,), attrs)
+            })
+            https_pool = type('_CachedHTTPSConnectionPool', (https_pool,), {
+                'ConnectionCls': type('_CachedHTTPSConnection', (_TimedHTTPSConnection,), attrs)
+            })
+        self.poolmanager.pool_classes_by_scheme = {'http': http_pool, 'https': https_pool}
+
+    def cert_verify(self, conn, url, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if self.ssl_context is not None and verify is True:
+            # 共享的 SSLContext 已加载默认CA证书，避免每个新连接重复加载
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+# 有总期限时每次读取响应体的最大字节数，每次读取后检查是否超时
+DEADLINE_CHUNK_SIZE = 64 * 1024
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """请求超过总期限，连接已关闭"""
+
+
+@dataclass(frozen=True)
+class RequestTimeout:
+    """请求的超时设置
+
+    连接超时和读取超时由传输层在套接字上生效；总期限在收到响应头后和每次读取响应体之后检查，
+    超过时关闭连接并抛出 DeadlineExceeded。连接超时和读取超时不会超过总期限
+
+    限制: 收到响应头之前无法检查总期限，服务端迟迟不返回响应头时只由连接超时和读取超时结束请求，
+    请求最长约 connect + min(read, total) 秒后才结束（逐字节缓慢返回响应头时可能更久）
+
+    Attributes:
+        connect: 建立连接的超时（秒）
+        read: 等待响应数据的超时（秒，两次收到数据之间的间隔）
+        total: 整个请求的总期限（秒），None表示不限制
+    """
+    connect: float = 30.0
+    read: float = 30.0
+    total: Optional[float] = None
+
+    @classmethod
+    def from_config(cls, config: Any = None, default: 'RequestTimeout' = None) -> 'RequestTimeout':
+        """从配置创建
+
+        Args:
+            config: 数字（连接和读取使用同一超时）或 {connect, read, total} 字典，为None时返回 default
+            default: 未配置的字段沿用的超时设置
+
+        Returns:
+            RequestTimeout 实例
+
+        Raises:
+            ValueError: 配置格式不合法或超时不是正数
+        """
+        default = default or cls()
+        if config is None:
+            return default
+        if isinstance(config, (int, float)) and not isinstance(config, bool):
+            config = {'connect': config, 'read': config}
+        if not isinstance(config, Mapping):
+            raise ValueError(f"超时配置必须是数字或包含 connect / read / total 的字典: {config}")
+
+        values = {name: getattr(default, name) for name in cls.__dataclass_fields__}
+        values.update({k: v for k, v in config.items() if k in values})
+        for name, value in values.items():
+            if value is None and name == 'total':
+                continue
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"超时 {name} 必须是正数: {value}")
+        return cls(**values)
+
+    def limits(self) -> Tuple[float, float]:
+        """传输层使用的 (连接超时, 读取超时)，均不超过总期限"""
+        if self.total is None:
+            return self.connect, self.read
+        return min(self.connect, self.total), min(self.read, self.total)
+
+    def deadline(self, start: float) -> Optional[float]:
+        """从 start（perf_counter）开始计算的截止时间，未设置总期限时为None"""
+        return start + self.total if self.total is not None else None
+
+
+def _check_deadline(deadline: Optional[float], response: Any, total: Optional[float]):
+    """超过截止时间时关闭响应（释放连接）并抛出 DeadlineExceeded"""
+    if deadline is not None and time.perf_counter() > deadline:
+        response.close()
+        raise DeadlineExceeded(f"请求超过总期限 {total:g}s，已取消")
+
+
+class _NoCookiePolicy(cookiejar.DefaultCookiePolicy):
+    """不在请求之间保留Cookie，保持每个请求相互独立"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+@dataclass
+class TransportResponse:
+    """传输层返回的原始响应
+
+    Attributes:
+        status_code: HTTP状态码
+        headers: 响应头
+        content: 响应体字节
+        elapsed: 从发送请求到收到响应头的耗时（秒）
+        timings: 客户端耗时分解（秒）: connect、tls、ttfb、download
+        http_version: 协议版本（如 HTTP/1.1、HTTP/2）
+        raw: 客户端库的响应对象，用于按其编码规则解析响应体
+    """
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    elapsed: float
+    timings: Dict[str, float] = field(default_factory=dict)
+    http_version: str = 'HTTP/1.1'
+    raw: Any = None
+
+    def json(self) -> Any:
+        """解析为JSON，失败时抛出 ValueError"""
+        return self.raw.json()
+
+    @property
+    def text(self) -> str:
+        """按响应编码解码的文本"""
+        return self.raw.text
+
+
+class Transport(ABC):
+    """传输层接口
+
+    子类实现 send 和 close，execute 负责组装参数、解析响应体和记录日志
+    """
+
+    name = ''
+    dns_cache: Optional[DNSCache] = None
+    tls_cache: Optional[TLSSessionCache] = None
+
+    @abstractmethod
+    def send(self, method: str, url: str, headers: Dict, timeout: RequestTimeout, **kwargs) -> TransportResponse:
+        """发送请求并读取完整响应
+
+        Args:
+            method: 请求方法
+            url: 请求URL
+            headers: 请求头
+            timeout: 超时设置（连接、读取和总期限）
+            **kwargs: params / data / json 之一
+
+        Returns:
+            TransportResponse: 原始响应
+
+        Raises:
+            DeadlineExceeded: 超过总期限（连接已关闭）
+            requests.exceptions.Timeout: 请求超时
+            requests.exceptions.ConnectionError: 连接错误
+            requests.exceptions.RequestException: 其他请求异常
+        """
+
+    def close(self):
+        """关闭连接池"""
+
+    def cache_stats(self) -> Dict[str, Optional[Dict[str, int]]]:
+        """DNS缓存和TLS会话缓存的命中/未命中次数（未启用的缓存为None）"""
+        return {
+            'dns': self.dns_cache.stats() if self.dns_cache is not None else None,
+            'tls': self.tls_cache.stats() if self.tls_cache is not None else None
+        }
+
+
+class RequestsTransport(Transport):
+    """基于 requests 的传输层（HTTP/1.1，默认）"""
+
+    name = 'requests'
+
+    def __init__(self, pool_size: int = 10, dns_cache: DNSCache = None, tls_cache: TLSSessionCache = None):
+        """初始化传输层
+
+        Args:
+            pool_size: 每个主机的连接池大小
+            dns_cache: DNS解析缓存（可选）
+            tls_cache: TLS会话缓存（可选）
+        """
+        self.dns_cache = dns_cache
+        self.tls_cache = tls_cache
+
+        # 复用连接的会话
+        self.session = requests.Session()
+        self.session.cookies.set_policy(_NoCookiePolicy())
+        adapter = TimedHTTPAdapter(
+            dns_cache=dns_cache,
+            tls_cache=tls_cache,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def send(self, method: str, url: str, headers: Dict, timeout: RequestTimeout, **kwargs) -> TransportResponse:
+        # 发送请求（stream模式下收到响应头即返回，便于分段计时）
+        _reset_connect_timing()
+        start = time.perf_counter()
+        deadline = timeout.deadline(start)
+        response = self.session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            timeout=timeout.limits(),
+            stream=True,
+            **kwargs
+        )
+        headers_received = time.perf_counter()
+
+        # 下载响应体（有总期限时逐次读取已到达的数据，超时即关闭连接）
+        if deadline is None:
+            content = response.content
+        else:
+            content = self._read_with_deadline(response, deadline, timeout.total)
+        downloaded = time.perf_counter()
+
+        connect_time = _connect_timing.connect
+        tls_time = _connect_timing.tls
+        return TransportResponse(
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content=content or b'',
+            elapsed=response.elapsed.total_seconds(),
+            timings={
+                'connect': connect_time,
+                'tls': tls_time,
+                'ttfb': max(headers_received - start - connect_time - tls_time, 0.0),
+                'download': downloaded - headers_received
+            },
+            http_version='HTTP/1.1' if getattr(response.raw, 'version', 11) == 11 else 'HTTP/1.0',
+            raw=response
+        )
+
+    @staticmethod
+    def _read_with_deadline(response: requests.Response, deadline: float, total: float) -> bytes:
+        """读取响应体，每次读取后检查总期限
+
+        read1 每次只返回已到达的数据，服务端缓慢发送时也能及时检查期限（需要 urllib3>=2.3）；
+        urllib3 的异常按 Response.content 的规则转换为 requests 的异常
+
+        Raises:
+            DeadlineExceeded: 超过总期限（连接已关闭）
+        """
+        _check_deadline(deadline, response, total)
+        raw = response.raw
+        chunks = []
+        try:
+            while True:
+                chunk = raw.read1(DEADLINE_CHUNK_SIZE, decode_content=True)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                _check_deadline(deadline, response, total)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ReadTimeout(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+
+        # 与 Response.content 相同，保存已读取的内容供 json() / text 使用
+        response._content = b''.join(chunks)
+        response._content_consumed = True
+        return response._content
+
+    def close(self):
+        self.session.close()
+
+
+class HTTPXTransport(Transport):
+    """基于 httpx 的传输层，支持 HTTP/2
+
+    HTTP/2 下同一主机的并发请求复用一个连接（多路复用），避免连接频繁建立和队头阻塞；
+    服务端不支持 HTTP/2 时通过 ALPN 协商自动回退到 HTTP/1.1。
+    明文 http:// 地址默认使用 HTTP/1.1（h2c 需要服务端显式支持）。
+    httpx 的域名解析不可替换，只支持TLS会话复用（HTTP/2 下新建连接本身很少）
+    """
+
+    name = 'httpx'
+
+    def __init__(self, pool_size: int = 10, http2: bool = True,
+                 dns_cache: DNSCache = None, tls_cache: TLSSessionCache = None):
+        """初始化传输层
+
+        Args:
+            pool_size: 最大连接数（HTTP/2 下每个主机通常只需要一个连接）
+            http2: 是否启用 HTTP/2
+            dns_cache: 不支持，忽略
+            tls_cache: TLS会话缓存（可选）
+
+        Raises:
+            ImportError: 未安装 httpx（或启用 HTTP/2 时未安装 h2）
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("使用 httpx 传输层需要安装 httpx: pip install 'httpx[http2]'")
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise ImportError("启用 HTTP/2 需要安装 h2: pip install 'httpx[http2]'")
+
+        self._httpx = httpx
+        self.tls_cache = tls_cache
+        self.client = httpx.Client(
+            http2=http2,
+            verify=create_ssl_context(tls_cache, DEFAULT_CA_BUNDLE_PATH) if tls_cache is not None else True,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            # 与 requests 传输层相同，不在请求之间保留Cookie（客户端由所有并发线程共享）
+            cookies=cookiejar.CookieJar(policy=_NoCookiePolicy()),
+            # 与 requests 一致自动跟随重定向
+            follow_redirects=True
+        )
+
+    def send(self, method: str, url: str, headers: Dict, timeout: RequestTimeout, **kwargs) -> TransportResponse:
+        httpx = self._httpx
+        connect_timeout, read_timeout = timeout.limits()
+        timings = {'connect': 0.0, 'tls': 0.0}
+        marks: Dict[str, float] = {}
+
+        def trace(event_name: str, info: Dict):
+            # httpcore 的连接事件: connection.connect_tcp.started/complete、connection.start_tls.started/complete
+            marks[event_name] = time.perf_counter()
+            if event_name == 'connection.connect_tcp.complete':
+                timings['connect'] += marks[event_name] - marks.get('connection.connect_tcp.started', marks[event_name])
+            elif event_name == 'connection.start_tls.complete':
+                timings['tls'] += marks[event_name] - marks.get('connection.start_tls.started', marks[event_name])
+
+        if 'data' in kwargs and isinstance(kwargs['data'], (str, bytes)):
+            # httpx 的 data 只接受表单字典，原始请求体使用 content
+            kwargs['content'] = kwargs.pop('data')
+
+        start = time.perf_counter()
+        deadline = timeout.deadline(start)
+        try:
+            request = self.client.build_request(
+                method, url, headers=headers,
+                timeout=httpx.Timeout(connect=connect_timeout, read=read_timeout,
+                                      write=read_timeout, pool=connect_timeout),
+                extensions={'trace': trace}, **kwargs
+            )
+            response = self.client.send(request, stream=True)
+            headers_received = time.perf_counter()
+            try:
+                if deadline is None:
+                    content = response.read()
+                else:
+                    _check_deadline(deadline, response, timeout.total)
+                    chunks = []
+                    for chunk in response.iter_bytes():
+                        chunks.append(chunk)
+                        _check_deadline(deadline, response, timeout.total)
+                    # 与 Response.read() 相同，保存已读取的内容供 json() / text 使用
+                    content = response._content = b''.join(chunks)
+            finally:
+                response.close()
+            downloaded = time.perf_counter()
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except (httpx.ConnectError, httpx.RemoteProtocolError, httpx.NetworkError) as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+
+        return TransportResponse(
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            content=content or b'',
+            elapsed=headers_received - start,
+            timings={
+                'connect': timings['connect'],
+                'tls': timings['tls'],
+                'ttfb': max(headers_received - start - timings['connect'] - timings['tls'], 0.0),
+                'download': downloaded - headers_received
+            },
+            http_version=response.http_version,
+            raw=response
+        )
+
+    def close(self):
+        self.client.close()
+
+
+# 可选的传输层（config.yaml 中环境的 transport 字段）
+TRANSPORTS = {
+    RequestsTransport.name: RequestsTransport,
+    HTTPXTransport.name: HTTPXTransport
+}
+
+
+def create_transport(name: str = 'requests', pool_size: int = 10,
+                     dns_cache: DNSCache = None, tls_cache: TLSSessionCache = None) -> Transport:
+    """按名称创建传输层
+
+    Args:
+        name: 传输层名称（requests / httpx）
+        pool_size: 连接池大小
+        dns_cache: DNS解析缓存（可选）
+        tls_cache: TLS会话缓存（可选）
+
+    Returns:
+        Transport 实例
+
+    Raises:
+        ValueError: 不支持的传输层
+    """
+    transport_cls = TRANSPORTS.get((name or 'requests').lower())
+    if transport_cls is None:
+        raise ValueError(f"不支持的传输层: {name}，可选: {', '.join(TRANSPORTS)}")
+    return transport_cls(pool_size=pool_size, dns_cache=dns_cache, tls_cache=tls_cache)
+
 
 class APIExecutor:
     """接口执行器
@@ -14,17 +570,45 @@ class APIExecutor:
     封装HTTP请求的发送和响应处理
     """
 
-    def __init__(self, timeout: int = 30):
+    def __init__(self, timeout: Union[float, RequestTimeout] = 30, pool_size: int = 10,
+                 transport: Union[str, Transport] = 'requests',
+                 dns_cache_ttl: float = 60.0, tls_session_cache: bool = True):
         """初始化接口执行器
 
         Args:
-            timeout: 请求超时时间（秒）
+            timeout: 默认超时设置，为数字时连接和读取使用同一超时（秒），不限制总期限
+            pool_size: 每个主机的连接池大小，并发执行时应不小于并发数
+            transport: 传输层名称（requests / httpx）或 Transport 实例
+            dns_cache_ttl: DNS解析结果缓存时间（秒），0表示不缓存（传入 Transport 实例时忽略）
+            tls_session_cache: 新建HTTPS连接时是否恢复TLS会话（传入 Transport 实例时忽略）
         """
-        self.timeout = timeout
+        self.timeout = timeout if isinstance(timeout, RequestTimeout) else RequestTimeout.from_config(timeout)
         self.logger = logger
+        if isinstance(transport, Transport):
+            self.transport = transport
+        else:
+            self.transport = create_transport(
+                transport,
+                pool_size,
+                dns_cache=DNSCache(dns_cache_ttl) if dns_cache_ttl and dns_cache_ttl > 0 else None,
+                tls_cache=TLSSessionCache() if tls_session_cache else None
+            )
+
+    def close(self):
+        """关闭传输层的连接池"""
+        self.transport.close()
+
+    def connection_stats(self) -> Dict[str, Optional[Dict[str, int]]]:
+        """DNS缓存和TLS会话复用的命中/未命中次数
+
+        Returns:
+            {'dns': {'hits', 'misses'}, 'tls': {'hits', 'misses'}}，未启用的缓存为None
+        """
+        return self.transport.cache_stats()
 
     def execute(self, url: str, method: str, headers: Dict,
-                params: Any, param_type: str) -> Dict[str, Any]:
+                params: Any, param_type: str, log_key: str = None,
+                timeout: RequestTimeout = None) -> Dict[str, Any]:
         """执行HTTP请求
 
         Args:
@@ -33,6 +617,8 @@ class APIExecutor:
             headers: 请求头
             params: 请求参数
             param_type: 参数类型（params/data/json）
+            log_key: 日志采样键（通常为用例ID），压测日志模式下按此键采样，默认使用URL
+            timeout: 本次请求的超时设置（可选），默认使用执行器的超时设置
 
         Returns:
             响应字典，包含:
@@ -40,15 +626,23 @@ class APIExecutor:
             - headers: 响应头
             - body: 响应体
             - response_time: 响应时间（秒）
+            - body_size: 响应体字节数
+            - timings: 客户端耗时分解（秒），包含:
+              connect（TCP连接，含DNS）、tls（TLS握手）、ttfb（首字节）、
+              download（下载响应体）、decode（解析响应体）
 
         Raises:
+            DeadlineExceeded: 超过总期限（requests.exceptions.Timeout 的子类）
             requests.exceptions.Timeout: 请求超时
             requests.exceptions.RequestException: 请求异常
         """
-        self.logger.info(f"执行请求: {method} {url}")
-        self.logger.debug(f"请求头: {headers}")
-        self.logger.debug(f"请求参数: {params}")
-        self.logger.debug(f"参数类型: {param_type}")
+        # 压测日志模式下按用例采样，调试日志延迟格式化，未启用DEBUG级别时不产生格式化开销
+        verbose = Logger.should_log(log_key or url)
+        if verbose:
+            self.logger.info("执行请求: {} {}", method, url)
+            self.logger.opt(lazy=True).debug("请求头: {}", lambda: Logger.truncate(headers))
+            self.logger.opt(lazy=True).debug("请求参数: {}", lambda: Logger.truncate(params))
+            self.logger.debug("参数类型: {}", param_type)
 
         try:
             # 根据参数类型决定如何发送
@@ -59,40 +653,44 @@ class APIExecutor:
             else:  # json
                 kwargs = {'json': params}
 
-            # 发送请求
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=headers,
-                timeout=self.timeout,
-                **kwargs
-            )
+            response = self.transport.send(method, url, headers, timeout or self.timeout, **kwargs)
+
+            # 解析响应体
+            decode_start = time.perf_counter()
+            body = self._parse_response_body(response)
+            decode_time = time.perf_counter() - decode_start
 
             # 构建响应结果
             result = {
                 'status_code': response.status_code,
                 'headers': dict(response.headers),
-                'body': self._parse_response_body(response),
-                'response_time': response.elapsed.total_seconds()
+                'body': body,
+                'response_time': response.elapsed,
+                'body_size': len(response.content),
+                'timings': dict(response.timings, decode=decode_time)
             }
 
-            self.logger.info(f"响应状态码: {result['status_code']}")
-            self.logger.info(f"响应时间: {result['response_time']:.3f}s")
-            self.logger.debug(f"响应体: {result['body']}")
+            if verbose:
+                self.logger.info("响应状态码: {}", result['status_code'])
+                self.logger.info("响应时间: {:.3f}s", result['response_time'])
+                self.logger.opt(lazy=True).debug("响应体: {}", lambda: Logger.truncate(result['body']))
 
             return result
 
-        except requests.exceptions.Timeout:
-            self.logger.error(f"请求超时: {url}")
+        except requests.exceptions.Timeout as e:
+            if Logger.should_log(f"error:{log_key or url}"):
+                self.logger.error("请求超时: {}（{}）", url, e)
             raise
         except requests.exceptions.ConnectionError as e:
-            self.logger.error(f"连接错误: {e}")
+            if Logger.should_log(f"error:{log_key or url}"):
+                self.logger.error("连接错误: {}", e)
             raise
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"请求失败: {e}")
+            if Logger.should_log(f"error:{log_key or url}"):
+                self.logger.error("请求失败: {}", e)
             raise
 
-    def _parse_response_body(self, response: requests.Response) -> Any:
+    def _parse_response_body(self, response: TransportResponse) -> Any:
         """解析响应体
 
         Args:
@@ -0,0 +1,197 @@
+"""容量探测 - 逐级增加并发，找出吞吐量不再增长或SLO被破坏的拐点
+
+每一级以固定并发运行 step_duration 秒，记录TPS、错误率和响应时间百分位:
+    SLO破坏:   错误率超过 max_error_rate、P99超过 p99_ms，或该级被提前终止规则中止
+    吞吐量饱和: 扩展效率 =（TPS相对增长）/（并发相对增长）低于 min_scaling
+
+出现任一情况即停止加压。满足SLO的各级中TPS最高的一级为拐点，其TPS为最大可持续吞吐量
+"""
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CapacitySearchConfig:
+    """容量探测配置
+
+    Attributes:
+        start_users: 起始并发数
+        step_users: 每级增加的并发数（step_factor 为None时使用）
+        step_factor: 每级并发数的倍数（如1.5），设置后优先于 step_users
+        max_users: 最大并发数
+        step_duration: 每级持续时间（秒）
+        p99_ms: P99响应时间SLO（毫秒），为None时不检查
+        max_error_rate: 错误率SLO（0-1）
+        min_scaling: 最低扩展效率，低于此值视为吞吐量不再随并发增长
+    """
+    start_users: int = 5
+    step_users: int = 5
+    step_factor: Optional[float] = None
+    max_users: int = 200
+    step_duration: int = 30
+    p99_ms: Optional[float] = None
+    max_error_rate: float = 0.01
+    min_scaling: float = 0.3
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'CapacitySearchConfig':
+        """从配置字典创建，忽略未知字段
+
+        Args:
+            config: 配置字典（config.yaml 中的 performance.capacity_search）
+
+        Returns:
+            CapacitySearchConfig 实例
+        """
+        config = config or {}
+        known = cls.__dataclass_fields__.keys()
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+    def user_steps(self) -> List[int]:
+        """各级的并发数"""
+        steps = []
+        users = max(1, self.start_users)
+        while users <= self.max_users:
+            steps.append(users)
+            if self.step_factor:
+                users = max(users + 1, int(round(users * self.step_factor)))
+            else:
+                users += max(1, self.step_users)
+        if not steps or steps[-1] < self.max_users:
+            steps.append(self.max_users)
+        return steps
+
+
+@dataclass
+class CapacityStep:
+    """一级并发的测试结果"""
+    users: int
+    duration: float
+    total_requests: int
+    error_rate: float
+    tps: float
+    avg_time: float
+    p50_time: float
+    p95_time: float
+    p99_time: float
+    scaling: Optional[float] = None  # 扩展效率（第一级为None）
+    slo_ok: bool = True
+    note: str = ''
+
+    @classmethod
+    def from_result(cls, users: int, result) -> 'CapacityStep':
+        """由 PerformanceResult 构建
+
+        Args:
+            users: 并发数
+            result: 该级的性能测试结果
+
+        Returns:
+            CapacityStep 实例
+        """
+        total = result.total_requests
+        return cls(
+            users=users,
+            duration=result.actual_duration,
+            total_requests=total,
+            error_rate=result.failure_count / total if total else 0.0,
+            tps=result.tps,
+            avg_time=result.avg_time,
+            p50_time=result.median_time,
+            p95_time=result.p95_time,
+            p99_time=result.p99_time
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'users': self.users,
+            'duration': self.duration,
+            'total_requests': self.total_requests,
+            'error_rate': self.error_rate,
+            'tps': self.tps,
+            'avg_time': self.avg_time,
+            'p50_time': self.p50_time,
+            'p95_time': self.p95_time,
+            'p99_time': self.p99_time,
+            'scaling': self.scaling,
+            'slo_ok': self.slo_ok,
+            'note': self.note
+        }
+
+
+@dataclass
+class CapacityResult:
+    """容量探测结果"""
+    config: CapacitySearchConfig
+    steps: List[CapacityStep] = field(default_factory=list)
+    stop_reason: str = ''
+
+    @property
+    def knee(self) -> Optional[CapacityStep]:
+        """拐点：满足SLO的各级中TPS最高的一级"""
+        passing = [s for s in self.steps if s.slo_ok]
+        return max(passing, key=lambda s: s.tps) if passing else None
+
+    @property
+    def max_sustainable_tps(self) -> float:
+        """最大可持续吞吐量"""
+        knee = self.knee
+        return knee.tps if knee else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        knee = self.knee
+        return {
+            'config': {
+                'start_users': self.config.start_users,
+                'step_users': self.config.step_users,
+                'step_factor': self.config.step_factor,
+                'max_users': self.config.max_users,
+                'step_duration': self.config.step_duration,
+                'p99_ms': self.config.p99_ms,
+                'max_error_rate': self.config.max_error_rate,
+                'min_scaling': self.config.min_scaling
+            },
+            'knee_users': knee.users if knee else None,
+            'max_sustainable_tps': self.max_sustainable_tps,
+            'stop_reason': self.stop_reason,
+            'steps': [s.to_dict() for s in self.steps]
+        }
+
+
+def evaluate_step(config: CapacitySearchConfig, step: CapacityStep,
+                  previous: Optional[CapacityStep], aborted: bool = False) -> Optional[str]:
+    """判定一级结果，填写 slo_ok / scaling / note
+
+    Args:
+        config: 探测配置
+        step: 本级结果
+        previous: 上一级结果
+        aborted: 本级是否被提前终止规则中止
+
+    Returns:
+        应停止加压时返回原因，否则返回None
+    """
+    breaches = []
+    if aborted:
+        breaches.append("触发提前终止规则")
+    if step.error_rate > config.max_error_rate:
+        breaches.append(f"错误率 {step.error_rate:.2%} 超过 {config.max_error_rate:.2%}")
+    if config.p99_ms is not None and step.p99_time * 1000 > config.p99_ms:
+        breaches.append(f"P99 {step.p99_time * 1000:.0f}ms 超过 {config.p99_ms:g}ms")
+
+    if breaches:
+        step.slo_ok = False
+        step.note = "，".join(breaches)
+        return f"并发 {step.users} 时SLO被破坏: {step.note}"
+
+    if previous is not None and previous.tps > 0 and step.users > previous.users:
+        step.scaling = ((step.tps - previous.tps) / previous.tps) / ((step.users - previous.users) / previous.users)
+        if step.scaling < config.min_scaling:
+            step.note = f"扩展效率 {step.scaling:.2f} 低于 {config.min_scaling:g}"
+            return f"并发 {previous.users} → {step.users} 时吞吐量不再增长（{step.note}）"
+
+    return None
@@ -1,5 +1,7 @@
-"""Excel测试用例加载器"""
-import openpyxl
+"""Excel测试用例加载器
+
+openpyxl 在加载Excel文件时才导入，只使用 TestCase 的模块（请求构建、压测执行）不产生其导入开销
+"""
 from typing import List, Optional, Union
 from dataclasses import dataclass
 from pathlib import Path
@@ -28,6 +30,8 @@ class TestCase:
         expected_status: 期望HTTP状态码
         performance_config: 性能配置（JSON字符串，可选）
         max_response_time: 最大响应时间（毫秒，可选）
+        scenario: 所属场景（可选），同一场景的用例在性能测试中按顺序作为一个事务执行
+        response_schema: 响应体的 JSON Schema（JSON字符串，可选）
     """
     case_id: str
     module: str
@@ -43,6 +47,8 @@ class TestCase:
     expected_status: int
     performance_config: str = "{}"  # 默认为空配置
     max_response_time: int = 0  # 默认为0表示不限制
+    scenario: str = ""  # 默认不属于任何场景
+    response_schema: str = ""  # 默认不校验Schema
 
 
 class CaseLoader:
@@ -97,6 +103,8 @@ class CaseLoader:
         if not file_path.exists():
             raise FileNotFoundError(f"Excel文件不存在: {file_path}")
 
+        import openpyxl
+
         try:
             workbook = openpyxl.load_workbook(file_path)
 
@@ -202,7 +210,9 @@ class CaseLoader:
                 headers=str(row[10] if row[10] is not None else "{}"),
                 expected_status=int(row[11] if row[11] else 200),
                 performance_config=str(row[12] if len(row) > 12 and row[12] is not None else "{}"),
-                max_response_time=int(row[13] if len(row) > 13 and row[13] is not None else 0)
+                max_response_time=int(row[13] if len(row) > 13 and row[13] is not None else 0),
+                scenario=str(row[14] if len(row) > 14 and row[14] is not None else "").strip(),
+                response_schema=str(row[15] if len(row) > 15 and row[15] is not None else "").strip()
             )
         except Exception as e:
             self.logger.warning(f"解析行数据失败: {row}, 错误: {e}")
@@ -0,0 +1,241 @@
+"""连接缓存 - DNS解析缓存和TLS会话复用
+
+连接池只复用已建立的连接。压测启动阶段、服务端关闭空闲连接或连接数超过池大小时仍会新建连接，
+每次都要重新解析域名并完成完整的TLS握手:
+    DNSCache:        按 (主机, 端口) 缓存 getaddrinfo 的结果，超过 TTL 后重新解析
+    TLSSessionCache: 按服务器名称保存TLS会话，新连接握手时携带会话（session ticket / session id），
+                     服务端接受时跳过证书交换和密钥协商
+
+两个缓存都是线程安全的，并统计命中/未命中次数
+"""
+import ipaddress
+import socket
+import ssl
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 缓存的最大条目数（按最近使用淘汰）
+DEFAULT_MAX_ENTRIES = 256
+
+
+class DNSCache:
+    """带 TTL 的 DNS 解析缓存
+
+    getaddrinfo 不返回记录本身的 TTL，过期时间统一使用配置的 ttl。
+    IP 地址不经过缓存，解析失败的结果不缓存
+    """
+
+    def __init__(self, ttl: float = 60.0, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """初始化缓存
+
+        Args:
+            ttl: 解析结果的缓存时间（秒）
+            max_entries: 最大条目数
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Tuple[str, int], Tuple[float, List[str]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int) -> Optional[List[str]]:
+        """解析主机地址
+
+        Args:
+            host: 主机名
+            port: 端口
+
+        Returns:
+            按 getaddrinfo 顺序去重的IP地址列表；host 本身是IP或解析失败时返回None，
+            由调用方按原方式建立连接（解析失败时由其抛出原始异常）
+        """
+        if _is_ip_address(host):
+            return None
+
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        try:
+            infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            return None
+
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return addresses
+
+    def invalidate(self, host: str, port: int):
+        """删除缓存的解析结果（缓存的地址全部连接失败时调用）"""
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+    def stats(self) -> Dict[str, int]:
+        """命中和未命中次数"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+class TLSSessionCache:
+    """TLS 会话缓存
+
+    TLS 1.2 的会话在握手完成后即可复用；TLS 1.3 的 session ticket 在握手之后才由服务端发送，
+    因此同时保留每个服务器最近一个连接的弱引用，新连接握手前从该连接读取最新的会话
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """初始化缓存
+
+        Args:
+            max_entries: 最大条目数
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._sessions: 'OrderedDict[str, ssl.SSLSession]' = OrderedDict()
+        self._sockets: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, server_name: str) -> Optional[ssl.SSLSession]:
+        """获取可用于恢复的会话
+
+        Args:
+            server_name: 服务器名称（SNI）
+
+        Returns:
+            会话，没有时返回None
+        """
+        with self._lock:
+            session = self._sessions.get(server_name)
+            ref = self._sockets.get(server_name)
+        sock = ref() if ref is not None else None
+        if sock is not None:
+            try:
+                live = sock.session
+            except (OSError, ValueError, AttributeError):
+                live = None
+            if live is not None and (session is None or live.has_ticket):
+                session = live
+        return session
+
+    def put(self, server_name: str, sock: ssl.SSLSocket):
+        """记录握手完成的连接
+
+        Args:
+            server_name: 服务器名称（SNI）
+            sock: 已完成握手的TLS连接
+        """
+        session = sock.session
+        with self._lock:
+            if session is not None:
+                self._sessions[server_name] = session
+                self._sessions.move_to_end(server_name)
+                while len(self._sessions) > self.max_entries:
+                    self._sockets.pop(self._sessions.popitem(last=False)[0], None)
+            self._sockets[server_name] = weakref.ref(sock)
+            if sock.session_reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def update(self, server_name: str, sock: ssl.SSLSocket):
+        """连接关闭前保存其最新的会话（TLS 1.3 的 session ticket 在读取响应时才收到）
+
+        Args:
+            server_name: 服务器名称（SNI）
+            sock: 即将关闭的TLS连接
+        """
+        try:
+            session = sock.session
+        except (OSError, ValueError, AttributeError):
+            return
+        if session is None:
+            return
+        with self._lock:
+            if server_name in self._sessions or len(self._sessions) < self.max_entries:
+                self._sessions[server_name] = session
+                self._sessions.move_to_end(server_name)
+
+    def stats(self) -> Dict[str, int]:
+        """会话恢复（命中）和完整握手（未命中）次数"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+
+class ResumingSSLContext(ssl.SSLContext):
+    """握手时自动携带缓存会话的 SSLContext
+
+    requests（urllib3）和 httpx 都通过 SSLContext.wrap_socket 建立TLS连接，
+    所有连接共用一个 context，同时省去每个新连接重新创建 context 和加载CA证书的开销
+    """
+
+    session_cache: Optional[TLSSessionCache] = None
+
+    def wrap_socket(self, sock, server_side=False, do_handshake_on_connect=True,
+                    suppress_ragged_eofs=True, server_hostname=None, session=None):
+        cache = self.session_cache
+        if cache is not None and session is None and server_hostname and not server_side:
+            session = cache.get(server_hostname)
+
+        ssl_sock = super().wrap_socket(
+            sock,
+            server_side=server_side,
+            do_handshake_on_connect=do_handshake_on_connect,
+            suppress_ragged_eofs=suppress_ragged_eofs,
+            server_hostname=server_hostname,
+            session=session
+        )
+
+        if cache is not None and server_hostname and not server_side and do_handshake_on_connect:
+            cache.put(server_hostname, ssl_sock)
+        return ssl_sock
+
+
+def create_ssl_context(session_cache: Optional[TLSSessionCache] = None,
+                       cafile: Optional[str] = None) -> ResumingSSLContext:
+    """创建验证证书的客户端 SSLContext（与 urllib3 的默认配置一致）
+
+    Args:
+        session_cache: TLS会话缓存（可选）
+        cafile: CA证书文件（如 certifi 的证书包），为None时加载系统默认证书
+
+    Returns:
+        ResumingSSLContext 实例
+    """
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.options |= ssl.OP_NO_COMPRESSION
+    context.post_handshake_auth = True
+    if cafile:
+        context.load_verify_locations(cafile=cafile)
+    else:
+        context.load_default_certs()
+    context.session_cache = session_cache
+    return context
+
+
+def _is_ip_address(host: str) -> bool:
+    """host 是否为IP地址（IPv6 可能带方括号）"""
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
@@ -43,23 +43,42 @@ class DataExtractor:
             self.logger.debug("无提取规则，跳过数据提取")
             return {}
 
-        extracted = {}
+        extracted = self.extract(response_data, extract_rules)
 
         for var_name, rule in extract_rules.items():
+            if var_name in extracted:
+                self.logger.info(f"提取数据: {var_name} = {extracted[var_name]}")
+            else:
+                self.logger.warning(f"提取失败: {var_name} (规则: {rule})")
+
+        # 保存到yaml文件
+        if extracted:
+            self.data_manager.update(extracted)
+
+        return extracted
+
+    def extract(self, response_data: Any, extract_rules: Dict[str, str]) -> Dict[str, Any]:
+        """从响应中提取数据（不保存，不记录逐条日志）
+
+        性能测试的场景中用于把数据提取到虚拟用户自己的变量里
+
+        Args:
+            response_data: 响应数据
+            extract_rules: 提取规则字典，格式同 extract_and_save
+
+        Returns:
+            提取成功的数据字典
+        """
+        extracted = {}
+
+        for var_name, rule in (extract_rules or {}).items():
             try:
                 value = self._extract_value(response_data, rule)
                 if value is not None:
                     extracted[var_name] = value
-                    self.logger.info(f"提取数据: {var_name} = {value}")
-                else:
-                    self.logger.warning(f"提取失败: {var_name} (规则: {rule})")
             except Exception as e:
                 self.logger.error(f"提取数据异常: {var_name}, 错误: {e}")
 
-        # 保存到yaml文件
-        if extracted:
-            self.data_manager.update(extracted)
-
         return extracted
 
     def _extract_value(self, data: Any, rule: str) -> Any:
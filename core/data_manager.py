@@ -1,5 +1,10 @@
-"""数据管理器 - 处理提取数据的存储和读取"""
-import yaml
+"""数据管理器 - 处理提取数据的存储和读取
+
+数据在内存中缓存，按文件修改时间失效：读取占位符不再每次解析YAML文件，
+其他进程修改数据文件后下次读取时重新加载。PyYAML 在读写数据文件时才导入
+"""
+import os
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional
 
@@ -23,8 +28,40 @@ class DataManager:
         """
         self.data_file = Path(data_file)
         self.logger = logger
+
+        # 内存缓存及其对应的文件修改时间
+        self._cache: Optional[Dict[str, Any]] = None
+        self._cache_mtime: Optional[int] = None
+        self._lock = threading.RLock()
+
         self._ensure_file_exists()
 
+    def _mtime(self) -> Optional[int]:
+        """数据文件的修改时间（纳秒），文件不存在时返回None"""
+        try:
+            return os.stat(self.data_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _read(self) -> Dict[str, Any]:
+        """读取数据（文件未修改时直接返回缓存，调用方不得修改返回值）"""
+        mtime = self._mtime()
+        cache = self._cache
+        if cache is not None and mtime is not None and mtime == self._cache_mtime:
+            return cache
+
+        import yaml
+
+        with self._lock:
+            try:
+                with open(self.data_file, 'r', encoding='utf-8') as f:
+                    data = yaml.safe_load(f) or {}
+            except Exception as e:
+                self.logger.error(f"加载数据文件失败: {e}")
+                return {}
+            self._cache, self._cache_mtime = data, mtime
+            return data
+
     def _ensure_file_exists(self):
         """确保数据文件存在"""
         if not self.data_file.exists():
@@ -36,15 +73,9 @@ class DataManager:
         """加载提取的数据
 
         Returns:
-            数据字典，文件不存在或为空时返回空字典
+            数据字典（副本），文件不存在或为空时返回空字典
         """
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                return data if data else {}
-        except Exception as e:
-            self.logger.error(f"加载数据文件失败: {e}")
-            return {}
+        return dict(self._read())
 
     def save(self, data: Dict[str, Any]):
         """保存提取的数据
@@ -52,13 +83,18 @@ class DataManager:
         Args:
             data: 要保存的数据字典
         """
-        try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
-            self.logger.debug(f"保存数据到文件: {self.data_file}")
-        except Exception as e:
-            self.logger.error(f"保存数据文件失败: {e}")
-            raise
+        import yaml
+
+        with self._lock:
+            try:
+                with open(self.data_file, 'w', encoding='utf-8') as f:
+                    yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+                self.logger.debug(f"保存数据到文件: {self.data_file}")
+            except Exception as e:
+                self._cache = self._cache_mtime = None
+                self.logger.error(f"保存数据文件失败: {e}")
+                raise
+            self._cache, self._cache_mtime = dict(data), self._mtime()
 
     def get(self, key: str, default: Any = None) -> Any:
         """获取单个数据
@@ -70,8 +106,7 @@ class DataManager:
         Returns:
             数据值，不存在时返回默认值
         """
-        data = self.load()
-        return data.get(key, default)
+        return self._read().get(key, default)
 
     def set(self, key: str, value: Any):
         """设置单个数据
@@ -80,9 +115,10 @@ class DataManager:
             key: 数据键名
             value: 数据值
         """
-        data = self.load()
-        data[key] = value
-        self.save(data)
+        with self._lock:
+            data = self.load()
+            data[key] = value
+            self.save(data)
         self.logger.debug(f"设置数据: {key} = {value}")
 
     def update(self, new_data: Dict[str, Any]):
@@ -94,9 +130,10 @@ class DataManager:
         if not new_data:
             return
 
-        data = self.load()
-        data.update(new_data)
-        self.save(data)
+        with self._lock:
+            data = self.load()
+            data.update(new_data)
+            self.save(data)
         self.logger.debug(f"批量更新数据: {list(new_data.keys())}")
 
     def delete(self, key: str):
@@ -105,11 +142,13 @@ class DataManager:
         Args:
             key: 数据键名
         """
-        data = self.load()
-        if key in data:
+        with self._lock:
+            data = self.load()
+            if key not in data:
+                return
             del data[key]
             self.save(data)
-            self.logger.debug(f"删除数据: {key}")
+        self.logger.debug(f"删除数据: {key}")
 
     def clear(self):
         """清空所有数据"""
@@ -0,0 +1,267 @@
+"""压测错误聚合 - 按类别归并错误，条目数有上限
+
+异常信息中常带有URL、IP端口、对象地址等每次不同的内容，直接以 str(e) 作为键时，
+连接风暴中会产生无限多的错误条目。聚合器把每个失败归入一个类别:
+    timeout    请求超时（连接超时、读取超时）
+    deadline   超过总期限，请求已取消（见 core/api_executor.py 的 RequestTimeout）
+    connect    连接失败（拒绝连接、连接重置等）
+    dns        域名解析失败
+    tls        TLS握手或证书错误
+    http_5xx   服务端错误状态码
+    http_4xx   客户端错误状态码
+    assertion  状态码不符合期望、响应体 / Schema / 响应时间校验不通过
+    other      其他异常
+
+每个类别内按规范化后的错误签名计数（URL、地址、数字等替换为占位符），
+签名数超过 max_signatures 时计入“其他”；每个签名保留前几条原始信息作为示例，
+每个类别按 interval 秒分桶统计次数随时间的变化
+"""
+import re
+import socket
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from core.api_executor import DeadlineExceeded
+
+# 错误类别
+CATEGORY_TIMEOUT = 'timeout'
+CATEGORY_DEADLINE = 'deadline'
+CATEGORY_CONNECT = 'connect'
+CATEGORY_DNS = 'dns'
+CATEGORY_TLS = 'tls'
+CATEGORY_HTTP_5XX = 'http_5xx'
+CATEGORY_HTTP_4XX = 'http_4xx'
+CATEGORY_ASSERTION = 'assertion'
+CATEGORY_OTHER = 'other'
+
+CATEGORY_LABELS = {
+    CATEGORY_TIMEOUT: '请求超时',
+    CATEGORY_DEADLINE: '超过总期限（已取消）',
+    CATEGORY_CONNECT: '连接失败',
+    CATEGORY_DNS: '域名解析失败',
+    CATEGORY_TLS: 'TLS错误',
+    CATEGORY_HTTP_5XX: 'HTTP 5xx',
+    CATEGORY_HTTP_4XX: 'HTTP 4xx',
+    CATEGORY_ASSERTION: '校验失败',
+    CATEGORY_OTHER: '其他错误',
+}
+
+# 签名数超过上限后的归并签名
+OVERFLOW_SIGNATURE = '（其他）'
+
+_DNS_PATTERN = re.compile(
+    r'NameResolutionError|Name or service not known|nodename nor servname|getaddrinfo failed|'
+    r'Temporary failure in name resolution|No address associated with hostname|Failed to resolve',
+    re.IGNORECASE
+)
+
+# 规范化规则（按顺序替换）
+_NORMALIZERS = [
+    (re.compile(r'[a-zA-Z][a-zA-Z0-9+.-]*://[^\s\'")>,]+'), '<url>'),
+    (re.compile(r'\bat 0x[0-9a-fA-F]+'), 'at <addr>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '<hex>'),
+    (re.compile(r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b'), '<uuid>'),
+    (re.compile(r'\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b'), '<ip>'),
+    (re.compile(r"host='[^']*'"), "host='<host>'"),
+    (re.compile(r'\d+(?:\.\d+)?'), '<n>'),
+]
+
+# 签名的最大长度
+MAX_SIGNATURE_CHARS = 200
+
+
+@dataclass
+class ErrorAggregationConfig:
+    """错误聚合配置
+
+    Attributes:
+        max_signatures: 每个类别最多保留的错误签名数
+        max_exemplars: 每个签名保留的原始信息条数
+        max_message_chars: 原始信息的最大字符数
+        interval: 次数随时间变化的分桶间隔（秒）
+    """
+    max_signatures: int = 20
+    max_exemplars: int = 3
+    max_message_chars: int = 500
+    interval: float = 10.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'ErrorAggregationConfig':
+        """从配置字典创建，忽略未知字段
+
+        Args:
+            config: 配置字典（config.yaml 中的 performance.errors）
+
+        Returns:
+            ErrorAggregationConfig 实例
+        """
+        config = config or {}
+        known = cls.__dataclass_fields__.keys()
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+
+@dataclass
+class ErrorSignature:
+    """同一签名的错误"""
+    count: int = 0
+    first_seen: Optional[float] = None  # 相对测试开始（秒）
+    last_seen: Optional[float] = None
+    exemplars: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ErrorCategory:
+    """一个类别的错误"""
+    count: int = 0
+    signatures: Dict[str, ErrorSignature] = field(default_factory=dict)
+    timeline: Dict[int, int] = field(default_factory=dict)  # 分桶序号 -> 次数
+
+
+def classify_exception(error: BaseException) -> str:
+    """按异常类型判断错误类别
+
+    httpx 传输层的异常已转换为 requests 的异常类型（见 core/api_executor.py）
+
+    Args:
+        error: 请求过程中抛出的异常
+
+    Returns:
+        错误类别
+    """
+    if isinstance(error, DeadlineExceeded):
+        return CATEGORY_DEADLINE
+    if isinstance(error, requests.exceptions.Timeout):
+        return CATEGORY_TIMEOUT
+    if isinstance(error, requests.exceptions.SSLError):
+        return CATEGORY_TLS
+    if isinstance(error, requests.exceptions.ConnectionError):
+        return CATEGORY_DNS if _is_dns_error(error) else CATEGORY_CONNECT
+    if isinstance(error, AssertionError):
+        return CATEGORY_ASSERTION
+    if isinstance(error, socket.gaierror):
+        return CATEGORY_DNS
+    if isinstance(error, (TimeoutError, socket.timeout)):
+        return CATEGORY_TIMEOUT
+    if isinstance(error, ConnectionError):
+        return CATEGORY_CONNECT
+    return CATEGORY_OTHER
+
+
+def classify_status(status_code: Optional[int]) -> str:
+    """按状态码判断校验失败的类别（4xx/5xx 单独归类，其余为校验失败）"""
+    if status_code and status_code >= 500:
+        return CATEGORY_HTTP_5XX
+    if status_code and status_code >= 400:
+        return CATEGORY_HTTP_4XX
+    return CATEGORY_ASSERTION
+
+
+def _is_dns_error(error: BaseException) -> bool:
+    """异常链中是否有域名解析失败"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, socket.gaierror) or _DNS_PATTERN.search(str(error)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def normalize_message(message: str) -> str:
+    """把错误信息中每次不同的部分替换为占位符，得到错误签名"""
+    for pattern, replacement in _NORMALIZERS:
+        message = pattern.sub(replacement, message)
+    return message[:MAX_SIGNATURE_CHARS]
+
+
+class ErrorAggregator:
+    """错误聚合器（调用方负责加锁）"""
+
+    def __init__(self, config: ErrorAggregationConfig = None):
+        """初始化聚合器
+
+        Args:
+            config: 聚合配置
+        """
+        self.config = config or ErrorAggregationConfig()
+        self.categories: Dict[str, ErrorCategory] = {}
+
+    @property
+    def total(self) -> int:
+        """错误总数"""
+        return sum(category.count for category in self.categories.values())
+
+    def add(self, category: str, message: str, elapsed: Optional[float] = None,
+            normalize: bool = True, count: int = 1) -> str:
+        """记录错误
+
+        Args:
+            category: 错误类别
+            message: 错误信息
+            elapsed: 发生时间（相对测试开始，秒），为None时不计入时间分布
+            normalize: 是否规范化（框架生成的校验失败信息本身不含变化的内容，无需规范化）
+            count: 次数
+
+        Returns:
+            错误统计中使用的键（“类别: 签名”）
+        """
+        config = self.config
+        stats = self.categories.get(category)
+        if stats is None:
+            stats = self.categories[category] = ErrorCategory()
+        stats.count += count
+
+        signature = normalize_message(message) if normalize else message[:MAX_SIGNATURE_CHARS]
+        entry = stats.signatures.get(signature)
+        if entry is None:
+            if len(stats.signatures) >= config.max_signatures:
+                signature = OVERFLOW_SIGNATURE
+                entry = stats.signatures.get(signature)
+            if entry is None:
+                entry = stats.signatures[signature] = ErrorSignature()
+        entry.count += count
+
+        if len(entry.exemplars) < config.max_exemplars and message not in entry.exemplars:
+            entry.exemplars.append(message[:config.max_message_chars])
+
+        if elapsed is not None:
+            if entry.first_seen is None:
+                entry.first_seen = elapsed
+            entry.last_seen = elapsed
+            bucket = int(elapsed // config.interval)
+            stats.timeline[bucket] = stats.timeline.get(bucket, 0) + count
+
+        return f"{CATEGORY_LABELS.get(category, category)}: {signature}"
+
+    def summary(self) -> str:
+        """单行汇总，如“请求超时 120，连接失败 3”"""
+        ordered = sorted(self.categories.items(), key=lambda item: item[1].count, reverse=True)
+        return "，".join(f"{CATEGORY_LABELS.get(name, name)} {stats.count}" for name, stats in ordered)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为报告使用的字典（时间分布为 [[桶开始秒, 次数], ...]）"""
+        interval = self.config.interval
+        return {
+            'interval': interval,
+            'categories': {
+                name: {
+                    'label': CATEGORY_LABELS.get(name, name),
+                    'count': stats.count,
+                    'timeline': [[bucket * interval, count] for bucket, count in sorted(stats.timeline.items())],
+                    'signatures': [
+                        {
+                            'signature': signature,
+                            'count': entry.count,
+                            'first_seen': entry.first_seen,
+                            'last_seen': entry.last_seen,
+                            'exemplars': entry.exemplars
+                        }
+                        for signature, entry in sorted(stats.signatures.items(),
+                                                       key=lambda item: item[1].count, reverse=True)
+                    ]
+                }
+                for name, stats in sorted(self.categories.items(), key=lambda item: item[1].count, reverse=True)
+            }
+        }
@@ -0,0 +1,254 @@
+"""压测机健康度监控 - 检测压测客户端自身是否成为瓶颈"""
+import gc
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Any, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class HealthThresholds:
+    """压测机饱和判定阈值
+
+    Attributes:
+        cpu_percent: 进程CPU占用阈值（占单核的百分比，受GIL限制Python进程的有效上限约为一个核）
+        scheduling_lag_ms: P95调度延迟阈值（毫秒），采样线程被唤醒的延迟反映GIL和CPU争用
+        gc_pause_ratio: GC暂停时间占比阈值（0-1）
+        queue_per_worker: 线程池平均积压任务数 / 并发数 的告警阈值
+        min_samples: 做出判定所需的最少采样次数，过短的测试不做判定
+    """
+    cpu_percent: float = 90.0
+    scheduling_lag_ms: float = 50.0
+    gc_pause_ratio: float = 0.05
+    queue_per_worker: float = 50.0
+    min_samples: int = 4
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'HealthThresholds':
+        """从配置字典创建阈值，忽略未知字段
+
+        Args:
+            config: 配置字典（config.yaml 中的 performance.generator_health）
+
+        Returns:
+            HealthThresholds 实例
+        """
+        config = config or {}
+        known = cls.__dataclass_fields__.keys()
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+
+@dataclass
+class GeneratorHealth:
+    """压测机健康度汇总"""
+
+    # 采样概况
+    sample_count: int = 0
+    interval: float = 0.0
+    cpu_count: int = 0
+
+    # CPU（占单核的百分比）
+    cpu_avg: float = 0.0
+    cpu_max: float = 0.0
+
+    # GC暂停
+    gc_collections: int = 0
+    gc_pause_total_ms: float = 0.0
+    gc_pause_max_ms: float = 0.0
+    gc_pause_ratio: float = 0.0
+
+    # 线程池积压
+    queue_depth_avg: float = 0.0
+    queue_depth_max: int = 0
+
+    # 调度延迟（毫秒）
+    lag_avg_ms: float = 0.0
+    lag_p95_ms: float = 0.0
+    lag_max_ms: float = 0.0
+
+    # 判定结果
+    reliable: bool = True
+    warnings: List[str] = field(default_factory=list)
+
+    # 时间线采样: [{'t', 'cpu', 'queue_depth', 'lag_ms', 'gc_pause_ms'}]
+    samples: List[Dict[str, float]] = field(default_factory=list)
+
+
+class GeneratorMonitor:
+    """压测机健康度监控器
+
+    在后台线程中按固定间隔采样本进程的CPU占用、GC暂停、
+    线程池积压和调度延迟，测试结束后汇总并判定结果是否可信
+    """
+
+    def __init__(self, interval: float = 0.5,
+                 thresholds: HealthThresholds = None,
+                 queue_depth_fn: Optional[Callable[[], int]] = None):
+        """初始化监控器
+
+        Args:
+            interval: 采样间隔（秒）
+            thresholds: 饱和判定阈值
+            queue_depth_fn: 返回线程池积压任务数的函数（可选）
+        """
+        self.interval = interval
+        self.thresholds = thresholds or HealthThresholds()
+        self.queue_depth_fn = queue_depth_fn
+        self.logger = logger
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._samples: List[Dict[str, float]] = []
+
+        # GC暂停统计（由gc回调写入）
+        self._gc_started = 0.0
+        self._gc_collections = 0
+        self._gc_pause_total = 0.0
+        self._gc_pause_max = 0.0
+        self._gc_pause_since_sample = 0.0
+
+        self._start_wall = 0.0
+        self._start_cpu = 0.0
+        self._stop_wall = 0.0
+        self._stop_cpu = 0.0
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]):
+        """gc回调，记录每次回收的暂停时间"""
+        if phase == 'start':
+            self._gc_started = time.perf_counter()
+        elif phase == 'stop' and self._gc_started:
+            pause = time.perf_counter() - self._gc_started
+            self._gc_started = 0.0
+            self._gc_collections += 1
+            self._gc_pause_total += pause
+            self._gc_pause_since_sample += pause
+            self._gc_pause_max = max(self._gc_pause_max, pause)
+
+    def _queue_depth(self) -> int:
+        if self.queue_depth_fn is None:
+            return 0
+        try:
+            return int(self.queue_depth_fn())
+        except Exception:
+            return 0
+
+    def _run(self):
+        """采样线程主循环"""
+        last_wall = time.perf_counter()
+        last_cpu = time.process_time()
+
+        while True:
+            expected = time.perf_counter() + self.interval
+            if self._stop_event.wait(self.interval):
+                break
+
+            now = time.perf_counter()
+            cpu_now = time.process_time()
+            wall_delta = now - last_wall
+
+            self._samples.append({
+                't': now - self._start_wall,
+                'cpu': (cpu_now - last_cpu) / wall_delta * 100 if wall_delta > 0 else 0.0,
+                'queue_depth': self._queue_depth(),
+                'lag_ms': max(now - expected, 0.0) * 1000,
+                'gc_pause_ms': self._gc_pause_since_sample * 1000
+            })
+            self._gc_pause_since_sample = 0.0
+            last_wall, last_cpu = now, cpu_now
+
+    def start(self):
+        """开始采样"""
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+        gc.callbacks.append(self._on_gc)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="generator-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止采样"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._stop_wall = time.perf_counter()
+        self._stop_cpu = time.process_time()
+
+    def summary(self, max_workers: int = 1) -> GeneratorHealth:
+        """汇总采样结果并判定测试结果是否可信
+
+        Args:
+            max_workers: 并发数，用于评估线程池积压程度
+
+        Returns:
+            GeneratorHealth: 健康度汇总
+        """
+        samples = self._samples
+        wall = (self._stop_wall or time.perf_counter()) - self._start_wall
+        cpu_time = (self._stop_cpu or time.process_time()) - self._start_cpu
+
+        health = GeneratorHealth(
+            sample_count=len(samples),
+            interval=self.interval,
+            cpu_count=os.cpu_count() or 1,
+            cpu_avg=cpu_time / wall * 100 if wall > 0 else 0.0,
+            gc_collections=self._gc_collections,
+            gc_pause_total_ms=self._gc_pause_total * 1000,
+            gc_pause_max_ms=self._gc_pause_max * 1000,
+            gc_pause_ratio=self._gc_pause_total / wall if wall > 0 else 0.0,
+            samples=samples
+        )
+
+        if samples:
+            lags = sorted(s['lag_ms'] for s in samples)
+            depths = [s['queue_depth'] for s in samples]
+            health.cpu_max = max(s['cpu'] for s in samples)
+            health.queue_depth_avg = sum(depths) / len(depths)
+            health.queue_depth_max = max(depths)
+            health.lag_avg_ms = sum(lags) / len(lags)
+            health.lag_p95_ms = lags[min(len(lags) - 1, int(len(lags) * 0.95))]
+            health.lag_max_ms = lags[-1]
+
+        self._evaluate(health, max_workers)
+        return health
+
+    def _evaluate(self, health: GeneratorHealth, max_workers: int):
+        """根据阈值判定压测机是否饱和"""
+        thresholds = self.thresholds
+
+        if health.sample_count < thresholds.min_samples:
+            # 采样不足，不做判定
+            return
+
+        if health.cpu_avg >= thresholds.cpu_percent:
+            health.reliable = False
+            health.warnings.append(
+                f"压测进程CPU占用 {health.cpu_avg:.1f}% 达到阈值 {thresholds.cpu_percent:.0f}%（单核）"
+            )
+
+        if health.lag_p95_ms >= thresholds.scheduling_lag_ms:
+            health.reliable = False
+            health.warnings.append(
+                f"P95调度延迟 {health.lag_p95_ms:.1f}ms 达到阈值 {thresholds.scheduling_lag_ms:.0f}ms"
+            )
+
+        if health.gc_pause_ratio >= thresholds.gc_pause_ratio:
+            health.reliable = False
+            health.warnings.append(
+                f"GC暂停占比 {health.gc_pause_ratio * 100:.1f}% 达到阈值 {thresholds.gc_pause_ratio * 100:.0f}%"
+            )
+
+        if max_workers > 0 and health.queue_depth_avg / max_workers >= thresholds.queue_per_worker:
+            health.warnings.append(
+                f"线程池平均积压 {health.queue_depth_avg:.0f} 个任务（并发数 {max_workers}），请求在客户端排队"
+            )
+
+        for warning in health.warnings:
+            self.logger.warning(f"压测机健康度: {warning}")
@@ -1,19 +1,35 @@
 """性能测试执行器 - 支持并发执行和性能统计"""
+import random
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from array import array
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any, Callable, Optional
 from dataclasses import dataclass, field
 from collections import defaultdict
-import statistics
 
-from utils.logger import get_logger
-from core.api_executor import APIExecutor
+from utils.logger import get_logger, Logger, LoadLogPolicy
+from core.api_executor import APIExecutor, RequestTimeout
 from core.request_builder import RequestBuilder
 from core.data_manager import DataManager
+from core.data_extractor import DataExtractor
+from core.generator_monitor import GeneratorMonitor, GeneratorHealth, HealthThresholds
+from core.trace_recorder import TraceRecorder
+from core.stop_conditions import StopMonitor, StopRules, STOP_CONVERGED
+from core.capacity_search import CapacitySearchConfig, CapacityResult, CapacityStep, evaluate_step
+from core.workload import Workload
+from core.response_validation import FAILURE_STATUS, ResponseValidator, ValidationConfig
+from core.error_aggregator import (
+    CATEGORY_ASSERTION, CATEGORY_OTHER, ErrorAggregationConfig, ErrorAggregator,
+    classify_exception, classify_status
+)
 
 logger = get_logger(__name__)
 
+# 客户端耗时分解的阶段（按请求生命周期排序）
+# build/assert/extract 为框架自身开销，其余为网络和解析阶段
+TIMING_PHASES = ('build', 'connect', 'tls', 'ttfb', 'download', 'decode', 'assert', 'extract')
+
 
 @dataclass
 class PerformanceResult:
@@ -24,8 +40,15 @@ class PerformanceResult:
     success_count: int = 0
     failure_count: int = 0
 
+    # 逐请求采样（紧凑数组，按完成顺序对齐）
+    response_times: array = field(default_factory=lambda: array('d'))  # 响应时间（秒）
+    case_indices: array = field(default_factory=lambda: array('I'))  # 用例序号，对应 case_ids
+    successes: array = field(default_factory=lambda: array('B'))  # 是否成功
+    timestamps: array = field(default_factory=lambda: array('d'))  # 完成时间（相对测试开始，秒）
+    case_ids: List[str] = field(default_factory=list)
+    start_time: float = 0.0  # 测试开始时间（Unix时间戳，秒）
+
     # 响应时间统计（秒）
-    response_times: List[float] = field(default_factory=list)
     min_time: float = 0.0
     max_time: float = 0.0
     avg_time: float = 0.0
@@ -37,23 +60,173 @@ class PerformanceResult:
     tps: float = 0.0  # 每秒事务数
     actual_duration: float = 0.0  # 实际测试时长（秒）
 
-    # 错误统计
+    # 错误统计（键为“类别: 错误签名”，每个类别的签名数有上限）
     errors: Dict[str, int] = field(default_factory=dict)
 
+    # 错误分类明细（见 core/error_aggregator.py）：各类别的次数、签名、示例和时间分布
+    error_details: Optional[ErrorAggregator] = None
+
     # 每个用例的详细统计
     case_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)
 
-    def calculate_statistics(self):
-        """计算性能统计指标"""
+    # 客户端耗时分解（各阶段累计耗时，秒）
+    timing_totals: Dict[str, float] = field(default_factory=dict)
+    timing_count: int = 0  # 带耗时分解的请求数
+
+    # 压测机健康度（CPU、GC暂停、线程池积压、调度延迟）
+    generator_health: Optional[GeneratorHealth] = None
+
+    # 请求轨迹文件路径（启用轨迹记录时）
+    trace_file: Optional[str] = None
+
+    # 向量化分析结果（utils.perf_analytics.AnalyticsReport），calculate_statistics() 后可用
+    analytics: Optional[Any] = None
+
+    # 提前终止（见 core/stop_conditions.py）：触发的规则和原因，正常结束时为None
+    stop_rule: Optional[str] = None
+    stop_reason: Optional[str] = None
+
+    # 多步骤场景的事务统计（每个场景一次完整执行为一个采样，case_stats 按场景名称统计）
+    transactions: Optional['PerformanceResult'] = None
+
+    # 本次测试新建连接的DNS缓存和TLS会话复用统计: {'dns': {'hits', 'misses', 'hit_rate'}, 'tls': {...}}
+    connection_stats: Optional[Dict[str, Dict[str, float]]] = None
+
+    @property
+    def reliable(self) -> bool:
+        """测试结果是否可信（压测机自身未成为瓶颈）"""
+        return self.generator_health is None or self.generator_health.reliable
+
+    @property
+    def aborted(self) -> bool:
+        """测试是否因错误率或响应时间超限被提前终止（结果收敛而提前结束不算）"""
+        return self.stop_rule is not None and self.stop_rule != STOP_CONVERGED
+
+    def record_sample(self, case_id: str, response_time: float, success: bool,
+                      timestamp: float = None) -> Dict[str, Any]:
+        """记录一个请求采样
+
+        Args:
+            case_id: 用例ID
+            response_time: 响应时间（秒）
+            success: 是否成功
+            timestamp: 完成时间（Unix时间戳，秒），默认为当前时间
+
+        Returns:
+            该用例的统计字典
+        """
+        case_stat = self.case_stats.get(case_id)
+        if case_stat is None:
+            case_stat = self.case_stats[case_id] = {
+                'index': len(self.case_ids),
+                'count': 0,
+                'success_count': 0
+            }
+            self.case_ids.append(case_id)
+
+        case_stat['count'] += 1
+        if success:
+            case_stat['success_count'] += 1
+
+        if not self.start_time:
+            self.start_time = time.time()
+        finished = timestamp if timestamp is not None else time.time()
+
+        self.response_times.append(response_time)
+        self.case_indices.append(case_stat['index'])
+        self.successes.append(1 if success else 0)
+        self.timestamps.append(max(finished - self.start_time, 0.0))
+        return case_stat
+
+    def record_error(self, category: str, message: str, normalize: bool = True,
+                     timestamp: float = None, count: int = 1):
+        """记录一个失败请求的错误
+
+        Args:
+            category: 错误类别（core.error_aggregator.CATEGORY_*）
+            message: 错误信息
+            normalize: 是否把信息中的URL、地址、数字等替换为占位符后再归并
+            timestamp: 发生时间（Unix时间戳，秒），默认为当前时间
+            count: 次数
+        """
+        if self.error_details is None:
+            self.error_details = ErrorAggregator()
+        if not self.start_time:
+            self.start_time = time.time()
+        occurred = timestamp if timestamp is not None else time.time()
+
+        key = self.error_details.add(category, message, max(occurred - self.start_time, 0.0), normalize, count)
+        self.errors[key] = self.errors.get(key, 0) + count
+
+    def record_transaction(self, scenario: str, duration: float, success: bool, error: str = None):
+        """记录一次场景事务
+
+        Args:
+            scenario: 场景名称
+            duration: 事务耗时（秒，不含思考时间）
+            success: 所有步骤是否都成功
+            error: 失败原因
+        """
+        transactions = self.transactions
+        if transactions is None:
+            transactions = self.transactions = PerformanceResult(start_time=self.start_time)
+
+        transactions.total_requests += 1
+        if success:
+            transactions.success_count += 1
+        else:
+            transactions.failure_count += 1
+            error = error or 'unknown error'
+            transactions.errors[error] = transactions.errors.get(error, 0) + 1
+        transactions.record_sample(scenario, duration, success)
+
+    def calculate_statistics(self, percentiles=None):
+        """计算性能统计指标
+
+        基于NumPy一次性计算全局和每个用例的统计指标，结果保存在 analytics 中
+
+        Args:
+            percentiles: 需要计算的百分位列表（可选，默认 50/90/95/99/99.9）
+        """
         if not self.response_times:
             return
 
-        self.min_time = min(self.response_times)
-        self.max_time = max(self.response_times)
-        self.avg_time = statistics.mean(self.response_times)
-        self.median_time = statistics.median(self.response_times)
-        self.p95_time = statistics.quantiles(self.response_times, n=20)[18] if len(self.response_times) >= 20 else self.max_time
-        self.p99_time = statistics.quantiles(self.response_times, n=100)[98] if len(self.response_times) >= 100 else self.max_time
+        # 延迟导入，避免未执行性能测试时加载NumPy
+        from utils.perf_analytics import analyze, DEFAULT_PERCENTILES
+
+        wanted = sorted(set(DEFAULT_PERCENTILES) | set(percentiles or ()))
+        self.analytics = analyze(self, wanted)
+
+        overall = self.analytics.overall
+        self.min_time = overall.min
+        self.max_time = overall.max
+        self.avg_time = overall.mean
+        self.median_time = overall.percentile(50)
+        self.p95_time = overall.percentile(95)
+        self.p99_time = overall.percentile(99)
+
+        if self.transactions is not None:
+            self.transactions.calculate_statistics(percentiles)
+
+    def average_timings(self, case_id: str = None) -> Dict[str, float]:
+        """计算平均客户端耗时分解
+
+        Args:
+            case_id: 用例ID，为None时返回全局平均值
+
+        Returns:
+            各阶段平均耗时字典（秒），没有数据时各阶段为0
+        """
+        if case_id is None:
+            totals, count = self.timing_totals, self.timing_count
+        else:
+            case_stat = self.case_stats.get(case_id, {})
+            totals, count = case_stat.get('timings', {}), case_stat.get('timing_count', 0)
+
+        return {
+            phase: (totals.get(phase, 0.0) / count if count else 0.0)
+            for phase in TIMING_PHASES
+        }
 
     def calculate_tps(self, duration: float):
         """计算TPS
@@ -65,6 +238,9 @@ class PerformanceResult:
             self.tps = self.success_count / duration
         self.actual_duration = duration
 
+        if self.transactions is not None:
+            self.transactions.calculate_tps(duration)
+
 
 class PerformanceExecutor:
     """性能测试执行器
@@ -74,27 +250,78 @@ class PerformanceExecutor:
 
     def __init__(self, max_workers: int = 10,
                  duration: int = 60,
-                 ramp_up: int = 0):
+                 ramp_up: int = 0,
+                 monitor_interval: float = 0.5,
+                 health_thresholds: HealthThresholds = None,
+                 log_policy: LoadLogPolicy = None,
+                 trace_file: str = None,
+                 stop_rules: StopRules = None,
+                 transport: str = 'requests',
+                 dns_cache_ttl: float = 60.0,
+                 tls_session_cache: bool = True,
+                 validation: ValidationConfig = None,
+                 errors: ErrorAggregationConfig = None,
+                 timeout: RequestTimeout = None):
         """初始化性能测试执行器
 
         Args:
             max_workers: 最大并发数
             duration: 测试持续时间（秒）
             ramp_up: 启动时间（秒），在此时间内逐步增加并发
+            monitor_interval: 压测机健康度采样间隔（秒）
+            health_thresholds: 压测机饱和判定阈值
+            log_policy: 压测日志策略（采样、截断、非阻塞写入），为None时沿用常规日志配置
+            trace_file: 请求轨迹文件路径（可选），启用后以二进制定长记录保存每个请求
+            stop_rules: 提前终止规则（可选），触发后停止压测并汇总已有结果
+            transport: HTTP传输层（requests / httpx），httpx 支持 HTTP/2 多路复用
+            dns_cache_ttl: DNS解析结果缓存时间（秒），0表示不缓存
+            tls_session_cache: 新建HTTPS连接时是否恢复TLS会话
+            validation: 压测响应校验配置（期望结果、响应Schema的采样率和最大响应时间），默认使用 ValidationConfig 的默认值
+            errors: 错误聚合配置（每个类别的签名数、示例数和时间分布间隔）
+            timeout: 请求的连接超时、读取超时和总期限，用例可在性能配置的 timeout 字段中覆盖
         """
         self.max_workers = max_workers
         self.duration = duration
         self.ramp_up = ramp_up
+        self.monitor_interval = monitor_interval
+        self.health_thresholds = health_thresholds or HealthThresholds()
+        self.log_policy = log_policy
+        self.trace_file = trace_file
+        self.stop_rules = stop_rules
+        self.transport = transport
+        self.dns_cache_ttl = dns_cache_ttl
+        self.tls_session_cache = tls_session_cache
+        self.response_validator = ResponseValidator(validation)
+        self.error_config = errors or ErrorAggregationConfig()
+        self.timeout = timeout or RequestTimeout()
         self.logger = logger
 
+        # 用例性能配置中覆盖的超时设置（用例ID -> RequestTimeout）
+        self._case_timeouts: Dict[str, RequestTimeout] = {}
+
+        # 当前测试的轨迹记录器和提前终止监控器
+        self._trace_recorder: Optional[TraceRecorder] = None
+        self._stop_monitor: Optional[StopMonitor] = None
+
         # 线程安全锁
         self.lock = threading.Lock()
 
-        # 初始化组件
-        self.api_executor = APIExecutor()
+        # 初始化组件（连接池大小与并发数一致，避免连接被频繁丢弃重建）
+        self.api_executor = self._create_api_executor(max_workers)
         self.request_builder = None
+        self.extractor = None
         self.data_manager = None
 
+    def _create_api_executor(self, pool_size: int) -> APIExecutor:
+        """按执行器的传输层和连接缓存配置创建接口执行器"""
+        return APIExecutor(
+            timeout=self.timeout,
+            pool_size=pool_size,
+            transport=self.transport,
+            dns_cache_ttl=self.dns_cache_ttl,
+            tls_session_cache=self.tls_session_cache
+        )
+
     def configure(self, base_url: str, data_manager: DataManager = None):
         """配置执行器
 
@@ -111,8 +338,31 @@ class PerformanceExecutor:
             data_manager = DataManager(temp_file.name)
 
         self.request_builder = RequestBuilder(base_url, data_manager)
+        self.extractor = DataExtractor(data_manager)
         self.data_manager = data_manager
 
+    def update_config(self, base_url: str = None, stop_rules: StopRules = None):
+        """运行中更新配置（配置热加载时调用），参数为None的项保持不变
+
+        新的 base_url 对之后构建的请求生效；新的提前终止规则立即替换正在运行的监控器的规则，
+        未运行测试时在下一次测试生效
+
+        Args:
+            base_url: 新的基础URL
+            stop_rules: 新的提前终止规则
+        """
+        if base_url is not None and self.request_builder is not None \
+                and base_url != self.request_builder.base_url:
+            self.logger.info(f"base_url 已更新: {self.request_builder.base_url} -> {base_url}")
+            self.request_builder.base_url = base_url
+
+        if stop_rules is not None:
+            self.stop_rules = stop_rules
+            stop_monitor = self._stop_monitor
+            if stop_monitor is not None:
+                stop_monitor.update_rules(stop_rules)
+            self.logger.info("提前终止规则已更新")
+
     def execute_performance_test(self,
                                  test_cases: List[Any],
                                  execute_func: Optional[Callable] = None) -> PerformanceResult:
@@ -130,77 +380,140 @@ class PerformanceExecutor:
 
         self.logger.info(f"开始性能测试: 并发数={self.max_workers}, 持续时间={self.duration}秒")
 
-        result = PerformanceResult()
+        # 编译用例的期望结果和响应Schema，压测中按采样率校验
+        self.response_validator.prepare(test_cases)
+        # 压测开始前一次性解析并校验所有用例的性能配置，不合法时列出全部问题用例
+        case_configs = Workload.parse_configs(test_cases)
+        self._prepare_timeouts(test_cases, case_configs)
+
+        # 用例配置了权重、思考时间或节奏时使用虚拟用户模式；场景步骤的提取规则同样在压测开始前解析
+        workload = None
+        if self.duration > 0:
+            extract_rules = Workload.parse_extract_rules(test_cases)
+            workload = Workload.from_cases(test_cases, case_configs, extract_rules)
+        if workload is None and self.duration <= 0:
+            scenarios = sorted({c.scenario for c in test_cases if getattr(c, 'scenario', '')})
+            if scenarios:
+                self.logger.warning(
+                    f"固定次数模式（duration=0）不支持多步骤场景，场景 {', '.join(scenarios)} 的步骤按独立请求执行: "
+                    f"不统计事务，步骤之间不传递提取的变量"
+                )
+
         start_time = time.time()
+        result = PerformanceResult(start_time=start_time, error_details=ErrorAggregator(self.error_config))
+        connection_before = self.api_executor.connection_stats()
 
         # 使用线程池并发执行
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
-
-            # 根据持续时间计算需要执行多少轮
-            if self.duration > 0:
-                # 持续时间模式：循环执行用例直到时间结束
-                elapsed = 0
-                round_num = 0
-                while elapsed < self.duration:
-                    round_start = time.time()
-
-                    # 提交本轮所有用例
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        # 采样压测机自身的健康度，判断客户端是否成为瓶颈
+        monitor = GeneratorMonitor(
+            interval=self.monitor_interval,
+            thresholds=self.health_thresholds,
+            queue_depth_fn=lambda: self._pool_queue_depth(executor)
+        ).start()
+
+        # 根据实时指标判断是否提前终止
+        stop_monitor = None
+        if self.stop_rules is not None:
+            stop_monitor = self._stop_monitor = StopMonitor(self.stop_rules, result, self.lock).start()
+        stopped = stop_monitor.triggered if stop_monitor is not None else threading.Event()
+
+        # 切换到压测日志模式，避免逐请求的日志格式化和写入占满CPU和磁盘
+        if self.log_policy is not None:
+            Logger.enable_load_mode(self.log_policy)
+
+        # 请求轨迹记录
+        if self.trace_file:
+            case_ids = list(dict.fromkeys(getattr(c, 'case_id', 'unknown') for c in test_cases))
+            self._trace_recorder = TraceRecorder(self.trace_file, case_ids)
+            result.trace_file = self.trace_file
+
+        try:
+            with executor:
+                futures = []
+
+                if workload is not None:
+                    # 虚拟用户模式：每个虚拟用户按权重循环抽取用例，直到时间结束
+                    self.logger.info(f"虚拟用户模式: {len(workload.items)} 个用例按权重混合")
+                    deadline = start_time + self.duration
+                    futures = [
+                        executor.submit(self._virtual_user, vu, workload, execute_func, result, deadline, stopped)
+                        for vu in range(self.max_workers)
+                    ]
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self.logger.error(f"虚拟用户异常退出: {e}")
+
+                # 根据持续时间计算需要执行多少轮
+                elif self.duration > 0:
+                    # 持续时间模式：循环执行用例直到时间结束
+                    elapsed = 0
+                    round_num = 0
+                    while elapsed < self.duration and not stopped.is_set():
+                        round_start = time.time()
+
+                        # 提交本轮所有用例
+                        for case in test_cases:
+                            future = executor.submit(
+                                self._execute_single_case,
+                                case,
+                                execute_func,
+                                round_num
+                            )
+                            futures.append(future)
+
+                        # 等待本轮完成
+                        self._collect_results(futures, result, stopped)
+                        futures.clear()
+
+                        # 更新已用时间
+                        round_elapsed = time.time() - round_start
+                        elapsed = time.time() - start_time
+                        round_num += 1
+
+                        self.logger.info(f"完成第 {round_num} 轮，已用时 {elapsed:.1f}秒")
+                else:
+                    # 固定次数模式：每个用例执行一次
                     for case in test_cases:
                         future = executor.submit(
                             self._execute_single_case,
                             case,
                             execute_func,
-                            round_num
+                            0
                         )
                         futures.append(future)
 
-                    # 等待本轮完成
-                    for future in as_completed(futures):
-                        try:
-                            case_result = future.result()
-                            with self.lock:
-                                self._update_result(result, case_result)
-                        except Exception as e:
-                            self.logger.error(f"用例执行异常: {e}")
-                            with self.lock:
-                                result.failure_count += 1
-
-                    futures.clear()
-
-                    # 更新已用时间
-                    round_elapsed = time.time() - round_start
-                    elapsed = time.time() - start_time
-                    round_num += 1
-
-                    self.logger.info(f"完成第 {round_num} 轮，已用时 {elapsed:.1f}秒")
-            else:
-                # 固定次数模式：每个用例执行一次
-                for case in test_cases:
-                    future = executor.submit(
-                        self._execute_single_case,
-                        case,
-                        execute_func,
-                        0
-                    )
-                    futures.append(future)
-
-                # 收集结果
-                for future in as_completed(futures):
-                    try:
-                        case_result = future.result()
-                        with self.lock:
-                            self._update_result(result, case_result)
-                    except Exception as e:
-                        self.logger.error(f"用例执行异常: {e}")
-                        with self.lock:
-                            result.failure_count += 1
+                    # 收集结果
+                    self._collect_results(futures, result, stopped)
+        finally:
+            monitor.stop()
+            if stop_monitor is not None:
+                stop_monitor.stop()
+                self._stop_monitor = None
+                result.stop_rule, result.stop_reason = stop_monitor.rule, stop_monitor.reason
+            if self._trace_recorder is not None:
+                self._trace_recorder.close()
+                self._trace_recorder = None
+            if self.log_policy is not None:
+                Logger.disable_load_mode()
 
         # 计算最终统计
         actual_duration = time.time() - start_time
         result.total_requests = result.success_count + result.failure_count
-        result.calculate_statistics()
         result.calculate_tps(actual_duration)
+        result.calculate_statistics()
+        result.generator_health = monitor.summary(self.max_workers)
+        result.connection_stats = self._connection_stats_delta(connection_before)
+
+        if not result.generator_health.reliable:
+            self.logger.warning("压测机自身达到瓶颈，本次测试结果可能不可信")
+        if result.stop_rule is not None:
+            self.logger.warning(f"性能测试提前结束（{actual_duration:.1f}秒），报告为部分结果: {result.stop_reason}")
+        if result.failure_count and result.error_details is not None:
+            self.logger.warning(f"错误分类: {result.error_details.summary()}")
 
         self.logger.info(
             f"性能测试完成: 总请求数={result.total_requests}, "
@@ -210,49 +523,252 @@ class PerformanceExecutor:
 
         return result
 
-    def _execute_single_case(self, case: Any, execute_func: Optional[Callable], round_num: int) -> Dict[str, Any]:
+    def _connection_stats_delta(self, before: Dict[str, Optional[Dict[str, int]]]) -> Optional[Dict[str, Any]]:
+        """本次测试期间的连接缓存命中/未命中次数（没有新建连接或未启用缓存时返回None）"""
+        after = self.api_executor.connection_stats()
+        delta = {}
+        for name, stats in after.items():
+            if stats is None:
+                continue
+            previous = before.get(name) or {}
+            hits = stats['hits'] - previous.get('hits', 0)
+            misses = stats['misses'] - previous.get('misses', 0)
+            if hits or misses:
+                delta[name] = {'hits': hits, 'misses': misses, 'hit_rate': hits / (hits + misses)}
+
+        for name, label in (('dns', 'DNS缓存'), ('tls', 'TLS会话复用')):
+            if name in delta:
+                self.logger.info(
+                    f"{label}: 命中 {delta[name]['hits']} 次，未命中 {delta[name]['misses']} 次"
+                    f"（命中率 {delta[name]['hit_rate']:.1%}）"
+                )
+        return delta or None
+
+    def _collect_results(self, futures: List[Future], result: PerformanceResult, stopped: threading.Event):
+        """等待并汇总一批请求的结果
+
+        触发提前终止后取消尚未开始执行的请求，只等待正在执行的请求
+
+        Args:
+            futures: 已提交的请求
+            result: 性能结果对象
+            stopped: 提前终止事件
+        """
+        cancelled = False
+        for future in as_completed(futures):
+            if stopped.is_set() and not cancelled:
+                cancelled = True
+                for pending in futures:
+                    pending.cancel()
+
+            try:
+                case_result = future.result()
+            except CancelledError:
+                continue
+            except Exception as e:
+                self.logger.error(f"用例执行异常: {e}")
+                with self.lock:
+                    result.failure_count += 1
+                continue
+
+            with self.lock:
+                self._update_result(result, case_result)
+
+    def _virtual_user(self, vu_id: int, workload: Workload, execute_func: Optional[Callable],
+                      result: PerformanceResult, deadline: float, stopped: threading.Event):
+        """虚拟用户主循环：抽取用例、执行、思考时间和节奏控制
+
+        Args:
+            vu_id: 虚拟用户编号
+            workload: 按权重混合的负载
+            execute_func: 自定义执行函数
+            result: 性能结果对象
+            deadline: 结束时间（Unix时间戳）
+            stopped: 提前终止事件
+        """
+        rng = random.Random()
+
+        # 在 ramp_up 时间内逐个启动虚拟用户
+        delay = self.ramp_up * vu_id / self.max_workers if self.ramp_up else 0.0
+        if delay and stopped.wait(delay):
+            return
+
+        iteration = 0
+        while not stopped.is_set() and time.time() < deadline:
+            iteration_start = time.time()
+            item = workload.sample(rng)
+
+            pause = self._run_item(item, execute_func, iteration, result, rng, deadline, stopped)
+            if pause is None:
+                break
+            iteration += 1
+
+            # 节奏控制保证两次迭代开始的间隔不小于 pacing
+            if item.pacing:
+                pause = max(pause, item.pacing - (time.time() - iteration_start))
+            pause = min(pause, deadline - time.time())
+            if pause > 0 and stopped.wait(pause):
+                break
+
+    def _run_item(self, item: Any, execute_func: Optional[Callable], iteration: int,
+                  result: PerformanceResult, rng: random.Random, deadline: float,
+                  stopped: threading.Event) -> Optional[float]:
+        """执行一个负载项（单个用例或场景的全部步骤）
+
+        场景的步骤按顺序执行，共享本次迭代的变量（前置条件中的提取规则写入变量，后续步骤的 ${变量} 从中替换），
+        任一步骤失败时跳过后续步骤，整个场景记录为一次事务
+
+        Args:
+            item: 负载项（core.workload.WorkloadItem）
+            execute_func: 自定义执行函数
+            iteration: 迭代编号
+            result: 性能结果对象
+            rng: 虚拟用户的随机数生成器
+            deadline: 结束时间（Unix时间戳）
+            stopped: 提前终止事件
+
+        Returns:
+            最后一个步骤之后的思考时间（秒）；场景在步骤间被终止时返回None
+        """
+        variables = {} if item.scenario else None
+        started = time.perf_counter()
+        thinking = 0.0
+        last = len(item.steps) - 1
+
+        for index, step in enumerate(item.steps):
+            case_result = self._execute_single_case(step.case, execute_func, iteration, variables, step.extract_rules)
+            with self.lock:
+                self._update_result(result, case_result)
+
+            think = step.think_time.sample(rng) if step.think_time is not None else 0.0
+            if not case_result.get('success', False):
+                if item.scenario:
+                    self._record_transaction(result, item.name, time.perf_counter() - started - thinking,
+                                             False, f"步骤 {step.case.case_id} 失败")
+                return think
+            if index == last:
+                break
+
+            # 步骤之间的思考时间（不计入事务耗时）
+            think = min(think, deadline - time.time())
+            if think > 0:
+                if stopped.wait(think):
+                    return None
+                thinking += think
+
+        if item.scenario:
+            self._record_transaction(result, item.name, time.perf_counter() - started - thinking, True)
+        return think
+
+    def _record_transaction(self, result: PerformanceResult, scenario: str, duration: float,
+                            success: bool, error: str = None):
+        """记录场景事务（线程安全）"""
+        with self.lock:
+            result.record_transaction(scenario, duration, success, error)
+
+    @staticmethod
+    def _pool_queue_depth(executor: ThreadPoolExecutor) -> int:
+        """获取线程池中等待执行的任务数"""
+        work_queue = getattr(executor, '_work_queue', None)
+        return work_queue.qsize() if work_queue is not None else 0
+
+    def _prepare_timeouts(self, cases: List[Any], configs: List[Dict[str, Any]]):
+        """解析用例性能配置中的 timeout 字段（数字或 {connect, read, total}），未配置的字段沿用执行器的设置
+
+        Args:
+            cases: 测试用例列表
+            configs: Workload.parse_configs 解析出的性能配置，与 cases 一一对应
+
+        Raises:
+            ValueError: 超时设置不合法，错误信息列出所有不合法的用例
+        """
+        self._case_timeouts = {}
+        errors = []
+        for case, case_config in zip(cases, configs):
+            config = case_config.get('timeout')
+            if config is None:
+                continue
+            try:
+                self._case_timeouts[case.case_id] = RequestTimeout.from_config(config, self.timeout)
+            except ValueError as e:
+                errors.append(f"用例 {case.case_id}: {e}")
+        if errors:
+            raise ValueError(f"{len(errors)} 个用例的超时设置不合法:\n  " + "\n  ".join(errors))
+        if self._case_timeouts:
+            self.logger.info(f"用例超时设置: {len(self._case_timeouts)} 个用例覆盖了默认超时")
+
+    def _execute_single_case(self, case: Any, execute_func: Optional[Callable], round_num: int,
+                             variables: Optional[Dict[str, Any]] = None,
+                             extract_rules: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """执行单个测试用例
 
         Args:
             case: 测试用例
             execute_func: 自定义执行函数
             round_num: 轮次编号
+            variables: 场景中虚拟用户的变量（可选，默认执行逻辑用于替换占位符和保存提取的数据）
+            extract_rules: 场景步骤的提取规则（可选，已在压测开始前解析）
 
         Returns:
             用例执行结果
         """
         case_id = getattr(case, 'case_id', 'unknown')
+        started = time.time()
 
         try:
             if execute_func:
                 # 使用自定义执行函数
-                return execute_func(case)
+                case_result = execute_func(case)
             else:
                 # 使用默认执行逻辑
-                return self._default_execute(case)
+                case_result = self._default_execute(case, variables, extract_rules)
 
         except Exception as e:
-            self.logger.error(f"用例 {case_id} 执行失败: {e}")
-            return {
+            if Logger.should_log(f"error:{case_id}"):
+                self.logger.error(f"用例 {case_id} 执行失败: {e}")
+            case_result = {
                 'case_id': case_id,
                 'success': False,
                 'error': str(e),
+                'error_category': classify_exception(e),
                 'response_time': 0.0
             }
 
-    def _default_execute(self, case: Any) -> Dict[str, Any]:
+        recorder = self._trace_recorder
+        if recorder is not None:
+            recorder.record(
+                case_id=case_result.get('case_id', case_id),
+                status=case_result.get('status_code', 0) or 0,
+                latency=case_result.get('response_time', 0.0),
+                size=case_result.get('bytes', 0),
+                success=case_result.get('success', False),
+                timestamp=started
+            )
+
+        return case_result
+
+    def _default_execute(self, case: Any, variables: Optional[Dict[str, Any]] = None,
+                         extract_rules: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """默认执行逻辑
 
         Args:
             case: 测试用例
+            variables: 场景中虚拟用户的变量（可选），提供时替换 ${变量} 占位符，并把提取的数据写入其中
+            extract_rules: 提取规则（可选），与 variables 一起提供时把提取的数据写入 variables
 
         Returns:
             执行结果
         """
         # 构建请求
+        build_start = time.perf_counter()
         url = self.request_builder._build_url(case.url)
         headers = self.request_builder._parse_headers(case.headers)
         params = self.request_builder._parse_params(case.params, case.param_type)
+        if variables is not None:
+            url = self.request_builder._replace_placeholders(url, variables)
+            headers = self.request_builder._replace_placeholders_dict(headers, variables)
+            params = self.request_builder._replace_placeholders_dict(params, variables)
+        build_time = time.perf_counter() - build_start
 
         # 执行请求
         response = self.api_executor.execute(
@@ -260,16 +776,41 @@ class PerformanceExecutor:
             method=case.method,
             headers=headers,
             params=params,
-            param_type=case.param_type
+            param_type=case.param_type,
+            log_key=case.case_id,
+            timeout=self._case_timeouts.get(case.case_id)
         )
 
-        return {
+        # 校验结果（状态码每次检查，响应时间、期望结果和响应Schema按配置和采样率校验）
+        assert_start = time.perf_counter()
+        failure = self.response_validator.validate(case, response)
+        success = failure is None
+        assert_time = time.perf_counter() - assert_start
+
+        # 场景中把提取的数据保存到虚拟用户的变量
+        extract_start = time.perf_counter()
+        if variables is not None and success and extract_rules:
+            variables.update(self.extractor.extract(response.get('body'), extract_rules))
+        extract_time = time.perf_counter() - extract_start
+
+        timings = dict(response.get('timings', {}))
+        timings.update({'build': build_time, 'assert': assert_time, 'extract': extract_time})
+
+        case_result = {
             'case_id': case.case_id,
-            'success': response['status_code'] == case.expected_status,
+            'success': success,
             'status_code': response['status_code'],
             'response_time': response.get('response_time', 0.0),
-            'response_body': response.get('body')
+            'response_body': response.get('body'),
+            'bytes': response.get('body_size', 0),
+            'timings': timings
         }
+        if failure is not None:
+            case_result['failure_reason'], case_result['error'] = failure
+            case_result['error_category'] = (
+                classify_status(response['status_code']) if failure[0] == FAILURE_STATUS else CATEGORY_ASSERTION
+            )
+        return case_result
 
     def _update_result(self, result: PerformanceResult, case_result: Dict[str, Any]):
         """更新结果统计
@@ -286,26 +827,33 @@ class PerformanceExecutor:
         else:
             result.failure_count += 1
 
-            # 记录错误
-            error_msg = case_result.get('error', 'unknown error')
-            result.errors[error_msg] = result.errors.get(error_msg, 0) + 1
-
-        # 记录响应时间
-        response_time = case_result.get('response_time', 0.0)
-        result.response_times.append(response_time)
-
-        # 更新用例级别统计
-        if case_id not in result.case_stats:
-            result.case_stats[case_id] = {
-                'count': 0,
-                'success_count': 0,
-                'response_times': []
-            }
+            # 按类别记录错误；校验失败的信息由框架生成、本身有界，无需规范化
+            category = case_result.get('error_category')
+            if category is None:
+                status = case_result.get('status_code')
+                category = classify_status(status) if status else CATEGORY_OTHER
+            result.record_error(
+                category,
+                str(case_result.get('error', 'unknown error')),
+                normalize='failure_reason' not in case_result
+            )
+
+        # 记录响应时间采样并更新用例级别统计
+        case_stat = result.record_sample(
+            case_id,
+            case_result.get('response_time', 0.0),
+            case_result.get('success', False)
+        )
 
-        result.case_stats[case_id]['count'] += 1
-        if case_result.get('success', False):
-            result.case_stats[case_id]['success_count'] += 1
-        result.case_stats[case_id]['response_times'].append(response_time)
+        # 累计客户端耗时分解
+        timings = case_result.get('timings')
+        if timings:
+            case_timings = case_stat.setdefault('timings', {})
+            for phase, seconds in timings.items():
+                result.timing_totals[phase] = result.timing_totals.get(phase, 0.0) + seconds
+                case_timings[phase] = case_timings.get(phase, 0.0) + seconds
+            result.timing_count += 1
+            case_stat['timing_count'] = case_stat.get('timing_count', 0) + 1
 
     def execute_concurrent_test(self,
                                 test_cases: List[Any],
@@ -336,3 +884,60 @@ class PerformanceExecutor:
             self.duration = original_duration  # 恢复原始设置
 
         return result
+
+    def execute_capacity_search(self,
+                                test_cases: List[Any],
+                                search: CapacitySearchConfig = None,
+                                execute_func: Optional[Callable] = None) -> CapacityResult:
+        """容量探测：逐级增加并发，找出吞吐量不再增长或SLO被破坏的拐点
+
+        Args:
+            test_cases: 测试用例列表
+            search: 探测配置
+            execute_func: 自定义执行函数（可选）
+
+        Returns:
+            CapacityResult: 各级结果和拐点
+        """
+        search = search or CapacitySearchConfig()
+        user_steps = search.user_steps()
+        self.logger.info(f"开始容量探测: 并发 {user_steps}，每级 {search.step_duration} 秒")
+
+        # 连接池按最大并发创建，避免高并发级别的连接被丢弃重建
+        if search.max_users > self.max_workers:
+            self.api_executor.close()
+            self.api_executor = self._create_api_executor(search.max_users)
+
+        capacity = CapacityResult(config=search)
+        original_workers, original_duration = self.max_workers, self.duration
+        try:
+            for users in user_steps:
+                self.max_workers = users
+                self.duration = search.step_duration
+                result = self.execute_performance_test(test_cases, execute_func)
+
+                step = CapacityStep.from_result(users, result)
+                previous = capacity.steps[-1] if capacity.steps else None
+                capacity.steps.append(step)
+                stop_reason = evaluate_step(search, step, previous, aborted=result.aborted)
+
+                self.logger.info(
+                    f"容量探测 并发={users}: TPS={step.tps:.2f}, P99={step.p99_time * 1000:.0f}ms, "
+                    f"错误率={step.error_rate:.2%}"
+                )
+                if stop_reason:
+                    capacity.stop_reason = stop_reason
+                    break
+            else:
+                capacity.stop_reason = f"已达到最大并发 {search.max_users}"
+        finally:
+            self.max_workers, self.duration = original_workers, original_duration
+
+        knee = capacity.knee
+        if knee is not None:
+            self.logger.info(
+                f"容量探测完成: 拐点并发={knee.users}, 最大可持续TPS={knee.tps:.2f}（{capacity.stop_reason}）"
+            )
+        else:
+            self.logger.warning(f"容量探测完成: 起始并发即不满足SLO（{capacity.stop_reason}）")
+        return capacity
@@ -1,7 +1,7 @@
 """请求构建器 - 构建HTTP请求"""
 import json
 import re
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, Optional, Tuple
 from urllib.parse import urljoin
 
 from core.case_loader import TestCase
@@ -52,9 +52,9 @@ class RequestBuilder:
         headers = self._replace_placeholders_dict(headers)
         params = self._replace_placeholders_dict(params)
 
-        self.logger.info(f"构建请求: {case.method} {url}")
-        self.logger.debug(f"请求头: {headers}")
-        self.logger.debug(f"请求参数: {params}")
+        self.logger.info("构建请求: {} {}", case.method, url)
+        self.logger.opt(lazy=True).debug("请求头: {}", lambda: headers)
+        self.logger.opt(lazy=True).debug("请求参数: {}", lambda: params)
 
         return url, case.method, headers, params
 
@@ -110,13 +110,14 @@ class RequestBuilder:
             self.logger.warning(f"参数JSON解析失败: {e}, 使用空字典")
             return {}
 
-    def _replace_placeholders(self, text: str) -> str:
+    def _replace_placeholders(self, text: str, variables: Optional[Dict[str, Any]] = None) -> str:
         """替换文本中的占位符
 
         支持 ${variable_name} 格式的占位符
 
         Args:
             text: 包含占位符的文本
+            variables: 优先使用的变量（如性能测试中虚拟用户自己的变量），未找到时再从数据文件读取
 
         Returns:
             替换后的文本
@@ -129,7 +130,10 @@ class RequestBuilder:
 
         def replacer(match):
             var_name = match.group(1)
-            value = self.data_manager.get(var_name)
+            if variables is not None and var_name in variables:
+                value = variables[var_name]
+            else:
+                value = self.data_manager.get(var_name)
             if value is not None:
                 self.logger.debug(f"替换占位符: ${{{var_name}}} -> {value}")
                 return str(value)
@@ -139,11 +143,12 @@ class RequestBuilder:
 
         return re.sub(pattern, replacer, text)
 
-    def _replace_placeholders_dict(self, data: Any) -> Any:
+    def _replace_placeholders_dict(self, data: Any, variables: Optional[Dict[str, Any]] = None) -> Any:
         """替换字典中的占位符（递归）
 
         Args:
             data: 数据对象（字典、列表或字符串）
+            variables: 优先使用的变量（可选）
 
         Returns:
             替换后的数据
@@ -155,15 +160,15 @@ class RequestBuilder:
         for key, value in data.items():
             if isinstance(value, str):
                 # 字符串类型，替换占位符
-                result[key] = self._replace_placeholders(value)
+                result[key] = self._replace_placeholders(value, variables)
             elif isinstance(value, dict):
                 # 字典类型，递归替换
-                result[key] = self._replace_placeholders_dict(value)
+                result[key] = self._replace_placeholders_dict(value, variables)
             elif isinstance(value, list):
                 # 列表类型，处理每个元素
                 result[key] = [
-                    self._replace_placeholders(item) if isinstance(item, str)
-                    else self._replace_placeholders_dict(item) if isinstance(item, dict)
+                    self._replace_placeholders(item, variables) if isinstance(item, str)
+                    else self._replace_placeholders_dict(item, variables) if isinstance(item, dict)
                     else item
                     for item in value
                 ]
@@ -0,0 +1,174 @@
+"""压测响应校验 - 状态码之外按采样率校验响应体、Schema 和响应时间
+
+压测时每个请求都检查状态码，其余校验按配置执行:
+    max_response_time:  检查用例的“最大响应时间”列，单个请求超过时计为失败（开销可忽略，默认关闭，
+                        该列同时作为性能门禁的平均响应时间阈值）
+    body_sample_rate:   按“期望结果”列部分匹配响应体的请求比例（0-1）
+    schema_sample_rate: 按“响应Schema”列校验的请求比例（0-1）
+
+测试开始前为每个用例编译期望结构和 Schema 校验器（相同内容共用一个），执行时只需按用例ID查找；
+每个请求只抽取一次随机数，未抽中的请求不产生校验开销。
+失败按原因分类，错误信息只包含状态码、字段路径或规则名称，不包含实际值，错误统计的条目数有上限
+"""
+import json
+import random
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.body_matcher import Matcher, REASON_LABELS, compile_expected_json
+from utils.schema_validator import SchemaValidator, compile_schema
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 失败原因
+FAILURE_STATUS = 'status'
+FAILURE_RESPONSE_TIME = 'response_time'
+FAILURE_BODY = 'body'
+FAILURE_SCHEMA = 'schema'
+
+
+@dataclass
+class ValidationConfig:
+    """压测响应校验配置
+
+    Attributes:
+        max_response_time: 是否把超过用例最大响应时间的单个请求计为失败
+        body_sample_rate: 校验期望结果的请求比例（0-1）
+        schema_sample_rate: 校验 JSON Schema 的请求比例（0-1）
+    """
+    max_response_time: bool = False
+    body_sample_rate: float = 1.0
+    schema_sample_rate: float = 0.1
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'ValidationConfig':
+        """从配置字典创建，忽略未知字段
+
+        Args:
+            config: 配置字典（config.yaml 中的 performance.validation）
+
+        Returns:
+            ValidationConfig 实例
+        """
+        config = config or {}
+        known = cls.__dataclass_fields__.keys()
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+
+@dataclass
+class CaseExpectations:
+    """一个用例编译后的校验规则"""
+    expected_status: int
+    max_time: float = 0.0  # 秒，0 表示不检查
+    body: Optional[Matcher] = None
+    schema: Optional[SchemaValidator] = None
+
+
+class ResponseValidator:
+    """压测响应校验器"""
+
+    def __init__(self, config: ValidationConfig = None):
+        """初始化校验器
+
+        Args:
+            config: 校验配置
+        """
+        self.config = config or ValidationConfig()
+        self.logger = logger
+        self._cases: Dict[str, CaseExpectations] = {}
+
+    def prepare(self, cases: List[Any]):
+        """编译用例的校验规则
+
+        Args:
+            cases: 测试用例列表
+
+        Raises:
+            ImportError: 需要校验 Schema 但未安装 jsonschema
+            ValueError: 用例的 Schema 或期望结果中的运算符不合法
+        """
+        config = self.config
+        self._cases = {}
+        bodies = schemas = 0
+        for case in cases:
+            expectations = CaseExpectations(expected_status=case.expected_status)
+
+            max_response_time = getattr(case, 'max_response_time', 0) or 0
+            if config.max_response_time and max_response_time > 0:
+                expectations.max_time = max_response_time / 1000.0
+
+            expected_result = (getattr(case, 'expected_result', '') or '').strip()
+            if config.body_sample_rate > 0 and expected_result not in ('', '{}'):
+                try:
+                    expectations.body = compile_expected_json(expected_result)
+                    bodies += 1
+                except json.JSONDecodeError:
+                    self.logger.warning(f"用例 {case.case_id} 期望结果JSON解析失败，压测中跳过响应体校验")
+                except ValueError as e:
+                    raise ValueError(f"用例 {case.case_id} 的期望结果不合法: {e}")
+
+            schema = getattr(case, 'response_schema', '')
+            if config.schema_sample_rate > 0 and schema:
+                try:
+                    expectations.schema = compile_schema(schema)
+                    schemas += 1
+                except ValueError as e:
+                    raise ValueError(f"用例 {case.case_id} 的响应Schema不合法: {e}")
+
+            self._cases[case.case_id] = expectations
+
+        if bodies or schemas:
+            self.logger.info(
+                f"压测响应校验: 期望结果 {bodies} 个用例（采样率 {config.body_sample_rate:.0%}），"
+                f"响应Schema {schemas} 个用例（采样率 {config.schema_sample_rate:.0%}）"
+            )
+
+    def validate(self, case: Any, response: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """校验响应
+
+        Args:
+            case: 测试用例
+            response: APIExecutor.execute 返回的响应
+
+        Returns:
+            不通过时返回 (失败原因, 错误信息)，通过时返回None
+        """
+        expectations = self._cases.get(case.case_id)
+        if expectations is None:
+            expectations = self._cases[case.case_id] = CaseExpectations(case.expected_status)
+
+        status = response['status_code']
+        if status != expectations.expected_status:
+            return FAILURE_STATUS, f"状态码 {status}（期望 {expectations.expected_status}）"
+
+        if expectations.max_time and response.get('response_time', 0.0) > expectations.max_time:
+            return FAILURE_RESPONSE_TIME, f"响应时间超过 {expectations.max_time * 1000:g}ms"
+
+        if expectations.body is None and expectations.schema is None:
+            return None
+
+        sample = random.random()
+        body = response.get('body')
+
+        if expectations.body is not None and sample < self.config.body_sample_rate:
+            mismatch = expectations.body.match(body)
+            if mismatch is not None:
+                return FAILURE_BODY, f"响应体不匹配: {_generalize(mismatch.path)}（{REASON_LABELS[mismatch.reason]}）"
+
+        if expectations.schema is not None and sample < self.config.schema_sample_rate:
+            if not expectations.schema.is_valid(body):
+                path, _, keyword = expectations.schema.first_error(body)
+                return FAILURE_SCHEMA, f"响应不符合JSON Schema: {_generalize(path)}（{keyword}）"
+
+        return None
+
+
+def _generalize(path) -> str:
+    """路径字符串，数组下标替换为 [*]（同一字段在不同元素上的失败归为一类）"""
+    if not path:
+        return '$'
+    parts = []
+    for key in path:
+        parts.append('[*]' if isinstance(key, int) else (f".{key}" if parts else str(key)))
+    return ''.join(parts)
@@ -0,0 +1,257 @@
+"""压测提前终止 - 根据实时指标判断是否提前结束性能测试
+
+在后台线程中按固定间隔增量读取 PerformanceResult 的采样，评估以下规则:
+    错误率:   最近 error_window 秒的错误率超过 error_rate（目标服务不可用时尽早停止）
+    P99:      最近 p99_window 秒的P99响应时间超过 p99_ms
+    结果收敛: 运行至少 converge_min_duration 秒后，平均响应时间和 converge_percentile
+              百分位的置信区间相对半宽都不超过 converge_precision（继续压测不会改变结论）
+
+任一规则触发后设置 triggered 事件，执行器停止提交新请求、取消排队中的请求并汇总已有结果
+"""
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from utils.histogram import LatencyHistogram
+from utils.performance_gate import percentile_interval
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 终止规则
+STOP_ERROR_RATE = 'error_rate'
+STOP_P99 = 'p99'
+STOP_CONVERGED = 'converged'
+
+
+@dataclass
+class StopRules:
+    """提前终止规则
+
+    Attributes:
+        check_interval: 评估间隔（秒）
+        min_requests: 错误率和P99规则在窗口内所需的最少请求数
+        error_rate: 错误率阈值（0-1），为None时不启用
+        error_window: 错误率统计窗口（秒）
+        p99_ms: P99响应时间阈值（毫秒），为None时不启用
+        p99_window: P99统计窗口（秒）
+        converge_precision: 置信区间相对半宽阈值（如0.05表示±5%），为None时不启用
+        converge_percentile: 收敛判定使用的百分位
+        converge_min_duration: 收敛判定前的最短运行时间（秒）
+        confidence: 收敛判定的置信水平
+    """
+    check_interval: float = 1.0
+    min_requests: int = 50
+    error_rate: Optional[float] = 0.5
+    error_window: float = 10.0
+    p99_ms: Optional[float] = None
+    p99_window: float = 10.0
+    converge_precision: Optional[float] = None
+    converge_percentile: float = 95.0
+    converge_min_duration: float = 30.0
+    confidence: float = 0.95
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'StopRules':
+        """从配置字典创建规则，忽略未知字段
+
+        Args:
+            config: 配置字典（config.yaml 中的 performance.stop_rules）
+
+        Returns:
+            StopRules 实例
+        """
+        config = config or {}
+        known = cls.__dataclass_fields__.keys()
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+    @property
+    def window(self) -> float:
+        """需要保留的逐秒数据窗口（秒）"""
+        windows = [0.0]
+        if self.error_rate is not None:
+            windows.append(self.error_window)
+        if self.p99_ms is not None:
+            windows.append(self.p99_window)
+        return max(windows)
+
+
+class StopMonitor:
+    """提前终止监控器
+
+    增量读取测试结果中的采样，按秒聚合请求数、失败数和响应时间直方图，
+    只保留规则所需的窗口，内存占用与测试时长无关
+    """
+
+    def __init__(self, rules: StopRules, result: Any, lock: threading.Lock):
+        """初始化监控器
+
+        Args:
+            rules: 终止规则
+            result: PerformanceResult（执行器持有 lock 时写入采样）
+            lock: 保护 result 的锁
+        """
+        self.rules = rules
+        self.result = result
+        self.lock = lock
+        self.logger = logger
+
+        self.triggered = threading.Event()
+        self.rule: Optional[str] = None
+        self.reason: Optional[str] = None
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._cursor = 0
+
+        # 逐秒聚合: 秒 -> [请求数, 失败数, 直方图]
+        self._seconds: Dict[int, list] = {}
+        self._order: Deque[int] = deque()
+
+        # 收敛判定使用的全程统计
+        self._z = NormalDist().inv_cdf((1 + rules.confidence) / 2)
+        self._histogram = LatencyHistogram()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def start(self):
+        """开始监控"""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="stop-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止监控"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def update_rules(self, rules: StopRules):
+        """运行中替换终止规则（配置热加载）
+
+        已聚合的逐秒数据继续使用；运行中才启用的收敛规则只统计启用之后的采样
+
+        Args:
+            rules: 新的终止规则
+        """
+        self._z = NormalDist().inv_cdf((1 + rules.confidence) / 2)
+        self.rules = rules
+
+    def _run(self):
+        """监控线程主循环"""
+        while not self._stop_event.wait(self.rules.check_interval):
+            self._ingest()
+            decision = self.evaluate(time.time() - self.result.start_time)
+            if decision is not None:
+                self.rule, self.reason = decision
+                self.logger.warning(f"触发提前终止规则: {self.reason}")
+                self.triggered.set()
+                break
+
+    def _ingest(self):
+        """读取上次之后新增的采样"""
+        result = self.result
+        with self.lock:
+            end = len(result.response_times)
+            latencies = result.response_times[self._cursor:end]
+            successes = result.successes[self._cursor:end]
+            timestamps = result.timestamps[self._cursor:end]
+        self._cursor = end
+
+        track_all = self.rules.converge_precision is not None
+        for latency, success, timestamp in zip(latencies, successes, timestamps):
+            second = int(timestamp)
+            bucket = self._seconds.get(second)
+            if bucket is None:
+                bucket = self._seconds[second] = [0, 0, LatencyHistogram()]
+                self._order.append(second)
+            bucket[0] += 1
+            if not success:
+                bucket[1] += 1
+            bucket[2].add(latency)
+
+            if track_all:
+                self._histogram.add(latency)
+                self._sum += latency
+                self._sum_sq += latency * latency
+
+        # 丢弃窗口之外的逐秒数据
+        if self._order:
+            oldest = max(self._order) - int(math.ceil(self.rules.window)) - 1
+            while self._order and self._order[0] < oldest:
+                self._seconds.pop(self._order.popleft(), None)
+
+    def _window(self, last_second: int, window: float) -> Tuple[int, int, LatencyHistogram]:
+        """汇总 (last_second - window, last_second] 内的请求数、失败数和直方图"""
+        count = failures = 0
+        histogram = LatencyHistogram()
+        for second in range(last_second - int(window) + 1, last_second + 1):
+            bucket = self._seconds.get(second)
+            if bucket is not None:
+                count += bucket[0]
+                failures += bucket[1]
+                histogram.merge(bucket[2])
+        return count, failures, histogram
+
+    def evaluate(self, elapsed: float) -> Optional[Tuple[str, str]]:
+        """评估终止规则
+
+        Args:
+            elapsed: 已运行时间（秒）
+
+        Returns:
+            (规则, 原因)，未触发时返回None
+        """
+        rules = self.rules
+        # 只统计已经结束的整秒
+        last_second = int(elapsed) - 1
+
+        if rules.error_rate is not None and elapsed >= rules.error_window:
+            count, failures, _ = self._window(last_second, rules.error_window)
+            if count >= rules.min_requests and failures / count > rules.error_rate:
+                return STOP_ERROR_RATE, (
+                    f"最近 {rules.error_window:g} 秒错误率 {failures / count:.1%} "
+                    f"超过 {rules.error_rate:.1%}（{failures}/{count}）"
+                )
+
+        if rules.p99_ms is not None and elapsed >= rules.p99_window:
+            count, _, histogram = self._window(last_second, rules.p99_window)
+            p99 = histogram.percentile(99)
+            if count >= rules.min_requests and p99 * 1000 > rules.p99_ms:
+                return STOP_P99, (
+                    f"最近 {rules.p99_window:g} 秒P99响应时间 {p99 * 1000:.0f}ms 超过 {rules.p99_ms:g}ms"
+                )
+
+        if rules.converge_precision is not None and elapsed >= rules.converge_min_duration:
+            precision = self._precision()
+            if precision is not None and precision <= rules.converge_precision:
+                return STOP_CONVERGED, (
+                    f"运行 {elapsed:.0f} 秒后结果已收敛（置信区间相对半宽 ±{precision:.1%}，"
+                    f"样本数 {self._histogram.total}）"
+                )
+
+        return None
+
+    def _precision(self) -> Optional[float]:
+        """平均响应时间和收敛百分位置信区间的最大相对半宽"""
+        n = self._histogram.total
+        if n < max(self.rules.min_requests, 2):
+            return None
+
+        mean = self._sum / n
+        variance = max(self._sum_sq / n - mean * mean, 0.0)
+        if mean <= 0:
+            return None
+        mean_precision = self._z * math.sqrt(variance / n) / mean
+
+        estimate, low, high = percentile_interval(self._histogram, self.rules.converge_percentile / 100, self._z)
+        if not estimate:
+            return None
+        percentile_precision = (high - low) / 2 / estimate
+
+        return max(mean_precision, percentile_precision)
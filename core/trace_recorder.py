@@ -0,0 +1,305 @@
+"""请求轨迹记录器 - 以定长二进制记录保存压测中的每个请求
+
+文件格式（小端序）:
+    文件头（64字节）:
+        magic(8) version(u16) record_size(u16) reserved(u32)
+        start_time(f64) record_count(u64) case_table_offset(u64) case_table_length(u64)
+        填充至64字节
+    记录区（每条32字节）:
+        timestamp_us(i64)  请求开始时间（Unix时间戳，微秒）
+        case_index(u32)    用例序号，对应用例表中的位置
+        worker(u16)        执行请求的工作线程编号
+        status(u16)        HTTP状态码，请求异常时为0
+        latency_us(u32)    响应时间（微秒）
+        bytes(u64)         响应体字节数
+        flags(u8)          bit0: 是否成功
+        填充3字节
+    用例表: 记录区之后的UTF-8 JSON数组，关闭记录器时写入
+
+记录时通过内存映射直接写入文件，每条记录后更新文件头中的记录数，
+进程异常退出时已写入的记录仍可读取（用例表缺失时以序号代替用例ID）
+"""
+import json
+import mmap
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b'APITRACE'
+VERSION = 1
+
+HEADER_FORMAT = '<8sHHIdQQQ'
+HEADER_SIZE = 64
+RECORD_FORMAT = '<qIHHIQB3x'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# 文件头中记录数字段的偏移
+_COUNT_OFFSET = struct.calcsize('<8sHHId')
+
+# 成功标记位
+FLAG_SUCCESS = 0x01
+
+# 与 RECORD_FORMAT 一致的NumPy结构化类型定义
+RECORD_DTYPE_FIELDS = [
+    ('timestamp_us', '<i8'),
+    ('case_index', '<u4'),
+    ('worker', '<u2'),
+    ('status', '<u2'),
+    ('latency_us', '<u4'),
+    ('bytes', '<u8'),
+    ('flags', 'u1'),
+    ('_pad', 'V3'),
+]
+
+
+class TraceRecorder:
+    """请求轨迹记录器
+
+    线程安全，可在多个工作线程中并发调用 record()
+    """
+
+    def __init__(self, path: str, case_ids: List[str] = None, initial_capacity: int = 65536):
+        """初始化记录器并创建轨迹文件
+
+        Args:
+            path: 轨迹文件路径
+            case_ids: 用例ID列表（可选，未登记的用例会在记录时自动追加）
+            initial_capacity: 初始容量（记录数），写满后按倍数扩容
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logger
+
+        self.case_ids: List[str] = []
+        self._case_index: Dict[str, int] = {}
+        for case_id in case_ids or []:
+            self._register_case(case_id)
+
+        self._lock = threading.Lock()
+        self._workers: Dict[int, int] = {}
+        self._count = 0
+        self._capacity = max(1, initial_capacity)
+        self._start_time = time.time()
+
+        self._file = open(self.path, 'w+b')
+        self._file.truncate(HEADER_SIZE + self._capacity * RECORD_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._write_header()
+
+    def _register_case(self, case_id: str) -> int:
+        index = self._case_index.get(case_id)
+        if index is None:
+            index = len(self.case_ids)
+            self.case_ids.append(case_id)
+            self._case_index[case_id] = index
+        return index
+
+    def _worker_id(self) -> int:
+        """当前线程的工作线程编号（按首次记录的顺序从0开始分配）
+
+        已分配的线程直接读取；首次记录时在锁内分配，避免并发线程拿到相同编号。
+        调用方不能持有 self._lock
+        """
+        ident = threading.get_ident()
+        worker = self._workers.get(ident)
+        if worker is None:
+            with self._lock:
+                worker = self._workers.setdefault(ident, len(self._workers))
+        return worker
+
+    def _write_header(self, table_offset: int = 0, table_length: int = 0):
+        struct.pack_into(HEADER_FORMAT, self._mmap, 0, MAGIC, VERSION, RECORD_SIZE, 0,
+                         self._start_time, self._count, table_offset, table_length)
+
+    def _grow(self):
+        """容量翻倍（重新映射文件）"""
+        self._capacity *= 2
+        self._mmap.close()
+        self._file.truncate(HEADER_SIZE + self._capacity * RECORD_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+
+    def record(self, case_id: str, status: int, latency: float, size: int,
+               success: bool, timestamp: float = None):
+        """追加一条请求记录
+
+        Args:
+            case_id: 用例ID
+            status: HTTP状态码，请求异常时为0
+            latency: 响应时间（秒）
+            size: 响应体字节数
+            success: 是否成功
+            timestamp: 请求开始时间（Unix时间戳，秒），默认为当前时间
+        """
+        timestamp_us = int((timestamp if timestamp is not None else time.time()) * 1_000_000)
+        latency_us = min(max(int(latency * 1_000_000), 0), 0xFFFFFFFF)
+        flags = FLAG_SUCCESS if success else 0
+        worker = self._worker_id() & 0xFFFF
+
+        with self._lock:
+            if self._mmap is None:
+                return
+            case_index = self._register_case(case_id)
+            if self._count >= self._capacity:
+                self._grow()
+
+            offset = HEADER_SIZE + self._count * RECORD_SIZE
+            struct.pack_into(RECORD_FORMAT, self._mmap, offset, timestamp_us, case_index,
+                             worker, status & 0xFFFF, latency_us, max(size, 0), flags)
+            self._count += 1
+            struct.pack_into('<Q', self._mmap, _COUNT_OFFSET, self._count)
+
+    @property
+    def count(self) -> int:
+        """已记录的请求数"""
+        return self._count
+
+    def close(self):
+        """截断未使用的空间，写入用例表并关闭文件"""
+        with self._lock:
+            if self._mmap is None:
+                return
+
+            table = json.dumps(self.case_ids, ensure_ascii=False).encode('utf-8')
+            table_offset = HEADER_SIZE + self._count * RECORD_SIZE
+            self._write_header(table_offset, len(table))
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+            self._file.truncate(table_offset)
+            self._file.seek(table_offset)
+            self._file.write(table)
+            self._file.close()
+
+        self.logger.info(f"请求轨迹已保存: {self.path}（{self._count} 条记录）")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+@dataclass
+class TraceData:
+    """轨迹文件内容
+
+    Attributes:
+        records: NumPy结构化数组，字段见 RECORD_DTYPE_FIELDS
+        case_ids: 用例ID列表，下标即 records['case_index']
+        start_time: 记录开始时间（Unix时间戳，秒）
+    """
+    records: Any
+    case_ids: List[str]
+    start_time: float
+
+
+def load_trace(path: str) -> TraceData:
+    """读取轨迹文件为NumPy数组
+
+    Args:
+        path: 轨迹文件路径
+
+    Returns:
+        TraceData: 轨迹数据
+
+    Raises:
+        ValueError: 文件格式不正确
+    """
+    import numpy as np
+
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"轨迹文件不完整: {path}")
+
+        magic, version, record_size, _, start_time, count, table_offset, table_length = \
+            struct.unpack_from(HEADER_FORMAT, header)
+        if magic != MAGIC:
+            raise ValueError(f"不是轨迹文件: {path}")
+        if version != VERSION or record_size != RECORD_SIZE:
+            raise ValueError(f"不支持的轨迹文件版本: version={version}, record_size={record_size}")
+
+        records = np.fromfile(f, dtype=np.dtype(RECORD_DTYPE_FIELDS), count=count)
+
+        case_ids = []
+        if table_length:
+            f.seek(table_offset)
+            case_ids = json.loads(f.read(table_length).decode('utf-8'))
+
+    # 用例表缺失（进程异常退出）时以序号代替
+    if len(records):
+        max_index = int(records['case_index'].max())
+        case_ids += [f"case_{i}" for i in range(len(case_ids), max_index + 1)]
+
+    return TraceData(records=records, case_ids=case_ids, start_time=start_time)
+
+
+def trace_to_performance_result(trace: TraceData):
+    """由轨迹数据离线重建性能测试结果
+
+    Args:
+        trace: load_trace() 返回的轨迹数据
+
+    Returns:
+        PerformanceResult: 重建的性能测试结果
+    """
+    import numpy as np
+    from core.performance_executor import PerformanceResult
+    from core.error_aggregator import CATEGORY_OTHER, classify_status
+
+    records = trace.records
+    result = PerformanceResult(start_time=trace.start_time)
+    if not len(records):
+        return result
+
+    latencies = records['latency_us'] / 1_000_000
+    success = (records['flags'] & FLAG_SUCCESS).astype(bool)
+    case_index = records['case_index']
+
+    result.success_count = int(success.sum())
+    result.failure_count = int(len(records) - result.success_count)
+    result.total_requests = int(len(records))
+
+    # 采样数组（完成时间 = 开始时间 + 响应时间）
+    finished_us = records['timestamp_us'] + records['latency_us']
+    result.response_times.frombytes(latencies.astype(np.float64).tobytes())
+    result.case_indices.frombytes(case_index.astype(np.uint32).tobytes())
+    result.successes.frombytes(success.astype(np.uint8).tobytes())
+    result.timestamps.frombytes(
+        np.maximum(finished_us / 1_000_000 - trace.start_time, 0.0).astype(np.float64).tobytes()
+    )
+    result.case_ids = list(trace.case_ids)
+
+    # 失败请求按状态码归类（轨迹不含异常信息，无状态码的请求计为其他错误）
+    failed_status = records['status'][~success]
+    statuses, counts = np.unique(failed_status, return_counts=True)
+    for status, count in zip(statuses.tolist(), counts.tolist()):
+        category = classify_status(status) if status else CATEGORY_OTHER
+        error_msg = f"HTTP {status}" if status else "请求异常"
+        result.record_error(category, error_msg, normalize=False, timestamp=trace.start_time, count=int(count))
+
+    # 用例级别统计
+    case_counts = np.bincount(case_index, minlength=len(trace.case_ids))
+    case_success = np.bincount(case_index[success], minlength=len(trace.case_ids))
+    for index, case_id in enumerate(trace.case_ids):
+        if case_counts[index]:
+            result.case_stats[case_id] = {
+                'index': index,
+                'count': int(case_counts[index]),
+                'success_count': int(case_success[index])
+            }
+
+    # 测试时长：第一个请求开始到最后一个请求结束
+    duration = (int(finished_us.max()) - int(records['timestamp_us'].min())) / 1_000_000
+
+    result.calculate_tps(duration)
+    result.calculate_statistics()
+    return result
@@ -0,0 +1,337 @@
+"""压测负载模型 - 按权重混合用例和场景、思考时间和节奏控制
+
+用例的性能配置列（performance_config）支持:
+    weight:     流量占比权重（默认1）
+    think_time: 请求完成后的思考时间（秒），可为常数，或
+                {"type": "constant", "value": 1}
+                {"type": "uniform", "min": 0.5, "max": 1.5}
+                {"type": "exponential", "mean": 1.0}
+    pacing:     同一虚拟用户两次迭代开始之间的最小间隔（秒）
+
+场景列相同的用例组成一个多步骤场景（按用例顺序执行，作为一个事务统计），
+场景的 weight 和 pacing 取第一个步骤的配置，每个步骤的 think_time 在该步骤之后生效
+
+任一用例配置了以上字段或属于场景时，性能测试改为虚拟用户模式: 每个虚拟用户循环按权重抽取用例或场景执行，
+抽样使用别名表（Vose's alias method），每次抽样 O(1)
+"""
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 启用虚拟用户模式的性能配置字段
+WORKLOAD_KEYS = ('weight', 'think_time', 'pacing')
+
+
+def _non_negative_number(value: Any, name: str) -> float:
+    """校验性能配置中的数值（JSON 数字且非负，布尔值不视为数字）
+
+    Args:
+        value: 配置值
+        name: 字段名称（用于错误信息）
+
+    Returns:
+        浮点数
+
+    Raises:
+        ValueError: 不是数字或为负数
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{name} 必须是非负数: {value!r}")
+    return float(value)
+
+
+class AliasTable:
+    """别名表：按权重 O(1) 抽样
+
+    构建 O(n)，每次抽样只需两个随机数
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """构建别名表
+
+        Args:
+            weights: 各项的权重（非负，至少一项为正）
+
+        Raises:
+            ValueError: 权重为空、为负或全为0
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0 or any(w < 0 for w in weights):
+            raise ValueError(f"权重必须非负且至少一项为正: {list(weights)}")
+
+        self.size = n
+        self.probability = [0.0] * n
+        self.alias = [0] * n
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.probability[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # 浮点误差导致的剩余项概率为1
+        for i in small + large:
+            self.probability[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        """抽取一项
+
+        Args:
+            rng: 随机数生成器（每个虚拟用户一个，避免线程间竞争）
+
+        Returns:
+            项的序号
+        """
+        i = int(rng.random() * self.size)
+        return i if rng.random() < self.probability[i] else self.alias[i]
+
+
+@dataclass
+class ThinkTime:
+    """思考时间分布
+
+    Attributes:
+        kind: 分布类型（constant / uniform / exponential）
+        low: constant 的取值、uniform 的下限、exponential 的均值
+        high: uniform 的上限
+    """
+    kind: str = 'constant'
+    low: float = 0.0
+    high: float = 0.0
+
+    @classmethod
+    def from_config(cls, config: Any) -> Optional['ThinkTime']:
+        """由性能配置中的 think_time 创建
+
+        Args:
+            config: 数字（常数，秒）或 {"type": ..., ...}
+
+        Returns:
+            ThinkTime，未配置时返回None
+
+        Raises:
+            ValueError: 配置不合法
+        """
+        if config is None:
+            return None
+        if not isinstance(config, dict):
+            value = _non_negative_number(config, 'think_time')
+            return cls('constant', value) if value > 0 else None
+
+        kind = config.get('type', 'constant')
+        if kind == 'constant':
+            return cls(kind, _non_negative_number(config.get('value', 0), 'think_time.value'))
+        if kind == 'uniform':
+            low = _non_negative_number(config.get('min', 0), 'think_time.min')
+            high = _non_negative_number(config.get('max', 0), 'think_time.max')
+            if high < low:
+                raise ValueError(f"think_time 的 max 不能小于 min: {config!r}")
+            return cls(kind, low, high)
+        if kind == 'exponential':
+            mean = _non_negative_number(config.get('mean'), 'think_time.mean')
+            if mean <= 0:
+                raise ValueError(f"think_time.mean 必须是正数: {mean:g}")
+            return cls(kind, mean)
+        raise ValueError(f"不支持的 think_time 类型: {kind}")
+
+    def sample(self, rng: random.Random) -> float:
+        """抽取一次思考时间（秒）"""
+        if self.kind == 'uniform':
+            return rng.uniform(self.low, self.high)
+        if self.kind == 'exponential':
+            return rng.expovariate(1.0 / self.low) if self.low > 0 else 0.0
+        return self.low
+
+
+@dataclass
+class WorkloadStep:
+    """负载项中的一个步骤（用例）及其之后的思考时间
+
+    Attributes:
+        case: 测试用例
+        think_time: 该步骤之后的思考时间
+        extract_rules: 场景步骤的数据提取规则（前置条件列，压测开始前解析），提取的数据写入虚拟用户的变量
+    """
+    case: Any
+    think_time: Optional[ThinkTime] = None
+    extract_rules: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class WorkloadItem:
+    """负载中的一项（单个用例或多步骤场景）
+
+    Attributes:
+        name: 用例ID或场景名称
+        steps: 按顺序执行的步骤
+        scenario: 是否为场景（场景按事务统计，步骤之间通过虚拟用户的变量传递数据）
+        weight: 流量占比权重
+        pacing: 两次迭代开始之间的最小间隔（秒）
+    """
+    name: str
+    steps: List[WorkloadStep] = field(default_factory=list)
+    scenario: bool = False
+    weight: float = 1.0
+    pacing: float = 0.0
+
+
+class Workload:
+    """按权重混合的负载"""
+
+    def __init__(self, items: List[WorkloadItem]):
+        """初始化负载
+
+        Args:
+            items: 负载项（权重为0的项不会被抽到）
+        """
+        self.items = items
+        self.table = AliasTable([item.weight for item in items])
+
+    @staticmethod
+    def parse_config(case: Any) -> Dict[str, Any]:
+        """解析用例的性能配置列
+
+        Raises:
+            ValueError: 不是合法的JSON对象
+        """
+        raw = getattr(case, 'performance_config', '') or '{}'
+        try:
+            config = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"用例 {getattr(case, 'case_id', 'unknown')} 性能配置解析失败: {e}")
+        if not isinstance(config, dict):
+            raise ValueError(f"用例 {getattr(case, 'case_id', 'unknown')} 性能配置必须是JSON对象")
+        return config
+
+    @classmethod
+    def parse_configs(cls, cases: List[Any]) -> List[Dict[str, Any]]:
+        """解析并校验所有用例的性能配置（JSON 格式和 weight / think_time / pacing），压测开始前调用一次
+
+        Args:
+            cases: 测试用例列表
+
+        Returns:
+            与 cases 一一对应的性能配置
+
+        Raises:
+            ValueError: 存在不合法的性能配置，错误信息列出所有不合法的用例
+        """
+        configs, errors = [], []
+        for case in cases:
+            try:
+                config = cls.parse_config(case)
+            except ValueError as e:
+                errors.append(str(e))
+                configs.append({})
+                continue
+            try:
+                ThinkTime.from_config(config.get('think_time'))
+                for key in ('weight', 'pacing'):
+                    if key in config:
+                        _non_negative_number(config[key], key)
+            except ValueError as e:
+                errors.append(f"用例 {getattr(case, 'case_id', 'unknown')} 性能配置不合法: {e}")
+            configs.append(config)
+
+        if errors:
+            raise ValueError(f"{len(errors)} 个用例的性能配置不合法:\n  " + "\n  ".join(errors))
+        return configs
+
+    @staticmethod
+    def parse_extract_rules(cases: List[Any]) -> List[Optional[Dict[str, Any]]]:
+        """解析场景步骤前置条件列中的数据提取规则，压测开始前调用一次
+
+        只有场景中的步骤会提取数据，其他用例返回None
+
+        Args:
+            cases: 测试用例列表
+
+        Returns:
+            与 cases 一一对应的提取规则（未配置时为None）
+
+        Raises:
+            ValueError: 存在不合法的提取规则，错误信息列出所有不合法的用例
+        """
+        rules, errors = [], []
+        for case in cases:
+            raw = (getattr(case, 'pre_condition', '') or '').strip()
+            if not getattr(case, 'scenario', '') or raw in ('', '{}'):
+                rules.append(None)
+                continue
+            try:
+                parsed = json.loads(raw)
+                if not isinstance(parsed, dict):
+                    raise ValueError("必须是JSON对象")
+            except ValueError as e:
+                errors.append(f"用例 {getattr(case, 'case_id', 'unknown')} 前置条件（提取规则）不合法: {e}")
+                parsed = None
+            rules.append(parsed)
+
+        if errors:
+            raise ValueError(f"{len(errors)} 个场景步骤的提取规则不合法:\n  " + "\n  ".join(errors))
+        return rules
+
+    @classmethod
+    def from_cases(cls, cases: List[Any], configs: List[Dict[str, Any]] = None,
+                   extract_rules: List[Optional[Dict[str, Any]]] = None) -> Optional['Workload']:
+        """由用例的场景列和性能配置创建负载
+
+        Args:
+            cases: 测试用例列表
+            configs: 已由 parse_configs 解析的性能配置（为None时在此解析）
+            extract_rules: 已由 parse_extract_rules 解析的提取规则（为None时在此解析）
+
+        Returns:
+            Workload，没有场景且没有用例配置 weight / think_time / pacing 时返回None（沿用按轮执行）
+
+        Raises:
+            ValueError: 存在不合法的性能配置或提取规则
+        """
+        if configs is None:
+            configs = cls.parse_configs(cases)
+        has_scenario = any(getattr(case, 'scenario', '') for case in cases)
+        if not has_scenario and not any(key in config for config in configs for key in WORKLOAD_KEYS):
+            return None
+
+        if extract_rules is None:
+            extract_rules = cls.parse_extract_rules(cases)
+
+        items: List[WorkloadItem] = []
+        scenarios: Dict[str, WorkloadItem] = {}
+        for case, config, rules in zip(cases, configs, extract_rules):
+            step = WorkloadStep(case, ThinkTime.from_config(config.get('think_time')), rules)
+            name = getattr(case, 'scenario', '')
+
+            if name and name in scenarios:
+                scenarios[name].steps.append(step)
+                continue
+
+            item = WorkloadItem(
+                name=name or case.case_id,
+                steps=[step],
+                scenario=bool(name),
+                weight=float(config.get('weight', 1.0)),
+                pacing=float(config.get('pacing', 0.0))
+            )
+            if name:
+                scenarios[name] = item
+            items.append(item)
+
+        for item in scenarios.values():
+            logger.info(f"场景 {item.name}: {' → '.join(step.case.case_id for step in item.steps)}")
+        return cls(items)
+
+    def sample(self, rng: random.Random) -> WorkloadItem:
+        """按权重抽取一项"""
+        return self.items[self.table.sample(rng)]
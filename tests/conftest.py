@@ -1,7 +1,7 @@
 """pytest配置文件"""
 import pytest
 import sys
-from config.settings import settings
+from config.settings import get_settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -47,6 +47,25 @@ def pytest_addoption(parser):
         default=0,
         help="性能测试：启动时间（秒）"
     )
+    parser.addoption(
+        "--trace-file",
+        action="store",
+        default=None,
+        help="性能测试：请求轨迹文件路径（二进制），用于事后逐请求分析"
+    )
+    parser.addoption(
+        "--baseline-run",
+        action="store",
+        type=int,
+        default=None,
+        help="性能测试：回归对比的基线运行ID（默认使用历史库中最近的运行）"
+    )
+    parser.addoption(
+        "--capacity-search",
+        action="store_true",
+        default=False,
+        help="性能测试：容量探测模式，逐级增加并发找出最大可持续吞吐量（配置见 performance.capacity_search）"
+    )
 
 
 def pytest_configure(config):
@@ -59,8 +78,12 @@ def pytest_configure(config):
     config.addinivalue_line("markers", "smoke: 冒烟测试")
     config.addinivalue_line("markers", "regression: 回归测试")
 
+    # pytest-xdist 工作进程不生成报告，不创建报告目录
+    if hasattr(config, 'workerinput'):
+        return
+
     # 动态设置报告路径（使用带时间戳的路径）
-    from config.settings import settings
+    settings = get_settings()
 
     # 设置HTML报告路径
     config.option.htmlpath = settings.html_report_file
@@ -78,12 +101,14 @@ def pytest_configure(config):
     logger.info(f"{'='*60}\n")
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
     """测试环境设置
 
-    在测试开始前初始化，测试结束后清理
+    整个测试会话只输出一次环境配置，会话结束时输出结束信息
     """
+    settings = get_settings()
+
     # 测试开始
     logger.info("\n" + "=" * 60)
     logger.info("测试环境配置")
@@ -108,7 +133,7 @@ def base_url():
     Returns:
         当前环境的base_url
     """
-    return settings.base_url
+    return get_settings().base_url
 
 
 @pytest.fixture(autouse=True)
@@ -1,7 +1,10 @@
-"""测试执行主程序"""
+"""测试执行主程序
+
+请求构建器、接口执行器（连接池）、数据管理器（提取变量）和断言器在整个测试会话中只创建一次，由所有用例共享
+"""
 import pytest
 import json
-import allure
+from dataclasses import dataclass
 from typing import List
 
 from core.case_loader import CaseLoader, MultiFileCaseLoader, TestCase
@@ -10,6 +13,7 @@ from core.data_extractor import DataExtractor
 from core.data_manager import DataManager
 from core.request_builder import RequestBuilder
 from utils.assertions import Assertions
+from utils.attachments import AttachmentCollector, AttachmentPolicy
 from config.settings import settings
 from utils.logger import get_logger
 
@@ -47,6 +51,45 @@ def get_test_cases(excel_files: str = None, sheet_names: str = "all") -> List[Te
         return loader.load_cases()
 
 
+@dataclass
+class APIComponents:
+    """测试会话共享的组件"""
+    data_manager: DataManager
+    extractor: DataExtractor
+    request_builder: RequestBuilder
+    executor: APIExecutor
+    assertions: Assertions
+    attachment_policy: AttachmentPolicy
+
+
+@pytest.fixture(scope="session")
+def api_components():
+    """创建测试会话共享的组件，会话结束时关闭连接池
+
+    Yields:
+        APIComponents 实例
+    """
+    data_manager = DataManager(settings.extract_data_path)
+    executor = APIExecutor(
+        timeout=settings.timeout,
+        transport=settings.transport,
+        dns_cache_ttl=settings.http.get('dns_cache_ttl', 60),
+        tls_session_cache=settings.http.get('tls_session_cache', True)
+    )
+    components = APIComponents(
+        data_manager=data_manager,
+        extractor=DataExtractor(data_manager),
+        request_builder=RequestBuilder(settings.base_url, data_manager),
+        executor=executor,
+        assertions=Assertions(),
+        attachment_policy=AttachmentPolicy.from_config(settings.attachments)
+    )
+
+    yield components
+
+    executor.close()
+
+
 class TestAPI:
     """API测试类
 
@@ -73,32 +116,31 @@ class TestAPI:
         metafunc.parametrize("case", cases, ids=[c.case_id for c in cases])
 
     @pytest.fixture(autouse=True)
-    def setup(self):
+    def setup(self, api_components):
         """测试前置设置
 
-        在每个测试用例执行前初始化所需组件
+        绑定会话共享的组件，并重置本用例的请求和响应记录
         """
-        self.data_manager = DataManager(settings.extract_data_path)
-        self.extractor = DataExtractor(self.data_manager)
-        self.request_builder = RequestBuilder(settings.base_url, self.data_manager)
-        self.executor = APIExecutor(timeout=settings.timeout)
-        self.assertions = Assertions()
+        self.data_manager = api_components.data_manager
+        self.extractor = api_components.extractor
+        self.request_builder = api_components.request_builder
+        self.executor = api_components.executor
+        self.assertions = api_components.assertions
+        self.attachment_policy = api_components.attachment_policy
 
         # 初始化请求和响应记录（用于HTML报告）
         self._last_request = {}
         self._last_response = {}
 
-        yield
-
-        # 测试后清理（可选）
-        logger.debug("测试用例执行完成")
-
     def test_api_case(self, case):
         """测试单个API用例
 
         Args:
             case: 测试用例对象
         """
+        # 只在执行用例时导入allure，导入本模块（如复用 get_test_cases）不产生其导入开销
+        import allure
+
         # Allure测试用例基本信息
         allure.dynamic.title(f"[{case.case_id}] {case.api_name}")
         allure.dynamic.description(
@@ -107,13 +149,28 @@ class TestAPI:
             f"**用例ID**: {case.case_id}"
         )
 
-        logger.info("\n" + "=" * 60)
-        logger.info(f"执行测试用例: [{case.case_id}] {case.api_name}")
-        logger.info(f"所属模块: {case.module}")
-        logger.info("=" * 60)
+        logger.info(f"执行测试用例: [{case.case_id}] {case.api_name}（{case.module}）")
+
+        # 附件只登记，用例结束时按策略决定是否序列化并附加
+        attachments = AttachmentCollector(self.attachment_policy)
+        failed = True
+        try:
+            self._run_case(case, attachments)
+            failed = False
+        finally:
+            attachments.flush(failed)
+
+        logger.debug(f"测试用例执行通过: {case.case_id}")
 
+    def _run_case(self, case, attachments: AttachmentCollector):
+        """执行用例的各个步骤
+
+        Args:
+            case: 测试用例对象
+            attachments: 本用例的附件登记表（步骤通过 attachments.step 执行，失败步骤的附件附加在步骤内）
+        """
         # 步骤1: 构建请求
-        with allure.step("1. 构建请求"):
+        with attachments.step("1. 构建请求"):
             url, method, headers, params = self.request_builder.build(case)
 
             # 记录请求信息（用于HTML报告）
@@ -124,78 +181,32 @@ class TestAPI:
                 'params': params
             }
 
-            # 记录请求信息到Allure报告
-            allure.attach(
-                f"{method} {url}",
-                name="请求信息",
-                attachment_type=allure.attachment_type.TEXT
-            )
-
-            # 记录请求头
+            # 记录请求信息、请求头和请求参数
+            attachments.add_text("请求信息", f"{method} {url}")
             if headers:
-                headers_json = json.dumps(headers, indent=2, ensure_ascii=False)
-                allure.attach(
-                    headers_json,
-                    name="请求头",
-                    attachment_type=allure.attachment_type.JSON
-                )
-
-            # 记录请求参数
+                attachments.add_json("请求头", headers)
             if params:
-                params_json = json.dumps(params, indent=2, ensure_ascii=False)
-                allure.attach(
-                    params_json,
-                    name="请求参数",
-                    attachment_type=allure.attachment_type.JSON
-                )
+                attachments.add_json("请求参数", params)
 
         # 步骤2: 执行请求
-        with allure.step("2. 发送HTTP请求"):
+        with attachments.step("2. 发送HTTP请求"):
             response = self.executor.execute(url, method, headers, params, case.param_type)
 
         # 步骤3: 记录响应信息
-        with allure.step("3. 解析响应"):
+        with attachments.step("3. 解析响应"):
             # 记录响应信息（用于HTML报告）
             self._last_response = response
 
-            # 记录状态码
-            allure.attach(
-                str(response['status_code']),
-                name="响应状态码",
-                attachment_type=allure.attachment_type.TEXT
-            )
-
-            # 记录响应头
+            attachments.add_text("响应状态码", response['status_code'])
             if response.get('headers'):
-                headers_json = json.dumps(
-                    dict(list(response['headers'].items())[:10]),  # 只显示前10个
-                    indent=2,
-                    ensure_ascii=False
-                )
-                allure.attach(
-                    headers_json,
-                    name="响应头",
-                    attachment_type=allure.attachment_type.JSON
-                )
-
-            # 记录响应体
+                # 只显示前10个响应头
+                attachments.add_json("响应头", dict(list(response['headers'].items())[:10]))
             if response.get('body'):
-                body_json = json.dumps(response['body'], indent=2, ensure_ascii=False)
-                allure.attach(
-                    body_json,
-                    name="响应体",
-                    attachment_type=allure.attachment_type.JSON
-                )
-
-            # 记录响应时间
-            allure.attach(
-                f"{response['response_time']:.3f}秒",
-                name="响应时间",
-                attachment_type=allure.attachment_type.TEXT
-            )
+                attachments.add_json("响应体", response['body'])
+            attachments.add_text("响应时间", f"{response['response_time']:.3f}秒")
 
         # 步骤4: 断言状态码
-        with allure.step("4. 断言状态码"):
+        with attachments.step("4. 断言状态码"):
             # 传入响应体，以便断言失败时显示更多信息
             self.assertions.assert_status_code(
                 response['status_code'],
@@ -204,33 +215,31 @@ class TestAPI:
             )
 
         # 步骤5: 断言响应体
-        with allure.step("5. 断言响应体"):
+        with attachments.step("5. 断言响应体"):
             try:
                 expected_result = json.loads(case.expected_result) if case.expected_result else {}
                 self.assertions.assert_response_body(response['body'], expected_result)
             except json.JSONDecodeError:
                 logger.warning(f"期望结果JSON解析失败，跳过响应体断言: {case.expected_result}")
 
-        # 步骤6: 提取并保存数据（如果有前置条件定义）
+        # 步骤6: 校验响应Schema（如果有定义）
+        if case.response_schema:
+            with attachments.step("6. 校验响应Schema"):
+                self.assertions.assert_json_schema(response['body'], case.response_schema)
+
+        # 步骤7: 提取并保存数据（如果有前置条件定义）
         if case.pre_condition:
-            with allure.step("6. 提取并保存数据"):
+            with attachments.step("7. 提取并保存数据"):
                 try:
                     extract_rules = json.loads(case.pre_condition)
                     extracted = self.extractor.extract_and_save(response['body'], extract_rules)
                     if extracted:
                         logger.info(f"提取并保存数据: {extracted}")
                         # 记录提取的数据到报告
-                        extracted_json = json.dumps(extracted, indent=2, ensure_ascii=False)
-                        allure.attach(
-                            extracted_json,
-                            name="提取的数据",
-                            attachment_type=allure.attachment_type.JSON
-                        )
+                        attachments.add_json("提取的数据", extracted)
                 except json.JSONDecodeError:
                     logger.warning(f"前置条件JSON解析失败，跳过数据提取: {case.pre_condition}")
 
-        logger.info("测试用例执行通过\n")
-
 
 if __name__ == "__main__":
     # pytest.main([__file__, "-v", "--self-contained-html"])
@@ -0,0 +1,162 @@
+"""响应体结构化匹配（utils/body_matcher.py）的单元测试"""
+import pytest
+
+from utils.body_matcher import (
+    Matcher, REASON_LENGTH, REASON_MISSING, REASON_TYPE, REASON_UNEXPECTED, REASON_VALUE,
+    compile_expected, compile_expected_json, preview
+)
+
+
+def match(expected, actual):
+    """编译期望结构并匹配，返回 Mismatch 或 None"""
+    return compile_expected(expected).match(actual)
+
+
+class TestStructure:
+    """对象、数组和普通值"""
+
+    def test_dict_is_partial(self):
+        assert match({'code': 'SUCCESS'}, {'code': 'SUCCESS', 'data': {'id': 1}}) is None
+
+    def test_nested_value_mismatch_reports_path(self):
+        mismatch = match({'data': {'items': [{'id': 1}, {'id': 2}]}},
+                         {'data': {'items': [{'id': 1}, {'id': 3}]}})
+        assert mismatch.reason == REASON_VALUE
+        assert mismatch.path == ('data', 'items', 1, 'id')
+        assert mismatch.path_str == 'data.items[1].id'
+        assert (mismatch.expected, mismatch.actual) == (2, 3)
+
+    def test_missing_field(self):
+        mismatch = match({'data': {'token': 'x'}}, {'data': {}})
+        assert mismatch.reason == REASON_MISSING
+        assert mismatch.path_str == 'data.token'
+
+    def test_dict_expected_but_other_type(self):
+        assert match({'data': {'id': 1}}, {'data': [1]}).reason == REASON_TYPE
+
+    def test_list_is_positional_with_same_length(self):
+        assert match([1, 2], [1, 2]) is None
+        assert match([1, 2], [2, 1]).path == (0,)
+        assert match([1, 2], [1, 2, 3]).reason == REASON_LENGTH
+
+    def test_operator_lookalike_keys_are_plain_fields(self):
+        # 不全是运算符的对象按普通对象匹配
+        assert match({'$ref': '#/a', 'id': 1}, {'$ref': '#/a', 'id': 1}) is None
+        assert match({'$ref': '#/a', 'id': 1}, {'id': 1}).reason == REASON_MISSING
+
+    def test_matcher_is_abstract(self):
+        with pytest.raises(TypeError):
+            Matcher()
+
+
+class TestOperators:
+    """运算符的匹配和不匹配"""
+
+    @pytest.mark.parametrize('expected, ok, bad', [
+        ({'$type': 'string'}, 'a', 1),
+        ({'$type': 'integer'}, 1, 1.5),
+        ({'$type': 'integer'}, 0, True),
+        ({'$type': 'number'}, 1.5, '1.5'),
+        ({'$type': 'null'}, None, 0),
+        ({'$type': 'array'}, [], {}),
+        ({'$regex': r'^\d+$'}, '123', '12a'),
+        ({'$regex': 'a'}, 'xa', 1),
+        ({'$gt': 0, '$lte': 100}, 100, 0),
+        ({'$lt': 5}, 4, 'x'),
+        ({'$gte': 1}, 1, False),
+        ({'$ne': 'ERROR'}, 'OK', 'ERROR'),
+        ({'$in': ['A', 'B']}, 'B', 'C'),
+        ({'$len': 2}, [1, 2], [1]),
+        ({'$len': 3}, 'abc', 3),
+        ({'$contains': 'ok'}, 'is ok', 'nope'),
+        ({'$contains': [{'id': 2}]}, [{'id': 1}, {'id': 2}], [{'id': 1}]),
+        ({'$contains': {'id': 2}}, [{'id': 2}], {'id': 2}),
+        ({'$each': {'$type': 'integer'}}, [1, 2], [1, '2']),
+        ({'$each': {'id': {'$gt': 0}}}, [], 'x'),
+        ({'$any': True}, None, ...),
+    ])
+    def test_match_and_mismatch(self, expected, ok, bad):
+        assert match(expected, ok) is None
+        if bad is not ...:
+            assert match(expected, bad) is not None
+
+    def test_each_reports_element_index(self):
+        mismatch = match({'items': {'$each': {'id': {'$type': 'integer'}}}},
+                         {'items': [{'id': 1}, {'id': 2}, {'id': 'x'}]})
+        assert mismatch.path == ('items', 2, 'id')
+        assert mismatch.reason == REASON_TYPE
+
+    def test_invalid_operator_arguments(self):
+        with pytest.raises(ValueError):
+            compile_expected({'$type': 'date'})
+        with pytest.raises(ValueError):
+            compile_expected({'$unordered': 1})
+
+    @pytest.mark.parametrize('expected', [
+        {'$regex': '('},
+        {'$regex': 1},
+        {'$in': 'AB'},
+        {'code': {'$in': {'A': 1}}},
+    ])
+    def test_invalid_regex_and_in_raise_value_error(self, expected):
+        with pytest.raises(ValueError):
+            compile_expected(expected)
+
+
+class TestUnordered:
+    """$unordered 一一对应"""
+
+    def test_any_order(self):
+        assert match({'$unordered': [1, 2, 3]}, [3, 1, 2]) is None
+
+    def test_length_must_match(self):
+        assert match({'$unordered': [1, 2]}, [1, 2, 2]).reason == REASON_LENGTH
+
+    def test_each_element_used_once(self):
+        mismatch = match({'$unordered': [1, 1]}, [1, 2])
+        assert mismatch.reason == REASON_VALUE
+        assert mismatch.expected == 1
+
+    def test_not_fooled_by_greedy_assignment(self):
+        # 按顺序贪心时第一个期望项会占用 1，导致第二个期望项无元素可用
+        assert match({'$unordered': [{'$type': 'integer'}, 1]}, [1, 2]) is None
+        assert match({'$unordered': [{'$gt': 0}, {'$gt': 5}, {'$gt': 9}]}, [10, 1, 6]) is None
+
+    def test_nested_objects(self):
+        expected = {'$unordered': [{'id': 1}, {'id': {'$type': 'integer'}}]}
+        assert match(expected, [{'id': 7}, {'id': 1}]) is None
+        assert match(expected, [{'id': 7}, {'id': 'x'}]) is not None
+
+    def test_type(self):
+        assert match({'$unordered': [1]}, {'a': 1}).reason == REASON_TYPE
+
+
+class TestExists:
+    """$exists / $any 与字段是否存在"""
+
+    def test_exists_false(self):
+        assert match({'error': {'$exists': False}}, {'code': 0}) is None
+        mismatch = match({'error': {'$exists': False}}, {'error': None})
+        assert mismatch.reason == REASON_UNEXPECTED
+        assert mismatch.path == ('error',)
+
+    def test_exists_true_and_any_require_field(self):
+        assert match({'token': {'$exists': True}}, {'token': None}) is None
+        assert match({'token': {'$exists': True}}, {}).reason == REASON_MISSING
+        assert match({'token': {'$any': True}}, {}).reason == REASON_MISSING
+
+
+class TestHelpers:
+    """JSON编译缓存和摘要"""
+
+    def test_compile_json_is_cached(self):
+        text = '{"code": {"$in": ["SUCCESS", "OK"]}}'
+        assert compile_expected_json(text) is compile_expected_json(text)
+        assert compile_expected_json(text).match({'code': 'OK'}) is None
+
+    def test_preview_is_bounded(self):
+        body = {'items': [{'id': i, 'name': 'x' * 500} for i in range(10000)]}
+        text = preview(body, max_chars=300)
+        assert len(text) <= 301
+        mismatch = match({'items': {'$len': 1}}, body)
+        assert len(mismatch.describe()) < 1000
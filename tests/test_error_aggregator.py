@@ -0,0 +1,133 @@
+"""压测错误聚合（core/error_aggregator.py）的单元测试"""
+import socket
+
+import pytest
+import requests
+
+from core.api_executor import DeadlineExceeded
+from core.error_aggregator import (
+    CATEGORY_ASSERTION, CATEGORY_CONNECT, CATEGORY_DEADLINE, CATEGORY_DNS, CATEGORY_HTTP_4XX, CATEGORY_HTTP_5XX,
+    CATEGORY_OTHER, CATEGORY_TIMEOUT, CATEGORY_TLS, MAX_SIGNATURE_CHARS, OVERFLOW_SIGNATURE,
+    ErrorAggregationConfig, ErrorAggregator, classify_exception, classify_status, normalize_message
+)
+
+
+def dns_error():
+    """requests 包装的域名解析失败（异常链中有 socket.gaierror）"""
+    try:
+        try:
+            raise socket.gaierror(-2, 'Name or service not known')
+        except socket.gaierror as e:
+            raise requests.exceptions.ConnectionError('Max retries exceeded') from e
+    except requests.exceptions.ConnectionError as e:
+        return e
+
+
+class TestClassify:
+    """错误类别"""
+
+    @pytest.mark.parametrize('error, category', [
+        (DeadlineExceeded('请求超过总期限 15s，已取消'), CATEGORY_DEADLINE),
+        (requests.exceptions.ReadTimeout('read timed out'), CATEGORY_TIMEOUT),
+        (requests.exceptions.ConnectTimeout('connect timed out'), CATEGORY_TIMEOUT),
+        (requests.exceptions.SSLError('certificate verify failed'), CATEGORY_TLS),
+        (requests.exceptions.ConnectionError('Connection refused'), CATEGORY_CONNECT),
+        (requests.exceptions.ConnectionError("NameResolutionError(host='x')"), CATEGORY_DNS),
+        (AssertionError('状态码不符'), CATEGORY_ASSERTION),
+        (socket.gaierror(-2, 'x'), CATEGORY_DNS),
+        (socket.timeout('timed out'), CATEGORY_TIMEOUT),
+        (ConnectionResetError('reset'), CATEGORY_CONNECT),
+        (KeyError('data'), CATEGORY_OTHER),
+    ])
+    def test_exception(self, error, category):
+        assert classify_exception(error) == category
+
+    def test_dns_found_in_exception_chain(self):
+        assert classify_exception(dns_error()) == CATEGORY_DNS
+
+    @pytest.mark.parametrize('status, category', [
+        (503, CATEGORY_HTTP_5XX), (404, CATEGORY_HTTP_4XX), (200, CATEGORY_ASSERTION), (None, CATEGORY_ASSERTION)
+    ])
+    def test_status(self, status, category):
+        assert classify_status(status) == category
+
+
+class TestNormalize:
+    """错误签名规范化"""
+
+    def test_variable_parts_become_placeholders(self):
+        a = normalize_message("HTTPConnectionPool(host='10.0.0.1', port=8080): Read timed out. (read timeout=5)")
+        b = normalize_message("HTTPConnectionPool(host='10.0.0.2', port=9090): Read timed out. (read timeout=10)")
+        assert a == b
+        assert '<host>' in a and '<n>' in a
+
+    def test_urls_addresses_and_uuids(self):
+        message = ("GET https://api.example.com/users/42?x=1 failed at 0x7f3a2b1c "
+                   "id=123e4567-e89b-12d3-a456-426614174000 from 192.168.1.10:443")
+        assert normalize_message(message) == 'GET <url> failed at <addr> id=<uuid> from <ip>'
+
+    def test_signature_is_bounded(self):
+        assert len(normalize_message('x' * 10000)) == MAX_SIGNATURE_CHARS
+
+
+class TestAggregator:
+    """聚合、上限和时间分布"""
+
+    def test_same_signature_is_merged(self):
+        aggregator = ErrorAggregator()
+        key = aggregator.add(CATEGORY_TIMEOUT, "Read timed out (host='a', timeout=5)")
+        assert aggregator.add(CATEGORY_TIMEOUT, "Read timed out (host='b', timeout=7)") == key
+        assert key.startswith('请求超时: ')
+
+        category = aggregator.categories[CATEGORY_TIMEOUT]
+        assert category.count == 2
+        assert len(category.signatures) == 1
+        assert aggregator.total == 2
+
+    def test_signature_overflow(self):
+        aggregator = ErrorAggregator(ErrorAggregationConfig(max_signatures=3))
+        for i in range(10):
+            aggregator.add(CATEGORY_OTHER, f"error kind {chr(ord('a') + i)}")
+        signatures = aggregator.categories[CATEGORY_OTHER].signatures
+        assert len(signatures) == 4
+        assert signatures[OVERFLOW_SIGNATURE].count == 7
+        assert sum(entry.count for entry in signatures.values()) == 10
+
+    def test_exemplars_are_capped_and_truncated(self):
+        aggregator = ErrorAggregator(ErrorAggregationConfig(max_exemplars=2, max_message_chars=20))
+        for i in range(5):
+            aggregator.add(CATEGORY_CONNECT, f"refused by server {i} " + 'x' * 100)
+        (entry,) = aggregator.categories[CATEGORY_CONNECT].signatures.values()
+        assert entry.count == 5
+        assert len(entry.exemplars) == 2
+        assert all(len(exemplar) == 20 for exemplar in entry.exemplars)
+
+    def test_duplicate_exemplars_are_skipped(self):
+        aggregator = ErrorAggregator()
+        for _ in range(3):
+            aggregator.add(CATEGORY_ASSERTION, '状态码 500 不符合期望 200', normalize=False)
+        (entry,) = aggregator.categories[CATEGORY_ASSERTION].signatures.values()
+        assert entry.exemplars == ['状态码 500 不符合期望 200']
+        assert '状态码 500 不符合期望 200' in aggregator.categories[CATEGORY_ASSERTION].signatures
+
+    def test_timeline_and_first_last_seen(self):
+        aggregator = ErrorAggregator(ErrorAggregationConfig(interval=10))
+        for elapsed in (1.0, 5.0, 12.0, 31.0):
+            aggregator.add(CATEGORY_TIMEOUT, 'timeout', elapsed=elapsed)
+        aggregator.add(CATEGORY_TIMEOUT, 'timeout', count=2)
+
+        data = aggregator.to_dict()['categories'][CATEGORY_TIMEOUT]
+        assert data['count'] == 6
+        assert data['timeline'] == [[0, 2], [10, 1], [30, 1]]
+        assert (data['signatures'][0]['first_seen'], data['signatures'][0]['last_seen']) == (1.0, 31.0)
+
+    def test_summary_orders_by_count(self):
+        aggregator = ErrorAggregator()
+        aggregator.add(CATEGORY_CONNECT, 'refused', count=3)
+        aggregator.add(CATEGORY_TIMEOUT, 'timeout', count=120)
+        assert aggregator.summary() == '请求超时 120，连接失败 3'
+        assert list(aggregator.to_dict()['categories']) == [CATEGORY_TIMEOUT, CATEGORY_CONNECT]
+
+    def test_from_config_ignores_unknown_fields(self):
+        config = ErrorAggregationConfig.from_config({'max_signatures': 5, 'unknown': 1})
+        assert config.max_signatures == 5
@@ -0,0 +1,113 @@
+"""性能结果向量化分析（utils/perf_analytics.py）的单元测试"""
+import random
+
+import numpy as np
+import pytest
+
+from core.performance_executor import PerformanceResult
+from utils.histogram import HISTOGRAM_PRECISION, LatencyHistogram
+from utils.perf_analytics import DEFAULT_PERCENTILES, analyze, analyze_arrays
+
+
+@pytest.fixture(scope='module')
+def samples():
+    """两个用例的对数正态响应时间，约10%失败，分布在20秒内"""
+    rng = random.Random(31)
+    latencies = [rng.lognormvariate(-3, 0.8) for _ in range(5000)]
+    case_indices = [i % 3 // 2 for i in range(5000)]  # 用例0占2/3，用例1占1/3
+    successes = [rng.random() > 0.1 for _ in range(5000)]
+    timestamps = sorted(rng.uniform(0, 20) for _ in range(5000))
+    return latencies, case_indices, successes, timestamps
+
+
+class TestAnalyzeArrays:
+    """全局和用例指标"""
+
+    def test_percentiles_match_histogram(self, samples):
+        latencies, case_indices, successes, timestamps = samples
+        report = analyze_arrays(latencies, case_indices, successes, ['A', 'B'], timestamps=timestamps)
+
+        histogram = LatencyHistogram()
+        histogram.extend(latencies)
+        for p in DEFAULT_PERCENTILES:
+            assert report.overall.percentile(p) == pytest.approx(histogram.percentile(p), rel=1e-9)
+
+        case_b = LatencyHistogram()
+        case_b.extend(v for v, i in zip(latencies, case_indices) if i == 1)
+        assert report.cases['B'].percentile(95) == pytest.approx(case_b.percentile(95), rel=1e-9)
+
+    def test_percentiles_close_to_exact(self, samples):
+        latencies = samples[0]
+        report = analyze_arrays(latencies, [0] * len(latencies), [True] * len(latencies), ['A'])
+        ordered = sorted(latencies)
+        for p in (50, 95, 99):
+            exact = ordered[int(np.ceil(p / 100 * len(ordered))) - 1]
+            assert report.overall.percentile(p) == pytest.approx(exact, rel=HISTOGRAM_PRECISION / 2 + 1e-9)
+
+    def test_exact_moments_and_counts(self, samples):
+        latencies, case_indices, successes, timestamps = samples
+        report = analyze_arrays(latencies, case_indices, successes, ['A', 'B'], timestamps=timestamps)
+        values = np.asarray(latencies)
+
+        overall = report.overall
+        assert overall.count == 5000
+        assert overall.success_count == sum(successes)
+        assert (overall.min, overall.max) == (values.min(), values.max())
+        assert overall.mean == pytest.approx(values.mean())
+        assert overall.std == pytest.approx(values.std())
+
+        b = values[np.asarray(case_indices) == 1]
+        assert report.cases['B'].count == b.size
+        assert report.cases['B'].mean == pytest.approx(b.mean())
+        assert report.cases['A'].count + report.cases['B'].count == 5000
+
+    def test_tps_uses_duration(self, samples):
+        latencies, case_indices, successes, timestamps = samples
+        report = analyze_arrays(latencies, case_indices, successes, ['A', 'B'], timestamps=timestamps, duration=25.0)
+        assert report.overall.tps == pytest.approx(sum(successes) / 25.0)
+        # 未指定时长时由最后一个时间戳推算
+        inferred = analyze_arrays(latencies, case_indices, successes, ['A', 'B'], timestamps=timestamps)
+        assert inferred.duration == pytest.approx(max(timestamps))
+
+    def test_percentiles_clipped_to_min_max(self):
+        report = analyze_arrays([0.1], [0], [True], ['A'])
+        assert all(value == 0.1 for value in report.overall.percentiles.values())
+
+    def test_per_second_rollup(self):
+        report = analyze_arrays([0.1, 0.3, 0.2, 0.4], [0, 0, 0, 0], [True, False, True, True], ['A'],
+                                timestamps=[0.2, 0.8, 2.5, 2.9])
+        assert report.per_second['second'] == [0, 1, 2]
+        assert report.per_second['count'] == [2, 0, 2]
+        assert report.per_second['tps'] == [1.0, 0.0, 2.0]
+        assert report.per_second['error_rate'] == [0.5, 0.0, 0.0]
+        assert report.per_second['mean'] == pytest.approx([0.2, 0.0, 0.3])
+
+    def test_histograms(self, samples):
+        latencies, case_indices, successes, _ = samples
+        report = analyze_arrays(latencies, case_indices, successes, ['A', 'B', 'C'])
+        assert report.histogram.total == 5000
+        assert report.case_histogram('A').total + report.case_histogram('B').total == 5000
+        assert report.case_histogram('C').total == 0
+        assert 'C' not in report.cases
+
+    def test_empty(self):
+        report = analyze_arrays([], [], [], [])
+        assert report.overall.count == 0
+        assert report.histogram.total == 0
+
+
+class TestAnalyzeResult:
+    """直接分析 PerformanceResult"""
+
+    def test_reads_result_arrays(self):
+        result = PerformanceResult(start_time=1000.0)
+        for i in range(100):
+            result.record_sample('A' if i % 2 else 'B', 0.01 * (i + 1), i % 10 != 0, timestamp=1000.0 + i / 10)
+        result.actual_duration = 10.0
+
+        report = analyze(result)
+        assert report.overall.count == 100
+        assert report.overall.success_count == 90
+        assert set(report.cases) == {'A', 'B'}
+        assert report.overall.tps == pytest.approx(9.0)
+        assert sum(report.per_second['count']) == 100
@@ -0,0 +1,241 @@
+"""性能回归对比（utils/perf_compare.py）和历史记录（utils/run_history.py）的单元测试"""
+import math
+import random
+
+import pytest
+
+from core.performance_executor import PerformanceResult
+from utils.histogram import LatencyHistogram
+from utils.perf_compare import (
+    DEFAULT_ALPHA, MIN_SAMPLES, compare_runs, holm_adjust, mann_whitney, welch_test
+)
+from utils.run_history import CaseSnapshot, RunHistory, RunSnapshot
+
+
+def histogram_of(values):
+    """由响应时间构造直方图"""
+    histogram = LatencyHistogram()
+    histogram.extend(values)
+    return histogram
+
+
+def lognormal(seed, count, scale=1.0):
+    """对数正态分布的响应时间，scale 为整体倍数"""
+    rng = random.Random(seed)
+    return [scale * rng.lognormvariate(-3, 0.5) for _ in range(count)]
+
+
+def make_snapshot(label, cases, per_second_tps=None, tps=100.0):
+    """由 {用例ID: 响应时间列表} 构造运行快照"""
+    case_snapshots = {
+        case_id: CaseSnapshot(len(values), len(values), histogram_of(values), tps=len(values) / 10)
+        for case_id, values in cases.items()
+    }
+    overall = LatencyHistogram()
+    for case in case_snapshots.values():
+        overall.merge(case.histogram)
+    return RunSnapshot(label=label, tps=tps, per_second_tps=per_second_tps or [], histogram=overall,
+                       cases=case_snapshots)
+
+
+def make_result(case_latencies, duration=10.0):
+    """构造已计算统计指标的 PerformanceResult，采样均匀分布在 duration 秒内"""
+    result = PerformanceResult(start_time=1000.0)
+    samples = [(case_id, value) for case_id, values in case_latencies.items() for value in values]
+    for i, (case_id, value) in enumerate(samples):
+        result.record_sample(case_id, value, True, timestamp=1000.0 + duration * i / len(samples))
+    result.actual_duration = duration
+    result.calculate_statistics()
+    return result
+
+
+class TestMannWhitney:
+    """直方图上的 Mann-Whitney U 检验"""
+
+    def test_ties_use_average_ranks(self):
+        # 本次 [1, 1, 2]，基线 [1, 3, 3]：三个1并列取秩2，U = 8 - 6 = 2
+        # 并列校正: Σ(t³-t) = 24 + 6，方差 = 9/12 · (7 - 30/30) = 4.5
+        prob, p = mann_whitney(histogram_of([1, 1, 2]), histogram_of([1, 3, 3]))
+        assert prob == pytest.approx(2 / 9)
+        assert p == pytest.approx(math.erfc(2.5 / math.sqrt(4.5) / math.sqrt(2)))
+
+    def test_identical_distributions(self):
+        values = lognormal(1, 2000)
+        prob, p = mann_whitney(histogram_of(values), histogram_of(values))
+        assert prob == pytest.approx(0.5)
+        assert p == pytest.approx(1.0)
+
+    def test_all_values_tied(self):
+        assert mann_whitney(histogram_of([0.1] * 50), histogram_of([0.1] * 30)) == (0.5, 1.0)
+
+    def test_shifted_distribution_is_significant(self):
+        prob, p = mann_whitney(histogram_of(lognormal(1, 500, scale=1.5)), histogram_of(lognormal(2, 500)))
+        assert prob > 0.65
+        assert p < 1e-6
+
+    def test_empty_input(self):
+        assert mann_whitney(LatencyHistogram(), histogram_of([0.1])) == (0.5, 1.0)
+
+
+class TestWelch:
+    """逐秒TPS的 Welch t 检验"""
+
+    def test_same_mean(self):
+        assert welch_test([99, 101] * 20, [101, 99] * 20) == pytest.approx(1.0)
+
+    def test_different_mean(self):
+        assert welch_test([80, 82] * 20, [100, 102] * 20) < 1e-6
+
+    def test_constant_series(self):
+        assert welch_test([100] * 5, [100] * 5) == 1.0
+        assert welch_test([90] * 5, [100] * 5) == 0.0
+
+    def test_too_few_samples(self):
+        assert welch_test([1], [2, 3]) == 1.0
+
+
+class TestHolm:
+    """Holm-Bonferroni 校正"""
+
+    def test_known_values(self):
+        # 升序 0.01, 0.02, 0.04 分别乘以 3, 2, 1 得 0.03, 0.04, 0.04
+        assert holm_adjust([0.04, 0.01, 0.02]) == pytest.approx([0.04, 0.03, 0.04])
+
+    def test_monotone_and_capped(self):
+        assert holm_adjust([0.01, 0.011, 0.5]) == pytest.approx([0.03, 0.03, 0.5])
+        assert holm_adjust([0.6, 0.7]) == [1.0, 1.0]
+
+    def test_none_is_kept_and_not_counted(self):
+        assert holm_adjust([None, 0.01, None, 0.03]) == pytest.approx([None, 0.02, None, 0.03])
+        assert holm_adjust([]) == []
+
+
+class TestCompareRuns:
+    """回归判定"""
+
+    def test_detects_slow_case(self):
+        baseline = make_snapshot('基线', {'A': lognormal(1, 1000), 'B': lognormal(2, 1000)})
+        current = make_snapshot('本次', {'A': lognormal(3, 1000), 'B': lognormal(4, 1000, scale=1.5)})
+        comparison = compare_runs(current, baseline)
+
+        regressed = {(c.case_id, c.metric) for c in comparison.regressions}
+        assert ('B', 'latency_p50') in regressed
+        assert all(case_id != 'A' for case_id, _ in regressed)
+        # 用例记录按回退优先排序
+        case_changes = [c for c in comparison.changes if c.case_id is not None]
+        assert case_changes[0].case_id == 'B' and case_changes[0].regression
+
+    def test_many_unchanged_cases_have_no_false_positives(self):
+        # 200 个同分布用例：不校正时按 alpha=0.01 预期约2个偶然显著
+        case_ids = [f'C{i}' for i in range(200)]
+        baseline = make_snapshot('基线', {c: lognormal(i, 60) for i, c in enumerate(case_ids)})
+        current = make_snapshot('本次', {c: lognormal(1000 + i, 60) for i, c in enumerate(case_ids)})
+        comparison = compare_runs(current, baseline)
+        assert not comparison.has_regression
+        case_p = [c.p_value for c in comparison.changes if c.case_id is not None]
+        assert all(p is not None and p <= 1.0 for p in case_p)
+
+    def test_small_samples_are_not_tested(self):
+        baseline = make_snapshot('基线', {'A': lognormal(1, MIN_SAMPLES - 1)})
+        current = make_snapshot('本次', {'A': lognormal(2, MIN_SAMPLES - 1, scale=3)})
+        comparison = compare_runs(current, baseline)
+        assert all(c.p_value is None for c in comparison.changes)
+        assert not comparison.has_regression
+
+    def test_tps_drop(self):
+        rng = random.Random(5)
+        baseline = make_snapshot('基线', {'A': lognormal(1, 100)}, tps=100.0,
+                                 per_second_tps=[100 + rng.gauss(0, 3) for _ in range(31)])
+        current = make_snapshot('本次', {'A': lognormal(1, 100)}, tps=80.0,
+                                per_second_tps=[80 + rng.gauss(0, 3) for _ in range(31)])
+        comparison = compare_runs(current, baseline)
+        tps = comparison.changes[0]
+        assert tps.metric == 'tps' and tps.case_id is None
+        assert tps.change == pytest.approx(-0.2)
+        assert tps.regression
+
+        data = comparison.to_dict()
+        assert data['alpha'] == DEFAULT_ALPHA
+        assert data['regression_count'] == len(comparison.regressions)
+
+
+class TestRunSnapshot:
+    """快照构建和滚动窗口合并"""
+
+    def test_merge_sums_histograms_and_averages_tps(self):
+        first = make_snapshot('1', {'A': [0.1] * 10, 'B': [0.2] * 20}, per_second_tps=[10, 11], tps=30.0)
+        second = make_snapshot('2', {'A': [0.3] * 30}, per_second_tps=[12], tps=10.0)
+        merged = RunSnapshot.merge([first, second])
+
+        assert merged.label == '最近 2 次运行'
+        assert merged.tps == pytest.approx(20.0)
+        assert merged.per_second_tps == [10, 11, 12]
+        assert merged.histogram.total == 60
+        assert merged.cases['A'].count == 40
+        assert merged.cases['A'].histogram.total == 40
+        assert merged.cases['A'].tps == pytest.approx((1.0 + 3.0) / 2)
+        # B 只出现在一次运行中，TPS 不应被另一次运行稀释
+        assert merged.cases['B'].tps == pytest.approx(2.0)
+
+    def test_merge_single_snapshot(self):
+        snapshot = make_snapshot('1', {'A': [0.1]})
+        assert RunSnapshot.merge([snapshot]) is snapshot
+
+    def test_from_result(self):
+        result = make_result({'A': [0.01] * 30, 'B': [0.02] * 10})
+        snapshot = RunSnapshot.from_result(result)
+        assert snapshot.histogram.total == 40
+        assert set(snapshot.cases) == {'A', 'B'}
+        assert snapshot.cases['A'].tps == pytest.approx(3.0)
+        assert sum(snapshot.per_second_tps) == pytest.approx(40)
+
+
+class TestRunHistory:
+    """历史记录的写入和读取"""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        with RunHistory(str(tmp_path / 'history.db')) as history:
+            yield history
+
+    def test_record_and_read_round_trip(self, history):
+        result = make_result({'A': lognormal(1, 200), 'B': lognormal(2, 50)})
+        run_id = history.record_run(result, 'test', git_revision='abc123', test_config={'concurrent_users': 5})
+
+        snapshot = history.get_run(run_id)
+        expected = RunSnapshot.from_result(result)
+        assert (snapshot.run_id, snapshot.env, snapshot.git_revision) == (run_id, 'test', 'abc123')
+        assert snapshot.tps == pytest.approx(result.tps)
+        assert snapshot.per_second_tps == pytest.approx(expected.per_second_tps)
+        assert snapshot.histogram.counts == expected.histogram.counts
+        assert set(snapshot.cases) == {'A', 'B'}
+        assert snapshot.cases['B'].count == 50
+        assert snapshot.cases['B'].histogram.counts == expected.cases['B'].histogram.counts
+        assert history.get_run(run_id + 1) is None
+
+    def test_recent_runs_and_baseline_window(self, history):
+        ids = [history.record_run(make_result({'A': [0.01 * (i + 1)] * 30}), 'test', git_revision='r')
+               for i in range(3)]
+        other = history.record_run(make_result({'A': [0.5] * 30}), 'prod', git_revision='r')
+
+        assert history.recent_run_ids('test', limit=2) == [ids[2], ids[1]]
+        assert history.recent_run_ids('test', limit=5, before=ids[2]) == [ids[1], ids[0]]
+        assert history.baseline('test').run_id == ids[2]
+        assert history.baseline('test', run_id=other).env == 'prod'
+
+        window = history.baseline('test', window=3)
+        assert window.run_id is None
+        assert window.histogram.total == 90
+        assert history.baseline('staging') is None
+
+    def test_case_trend(self, history):
+        for env, latency in (('test', 0.01), ('prod', 0.02), ('test', 0.03)):
+            history.record_run(make_result({'A': [latency] * 30, 'B': [0.1] * 5}), env, git_revision='r')
+
+        trend = history.case_trend('A', env='test')
+        assert [row['env'] for row in trend] == ['test', 'test']
+        assert trend[0]['run_id'] > trend[1]['run_id']
+        assert trend[0]['mean'] == pytest.approx(0.03)
+        assert trend[0]['count'] == 30
+        assert len(history.case_trend('A')) == 3
+        assert len(history.case_trend('A', limit=1)) == 1
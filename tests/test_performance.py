@@ -1,16 +1,24 @@
 """性能测试执行入口"""
 import pytest
-import json
+from contextlib import contextmanager
 from typing import List, Dict, Any
 
 from core.case_loader import CaseLoader, TestCase
 from core.performance_executor import PerformanceExecutor
+from core.generator_monitor import HealthThresholds
+from core.stop_conditions import StopRules
+from core.capacity_search import CapacitySearchConfig
+from core.response_validation import ValidationConfig
+from core.error_aggregator import ErrorAggregationConfig
+from core.api_executor import RequestTimeout
 from core.request_builder import RequestBuilder
 from core.data_manager import DataManager
 from utils.performance_reporter import PerformanceReporter
+from utils.run_history import RunHistory
+from utils.performance_gate import GateEngine
 from utils.assertions import Assertions
-from config.settings import Settings
-from utils.logger import get_logger
+from config.settings import Settings, EnvironmentSnapshot
+from utils.logger import get_logger, LoadLogPolicy
 
 logger = get_logger(__name__)
 
@@ -28,7 +36,9 @@ class TestPerformance:
                                  sheet_names: str = "all",
                                  concurrent_users: int = 10,
                                  duration: int = 60,
-                                 ramp_up: int = 0):
+                                 ramp_up: int = 0,
+                                 trace_file: str = None,
+                                 baseline_run: int = None):
         """执行性能测试
 
         Args:
@@ -37,13 +47,113 @@ class TestPerformance:
             concurrent_users: 并发用户数
             duration: 测试持续时间（秒）
             ramp_up: 启动时间（秒）
+            trace_file: 请求轨迹文件路径（可选）
+            baseline_run: 回归对比的基线运行ID（可选）
 
         Returns:
             性能测试结果
         """
         logger.info(f"开始性能测试: 并发数={concurrent_users}, 持续时间={duration}秒")
 
-        # 加载测试用例
+        all_cases = self._load_cases(excel_files, sheet_names)
+        executor = self._create_executor(concurrent_users, duration, ramp_up, trace_file)
+
+        # 执行性能测试（启用热加载时，运行中修改配置文件即可切换 base_url 和提前终止规则）
+        with self._hot_reload(executor):
+            result = executor.execute_performance_test(all_cases)
+
+        # 生成报告
+        report_config = self.settings.performance_report
+        reporter = PerformanceReporter(
+            output_dir=report_config.get('output_dir', 'reports/performance'),
+            page_size=report_config.get('page_size', 100)
+        )
+        test_config = {
+            'concurrent_users': concurrent_users,
+            'duration': duration,
+            'ramp_up': ramp_up,
+            'total_cases': len(all_cases)
+        }
+
+        # 与历史基线对比，然后把本次结果追加到历史库（提前终止的运行数据不完整，不作为后续的基线）
+        comparison = None
+        history_config = self.settings.performance.get('history', {}) or {}
+        if history_config.get('enabled', False):
+            with RunHistory(history_config.get('db_path', 'reports/performance/history.db')) as history:
+                comparison = reporter.compare_with_history(
+                    result, history, self.settings.env,
+                    baseline_run_id=baseline_run,
+                    window=history_config.get('window', 1),
+                    alpha=history_config.get('alpha', 0.01),
+                    min_change=history_config.get('min_change', 0.1)
+                )
+                if result.aborted:
+                    logger.warning("性能测试提前终止，本次结果不写入历史库")
+                else:
+                    history.record_run(result, self.settings.env, test_config=test_config)
+
+        # 评估性能门禁（全局阈值 + 用例阈值）；提前终止的测试数据不完整，不评估门禁，由调用方按终止原因判定失败
+        gate_config = self.settings.performance.get('gate', {}) or {}
+        gates = None
+        if result.aborted:
+            logger.warning(f"性能测试提前终止，跳过性能门禁: {result.stop_reason}")
+        elif gate_config.get('enabled', False):
+            gates = self._evaluate_performance_gates(result, all_cases, gate_config)
+
+        raw_data_file = reporter.generate_raw_data(result) if report_config.get('raw_data', False) else None
+        html_report = reporter.generate_html_report(result, test_config, comparison, gates)
+        json_report = reporter.generate_json_report(result, test_config, raw_data_file, comparison, gates)
+
+        logger.info(f"HTML报告: {html_report}")
+        logger.info(f"JSON报告: {json_report}")
+
+        # 报告生成后再断言，门禁未通过时测试失败
+        if gates is not None:
+            self.assertions.assert_performance_gates(gates)
+
+        return result
+
+    def execute_capacity_search(self, excel_files: str = None, sheet_names: str = "all"):
+        """执行容量探测
+
+        Args:
+            excel_files: Excel文件路径（逗号分隔）
+            sheet_names: Sheet名称（逗号分隔）
+
+        Returns:
+            CapacityResult: 容量探测结果
+        """
+        search_config = dict(self.settings.performance.get('capacity_search', {}) or {})
+        if search_config.get('p99_ms') is None:
+            search_config['p99_ms'] = (self.settings.performance.get('thresholds', {}) or {}).get('response_time_p99')
+        search = CapacitySearchConfig.from_config(search_config)
+
+        all_cases = self._load_cases(excel_files, sheet_names)
+        executor = self._create_executor(search.start_users, search.step_duration)
+        with self._hot_reload(executor):
+            capacity = executor.execute_capacity_search(all_cases, search)
+
+        report_config = self.settings.performance_report
+        reporter = PerformanceReporter(
+            output_dir=report_config.get('output_dir', 'reports/performance'),
+            page_size=report_config.get('page_size', 100)
+        )
+        test_config = {'total_cases': len(all_cases)}
+        logger.info(f"HTML报告: {reporter.generate_capacity_report(capacity, test_config)}")
+        logger.info(f"JSON报告: {reporter.generate_capacity_json_report(capacity, test_config)}")
+
+        return capacity
+
+    def _load_cases(self, excel_files: str = None, sheet_names: str = "all") -> List[TestCase]:
+        """加载测试用例
+
+        Args:
+            excel_files: Excel文件路径（逗号分隔），默认使用配置中的路径
+            sheet_names: Sheet名称（逗号分隔）
+
+        Returns:
+            测试用例列表
+        """
         if excel_files:
             files = excel_files.split(',')
         else:
@@ -59,94 +169,95 @@ class TestPerformance:
             raise ValueError("没有找到测试用例")
 
         logger.info(f"加载了 {len(all_cases)} 个测试用例")
+        return all_cases
+
+    def _create_executor(self, concurrent_users: int, duration: int, ramp_up: int = 0,
+                         trace_file: str = None) -> PerformanceExecutor:
+        """按配置创建性能测试执行器
+
+        Args:
+            concurrent_users: 并发用户数
+            duration: 测试持续时间（秒）
+            ramp_up: 启动时间（秒）
+            trace_file: 请求轨迹文件路径（可选）
 
+        Returns:
+            PerformanceExecutor 实例
+        """
         # 初始化数据管理器
         data_manager = DataManager(self.settings.extract_data_path)
 
-        # 创建性能测试执行器
+        health_config = self.settings.performance.get('generator_health', {}) or {}
+        log_config = self.settings.performance.get('logging', {}) or {}
+        stop_config = self.settings.performance.get('stop_rules', {}) or {}
         executor = PerformanceExecutor(
             max_workers=concurrent_users,
             duration=duration,
-            ramp_up=ramp_up
+            ramp_up=ramp_up,
+            monitor_interval=health_config.get('interval', 0.5),
+            health_thresholds=HealthThresholds.from_config(health_config),
+            log_policy=LoadLogPolicy.from_config(log_config) if log_config.get('enabled', True) else None,
+            trace_file=trace_file,
+            stop_rules=StopRules.from_config(stop_config) if stop_config.get('enabled', True) else None,
+            transport=self.settings.transport,
+            dns_cache_ttl=self.settings.http.get('dns_cache_ttl', 60),
+            tls_session_cache=self.settings.http.get('tls_session_cache', True),
+            validation=ValidationConfig.from_config(self.settings.performance.get('validation', {})),
+            errors=ErrorAggregationConfig.from_config(self.settings.performance.get('errors', {})),
+            timeout=RequestTimeout.from_config(
+                self.settings.performance.get('timeout'), RequestTimeout.from_config(self.settings.timeout)
+            )
         )
         executor.configure(self.settings.base_url, data_manager)
+        return executor
 
-        # 执行性能测试
-        result = executor.execute_performance_test(all_cases)
+    @contextmanager
+    def _hot_reload(self, executor: PerformanceExecutor):
+        """测试运行期间监视配置文件（hot_reload.enabled 未启用时不做任何事）
 
-        # 生成报告
-        reporter = PerformanceReporter()
-        test_config = {
-            'concurrent_users': concurrent_users,
-            'duration': duration,
-            'ramp_up': ramp_up,
-            'total_cases': len(all_cases)
-        }
-
-        html_report = reporter.generate_html_report(result, test_config)
-        json_report = reporter.generate_json_report(result, test_config)
-
-        logger.info(f"HTML报告: {html_report}")
-        logger.info(f"JSON报告: {json_report}")
+        配置文件修改后，新的 base_url 和提前终止规则立即应用到执行器；
+        门禁阈值和报告配置在测试结束后读取，自动使用最新配置
 
-        # 检查性能阈值（如果有配置）
-        self._check_performance_thresholds(result, all_cases)
-
-        return result
-
-    def _check_performance_thresholds(self, result, test_cases: List[TestCase]):
-        """检查性能阈值
+        Args:
+            executor: 性能测试执行器
+        """
+        hot_reload = self.settings.hot_reload
+        if not hot_reload.get('enabled', False):
+            yield
+            return
+
+        def apply(old: EnvironmentSnapshot, new: EnvironmentSnapshot):
+            stop_config = new.performance.get('stop_rules', {}) or {}
+            stop_rules = None
+            if stop_config != (old.performance.get('stop_rules', {}) or {}) and stop_config.get('enabled', True):
+                stop_rules = StopRules.from_config(stop_config)
+            executor.update_config(base_url=new.base_url, stop_rules=stop_rules)
+
+        self.settings.add_listener(apply)
+        self.settings.start_watching(hot_reload.get('interval', 2.0))
+        try:
+            yield
+        finally:
+            self.settings.stop_watching()
+            self.settings.remove_listener(apply)
+
+    def _evaluate_performance_gates(self, result, test_cases: List[TestCase],
+                                    gate_config: Dict[str, Any]):
+        """评估性能门禁
 
         Args:
             result: 性能测试结果
             test_cases: 测试用例列表
+            gate_config: 门禁配置（performance.gate）
+
+        Returns:
+            GateReport: 门禁评估报告
         """
+        engine = GateEngine.from_config(gate_config)
+        rules = engine.rules_from_config(self.settings.performance.get('thresholds', {}))
         for case in test_cases:
-            # 检查用例级别的最大响应时间
-            if case.max_response_time > 0:
-                case_stat = result.case_stats.get(case.case_id, {})
-                if case_stat.get('response_times'):
-                    avg_time = sum(case_stat['response_times']) / len(case_stat['response_times'])
-                    max_time = case.max_response_time / 1000.0  # 转换为秒
-
-                    try:
-                        self.assertions.assert_response_time(
-                            avg_time,
-                            max_time,
-                            'less',
-                            case.case_id
-                        )
-                    except Exception as e:
-                        logger.warning(f"用例 {case.case_id} 性能阈值检查失败: {e}")
-
-            # 检查性能配置中的阈值
-            if case.performance_config and case.performance_config != "{}":
-                try:
-                    perf_config = json.loads(case.performance_config)
-                    thresholds = perf_config.get('thresholds', {})
-
-                    if thresholds:
-                        case_stat = result.case_stats.get(case.case_id, {})
-                        metrics = {}
-
-                        # 计算用例级别的指标
-                        if case_stat.get('response_times'):
-                            import statistics
-                            response_times = case_stat['response_times']
-                            metrics['avg_time'] = statistics.mean(response_times)
-                            if len(response_times) >= 20:
-                                metrics['p95_time'] = statistics.quantiles(response_times, n=20)[18]
-                            if len(response_times) >= 100:
-                                metrics['p99_time'] = statistics.quantiles(response_times, n=100)[98]
-
-                        metrics['success_rate'] = (
-                            case_stat.get('success_count', 0) / case_stat.get('count', 1)
-                        )
-
-                        # 执行断言
-                        self.assertions.assert_performance_metrics(metrics, thresholds)
-                except Exception as e:
-                    logger.warning(f"用例 {case.case_id} 性能配置解析失败: {e}")
+            rules.extend(engine.rules_from_case(case))
+        return engine.evaluate(result, rules)
 
 
 @pytest.fixture(scope="session")
@@ -161,22 +272,35 @@ def test_performance(performance_test, pytestconfig):
     使用示例:
         pytest tests/test_performance.py --concurrent-users 50 --duration 300
         pytest tests/test_performance.py --excel-files perf_cases.xlsx --concurrent-users 100
+        pytest tests/test_performance.py --capacity-search
     """
     excel_files = pytestconfig.getoption("--excel-files")
     sheet_names = pytestconfig.getoption("--sheet-names")
+
+    if pytestconfig.getoption("--capacity-search"):
+        capacity = performance_test.execute_capacity_search(excel_files, sheet_names)
+        assert capacity.knee is not None, f"起始并发即不满足SLO: {capacity.stop_reason}"
+        logger.info("容量探测完成")
+        return
+
     concurrent_users = pytestconfig.getoption("--concurrent-users")
     duration = pytestconfig.getoption("--duration")
     ramp_up = pytestconfig.getoption("--ramp-up")
+    trace_file = pytestconfig.getoption("--trace-file")
+    baseline_run = pytestconfig.getoption("--baseline-run")
 
     result = performance_test.execute_performance_test(
         excel_files=excel_files,
         sheet_names=sheet_names,
         concurrent_users=concurrent_users,
         duration=duration,
-        ramp_up=ramp_up
+        ramp_up=ramp_up,
+        trace_file=trace_file,
+        baseline_run=baseline_run
     )
 
     # 断言：确保测试成功执行
+    assert not result.aborted, f"性能测试提前终止: {result.stop_reason}"
     assert result.total_requests > 0, "没有执行任何请求"
     assert result.success_count > 0, "所有请求都失败了"
 
@@ -0,0 +1,189 @@
+"""性能门禁（utils/performance_gate.py）和响应时间直方图（utils/histogram.py）的单元测试"""
+from types import SimpleNamespace
+
+import pytest
+
+from utils.histogram import (
+    HISTOGRAM_PRECISION, LatencyHistogram, bucket_index, bucket_lower, bucket_upper, bucket_value
+)
+from utils.perf_analytics import analyze_arrays
+from utils.performance_gate import (
+    GATE_FAIL, GATE_INCONCLUSIVE, GATE_PASS, GateEngine, GateRule, percentile_interval
+)
+
+Z95 = 1.959963984540054
+
+
+def make_result(latencies, successes=None, timestamps=None, duration=10.0, case_ids=('A',), case_indices=None):
+    """由采样构造门禁评估需要的结果对象（analytics + actual_duration）"""
+    successes = [True] * len(latencies) if successes is None else successes
+    case_indices = [0] * len(latencies) if case_indices is None else case_indices
+    analytics = analyze_arrays(latencies, case_indices, successes, list(case_ids),
+                               timestamps=timestamps, duration=duration)
+    return SimpleNamespace(analytics=analytics, actual_duration=duration)
+
+
+def evaluate(result, *rules, **engine_options):
+    """评估规则，返回各规则的结果"""
+    return GateEngine(**engine_options).evaluate(result, list(rules)).results
+
+
+class TestHistogram:
+    """对数分桶直方图"""
+
+    @pytest.mark.parametrize('value', [2e-6, 0.001, 0.0123, 0.5, 1.0, 37.5])
+    def test_value_lies_in_its_bucket(self, value):
+        index = bucket_index(value)
+        assert bucket_lower(index) <= value < bucket_upper(index)
+        assert abs(bucket_value(index) - value) / value <= HISTOGRAM_PRECISION / 2 + 1e-9
+
+    def test_zero_goes_to_bucket_zero(self):
+        assert bucket_index(0.0) == 0
+        assert bucket_value(0) == 0.0
+        assert bucket_lower(0) == 0.0
+
+    def test_percentile_is_nearest_rank_within_precision(self):
+        histogram = LatencyHistogram()
+        histogram.extend(i / 1000 for i in range(1, 1001))
+        for p, expected in [(50, 0.5), (95, 0.95), (99, 0.99), (100, 1.0)]:
+            assert histogram.percentile(p) == pytest.approx(expected, rel=HISTOGRAM_PRECISION / 2)
+
+    def test_empty_histogram(self):
+        histogram = LatencyHistogram()
+        assert histogram.percentile(95) is None
+        assert histogram.mean() is None
+        assert histogram.rank_index(1) is None
+
+    def test_merge_and_round_trip(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.extend([0.01, 0.02])
+        b.extend([0.02, 0.5])
+        merged = LatencyHistogram.from_dict(a.merge(b).to_dict())
+        assert merged.total == 4
+        assert merged.counts == a.counts
+        assert merged.counts[bucket_index(0.02)] == 2
+
+
+class TestPercentileInterval:
+    """百分位数的顺序统计量置信区间"""
+
+    def test_known_histogram_p95_bounds(self):
+        # 1ms..1000ms 各一个: n·q = 950，z·√(n·q·(1-q)) ≈ 13.5，名次区间 [936, 965]
+        histogram = LatencyHistogram()
+        histogram.extend(i / 1000 for i in range(1, 1001))
+        estimate, low, high = percentile_interval(histogram, 0.95, Z95)
+
+        assert estimate == pytest.approx(0.95, rel=HISTOGRAM_PRECISION / 2)
+        # 取桶边界，区间包含对应名次的值，且不超出一个桶宽
+        assert 0.936 / (1 + HISTOGRAM_PRECISION) <= low <= 0.936
+        assert 0.965 <= high <= 0.965 * (1 + HISTOGRAM_PRECISION)
+
+    def test_interval_narrows_with_more_samples(self):
+        small, large = LatencyHistogram(), LatencyHistogram()
+        small.extend(i / 100 for i in range(1, 101))
+        for _ in range(100):
+            large.extend(i / 100 for i in range(1, 101))
+        _, small_low, small_high = percentile_interval(small, 0.95, Z95)
+        _, large_low, large_high = percentile_interval(large, 0.95, Z95)
+        assert large_high - large_low < small_high - small_low
+
+    def test_gate_on_percentile(self):
+        result = make_result([i / 1000 for i in range(1, 1001)])
+        passed, failed, unsure = evaluate(
+            result, GateRule('p95_time', 1.0), GateRule('p95_time', 0.9), GateRule('p95_time', 0.95)
+        )
+        assert (passed.status, failed.status, unsure.status) == (GATE_PASS, GATE_FAIL, GATE_INCONCLUSIVE)
+
+
+class TestWilson:
+    """成功率 / 错误率的 Wilson 区间"""
+
+    def test_known_interval(self):
+        low, high = GateEngine()._wilson(990, 1000)
+        assert low == pytest.approx(0.98169, abs=1e-4)
+        assert high == pytest.approx(0.99456, abs=1e-4)
+
+    def test_all_successes_stays_within_unit_interval(self):
+        low, high = GateEngine()._wilson(1000, 1000)
+        assert 0.99 < low < 1.0
+        assert high == 1.0
+
+    def test_success_rate_at_threshold_does_not_fail(self):
+        # 成功率恰好等于阈值时置信区间跨越阈值，结论为不确定，非严格模式下不算失败
+        result = make_result([0.01] * 1000, successes=[True] * 990 + [False] * 10)
+        report = GateEngine().evaluate(result, [GateRule('success_rate', 0.99)])
+        assert report.results[0].status == GATE_INCONCLUSIVE
+        assert report.passed
+        assert not GateEngine(strict=True).evaluate(result, [GateRule('success_rate', 0.99)]).passed
+
+    def test_error_rate_mirrors_success_rate(self):
+        result = make_result([0.01] * 1000, successes=[True] * 990 + [False] * 10)
+        success, error = evaluate(result, GateRule('success_rate', 0.9), GateRule('error_rate', 0.1))
+        assert error.estimate == pytest.approx(0.01)
+        assert (error.ci_low, error.ci_high) == pytest.approx((1 - success.ci_high, 1 - success.ci_low))
+        assert success.status == error.status == GATE_PASS
+
+    def test_clear_failure(self):
+        result = make_result([0.01] * 1000, successes=[True] * 900 + [False] * 100)
+        assert evaluate(result, GateRule('success_rate', 0.99))[0].status == GATE_FAIL
+
+
+class TestTps:
+    """TPS 区间"""
+
+    def test_poisson_interval_for_case(self):
+        # 400 次成功 / 10 秒: TPS 40，泊松近似的半宽 z·√400 / 10
+        result = make_result([0.01] * 400, duration=10.0)
+        tps = evaluate(result, GateRule('tps', 30, case_id='A'))[0]
+        assert tps.estimate == pytest.approx(40.0)
+        assert (tps.ci_low, tps.ci_high) == pytest.approx((40 - Z95 * 2, 40 + Z95 * 2))
+        assert tps.status == GATE_PASS
+
+    def test_interval_windows_for_global_tps(self):
+        # 21 秒、每秒 10 次：去掉最后一秒后为 4 个 5 秒区间，区间TPS完全一致，区间宽度为0
+        timestamps = [second + i / 10 for second in range(21) for i in range(10)]
+        result = make_result([0.01] * len(timestamps), timestamps=timestamps, duration=21.0)
+        tps, cv = evaluate(result, GateRule('tps', 9.0), GateRule('tps_cv', 0.1))
+        assert tps.samples == 4
+        assert tps.ci_low == tps.ci_high == pytest.approx(tps.estimate)
+        assert cv.estimate == pytest.approx(0.0)
+        assert cv.status == GATE_PASS
+
+    def test_short_run_has_no_interval_metrics(self):
+        result = make_result([0.01] * 10, timestamps=[i / 10 for i in range(10)], duration=1.0)
+        assert evaluate(result, GateRule('min_interval_tps', 1))[0].status == GATE_INCONCLUSIVE
+
+
+class TestRules:
+    """由配置和用例生成规则"""
+
+    def test_rules_from_config_converts_milliseconds(self):
+        rules = GateEngine.rules_from_config({
+            'response_time_p95': 3000, 'response_time_avg': 500, 'response_time_max': 8000,
+            'success_rate': 0.99, 'tps': 100, 'unknown_metric': 1, 'tps_cv': None
+        })
+        assert [(r.metric, r.limit) for r in rules] == [
+            ('p95_time', 3.0), ('avg_time', 0.5), ('max_time', 8.0), ('success_rate', 0.99), ('tps', 100.0)
+        ]
+        assert all(r.case_id is None and r.source == 'config' for r in rules)
+
+    def test_rules_from_case(self):
+        case = SimpleNamespace(case_id='C1', max_response_time=200,
+                               performance_config='{"thresholds": {"p99_time": 0.5, "error_rate": 0.01, "x": 1}}')
+        rules = GateEngine.rules_from_case(case)
+        assert [(r.metric, r.limit) for r in rules] == [('avg_time', 0.2), ('p99_time', 0.5), ('error_rate', 0.01)]
+        assert all(r.case_id == 'C1' and r.source == 'excel' for r in rules)
+
+    @pytest.mark.parametrize('config', ['{bad', '[1]', '{"thresholds": 3}', ''])
+    def test_malformed_case_config_is_skipped(self, config):
+        case = SimpleNamespace(case_id='C1', max_response_time=100, performance_config=config)
+        assert [r.metric for r in GateEngine.rules_from_case(case)] == ['avg_time']
+
+    def test_non_numeric_threshold_is_skipped(self):
+        case = SimpleNamespace(case_id='C1', max_response_time=0,
+                               performance_config='{"thresholds": {"tps": "fast", "error_rate": 0.05}}')
+        assert [r.metric for r in GateEngine.rules_from_case(case)] == ['error_rate']
+
+    def test_unexecuted_case_is_inconclusive(self):
+        result = make_result([0.01] * 10)
+        assert evaluate(result, GateRule('avg_time', 1.0, case_id='missing'))[0].status == GATE_INCONCLUSIVE
@@ -0,0 +1,120 @@
+"""压测提前终止（core/stop_conditions.py）的单元测试"""
+import threading
+import time
+from array import array
+from types import SimpleNamespace
+
+from core.stop_conditions import STOP_CONVERGED, STOP_ERROR_RATE, STOP_P99, StopMonitor, StopRules
+
+
+def make_result(seconds, per_second, latency=0.01, failures_per_second=0, slow_latency=None, start_time=None):
+    """构造逐秒均匀分布的采样
+
+    Args:
+        seconds: 秒数
+        per_second: 每秒请求数
+        latency: 响应时间（秒）
+        failures_per_second: 每秒失败数
+        slow_latency: 每秒最后一个请求的响应时间（可选，用于构造长尾）
+    """
+    result = SimpleNamespace(response_times=array('d'), successes=array('B'), timestamps=array('d'),
+                             start_time=start_time or time.time())
+    for second in range(seconds):
+        for i in range(per_second):
+            slow = slow_latency is not None and i == per_second - 1
+            result.response_times.append(slow_latency if slow else latency)
+            result.successes.append(0 if i < failures_per_second else 1)
+            result.timestamps.append(second + i / per_second)
+    return result
+
+
+def make_monitor(rules, result):
+    """创建监控器并读取全部采样（不启动后台线程）"""
+    monitor = StopMonitor(rules, result, threading.Lock())
+    monitor._ingest()
+    return monitor
+
+
+class TestErrorRate:
+    """最近窗口的错误率"""
+
+    def test_triggers_above_threshold(self):
+        monitor = make_monitor(StopRules(error_rate=0.5, error_window=5), make_result(10, 20, failures_per_second=12))
+        rule, reason = monitor.evaluate(10.5)
+        assert rule == STOP_ERROR_RATE
+        assert '60.0%' in reason
+
+    def test_not_before_window_elapsed(self):
+        monitor = make_monitor(StopRules(error_rate=0.5, error_window=5), make_result(4, 20, failures_per_second=20))
+        assert monitor.evaluate(4.5) is None
+
+    def test_not_below_min_requests(self):
+        rules = StopRules(error_rate=0.5, error_window=5, min_requests=50)
+        monitor = make_monitor(rules, make_result(10, 5, failures_per_second=5))
+        assert monitor.evaluate(10.5) is None
+
+    def test_only_recent_window_counts(self):
+        # 前5秒全部失败，最近5秒全部成功
+        result = make_result(5, 20, failures_per_second=20)
+        recovered = make_result(5, 20)
+        result.response_times.extend(recovered.response_times)
+        result.successes.extend(recovered.successes)
+        result.timestamps.extend(t + 5 for t in recovered.timestamps)
+        monitor = make_monitor(StopRules(error_rate=0.5, error_window=5), result)
+        assert monitor.evaluate(10.5) is None
+
+
+class TestP99:
+    """最近窗口的P99"""
+
+    def test_triggers_on_slow_tail(self):
+        # 每秒 50 个请求，其中 1 个 2 秒：P99 约为 2 秒
+        rules = StopRules(error_rate=None, p99_ms=1000, p99_window=5)
+        monitor = make_monitor(rules, make_result(10, 50, slow_latency=2.0))
+        rule, _ = monitor.evaluate(10.5)
+        assert rule == STOP_P99
+
+    def test_fast_responses_do_not_trigger(self):
+        rules = StopRules(error_rate=None, p99_ms=1000, p99_window=5)
+        assert make_monitor(rules, make_result(10, 50)).evaluate(10.5) is None
+
+
+class TestConverged:
+    """结果收敛"""
+
+    def test_stable_latency_converges_after_min_duration(self):
+        rules = StopRules(error_rate=None, converge_precision=0.05, converge_min_duration=5)
+        monitor = make_monitor(rules, make_result(10, 50))
+        assert monitor.evaluate(4.0) is None
+        rule, _ = monitor.evaluate(10.5)
+        assert rule == STOP_CONVERGED
+
+    def test_noisy_small_sample_does_not_converge(self):
+        rules = StopRules(error_rate=None, converge_precision=0.01, converge_min_duration=1, min_requests=10)
+        monitor = make_monitor(rules, make_result(2, 10, slow_latency=1.0))
+        assert monitor.evaluate(2.5) is None
+
+
+class TestMonitor:
+    """监控线程和窗口管理"""
+
+    def test_old_seconds_are_discarded(self):
+        rules = StopRules(error_rate=0.5, error_window=5)
+        monitor = make_monitor(rules, make_result(100, 5))
+        assert len(monitor._seconds) <= rules.window + 2
+        assert min(monitor._seconds) >= 100 - rules.window - 2
+
+    def test_from_config_ignores_unknown_fields(self):
+        rules = StopRules.from_config({'error_rate': 0.2, 'p99_ms': 800, 'enabled': True})
+        assert (rules.error_rate, rules.p99_ms) == (0.2, 800)
+        assert rules.window == 10.0
+
+    def test_background_thread_sets_triggered(self):
+        result = make_result(10, 20, failures_per_second=20, start_time=time.time() - 10.5)
+        monitor = StopMonitor(StopRules(check_interval=0.02, error_window=5), result, threading.Lock()).start()
+        try:
+            assert monitor.triggered.wait(2)
+        finally:
+            monitor.stop()
+        assert monitor.rule == STOP_ERROR_RATE
+        assert monitor.reason
@@ -0,0 +1,163 @@
+"""请求轨迹记录器（core/trace_recorder.py）的单元测试"""
+import threading
+
+import pytest
+
+from core.error_aggregator import CATEGORY_HTTP_5XX, CATEGORY_OTHER
+from core.trace_recorder import (
+    FLAG_SUCCESS, HEADER_SIZE, RECORD_SIZE, TraceRecorder, load_trace, trace_to_performance_result
+)
+
+START = 1_700_000_000.0
+
+
+@pytest.fixture
+def trace_path(tmp_path):
+    return tmp_path / 'run.trace'
+
+
+def write_trace(path, records, case_ids=None, initial_capacity=65536):
+    """写入轨迹文件，records 为 (case_id, status, latency, size, success, 相对开始的秒数)"""
+    with TraceRecorder(str(path), case_ids=case_ids, initial_capacity=initial_capacity) as recorder:
+        recorder._start_time = START
+        for case_id, status, latency, size, success, offset in records:
+            recorder.record(case_id, status, latency, size, success, timestamp=START + offset)
+    return recorder
+
+
+class TestRoundTrip:
+    """写入后读取"""
+
+    def test_fields_survive_round_trip(self, trace_path):
+        write_trace(trace_path, [
+            ('登录', 200, 0.0125, 512, True, 0.5),
+            ('查询', 503, 1.5, 0, False, 1.25),
+            ('登录', 0, 30.0, 0, False, 2.0),
+        ])
+        trace = load_trace(str(trace_path))
+
+        assert trace.start_time == START
+        assert trace.case_ids == ['登录', '查询']
+        records = trace.records
+        assert len(records) == 3
+        assert records['case_index'].tolist() == [0, 1, 0]
+        assert records['status'].tolist() == [200, 503, 0]
+        assert records['latency_us'].tolist() == [12500, 1_500_000, 30_000_000]
+        assert records['bytes'].tolist() == [512, 0, 0]
+        assert (records['flags'] & FLAG_SUCCESS).tolist() == [1, 0, 0]
+        assert records['timestamp_us'].tolist() == [int((START + t) * 1_000_000) for t in (0.5, 1.25, 2.0)]
+
+    def test_pre_registered_cases_keep_their_order(self, trace_path):
+        write_trace(trace_path, [('C', 200, 0.01, 1, True, 0)], case_ids=['A', 'B'])
+        trace = load_trace(str(trace_path))
+        assert trace.case_ids == ['A', 'B', 'C']
+        assert trace.records['case_index'].tolist() == [2]
+
+    def test_out_of_range_values_are_clamped(self, trace_path):
+        write_trace(trace_path, [('A', 200, -1.0, -5, True, 0), ('A', 200, 1e6, 10, True, 0)])
+        records = load_trace(str(trace_path)).records
+        assert records['latency_us'].tolist() == [0, 0xFFFFFFFF]
+        assert records['bytes'].tolist() == [0, 10]
+
+    def test_file_grows_past_initial_capacity(self, trace_path):
+        recorder = write_trace(trace_path, [('A', 200, 0.001 * i, i, True, i) for i in range(100)],
+                               initial_capacity=4)
+        assert recorder.count == 100
+        trace = load_trace(str(trace_path))
+        assert trace.records['bytes'].tolist() == list(range(100))
+        # 关闭后截断多余容量，文件只包含文件头、记录和用例表
+        assert trace_path.stat().st_size == HEADER_SIZE + 100 * RECORD_SIZE + len('["A"]')
+
+    def test_empty_trace(self, trace_path):
+        write_trace(trace_path, [])
+        trace = load_trace(str(trace_path))
+        assert len(trace.records) == 0
+        assert trace.case_ids == []
+
+    def test_record_after_close_is_ignored(self, trace_path):
+        recorder = write_trace(trace_path, [('A', 200, 0.01, 1, True, 0)])
+        recorder.record('A', 200, 0.01, 1, True)
+        recorder.close()
+        assert len(load_trace(str(trace_path)).records) == 1
+
+
+class TestCrashRecovery:
+    """未正常关闭的轨迹文件"""
+
+    def test_records_readable_without_case_table(self, trace_path):
+        recorder = TraceRecorder(str(trace_path), initial_capacity=8)
+        try:
+            recorder.record('A', 200, 0.01, 1, True)
+            recorder.record('B', 200, 0.02, 2, True)
+            # 未关闭时文件头中的记录数已更新，用例表尚未写入
+            trace = load_trace(str(trace_path))
+        finally:
+            recorder.close()
+
+        assert len(trace.records) == 2
+        assert trace.case_ids == ['case_0', 'case_1']
+
+    @pytest.mark.parametrize('content', [b'', b'x' * 10, b'NOTTRACE' + b'\0' * 56])
+    def test_invalid_file(self, trace_path, content):
+        trace_path.write_bytes(content)
+        with pytest.raises(ValueError):
+            load_trace(str(trace_path))
+
+
+class TestWorkers:
+    """工作线程编号"""
+
+    def test_each_thread_gets_a_distinct_id(self, trace_path):
+        threads = 16
+        barrier = threading.Barrier(threads)
+        recorder = TraceRecorder(str(trace_path), initial_capacity=4)
+
+        def work():
+            barrier.wait()
+            for _ in range(200):
+                recorder.record('A', 200, 0.01, 1, True)
+
+        workers = [threading.Thread(target=work) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        recorder.close()
+
+        records = load_trace(str(trace_path)).records
+        assert len(records) == threads * 200
+        worker_ids = records['worker'].tolist()
+        assert sorted(set(worker_ids)) == list(range(threads))
+        assert all(worker_ids.count(i) == 200 for i in range(threads))
+
+
+class TestRebuildResult:
+    """由轨迹离线重建性能测试结果"""
+
+    def test_counts_errors_and_case_stats(self, trace_path):
+        write_trace(trace_path, [
+            ('A', 200, 0.1, 10, True, 0.0),
+            ('A', 503, 0.2, 0, False, 1.0),
+            ('B', 200, 0.3, 10, True, 2.0),
+            ('B', 0, 0.4, 0, False, 3.0),
+            ('B', 503, 0.5, 0, False, 3.5),
+        ])
+        result = trace_to_performance_result(load_trace(str(trace_path)))
+
+        assert (result.total_requests, result.success_count, result.failure_count) == (5, 2, 3)
+        assert result.case_ids == ['A', 'B']
+        assert result.case_stats['A'] == {'index': 0, 'count': 2, 'success_count': 1}
+        assert result.case_stats['B'] == {'index': 1, 'count': 3, 'success_count': 1}
+        assert list(result.response_times) == pytest.approx([0.1, 0.2, 0.3, 0.4, 0.5])
+        # 时长为第一个请求开始到最后一个请求结束
+        assert result.tps == pytest.approx(2 / 4.0)
+
+        categories = result.error_details.categories
+        assert categories[CATEGORY_HTTP_5XX].count == 2
+        assert categories[CATEGORY_OTHER].count == 1
+
+    def test_empty_trace(self, trace_path):
+        write_trace(trace_path, [])
+        result = trace_to_performance_result(load_trace(str(trace_path)))
+        assert result.total_requests == 0
+        assert result.start_time == START
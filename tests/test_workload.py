@@ -0,0 +1,143 @@
+"""压测负载模型（core/workload.py）的单元测试"""
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from core.workload import AliasTable, ThinkTime, Workload
+
+
+def make_case(case_id, performance_config='', scenario='', pre_condition=''):
+    """构造负载模型需要的用例字段"""
+    return SimpleNamespace(case_id=case_id, performance_config=performance_config,
+                           scenario=scenario, pre_condition=pre_condition)
+
+
+class TestAliasTable:
+    """按权重抽样"""
+
+    @pytest.mark.parametrize('weights', [[1, 1, 1], [6, 3, 1], [0.5, 0, 2.5, 7], [1]])
+    def test_frequencies_match_weights(self, weights):
+        table = AliasTable(weights)
+        rng = random.Random(20261019)
+        draws = 100000
+        counts = [0] * len(weights)
+        for _ in range(draws):
+            counts[table.sample(rng)] += 1
+
+        total = sum(weights)
+        for weight, count in zip(weights, counts):
+            # 100000 次抽样的标准误差不超过 0.0016，允许 0.01 的偏差
+            assert count / draws == pytest.approx(weight / total, abs=0.01)
+
+    def test_zero_weight_is_never_sampled(self):
+        table = AliasTable([0, 1, 0])
+        rng = random.Random(1)
+        assert {table.sample(rng) for _ in range(1000)} == {1}
+
+    @pytest.mark.parametrize('weights', [[], [0, 0], [1, -1]])
+    def test_invalid_weights(self, weights):
+        with pytest.raises(ValueError):
+            AliasTable(weights)
+
+
+class TestThinkTime:
+    """思考时间配置"""
+
+    @pytest.mark.parametrize('config, expected', [
+        (None, None),
+        (0, None),
+        (1.5, ThinkTime('constant', 1.5)),
+        ({'type': 'constant', 'value': 2}, ThinkTime('constant', 2.0)),
+        ({'type': 'uniform', 'min': 0.5, 'max': 1.5}, ThinkTime('uniform', 0.5, 1.5)),
+        ({'type': 'exponential', 'mean': 1.0}, ThinkTime('exponential', 1.0)),
+    ])
+    def test_valid(self, config, expected):
+        assert ThinkTime.from_config(config) == expected
+
+    @pytest.mark.parametrize('config', [
+        -1,
+        True,
+        '1',
+        [1],
+        {'type': 'constant', 'value': -1},
+        {'type': 'constant', 'value': False},
+        {'type': 'uniform', 'min': -0.5, 'max': 1},
+        {'type': 'uniform', 'min': 2, 'max': 1},
+        {'type': 'exponential', 'mean': 0},
+        {'type': 'exponential', 'mean': -1},
+        {'type': 'exponential'},
+        {'type': 'normal', 'mean': 1},
+    ])
+    def test_invalid(self, config):
+        with pytest.raises(ValueError):
+            ThinkTime.from_config(config)
+
+    def test_samples_stay_in_range(self):
+        rng = random.Random(7)
+        uniform = ThinkTime('uniform', 0.5, 1.5)
+        assert all(0.5 <= uniform.sample(rng) <= 1.5 for _ in range(1000))
+        exponential = ThinkTime('exponential', 2.0)
+        mean = sum(exponential.sample(rng) for _ in range(20000)) / 20000
+        assert mean == pytest.approx(2.0, rel=0.05)
+
+
+class TestParseConfigs:
+    """压测开始前的配置校验"""
+
+    def test_lists_every_bad_case_in_one_error(self):
+        cases = [
+            make_case('A', '{bad'),
+            make_case('B', '{"weight": "x"}'),
+            make_case('C', '{"weight": true}'),
+            make_case('D', '{"pacing": -1}'),
+            make_case('E', '{"think_time": {"type": "exponential", "mean": 0}}'),
+            make_case('F', '{"weight": 2}'),
+        ]
+        with pytest.raises(ValueError) as excinfo:
+            Workload.parse_configs(cases)
+        message = str(excinfo.value)
+        assert message.startswith('5 个用例')
+        for case_id in 'ABCDE':
+            assert f"用例 {case_id} " in message
+        assert '用例 F ' not in message
+
+    def test_valid_configs(self):
+        cases = [make_case('A', ''), make_case('B', '{"weight": 3, "pacing": 0.5}')]
+        assert Workload.parse_configs(cases) == [{}, {'weight': 3, 'pacing': 0.5}]
+
+    def test_extract_rules_only_for_scenario_steps(self):
+        cases = [
+            make_case('A', pre_condition='{"token": "data.token"}', scenario='login'),
+            make_case('B', pre_condition='{bad'),
+            make_case('C', scenario='login'),
+        ]
+        assert Workload.parse_extract_rules(cases) == [{'token': 'data.token'}, None, None]
+
+        cases[1].scenario = 'login'
+        with pytest.raises(ValueError, match='用例 B'):
+            Workload.parse_extract_rules(cases)
+
+
+class TestFromCases:
+    """由用例创建负载"""
+
+    def test_plain_cases_keep_round_mode(self):
+        assert Workload.from_cases([make_case('A'), make_case('B', '{"timeout": 5}')]) is None
+
+    def test_weights_and_scenarios(self):
+        cases = [
+            make_case('A', '{"weight": 3, "think_time": 1}'),
+            make_case('L1', '{"weight": 1, "pacing": 2}', scenario='login',
+                      pre_condition='{"token": "data.token"}'),
+            make_case('L2', '{"think_time": 0.5}', scenario='login'),
+        ]
+        workload = Workload.from_cases(cases)
+        assert [(item.name, item.scenario, item.weight) for item in workload.items] == [
+            ('A', False, 3.0), ('login', True, 1.0)
+        ]
+        login = workload.items[1]
+        assert login.pacing == 2.0
+        assert [step.case.case_id for step in login.steps] == ['L1', 'L2']
+        assert login.steps[0].extract_rules == {'token': 'data.token'}
+        assert login.steps[1].think_time == ThinkTime('constant', 0.5)
@@ -1,7 +1,11 @@
 """断言工具"""
-import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Sequence, Union
 
+from utils.body_matcher import (
+    Matcher, Mismatch, REASON_MISSING, PREVIEW_MAX_CHARS,
+    compile_expected, format_path, preview, value_at
+)
+from utils.schema_validator import SchemaValidator, compile_schema
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -10,7 +14,8 @@ logger = get_logger(__name__)
 class APIAssertionError(AssertionError):
     """API测试断言错误基类
 
-    提供更结构化的错误信息，便于阅读和调试
+    提供更结构化的错误信息，便于阅读和调试。
+    完整消息在首次转换为字符串时才格式化，上下文中的大对象只显示有长度上限的摘要
     """
 
     def __init__(self, message: str, **context):
@@ -22,10 +27,13 @@ class APIAssertionError(AssertionError):
         """
         self.message = message
         self.context = context
+        self._formatted: Optional[str] = None
+        super().__init__(message)
 
-        # 构建完整的错误消息
-        full_message = self._format_message()
-        super().__init__(full_message)
+    def __str__(self) -> str:
+        if self._formatted is None:
+            self._formatted = self._format_message()
+        return self._formatted
 
     def _format_message(self) -> str:
         """格式化错误消息"""
@@ -36,11 +44,14 @@ class APIAssertionError(AssertionError):
             msg.append("\n[Details]")
             for key, value in self.context.items():
                 if isinstance(value, (dict, list)):
-                    # JSON格式化
-                    value_str = json.dumps(value, indent=2, ensure_ascii=False)
+                    # JSON格式化（截取后序列化）
+                    value_str = preview(value, indent=2)
                     msg.append(f"  - {key}:\n{self._indent(value_str, '    ')}")
                 else:
-                    msg.append(f"  - {key}: {value}")
+                    value_str = str(value)
+                    if len(value_str) > PREVIEW_MAX_CHARS:
+                        value_str = f"{value_str[:PREVIEW_MAX_CHARS]}…（共 {len(value_str)} 字符）"
+                    msg.append(f"  - {key}: {value_str}")
 
         return "\n".join(msg)
 
@@ -66,14 +77,26 @@ class StatusCodeError(APIAssertionError):
 class ResponseBodyError(APIAssertionError):
     """响应体断言错误"""
 
-    def __init__(self, field: str, expected: Any, actual: Any, full_response: Any = None):
-        super().__init__(
-            f"响应字段 '{field}' 不匹配",
-            field=field,
-            expected_value=expected,
-            actual_value=actual,
-            response_context=full_response
-        )
+    def __init__(self, field: str, expected: Any, actual: Any, full_response: Any = None,
+                 path: Sequence[Any] = None, detail: str = ''):
+        """初始化响应体断言错误
+
+        Args:
+            field: 字段路径（如 data.items[3].id）
+            expected: 期望值
+            actual: 实际值
+            full_response: 完整响应体
+            path: 不匹配位置的键和下标，提供时上下文只显示其所在的对象或数组
+            detail: 补充说明
+        """
+        context = dict(field=field, expected_value=expected, actual_value=actual)
+        if detail:
+            context['detail'] = detail
+        if path:
+            context['context_path'] = format_path(path[:-1])
+            full_response = value_at(full_response, path[:-1])
+        context['response_context'] = full_response
+        super().__init__(f"响应字段 '{field}' 不匹配", **context)
 
 
 class MissingFieldError(APIAssertionError):
@@ -87,6 +110,27 @@ class MissingFieldError(APIAssertionError):
         )
 
 
+class SchemaValidationError(APIAssertionError):
+    """JSON Schema 校验错误"""
+
+    def __init__(self, path: str, reason: str, schema_digest: str = None, response_context: Any = None):
+        """初始化 Schema 校验错误
+
+        Args:
+            path: 不符合 Schema 的位置（如 data.items[3].id）
+            reason: jsonschema 给出的说明
+            schema_digest: Schema 的内容哈希
+            response_context: 不符合位置的值
+        """
+        super().__init__(
+            f"响应不符合JSON Schema: {path}",
+            path=path,
+            reason=reason,
+            schema=schema_digest[:12] if schema_digest else None,
+            response_context=response_context
+        )
+
+
 class PerformanceAssertionError(APIAssertionError):
     """性能断言错误
 
@@ -112,6 +156,29 @@ class PerformanceAssertionError(APIAssertionError):
         )
 
 
+class PerformanceGateError(APIAssertionError):
+    """性能门禁错误
+
+    性能门禁评估未通过时抛出，包含所有未通过规则的结构化信息
+    """
+
+    def __init__(self, report):
+        """初始化性能门禁错误
+
+        Args:
+            report: GateReport 门禁评估报告
+        """
+        self.report = report
+        counts = report.counts()
+        super().__init__(
+            f"性能门禁未通过: {len(report.failures)}/{len(report.results)} 条规则",
+            confidence=f"{report.confidence:.0%}",
+            strict=report.strict,
+            counts=counts,
+            failed_gates=[r.to_dict() for r in report.failures]
+        )
+
+
 class Assertions:
     """断言工具类
 
@@ -138,14 +205,15 @@ class Assertions:
 
         self.logger.info(f"状态码断言通过: {actual}")
 
-    def assert_response_body(self, actual: Dict[str, Any], expected: Dict[str, Any]):
+    def assert_response_body(self, actual: Any, expected: Union[Dict[str, Any], Matcher]):
         """断言响应体
 
-        验证实际响应体中是否包含期望的字段和值
+        按路径部分匹配：期望中的对象只检查列出的字段（可嵌套），数组按位置匹配，
+        支持 $type、$regex、$contains 等运算符（见 utils/body_matcher.py）
 
         Args:
             actual: 实际响应体
-            expected: 期望响应体（需要验证的字段）
+            expected: 期望响应体，或 compile_expected 编译好的匹配器
 
         Raises:
             MissingFieldError: 缺少字段
@@ -155,16 +223,32 @@ class Assertions:
             self.logger.info("无期望结果，跳过响应体断言")
             return
 
-        # 遍历期望结果进行断言
-        for key, expected_value in expected.items():
-            if key not in actual:
-                raise MissingFieldError(key, list(actual.keys()) if actual else None)
+        matcher = expected if isinstance(expected, Matcher) else compile_expected(expected)
+        mismatch = matcher.match(actual)
+        if mismatch is not None:
+            raise self.mismatch_error(mismatch, actual)
+
+        expected_value = getattr(matcher, 'expected', expected)
+        count = len(expected_value) if isinstance(expected_value, (dict, list)) else 1
+        self.logger.info(f"响应体断言通过，验证了 {count} 个字段")
 
-            actual_value = actual[key]
-            if actual_value != expected_value:
-                raise ResponseBodyError(key, expected_value, actual_value, actual)
+    @staticmethod
+    def mismatch_error(mismatch: Mismatch, response: Any) -> APIAssertionError:
+        """把匹配结果转换为断言错误
+
+        Args:
+            mismatch: 不匹配信息
+            response: 完整响应体
 
-        self.logger.info(f"响应体断言通过，验证了 {len(expected)} 个字段")
+        Returns:
+            MissingFieldError 或 ResponseBodyError
+        """
+        if mismatch.reason == REASON_MISSING:
+            return MissingFieldError(mismatch.path_str, list(mismatch.actual.keys()))
+        return ResponseBodyError(
+            mismatch.path_str, mismatch.expected, mismatch.actual, response,
+            path=mismatch.path, detail=mismatch.detail
+        )
 
     def assert_contains(self, actual: Any, expected: Any):
         """断言包含关系
@@ -219,6 +303,26 @@ class Assertions:
 
         self.logger.info(f"Schema断言通过，验证了 {len(schema)} 个字段")
 
+    def assert_json_schema(self, response_body: Any, schema: Union[str, Dict[str, Any], SchemaValidator]):
+        """断言响应体符合 JSON Schema
+
+        Schema 按内容哈希编译一次后缓存，支持 JSON Schema 各草案版本（由 $schema 决定，默认最新版本）
+
+        Args:
+            response_body: 响应体
+            schema: JSON Schema（字典或JSON文本），或 compile_schema 返回的校验器
+
+        Raises:
+            SchemaValidationError: 响应体不符合 Schema
+            ValueError: Schema 不合法
+        """
+        validator = schema if isinstance(schema, SchemaValidator) else compile_schema(schema)
+        if not validator.is_valid(response_body):
+            path, reason, _ = validator.first_error(response_body)
+            raise SchemaValidationError(format_path(path), reason, validator.digest, value_at(response_body, path))
+
+        self.logger.info(f"JSON Schema断言通过: {validator.digest[:12]}")
+
     def assert_response_time(self, actual_time: float, expected_time: float,
                             comparison: str = 'less', case_id: str = None):
         """断言响应时间
@@ -286,6 +390,16 @@ class Assertions:
                     metric="p95_response_time"
                 )
 
+        # 检查P99响应时间
+        if 'p99_time' in thresholds:
+            if metrics.get('p99_time', 0) > thresholds['p99_time']:
+                raise PerformanceAssertionError(
+                    "P99响应时间超过阈值",
+                    actual_time=metrics.get('p99_time', 0),
+                    expected_time=thresholds['p99_time'],
+                    metric="p99_response_time"
+                )
+
         # 检查成功率
         if 'success_rate' in thresholds:
             if metrics.get('success_rate', 0) < thresholds['success_rate']:
@@ -297,3 +411,18 @@ class Assertions:
                 )
 
         self.logger.info("性能指标断言通过")
+
+    def assert_performance_gates(self, report):
+        """断言性能门禁全部通过
+
+        Args:
+            report: GateEngine.evaluate() 返回的 GateReport
+
+        Raises:
+            PerformanceGateError: 存在未通过的门禁规则
+        """
+        self.logger.info(report.summary())
+        if not report.passed:
+            raise PerformanceGateError(report)
+
+        self.logger.info("性能门禁断言通过")
@@ -0,0 +1,218 @@
+"""测试报告附件策略 - 按需序列化、限制大小、大附件按内容去重保存
+
+用例执行过程中只登记附件及其生成函数，用例结束时按策略决定是否保留:
+    mode:       always（始终附加）/ on_failure（仅失败时附加）/ never（不附加）
+    max_size_kb: 单个附件的大小上限（KB），超过时按 large_body 处理
+    large_body: truncate（截断后附加）/ file（完整内容按 SHA-256 保存到 store_dir，
+                相同内容只保存一次，报告中附加截断预览和文件路径）
+
+未保留的附件不会被序列化，通过的用例不产生 json.dumps 和写文件的开销。
+通过 AttachmentCollector.step 执行的步骤失败时，该步骤登记的附件附加在步骤内；
+之前已通过的步骤的附件在用例结束时附加，名称前加上所属步骤
+"""
+import hashlib
+import json
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from config.settings import PROJECT_ROOT
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 附件保留策略
+ATTACH_ALWAYS = 'always'
+ATTACH_ON_FAILURE = 'on_failure'
+ATTACH_NEVER = 'never'
+
+# 超过大小上限时的处理方式
+LARGE_BODY_TRUNCATE = 'truncate'
+LARGE_BODY_FILE = 'file'
+
+
+@dataclass
+class AttachmentPolicy:
+    """附件策略
+
+    Attributes:
+        mode: 保留策略（always / on_failure / never）
+        max_size_kb: 单个附件的大小上限（KB）
+        large_body: 超过上限时的处理方式（truncate / file）
+        store_dir: large_body 为 file 时保存完整内容的目录（相对路径相对于项目根目录）
+    """
+    mode: str = ATTACH_ON_FAILURE
+    max_size_kb: float = 64
+    large_body: str = LARGE_BODY_FILE
+    store_dir: str = 'reports/attachments'
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'AttachmentPolicy':
+        """从配置字典创建，忽略未知字段
+
+        Args:
+            config: 配置字典（config.yaml 中的 attachments）
+
+        Returns:
+            AttachmentPolicy 实例
+
+        Raises:
+            ValueError: mode 或 large_body 不合法
+        """
+        config = config or {}
+        known = cls.__dataclass_fields__.keys()
+        policy = cls(**{k: v for k, v in config.items() if k in known})
+        if policy.mode not in (ATTACH_ALWAYS, ATTACH_ON_FAILURE, ATTACH_NEVER):
+            raise ValueError(f"不支持的附件策略: {policy.mode}")
+        if policy.large_body not in (LARGE_BODY_TRUNCATE, LARGE_BODY_FILE):
+            raise ValueError(f"不支持的大附件处理方式: {policy.large_body}")
+        return policy
+
+    @property
+    def max_bytes(self) -> int:
+        """单个附件的大小上限（字节）"""
+        return int(self.max_size_kb * 1024)
+
+    def keeps(self, failed: bool) -> bool:
+        """用例结束时是否保留附件"""
+        return self.mode == ATTACH_ALWAYS or (self.mode == ATTACH_ON_FAILURE and failed)
+
+
+class AttachmentCollector:
+    """一个用例的附件登记表
+
+    登记时只保存生成函数，flush 时按策略序列化并附加到 Allure 报告
+    """
+
+    def __init__(self, policy: AttachmentPolicy):
+        """初始化登记表
+
+        Args:
+            policy: 附件策略
+        """
+        self.policy = policy
+        self.logger = logger
+        self._pending: List[Tuple[str, str, Callable[[], str], str]] = []  # (步骤, 名称, 生成函数, 类型)
+        self._step = ''
+
+    def add_text(self, name: str, value: Any):
+        """登记文本附件
+
+        Args:
+            name: 附件名称
+            value: 附件内容（flush 时转换为字符串）
+        """
+        if self.policy.mode != ATTACH_NEVER:
+            self._pending.append((self._step, name, lambda: str(value), 'text'))
+
+    def add_json(self, name: str, value: Any):
+        """登记JSON附件
+
+        Args:
+            name: 附件名称
+            value: 可JSON序列化的对象（flush 时才序列化）
+        """
+        if self.policy.mode != ATTACH_NEVER:
+            self._pending.append(
+                (self._step, name, lambda: json.dumps(value, indent=2, ensure_ascii=False, default=str), 'json')
+            )
+
+    @contextmanager
+    def step(self, title: str):
+        """执行一个 Allure 步骤
+
+        步骤失败时（always 策略下步骤结束时）本步骤登记的附件附加在该步骤内，其余情况留到 flush
+
+        Args:
+            title: 步骤名称
+        """
+        import allure
+
+        with allure.step(title):
+            self._step = title
+            failed = True
+            try:
+                yield
+                failed = False
+            finally:
+                self._step = ''
+                if self.policy.keeps(failed):
+                    current = [item for item in self._pending if item[0] == title]
+                    self._pending = [item for item in self._pending if item[0] != title]
+                    self._attach(current, allure, prefix_step=False)
+
+    def flush(self, failed: bool) -> int:
+        """按策略附加已登记的附件并清空登记表
+
+        Args:
+            failed: 用例是否失败
+
+        Returns:
+            附加的附件数
+        """
+        pending, self._pending = self._pending, []
+        if not pending or not self.policy.keeps(failed):
+            return 0
+
+        import allure
+
+        self._attach(pending, allure, prefix_step=True)
+        return len(pending)
+
+    def _attach(self, items: List[Tuple[str, str, Callable[[], str], str]], allure: Any, prefix_step: bool):
+        """序列化并附加到当前 Allure 步骤（不在步骤内时附加到用例）
+
+        Args:
+            items: 登记的附件
+            allure: allure 模块
+            prefix_step: 是否在名称前加上登记时所属的步骤
+        """
+        types = {'text': allure.attachment_type.TEXT, 'json': allure.attachment_type.JSON}
+        for step, name, produce, kind in items:
+            if prefix_step and step:
+                name = f"{step} - {name}"
+            content = produce()
+            data = content.encode('utf-8')
+            if len(data) > self.policy.max_bytes:
+                content, kind = self._shrink(name, content, data, kind)
+            allure.attach(content, name=name, attachment_type=types[kind])
+
+    def _shrink(self, name: str, content: str, data: bytes, kind: str) -> Tuple[str, str]:
+        """处理超过大小上限的附件
+
+        Returns:
+            (附加到报告的内容, 附件类型)；截断后的JSON不再合法，改为文本
+        """
+        preview = data[:self.policy.max_bytes].decode('utf-8', errors='ignore')
+        note = f"[附件 {name} 共 {len(data) / 1024:.1f}KB，超过 {self.policy.max_size_kb:g}KB 上限"
+
+        if self.policy.large_body == LARGE_BODY_FILE:
+            path = self.store(data, 'json' if kind == 'json' else 'txt')
+            note += f"，完整内容: {path}"
+
+        return f"{note}，以下为前 {self.policy.max_size_kb:g}KB]\n{preview}", 'text'
+
+    def store(self, data: bytes, extension: str) -> Path:
+        """按内容地址保存附件，相同内容只写入一次
+
+        Args:
+            data: 附件内容
+            extension: 文件扩展名
+
+        Returns:
+            文件路径
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = PROJECT_ROOT / self.policy.store_dir / digest[:2] / f"{digest}.{extension}"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # 临时文件名唯一，多个 xdist 工作进程同时保存相同内容时互不干扰，replace 为原子操作
+            with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{digest}.", suffix='.tmp',
+                                             delete=False) as temp:
+                temp.write(data)
+            Path(temp.name).replace(path)
+            self.logger.debug(f"保存大附件: {path}")
+        return path
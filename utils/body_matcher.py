@@ -0,0 +1,500 @@
+"""响应体结构化匹配 - 按路径部分匹配嵌套的期望结构
+
+期望结构先编译为匹配器树，再对响应体逐路径匹配，遇到第一处不匹配即返回:
+    对象:   部分匹配，只检查期望中列出的字段（可嵌套）
+    数组:   按位置逐项匹配，长度必须一致
+    其他值: 相等比较
+
+对象的键全部为以下运算符时视为匹配器（否则按普通对象处理，"$ref" 等字段名不受影响）:
+    {"$type": "string"}              类型: string / number / integer / boolean / null / object / array
+    {"$regex": "^\\d+$"}             字符串正则匹配（search）
+    {"$gt": 0, "$lte": 100}          数值比较: $gt / $gte / $lt / $lte
+    {"$ne": "ERROR"}                 不等于
+    {"$in": ["A", "B"]}              取值属于列表
+    {"$any": true}                   任意值（只要求字段存在）
+    {"$exists": false}               字段不存在（$exists: true 等同 $any）
+    {"$len": 3}                      字符串、数组或对象的长度
+    {"$contains": [{"id": 1}]}       数组包含与每个期望项匹配的元素（任意位置）；字符串包含子串
+    {"$each": {"id": {"$type": "integer"}}}   数组的每个元素都匹配
+    {"$unordered": [1, 2, 3]}        数组与期望逐项一一对应（存在任意一种对应方式即可），顺序不限，长度一致
+
+匹配成功时不构造路径和错误信息；不匹配时返回 Mismatch，只保存路径和两侧值的引用，
+需要显示时再用 preview 生成有长度上限的摘要
+"""
+import json
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# 错误信息中单个值摘要的默认上限
+PREVIEW_MAX_CHARS = 2000
+PREVIEW_MAX_ITEMS = 20
+PREVIEW_MAX_DEPTH = 4
+PREVIEW_MAX_STRING = 200
+
+# 不匹配原因
+REASON_MISSING = 'missing'
+REASON_UNEXPECTED = 'unexpected'
+REASON_TYPE = 'type'
+REASON_VALUE = 'value'
+REASON_LENGTH = 'length'
+
+REASON_LABELS = {
+    REASON_MISSING: '缺少字段',
+    REASON_UNEXPECTED: '不应存在的字段',
+    REASON_TYPE: '类型不符',
+    REASON_VALUE: '值不符',
+    REASON_LENGTH: '长度不符',
+}
+
+_JSON_TYPES = {
+    'string': lambda v: isinstance(v, str),
+    'number': lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    'integer': lambda v: isinstance(v, int) and not isinstance(v, bool),
+    'boolean': lambda v: isinstance(v, bool),
+    'null': lambda v: v is None,
+    'object': lambda v: isinstance(v, dict),
+    'array': lambda v: isinstance(v, list),
+}
+
+_MISSING = object()
+
+
+class Mismatch:
+    """一处不匹配
+
+    Attributes:
+        reason: 原因（missing / unexpected / type / value / length）
+        expected: 期望（值或运算符描述）
+        actual: 实际值（缺少字段时为所在对象）
+        detail: 补充说明
+    """
+
+    __slots__ = ('reason', 'expected', 'actual', 'detail', '_reversed_path')
+
+    def __init__(self, reason: str, expected: Any, actual: Any, detail: str = ''):
+        self.reason = reason
+        self.expected = expected
+        self.actual = actual
+        self.detail = detail
+        self._reversed_path: List[Any] = []
+
+    def at(self, key: Any) -> 'Mismatch':
+        """由上一层匹配器在返回途中追加路径（从内向外）"""
+        self._reversed_path.append(key)
+        return self
+
+    @property
+    def path(self) -> Tuple[Any, ...]:
+        """从根到不匹配位置的键和下标"""
+        return tuple(reversed(self._reversed_path))
+
+    @property
+    def path_str(self) -> str:
+        """路径字符串，如 data.items[3].id（根为 $）"""
+        return format_path(self.path)
+
+    def describe(self) -> str:
+        """单行描述（值使用摘要）"""
+        if self.reason == REASON_MISSING:
+            return f"{self.path_str}: 缺少字段"
+        if self.reason == REASON_UNEXPECTED:
+            return f"{self.path_str}: 不应存在的字段，实际值 {preview(self.actual, 200)}"
+        text = f"{self.path_str}: 期望 {preview(self.expected, 200)}，实际 {preview(self.actual, 200)}"
+        return f"{text}（{self.detail}）" if self.detail else text
+
+
+def format_path(path: Sequence[Any]) -> str:
+    """把键和下标序列格式化为路径字符串"""
+    if not path:
+        return '$'
+    parts = []
+    for key in path:
+        if isinstance(key, int):
+            parts.append(f"[{key}]")
+        else:
+            parts.append(f".{key}" if parts else str(key))
+    return ''.join(parts)
+
+
+def value_at(data: Any, path: Sequence[Any]) -> Any:
+    """按路径取值，路径不存在时返回None"""
+    for key in path:
+        try:
+            data = data[key]
+        except (KeyError, IndexError, TypeError):
+            return None
+    return data
+
+
+class Matcher(ABC):
+    """匹配器基类"""
+
+    __slots__ = ()
+
+    @abstractmethod
+    def match(self, actual: Any) -> Optional[Mismatch]:
+        """匹配实际值
+
+        Returns:
+            第一处不匹配，匹配时返回None
+        """
+
+    def allows_missing(self) -> bool:
+        """字段不存在时是否视为匹配"""
+        return False
+
+    def requires_missing(self) -> bool:
+        """是否要求字段不存在"""
+        return False
+
+
+class EqualsMatcher(Matcher):
+    """相等比较"""
+
+    __slots__ = ('expected',)
+
+    def __init__(self, expected: Any):
+        self.expected = expected
+
+    def match(self, actual: Any) -> Optional[Mismatch]:
+        if actual == self.expected:
+            return None
+        return Mismatch(REASON_VALUE, self.expected, actual)
+
+
+class DictMatcher(Matcher):
+    """对象部分匹配"""
+
+    __slots__ = ('items', 'expected')
+
+    def __init__(self, items: List[Tuple[str, Matcher]], expected: Dict[str, Any]):
+        self.items = items
+        self.expected = expected
+
+    def match(self, actual: Any) -> Optional[Mismatch]:
+        if not isinstance(actual, dict):
+            return Mismatch(REASON_TYPE, self.expected, actual, "期望对象")
+        for key, matcher in self.items:
+            value = actual.get(key, _MISSING)
+            if value is _MISSING:
+                if matcher.allows_missing():
+                    continue
+                return Mismatch(REASON_MISSING, self.expected.get(key), actual).at(key)
+            if matcher.requires_missing():
+                return Mismatch(REASON_UNEXPECTED, None, value).at(key)
+            mismatch = matcher.match(value)
+            if mismatch is not None:
+                return mismatch.at(key)
+        return None
+
+
+class ListMatcher(Matcher):
+    """数组按位置匹配"""
+
+    __slots__ = ('items', 'expected')
+
+    def __init__(self, items: List[Matcher], expected: List[Any]):
+        self.items = items
+        self.expected = expected
+
+    def match(self, actual: Any) -> Optional[Mismatch]:
+        if not isinstance(actual, list):
+            return Mismatch(REASON_TYPE, self.expected, actual, "期望数组")
+        if len(actual) != len(self.items):
+            return Mismatch(REASON_LENGTH, len(self.items), len(actual), "数组长度不一致")
+        for index, (matcher, value) in enumerate(zip(self.items, actual)):
+            mismatch = matcher.match(value)
+            if mismatch is not None:
+                return mismatch.at(index)
+        return None
+
+
+class OperatorMatcher(Matcher):
+    """运算符匹配（同一对象中的多个运算符需同时满足）"""
+
+    __slots__ = ('checks', 'expected', 'exists')
+
+    def __init__(self, checks: List[Any], expected: Dict[str, Any], exists: Optional[bool]):
+        self.checks = checks
+        self.expected = expected
+        self.exists = exists
+
+    def allows_missing(self) -> bool:
+        return self.exists is False
+
+    def requires_missing(self) -> bool:
+        return self.exists is False
+
+    def match(self, actual: Any) -> Optional[Mismatch]:
+        for check in self.checks:
+            mismatch = check(actual)
+            if mismatch is not None:
+                return mismatch
+        return None
+
+
+def _type_check(name: str):
+    if name not in _JSON_TYPES:
+        raise ValueError(f"不支持的类型: {name}（可选: {', '.join(_JSON_TYPES)}）")
+    test = _JSON_TYPES[name]
+    return lambda v: None if test(v) else Mismatch(REASON_TYPE, {'$type': name}, v, f"期望类型 {name}")
+
+
+def _regex_check(pattern: str):
+    if not isinstance(pattern, str):
+        raise ValueError(f"$regex 的值必须是字符串: {pattern!r}")
+    try:
+        compiled = re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f"$regex 不是合法的正则表达式 {pattern!r}: {e}")
+    return lambda v: None if isinstance(v, str) and compiled.search(v) else \
+        Mismatch(REASON_VALUE, {'$regex': pattern}, v, "正则不匹配")
+
+
+def _compare_check(op: str, bound: Any):
+    compare = {
+        '$gt': lambda v: v > bound,
+        '$gte': lambda v: v >= bound,
+        '$lt': lambda v: v < bound,
+        '$lte': lambda v: v <= bound,
+    }[op]
+
+    def check(v):
+        try:
+            if not isinstance(v, bool) and compare(v):
+                return None
+        except TypeError:
+            pass
+        return Mismatch(REASON_VALUE, {op: bound}, v)
+    return check
+
+
+def _in_check(options: Any):
+    if not isinstance(options, list):
+        raise ValueError(f"$in 的值必须是数组: {options!r}")
+    return lambda v: None if v in options else Mismatch(REASON_VALUE, {'$in': options}, v)
+
+
+def _len_check(length: int):
+    def check(v):
+        if isinstance(v, (str, list, dict)) and len(v) == length:
+            return None
+        actual = len(v) if isinstance(v, (str, list, dict)) else v
+        return Mismatch(REASON_LENGTH, length, actual, "长度不一致")
+    return check
+
+
+def _contains_check(expected: Any):
+    if isinstance(expected, str):
+        return lambda v: None if isinstance(v, str) and expected in v else \
+            Mismatch(REASON_VALUE, {'$contains': expected}, v, "不包含子串")
+
+    items = expected if isinstance(expected, list) else [expected]
+    matchers = [compile_expected(item) for item in items]
+
+    def check(v):
+        if not isinstance(v, list):
+            return Mismatch(REASON_TYPE, {'$contains': expected}, v, "期望数组")
+        for item, matcher in zip(items, matchers):
+            if not any(matcher.match(element) is None for element in v):
+                return Mismatch(REASON_VALUE, item, v, "数组中没有匹配的元素")
+        return None
+    return check
+
+
+def _each_check(expected: Any):
+    matcher = compile_expected(expected)
+
+    def check(v):
+        if not isinstance(v, list):
+            return Mismatch(REASON_TYPE, {'$each': expected}, v, "期望数组")
+        for index, element in enumerate(v):
+            mismatch = matcher.match(element)
+            if mismatch is not None:
+                return mismatch.at(index)
+        return None
+    return check
+
+
+def _unordered_check(expected: List[Any]):
+    if not isinstance(expected, list):
+        raise ValueError("$unordered 的值必须是数组")
+    matchers = [compile_expected(item) for item in expected]
+
+    def check(v):
+        if not isinstance(v, list):
+            return Mismatch(REASON_TYPE, {'$unordered': expected}, v, "期望数组")
+        if len(v) != len(matchers):
+            return Mismatch(REASON_LENGTH, len(matchers), len(v), "数组长度不一致")
+        # 先按顺序贪心占用第一个匹配且未被占用的元素，多数情况一次通过
+        used = [False] * len(v)
+        for matcher in matchers:
+            for index, element in enumerate(v):
+                if not used[index] and matcher.match(element) is None:
+                    used[index] = True
+                    break
+            else:
+                break
+        else:
+            return None
+
+        # 贪心失败时（如 [{"$type": "integer"}, 1] 对 [1, 2]）按二分图最大匹配确认是否存在一一对应
+        candidates = [[index for index, element in enumerate(v) if matcher.match(element) is None]
+                      for matcher in matchers]
+        unmatched = _first_unassignable(candidates, len(v))
+        if unmatched is None:
+            return None
+        return Mismatch(REASON_VALUE, expected[unmatched], v, "数组中没有匹配的元素")
+    return check
+
+
+def _first_unassignable(candidates: List[List[int]], size: int) -> Optional[int]:
+    """二分图匹配（逐个期望项用广度优先搜索增广路径）
+
+    Args:
+        candidates: 每个期望项可以匹配的元素下标
+        size: 元素个数
+
+    Returns:
+        第一个无法分配到元素的期望项下标，全部可以一一对应时返回None
+    """
+    owner = [-1] * size  # 元素 -> 占用它的期望项
+    for item, indexes in enumerate(candidates):
+        parent: Dict[int, Optional[int]] = {}
+        queue = deque()
+        for index in indexes:
+            if index not in parent:
+                parent[index] = None
+                queue.append(index)
+
+        free = -1
+        while queue:
+            index = queue.popleft()
+            if owner[index] < 0:
+                free = index
+                break
+            for other in candidates[owner[index]]:
+                if other not in parent:
+                    parent[other] = index
+                    queue.append(other)
+        if free < 0:
+            return item
+
+        # 沿增广路径把元素依次让给上一个期望项
+        index = free
+        while parent[index] is not None:
+            previous = parent[index]
+            owner[index] = owner[previous]
+            index = previous
+        owner[index] = item
+    return None
+
+
+_OPERATORS = {
+    '$type': _type_check,
+    '$regex': _regex_check,
+    '$gt': lambda b: _compare_check('$gt', b),
+    '$gte': lambda b: _compare_check('$gte', b),
+    '$lt': lambda b: _compare_check('$lt', b),
+    '$lte': lambda b: _compare_check('$lte', b),
+    '$ne': lambda b: lambda v: None if v != b else Mismatch(REASON_VALUE, {'$ne': b}, v),
+    '$in': _in_check,
+    '$len': _len_check,
+    '$contains': _contains_check,
+    '$each': _each_check,
+    '$unordered': _unordered_check,
+    '$any': None,
+    '$exists': None,
+}
+
+
+def compile_expected(expected: Any) -> Matcher:
+    """把期望结构编译为匹配器
+
+    Args:
+        expected: 期望结构（通常来自用例的期望结果列）
+
+    Returns:
+        Matcher 实例
+
+    Raises:
+        ValueError: 运算符的参数不合法
+        re.error: 正则表达式不合法
+    """
+    if isinstance(expected, dict):
+        if expected and all(key in _OPERATORS for key in expected):
+            checks = [_OPERATORS[key](value) for key, value in expected.items() if _OPERATORS[key] is not None]
+            exists = expected.get('$exists')
+            return OperatorMatcher(checks, expected, None if exists is None else bool(exists))
+        return DictMatcher([(key, compile_expected(value)) for key, value in expected.items()], expected)
+    if isinstance(expected, list):
+        return ListMatcher([compile_expected(item) for item in expected], expected)
+    return EqualsMatcher(expected)
+
+
+@lru_cache(maxsize=1024)
+def compile_expected_json(text: str) -> Matcher:
+    """编译JSON文本形式的期望结构（按文本缓存，同一用例只编译一次）
+
+    Args:
+        text: JSON文本
+
+    Returns:
+        Matcher 实例
+
+    Raises:
+        json.JSONDecodeError: 不是合法的JSON
+        ValueError: 运算符的参数不合法
+    """
+    return compile_expected(json.loads(text))
+
+
+def abbreviate(value: Any, max_items: int = PREVIEW_MAX_ITEMS, max_depth: int = PREVIEW_MAX_DEPTH,
+               max_string: int = PREVIEW_MAX_STRING) -> Any:
+    """截取值的一部分（容器只保留前 max_items 项，嵌套超过 max_depth 层时省略，长字符串截断）
+
+    只遍历保留的部分，耗时与原值大小无关
+    """
+    if isinstance(value, str):
+        return value if len(value) <= max_string else f"{value[:max_string]}…（共 {len(value)} 字符）"
+    if isinstance(value, dict):
+        if max_depth <= 0:
+            return f"{{…{len(value)} 个字段}}"
+        result = {}
+        for index, (key, item) in enumerate(value.items()):
+            if index >= max_items:
+                result['…'] = f"还有 {len(value) - max_items} 个字段"
+                break
+            result[key] = abbreviate(item, max_items, max_depth - 1, max_string)
+        return result
+    if isinstance(value, (list, tuple)):
+        if max_depth <= 0:
+            return f"[…{len(value)} 项]"
+        result = [abbreviate(item, max_items, max_depth - 1, max_string) for item in value[:max_items]]
+        if len(value) > max_items:
+            result.append(f"…还有 {len(value) - max_items} 项")
+        return result
+    return value
+
+
+def preview(value: Any, max_chars: int = PREVIEW_MAX_CHARS, indent: Optional[int] = None) -> str:
+    """生成有长度上限的值摘要（先截取结构再序列化，不会序列化完整的大响应体）
+
+    Args:
+        value: 任意值
+        max_chars: 摘要的最大字符数
+        indent: JSON缩进（None 为单行）
+
+    Returns:
+        摘要字符串
+    """
+    if isinstance(value, (dict, list, tuple)):
+        text = json.dumps(abbreviate(value), indent=indent, ensure_ascii=False, default=str)
+    elif isinstance(value, str):
+        text = json.dumps(abbreviate(value), ensure_ascii=False)
+    else:
+        text = str(value)
+    return text if len(text) <= max_chars else f"{text[:max_chars]}…"
@@ -0,0 +1,159 @@
+"""响应时间直方图 - 对数分桶，可合并、可序列化
+
+分桶规则与 utils/perf_analytics.py 的向量化实现一致:
+    桶0: 不超过 HISTOGRAM_MIN 的值（含0）
+    桶b(b>=1): [HISTOGRAM_MIN * g^(b-1), HISTOGRAM_MIN * g^b)，其中 g = 1 + HISTOGRAM_PRECISION
+取桶的几何中点作为代表值，相对误差不超过 HISTOGRAM_PRECISION / 2
+"""
+import math
+from typing import Dict, Iterable, Optional
+
+# 最小可分辨的响应时间（秒）
+HISTOGRAM_MIN = 1e-6
+
+# 相邻桶边界的相对增长率
+HISTOGRAM_PRECISION = 0.01
+
+_LOG_GROWTH = math.log1p(HISTOGRAM_PRECISION)
+_LOG_MIN = math.log(HISTOGRAM_MIN)
+
+
+def bucket_index(value: float) -> int:
+    """计算响应时间所在的桶序号
+
+    Args:
+        value: 响应时间（秒）
+
+    Returns:
+        桶序号
+    """
+    if value <= HISTOGRAM_MIN:
+        return 0
+    return int((math.log(value) - _LOG_MIN) / _LOG_GROWTH) + 1
+
+
+def bucket_value(index: int) -> float:
+    """桶的代表值（几何中点，秒）
+
+    Args:
+        index: 桶序号
+
+    Returns:
+        代表值，桶0为0
+    """
+    if index <= 0:
+        return 0.0
+    return HISTOGRAM_MIN * math.exp((index - 0.5) * _LOG_GROWTH)
+
+
+def bucket_upper(index: int) -> float:
+    """桶的上边界（秒）"""
+    return HISTOGRAM_MIN * math.exp(max(index, 0) * _LOG_GROWTH)
+
+
+def bucket_lower(index: int) -> float:
+    """桶的下边界（秒），桶0为0"""
+    return bucket_upper(index - 1) if index > 0 else 0.0
+
+
+class LatencyHistogram:
+    """响应时间直方图
+
+    只保存非空桶的计数，可增量添加、合并和序列化，
+    用于流式统计、历史存储和基于直方图的置信区间
+    """
+
+    def __init__(self, counts: Dict[int, int] = None):
+        """初始化直方图
+
+        Args:
+            counts: 初始桶计数 {桶序号: 次数}
+        """
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+
+    def add(self, value: float, count: int = 1):
+        """添加响应时间
+
+        Args:
+            value: 响应时间（秒）
+            count: 次数
+        """
+        index = bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+
+    def extend(self, values: Iterable[float]):
+        """批量添加响应时间"""
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """合并另一个直方图（原地修改并返回自身）"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        return self
+
+    def rank_index(self, rank: int) -> Optional[int]:
+        """第rank小（从1开始）的值所在的桶序号
+
+        Args:
+            rank: 名次，超出范围时取最近的有效名次
+
+        Returns:
+            桶序号，直方图为空时返回None
+        """
+        if self.total == 0:
+            return None
+
+        rank = min(max(rank, 1), self.total)
+        cumulative = 0
+        for index in sorted(self.counts):
+            cumulative += self.counts[index]
+            if cumulative >= rank:
+                return index
+        return None
+
+    def rank_value(self, rank: int) -> Optional[float]:
+        """第rank小（从1开始）的值所在桶的代表值
+
+        Args:
+            rank: 名次
+
+        Returns:
+            代表值，直方图为空时返回None
+        """
+        index = self.rank_index(rank)
+        return bucket_value(index) if index is not None else None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """百分位数（最近秩法）
+
+        Args:
+            p: 百分位（0-100）
+
+        Returns:
+            百分位数（秒），直方图为空时返回None
+        """
+        if self.total == 0:
+            return None
+        return self.rank_value(math.ceil(p / 100 * self.total))
+
+    def mean(self) -> Optional[float]:
+        """按桶代表值估算的平均值"""
+        if self.total == 0:
+            return None
+        return sum(bucket_value(i) * c for i, c in self.counts.items()) / self.total
+
+    def to_dict(self) -> Dict[str, int]:
+        """序列化为 {桶序号字符串: 次数}，便于JSON存储"""
+        return {str(index): count for index, count in sorted(self.counts.items())}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, int]) -> 'LatencyHistogram':
+        """由 to_dict() 的结果还原"""
+        return cls({int(index): int(count) for index, count in (data or {}).items()})
+
+    def __len__(self) -> int:
+        return self.total
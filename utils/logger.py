@@ -1,48 +1,283 @@
-"""日志工具"""
+"""日志工具
+
+get_logger 返回的日志器在第一次记录日志时才配置日志系统（读取配置、创建日志文件、启动写入线程），
+只导入模块的脚本和子进程不会产生这些开销
+"""
+import itertools
 import logging
+import queue
 import sys
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Dict
 from loguru import logger
 
-from config.settings import settings
+# 文件日志格式
+FILE_LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+
+
+@dataclass
+class LoadLogPolicy:
+    """压测日志策略
+
+    压测时每秒成千上万个请求，逐条格式化并写入请求头、参数和完整响应体
+    会占满CPU和磁盘，因此按用例采样并截断大字段
+
+    Attributes:
+        sample_rate: 采样率，每个用例每N个请求记录1个（1表示全部记录）
+        max_body_chars: 响应体等大字段的最大字符数，超出部分截断
+        console_level: 控制台日志级别
+        file_level: 文件日志级别
+        queue_size: 异步写入队列长度，写满时丢弃日志而不阻塞请求线程
+    """
+    sample_rate: int = 1000
+    max_body_chars: int = 1024
+    console_level: str = "WARNING"
+    file_level: str = "INFO"
+    queue_size: int = 10000
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'LoadLogPolicy':
+        """从配置字典创建日志策略，忽略未知字段
+
+        Args:
+            config: 配置字典（config.yaml 中的 performance.logging）
+
+        Returns:
+            LoadLogPolicy 实例
+        """
+        config = config or {}
+        known = cls.__dataclass_fields__.keys()
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+
+class _AsyncFileWriter:
+    """非阻塞文件写入器
+
+    日志消息放入有界队列，由后台线程批量写入文件；
+    队列写满时直接丢弃并计数，保证请求线程不会被磁盘IO阻塞
+    """
+
+    _BATCH_SIZE = 1000
+
+    def __init__(self, path: str, queue_size: int = 10000):
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._file = open(path, 'a', encoding='utf-8', buffering=1 << 16)
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str):
+        """loguru sink：放入队列后立即返回"""
+        try:
+            self._queue.put_nowait(str(message))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # 尽量多取一些消息合并写入
+            while len(batch) < self._BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+                batch = [m for m in batch if m is not None]
+
+            self._file.write("".join(batch))
+            if self._queue.empty():
+                self._file.flush()
+
+    def close(self):
+        """写完队列中剩余的日志后关闭文件"""
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+
+
+class _LazyLogger:
+    """延迟配置的日志器
+
+    模块级的 logger = get_logger(__name__) 只创建本对象；第一次调用 info / debug / opt 等方法时
+    才执行 Logger.setup()，之后直接转发给绑定了名称的 loguru 日志器
+    """
+
+    __slots__ = ('_name', '_bound')
+
+    def __init__(self, name: str = None):
+        self._name = name
+        self._bound = None
+
+    def __getattr__(self, attr: str):
+        bound = self._bound
+        if bound is None:
+            Logger.ensure_setup()
+            bound = self._bound = logger.bind(name=self._name) if self._name else logger
+        return getattr(bound, attr)
 
 
 class Logger:
     """日志管理类"""
 
     _loggers = {}
+    _configured = False
+    _console = True  # 最近一次 setup 是否输出到控制台，退出压测日志模式时按此恢复
+    _setup_lock = threading.RLock()
+
+    # 压测日志模式
+    _load_policy: LoadLogPolicy = None
+    _load_writer: _AsyncFileWriter = None
+    _sample_counters: Dict[str, Any] = {}
 
     @classmethod
-    def setup(cls):
-        """配置日志系统"""
-        # 移除默认的handler
-        logger.remove()
-
-        # loguru格式字符串
-        log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
-
-        # 添加控制台handler
-        logger.add(
-            sys.stdout,
-            format=log_format,
-            level=settings.log_level,
-            colorize=True,
-            enqueue=True
-        )
-
-        # 添加文件handler
+    def setup(cls, console: bool = True):
+        """配置日志系统
+
+        Args:
+            console: 是否输出到控制台，基准测试等场景可关闭以免控制台输出干扰计时
+        """
+        from config.settings import settings
+
+        # 持有锁直到handler安装完成，其他线程的首次日志调用（ensure_setup）在此等待
+        with cls._setup_lock:
+            # 移除默认的handler
+            logger.remove()
+
+            # loguru格式字符串
+            log_format = "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+
+            # 添加控制台handler
+            if console:
+                logger.add(
+                    sys.stdout,
+                    format=log_format,
+                    level=settings.log_level,
+                    colorize=True,
+                    enqueue=True
+                )
+
+            # 添加文件handler
+            log_file = Path(settings.log_file)
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+
+            logger.add(
+                log_file,
+                format=FILE_LOG_FORMAT,
+                level="DEBUG",  # 文件记录所有级别
+                rotation="10 MB",  # 日志文件大小达到10MB时轮转
+                retention="7 days",  # 保留7天的日志
+                encoding="utf-8",
+                enqueue=True
+            )
+
+            cls._console = console
+            cls._configured = True
+
+    @classmethod
+    def ensure_setup(cls):
+        """尚未配置日志系统时按默认方式配置（线程安全，只执行一次）"""
+        if cls._configured:
+            return
+        with cls._setup_lock:
+            if not cls._configured:
+                cls.setup()
+
+    @classmethod
+    def enable_load_mode(cls, policy: LoadLogPolicy = None):
+        """切换到压测日志模式
+
+        控制台和文件日志提高级别，文件日志改为非阻塞写入，
+        并启用按用例采样（见 should_log）和大字段截断（见 truncate）
+
+        Args:
+            policy: 压测日志策略，默认使用 LoadLogPolicy()
+        """
+        if cls._load_policy is not None:
+            cls.disable_load_mode()
+
+        from config.settings import settings
+
+        policy = policy or LoadLogPolicy()
         log_file = Path(settings.log_file)
         log_file.parent.mkdir(parents=True, exist_ok=True)
 
-        logger.add(
-            log_file,
-            format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-            level="DEBUG",  # 文件记录所有级别
-            rotation="10 MB",  # 日志文件大小达到10MB时轮转
-            retention="7 days",  # 保留7天的日志
-            encoding="utf-8",
-            enqueue=True
-        )
+        with cls._setup_lock:
+            logger.remove()
+            # 常规配置关闭了控制台输出时（如基准测试），压测模式同样不输出到控制台
+            if cls._console:
+                logger.add(
+                    sys.stdout,
+                    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan> - <level>{message}</level>",
+                    level=policy.console_level,
+                    colorize=True,
+                    enqueue=True
+                )
+            writer = _AsyncFileWriter(str(log_file), policy.queue_size)
+            logger.add(writer.write, format=FILE_LOG_FORMAT, level=policy.file_level)
+
+            cls._load_writer = writer
+            cls._sample_counters = {}
+            cls._load_policy = policy
+            cls._configured = True
+
+    @classmethod
+    def disable_load_mode(cls):
+        """退出压测日志模式，恢复常规日志配置"""
+        if cls._load_policy is None:
+            return
+
+        writer = cls._load_writer
+        cls._load_policy = None
+        cls._load_writer = None
+
+        cls.setup(console=cls._console)
+        writer.close()
+        if writer.dropped:
+            logger.warning(f"压测期间日志队列已满，丢弃了 {writer.dropped} 条日志")
+
+    @classmethod
+    def should_log(cls, key: str) -> bool:
+        """判断本次请求是否需要记录详细日志
+
+        常规模式下始终返回True；压测模式下按key（通常为用例ID）计数，
+        每 sample_rate 个请求返回一次True（每个key的第一个请求总会记录）
+
+        Args:
+            key: 采样键
+
+        Returns:
+            是否记录
+        """
+        policy = cls._load_policy
+        if policy is None or policy.sample_rate <= 1:
+            return True
+
+        counter = cls._sample_counters.get(key)
+        if counter is None:
+            counter = cls._sample_counters.setdefault(key, itertools.count())
+        return next(counter) % policy.sample_rate == 0
+
+    @classmethod
+    def truncate(cls, value: Any) -> str:
+        """压测模式下截断过长的日志字段
+
+        Args:
+            value: 要记录的值
+
+        Returns:
+            字符串形式，超过 max_body_chars 时截断并注明原长度
+        """
+        text = str(value)
+        policy = cls._load_policy
+        if policy is None or policy.max_body_chars <= 0 or len(text) <= policy.max_body_chars:
+            return text
+        return f"{text[:policy.max_body_chars]}...(共{len(text)}字符，已截断)"
 
     @classmethod
     def get_logger(cls, name: str = None):
@@ -52,15 +287,13 @@ class Logger:
             name: 日志器名称
 
         Returns:
-            logger实例
+            logger实例（第一次记录日志时才配置日志系统）
         """
-        if not cls._loggers:
-            cls.setup()
-
-        # 使用loguru的logger
-        if name:
-            return logger.bind(name=name)
-        return logger
+        # 同名日志器共用一个实例
+        bound = cls._loggers.get(name)
+        if bound is None:
+            bound = cls._loggers.setdefault(name, _LazyLogger(name))
+        return bound
 
 
 def get_logger(name: str = None):
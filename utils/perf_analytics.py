@@ -0,0 +1,310 @@
+"""性能测试结果分析 - 基于NumPy的向量化统计
+
+一次遍历全部采样，同时计算全局和每个用例的:
+    次数、成功数、最小/最大/平均值、标准差、任意百分位数、TPS、直方图，
+以及按秒汇总的吞吐量和平均响应时间
+
+百分位数基于对数分桶直方图（见 utils/histogram.py）按最近秩法计算，
+相对误差不超过 HISTOGRAM_PRECISION / 2；最小/最大/平均值和标准差为精确值
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.histogram import HISTOGRAM_MIN, HISTOGRAM_PRECISION, LatencyHistogram, bucket_index
+
+# 默认计算的百分位
+DEFAULT_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+_LOG_GROWTH = math.log1p(HISTOGRAM_PRECISION)
+_LOG_MIN = math.log(HISTOGRAM_MIN)
+
+
+@dataclass
+class MetricSummary:
+    """一组采样的统计指标（响应时间单位为秒）"""
+
+    count: int = 0
+    success_count: int = 0
+    min: float = 0.0
+    max: float = 0.0
+    mean: float = 0.0
+    std: float = 0.0
+    percentiles: Dict[float, float] = field(default_factory=dict)
+    tps: float = 0.0
+
+    @property
+    def failure_count(self) -> int:
+        return self.count - self.success_count
+
+    @property
+    def success_rate(self) -> float:
+        """成功率（0-1）"""
+        return self.success_count / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> float:
+        """获取已计算的百分位数
+
+        Args:
+            p: 百分位（0-100），需包含在分析时指定的百分位中
+
+        Returns:
+            百分位数（秒）
+        """
+        return self.percentiles.get(float(p), 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典，百分位以 p50、p99.9 形式作为键"""
+        data = {
+            'count': self.count,
+            'success_count': self.success_count,
+            'success_rate': self.success_rate,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'std': self.std,
+            'tps': self.tps
+        }
+        for p, value in self.percentiles.items():
+            data[f"p{p:g}"] = value
+        return data
+
+
+@dataclass
+class AnalyticsReport:
+    """性能测试结果分析报告
+
+    Attributes:
+        overall: 全局指标
+        cases: 每个用例的指标 {用例ID: MetricSummary}
+        per_second: 按秒汇总 {'second', 'count', 'success', 'tps', 'error_rate', 'mean'}，每项为等长列表
+        duration: 用于计算TPS的测试时长（秒）
+    """
+    overall: MetricSummary
+    cases: Dict[str, MetricSummary]
+    per_second: Dict[str, List[float]]
+    duration: float = 0.0
+
+    # 直方图计数: 每行一个用例，列为从 _bucket_offset 开始的连续桶
+    _case_ids: List[str] = field(default_factory=list, repr=False)
+    _case_counts: Any = field(default=None, repr=False)
+    _bucket_offset: int = field(default=0, repr=False)
+
+    @property
+    def histogram(self) -> LatencyHistogram:
+        """全局响应时间直方图"""
+        if self._case_counts is None:
+            return LatencyHistogram()
+        return self._to_histogram(self._case_counts.sum(axis=0))
+
+    def case_histogram(self, case_id: str) -> LatencyHistogram:
+        """单个用例的响应时间直方图（按需构建）"""
+        if self._case_counts is None or case_id not in self._case_ids:
+            return LatencyHistogram()
+        return self._to_histogram(self._case_counts[self._case_ids.index(case_id)])
+
+    def _to_histogram(self, counts) -> LatencyHistogram:
+        nonzero = np.nonzero(counts)[0]
+        return LatencyHistogram(dict(zip((nonzero + self._bucket_offset).tolist(),
+                                         counts[nonzero].tolist())))
+
+
+def _bucket_indices(latencies: np.ndarray) -> np.ndarray:
+    """向量化计算桶序号（与 utils.histogram.bucket_index 一致）"""
+    # 原地运算，避免为1000万级采样反复分配临时数组
+    scaled = np.maximum(latencies, HISTOGRAM_MIN)
+    np.log(scaled, out=scaled)
+    scaled -= _LOG_MIN
+    scaled /= _LOG_GROWTH
+    indices = scaled.astype(np.int64)
+    indices += 1
+    indices[latencies <= HISTOGRAM_MIN] = 0
+    return indices
+
+
+def _bucket_values(indices: np.ndarray) -> np.ndarray:
+    """向量化计算桶代表值（与 utils.histogram.bucket_value 一致）"""
+    values = HISTOGRAM_MIN * np.exp((indices - 0.5) * _LOG_GROWTH)
+    return np.where(indices > 0, values, 0.0)
+
+
+def _percentiles_from_counts(counts: np.ndarray, totals: np.ndarray, offset: int,
+                             percentiles: Sequence[float]) -> np.ndarray:
+    """由直方图计数按最近秩法计算百分位数
+
+    Args:
+        counts: 二维计数数组（每行一组）
+        totals: 每组的总数
+        offset: 第0列对应的桶序号
+        percentiles: 百分位列表
+
+    Returns:
+        形状为 (组数, 百分位数) 的数组
+    """
+    cumulative = np.cumsum(counts, axis=1)
+    result = np.empty((counts.shape[0], len(percentiles)))
+    for i, p in enumerate(percentiles):
+        rank = np.maximum(np.ceil(totals * (p / 100.0)), 1)
+        column = (cumulative < rank[:, None]).sum(axis=1)
+        result[:, i] = _bucket_values(column + offset)
+    return result
+
+
+def analyze_arrays(latencies, case_indices, successes, case_ids: List[str],
+                   timestamps=None, duration: float = 0.0,
+                   percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> AnalyticsReport:
+    """对采样数组做一次向量化分析
+
+    Args:
+        latencies: 响应时间数组（秒）
+        case_indices: 每个采样的用例序号（对应 case_ids）
+        successes: 每个采样是否成功
+        case_ids: 用例ID列表
+        timestamps: 每个采样相对测试开始的时间（秒，可选），用于按秒汇总
+        duration: 测试时长（秒），为0时由 timestamps 推算
+        percentiles: 需要计算的百分位
+
+    Returns:
+        AnalyticsReport: 分析报告
+    """
+    latencies = np.asarray(latencies, dtype=np.float64)
+    case_indices = np.asarray(case_indices, dtype=np.intp)
+    successes = np.asarray(successes).astype(bool, copy=False)
+    percentiles = [float(p) for p in percentiles]
+    n_cases = len(case_ids)
+
+    if latencies.size == 0:
+        return AnalyticsReport(overall=MetricSummary(), cases={}, per_second={}, duration=duration)
+
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not duration and timestamps.size:
+            duration = float(timestamps.max())
+
+    # 每个用例的次数、成功数、总和、平方和
+    counts = np.bincount(case_indices, minlength=n_cases)
+    success_counts = np.bincount(case_indices, weights=successes, minlength=n_cases).astype(np.int64)
+    sums = np.bincount(case_indices, weights=latencies, minlength=n_cases)
+    squares = np.bincount(case_indices, weights=latencies * latencies, minlength=n_cases)
+
+    mins = np.full(n_cases, np.inf)
+    maxs = np.full(n_cases, -np.inf)
+    np.minimum.at(mins, case_indices, latencies)
+    np.maximum.at(maxs, case_indices, latencies)
+    overall_min = float(mins.min())
+    overall_max = float(maxs.max())
+
+    # 二维直方图: 用例 × 桶（桶范围由全局最小/最大值确定）
+    offset = bucket_index(overall_min)
+    width = bucket_index(overall_max) - offset + 1
+    keys = _bucket_indices(latencies)
+    keys -= offset
+    keys += case_indices * width
+    case_counts = np.bincount(keys, minlength=n_cases * width).reshape(n_cases, width)
+
+    present = counts > 0
+    safe_counts = np.where(present, counts, 1)
+    means = sums / safe_counts
+    stds = np.sqrt(np.maximum(squares / safe_counts - means * means, 0.0))
+    case_percentiles = np.clip(
+        _percentiles_from_counts(case_counts, counts, offset, percentiles),
+        np.where(present, mins, 0.0)[:, None], np.where(present, maxs, 0.0)[:, None]
+    )
+
+    total = int(latencies.size)
+    overall_mean = float(sums.sum() / total)
+    overall_percentiles = np.clip(
+        _percentiles_from_counts(case_counts.sum(axis=0)[None, :], np.array([total]), offset, percentiles)[0],
+        overall_min, overall_max
+    )
+    overall = MetricSummary(
+        count=total,
+        success_count=int(success_counts.sum()),
+        min=overall_min,
+        max=overall_max,
+        mean=overall_mean,
+        std=float(math.sqrt(max(squares.sum() / total - overall_mean * overall_mean, 0.0))),
+        percentiles=dict(zip(percentiles, overall_percentiles.tolist())),
+        tps=float(success_counts.sum() / duration) if duration > 0 else 0.0
+    )
+
+    cases = {}
+    rows = zip(case_ids, counts.tolist(), success_counts.tolist(), mins.tolist(), maxs.tolist(),
+               means.tolist(), stds.tolist(), case_percentiles.tolist())
+    for case_id, count, success, lo, hi, mean, std, values in rows:
+        if not count:
+            continue
+        cases[case_id] = MetricSummary(
+            count=count,
+            success_count=success,
+            min=lo,
+            max=hi,
+            mean=mean,
+            std=std,
+            percentiles=dict(zip(percentiles, values)),
+            tps=success / duration if duration > 0 else 0.0
+        )
+
+    return AnalyticsReport(
+        overall=overall,
+        cases=cases,
+        per_second=_per_second_rollup(latencies, successes, timestamps),
+        duration=duration,
+        _case_ids=list(case_ids),
+        _case_counts=case_counts,
+        _bucket_offset=offset
+    )
+
+
+def _per_second_rollup(latencies: np.ndarray, successes: np.ndarray,
+                       timestamps: Optional[np.ndarray]) -> Dict[str, List[float]]:
+    """按秒汇总吞吐量、错误率和平均响应时间"""
+    if timestamps is None or timestamps.size != latencies.size:
+        return {}
+
+    seconds = timestamps.astype(np.int64)
+    np.maximum(seconds, 0, out=seconds)
+    counts = np.bincount(seconds)
+    success = np.bincount(seconds, weights=successes, minlength=counts.size).astype(np.int64)
+    sums = np.bincount(seconds, weights=latencies, minlength=counts.size)
+    safe_counts = np.where(counts > 0, counts, 1)
+
+    return {
+        'second': np.arange(counts.size).tolist(),
+        'count': counts.tolist(),
+        'success': success.tolist(),
+        'tps': success.astype(np.float64).tolist(),
+        'error_rate': np.where(counts > 0, (counts - success) / safe_counts, 0.0).tolist(),
+        'mean': np.where(counts > 0, sums / safe_counts, 0.0).tolist()
+    }
+
+
+def analyze(result, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> AnalyticsReport:
+    """分析性能测试结果
+
+    直接读取 PerformanceResult 中基于数组的采样（零拷贝）
+
+    Args:
+        result: PerformanceResult 实例
+        percentiles: 需要计算的百分位
+
+    Returns:
+        AnalyticsReport: 分析报告
+    """
+    latencies = np.frombuffer(result.response_times, dtype=np.float64) \
+        if len(result.response_times) else np.empty(0)
+    case_indices = np.frombuffer(result.case_indices, dtype=np.uint32) \
+        if len(result.case_indices) else np.empty(0, dtype=np.uint32)
+    successes = np.frombuffer(result.successes, dtype=np.uint8) \
+        if len(result.successes) else np.empty(0, dtype=np.uint8)
+    timestamps = np.frombuffer(result.timestamps, dtype=np.float64) \
+        if len(result.timestamps) == len(result.response_times) and len(result.timestamps) else None
+
+    return analyze_arrays(
+        latencies, case_indices, successes, result.case_ids,
+        timestamps=timestamps,
+        duration=result.actual_duration,
+        percentiles=percentiles
+    )
@@ -0,0 +1,253 @@
+"""性能回归对比 - 判断本次运行相对基线是否存在统计显著的性能回退
+
+响应时间: 对两次运行的响应时间直方图做 Mann-Whitney U 检验（正态近似，含并列校正），
+          显著（p < alpha）且中位数或P95的相对变化超过 min_change 时判定为回退
+TPS:      对逐秒TPS序列做 Welch t 检验（正态近似），显著且下降幅度超过 min_change 时判定为回退
+
+用例数很多时，即使没有回退也会有部分用例偶然达到显著，因此用例级别的p值按 Holm-Bonferroni 方法
+在所有参与检验的用例之间校正后再与 alpha 比较；全局指标各只有一次检验，不做校正
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.histogram import LatencyHistogram
+from utils.run_history import RunSnapshot
+
+# 显著性水平
+DEFAULT_ALPHA = 0.01
+
+# 判定为回退的最小相对变化
+DEFAULT_MIN_CHANGE = 0.1
+
+# 参与检验的最少样本数（请求数或秒数）
+MIN_SAMPLES = 20
+
+
+@dataclass
+class MetricChange:
+    """单个指标相对基线的变化
+
+    Attributes:
+        metric: 指标名称（latency_p50 / latency_p95 / tps）
+        case_id: 用例ID，全局指标为None
+        baseline: 基线值
+        current: 本次值
+        change: 相对变化（(本次 - 基线) / 基线）
+        p_value: 显著性检验的p值（用例指标为 Holm 校正后的p值），样本不足时为None
+        regression: 是否判定为回退
+    """
+    metric: str
+    case_id: Optional[str]
+    baseline: float
+    current: float
+    change: float
+    p_value: Optional[float]
+    regression: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'metric': self.metric,
+            'case_id': self.case_id,
+            'baseline': self.baseline,
+            'current': self.current,
+            'change': self.change,
+            'p_value': self.p_value,
+            'regression': self.regression
+        }
+
+
+@dataclass
+class ComparisonResult:
+    """回归对比结果"""
+    baseline_label: str
+    alpha: float
+    min_change: float
+    changes: List[MetricChange] = field(default_factory=list)
+
+    @property
+    def regressions(self) -> List[MetricChange]:
+        """判定为回退的指标"""
+        return [c for c in self.changes if c.regression]
+
+    @property
+    def has_regression(self) -> bool:
+        return any(c.regression for c in self.changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（只包含判定为回退的指标，全部指标见HTML报告）"""
+        regressions = self.regressions
+        return {
+            'baseline': self.baseline_label,
+            'alpha': self.alpha,
+            'min_change': self.min_change,
+            'compared_metrics': len(self.changes),
+            'regression_count': len(regressions),
+            'regressions': [c.to_dict() for c in regressions]
+        }
+
+
+def mann_whitney(current: LatencyHistogram, baseline: LatencyHistogram) -> Tuple[float, float]:
+    """对两个直方图做 Mann-Whitney U 检验
+
+    同一个桶内的值视为并列，按平均秩计算
+
+    Args:
+        current: 本次运行的直方图
+        baseline: 基线直方图
+
+    Returns:
+        (本次大于基线的概率, 双侧p值)
+    """
+    n1, n2 = current.total, baseline.total
+    if not n1 or not n2:
+        return 0.5, 1.0
+
+    rank = 0
+    rank_sum = 0.0
+    tie_term = 0.0
+    for index in sorted(set(current.counts) | set(baseline.counts)):
+        c1 = current.counts.get(index, 0)
+        tied = c1 + baseline.counts.get(index, 0)
+        rank_sum += c1 * (rank + (tied + 1) / 2)
+        tie_term += tied ** 3 - tied
+        rank += tied
+
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return u / (n1 * n2), 1.0
+
+    z = (u - n1 * n2 / 2) / math.sqrt(variance)
+    return u / (n1 * n2), math.erfc(abs(z) / math.sqrt(2))
+
+
+def welch_test(current: List[float], baseline: List[float]) -> float:
+    """Welch t 检验（大样本正态近似）
+
+    Args:
+        current: 本次样本
+        baseline: 基线样本
+
+    Returns:
+        双侧p值
+    """
+    n1, n2 = len(current), len(baseline)
+    if n1 < 2 or n2 < 2:
+        return 1.0
+
+    m1, m2 = sum(current) / n1, sum(baseline) / n2
+    v1 = sum((x - m1) ** 2 for x in current) / (n1 - 1)
+    v2 = sum((x - m2) ** 2 for x in baseline) / (n2 - 1)
+    se = math.sqrt(v1 / n1 + v2 / n2)
+    if se == 0:
+        return 0.0 if m1 != m2 else 1.0
+    return math.erfc(abs(m1 - m2) / se / math.sqrt(2))
+
+
+def holm_adjust(p_values: List[Optional[float]]) -> List[Optional[float]]:
+    """Holm-Bonferroni 多重比较校正
+
+    Args:
+        p_values: 原始p值，None（样本不足，未检验）不参与校正
+
+    Returns:
+        与输入一一对应的校正后p值，与 alpha 直接比较即可控制总体错误率
+    """
+    ordered = sorted((p, i) for i, p in enumerate(p_values) if p is not None)
+    m = len(ordered)
+    adjusted = list(p_values)
+    running = 0.0
+    for rank, (p, i) in enumerate(ordered):
+        # 校正后的p值单调不减
+        running = max(running, min(1.0, (m - rank) * p))
+        adjusted[i] = running
+    return adjusted
+
+
+def _latency_p_value(current: LatencyHistogram, baseline: LatencyHistogram) -> Optional[float]:
+    """响应时间分布的 Mann-Whitney 检验p值，样本不足时为None"""
+    if current.total < MIN_SAMPLES or baseline.total < MIN_SAMPLES:
+        return None
+    return mann_whitney(current, baseline)[1]
+
+
+def _relative(current: float, baseline: float) -> float:
+    return (current - baseline) / baseline if baseline else 0.0
+
+
+def _compare_latency(case_id: Optional[str], current: LatencyHistogram, baseline: LatencyHistogram,
+                     p_value: Optional[float], alpha: float, min_change: float) -> List[MetricChange]:
+    """对比响应时间分布，中位数和P95各产生一条记录（p_value 为两次运行分布差异的p值）"""
+    changes = []
+    for metric, p in (('latency_p50', 50), ('latency_p95', 95)):
+        base_value = baseline.percentile(p) or 0.0
+        cur_value = current.percentile(p) or 0.0
+        change = _relative(cur_value, base_value)
+        changes.append(MetricChange(
+            metric=metric,
+            case_id=case_id,
+            baseline=base_value,
+            current=cur_value,
+            change=change,
+            p_value=p_value,
+            regression=p_value is not None and p_value < alpha and change >= min_change
+        ))
+    return changes
+
+
+def _steady_tps(per_second_tps: List[float]) -> List[float]:
+    """去掉最后一秒（通常不完整）"""
+    return per_second_tps[:-1] if len(per_second_tps) > 1 else list(per_second_tps)
+
+
+def compare_runs(current: RunSnapshot, baseline: RunSnapshot,
+                 alpha: float = DEFAULT_ALPHA,
+                 min_change: float = DEFAULT_MIN_CHANGE) -> ComparisonResult:
+    """对比本次运行与基线
+
+    Args:
+        current: 本次运行快照
+        baseline: 基线快照（单次运行或合并后的滚动窗口）
+        alpha: 显著性水平
+        min_change: 判定为回退的最小相对变化
+
+    Returns:
+        ComparisonResult: 对比结果，全局指标在前，用例按回退优先、变化幅度从大到小排序
+    """
+    comparison = ComparisonResult(baseline_label=baseline.label, alpha=alpha, min_change=min_change)
+
+    # 全局TPS
+    current_tps = _steady_tps(current.per_second_tps)
+    baseline_tps = _steady_tps(baseline.per_second_tps)
+    enough = len(current_tps) >= MIN_SAMPLES and len(baseline_tps) >= MIN_SAMPLES
+    p_value = welch_test(current_tps, baseline_tps) if enough else None
+    tps_change = _relative(current.tps, baseline.tps)
+    comparison.changes.append(MetricChange(
+        metric='tps',
+        case_id=None,
+        baseline=baseline.tps,
+        current=current.tps,
+        change=tps_change,
+        p_value=p_value,
+        regression=p_value is not None and p_value < alpha and -tps_change >= min_change
+    ))
+
+    # 全局响应时间
+    comparison.changes.extend(_compare_latency(
+        None, current.histogram, baseline.histogram,
+        _latency_p_value(current.histogram, baseline.histogram), alpha, min_change
+    ))
+
+    # 用例响应时间（只对比两边都有的用例），p值在所有用例之间做 Holm 校正
+    pairs = [(case_id, case.histogram, baseline.cases[case_id].histogram)
+             for case_id, case in current.cases.items() if case_id in baseline.cases]
+    p_values = holm_adjust([_latency_p_value(cur, base) for _, cur, base in pairs])
+    case_changes = []
+    for (case_id, cur, base), p_value in zip(pairs, p_values):
+        case_changes.extend(_compare_latency(case_id, cur, base, p_value, alpha, min_change))
+    case_changes.sort(key=lambda c: (not c.regression, -c.change))
+    comparison.changes.extend(case_changes)
+
+    return comparison
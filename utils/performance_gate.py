@@ -0,0 +1,433 @@
+"""性能门禁 - 基于置信区间评估所有配置的性能指标
+
+每条门禁规则对应一个指标和阈值，评估时先计算指标的点估计和置信区间:
+    响应时间百分位: 基于直方图的顺序统计量区间（取桶边界，偏保守）
+    平均响应时间:   均值 ± z·标准差/√n
+    成功率/错误率:  Wilson 区间
+    TPS:           按统计区间的TPS均值 ± z·标准差/√k，区间不足时按泊松近似
+    区间稳定性:     按统计区间（interval 秒）计算的最差值或变异系数，无置信区间
+
+结论:
+    通过:   置信区间完全满足阈值
+    失败:   置信区间完全违反阈值
+    不确定: 置信区间跨越阈值（样本不足以下结论），strict 模式下视为失败
+"""
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.histogram import LatencyHistogram, bucket_lower, bucket_upper
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+GATE_PASS = 'pass'
+GATE_FAIL = 'fail'
+GATE_INCONCLUSIVE = 'inconclusive'
+
+GATE_STATUS_LABELS = {
+    GATE_PASS: '通过',
+    GATE_FAIL: '失败',
+    GATE_INCONCLUSIVE: '不确定',
+}
+
+# 阈值为下限的指标（实际值不得低于阈值），其余指标阈值为上限
+LOWER_BOUND_METRICS = {'success_rate', 'tps', 'min_interval_tps'}
+
+# 指标的显示名称（百分位指标 pNN_time 动态生成）
+METRIC_LABELS = {
+    'avg_time': '平均响应时间（秒）',
+    'max_time': '最大响应时间（秒）',
+    'success_rate': '成功率',
+    'error_rate': '错误率',
+    'tps': 'TPS',
+    'tps_cv': '区间TPS变异系数',
+    'min_interval_tps': '最低区间TPS',
+    'max_interval_error_rate': '最高区间错误率',
+}
+
+_PERCENTILE_METRIC = re.compile(r'^p(\d+(?:\.\d+)?)_time$')
+_CONFIG_PERCENTILE_KEY = re.compile(r'^response_time_p(\d+(?:\.\d+)?)$')
+
+
+def metric_label(metric: str) -> str:
+    """指标的显示名称"""
+    match = _PERCENTILE_METRIC.match(metric)
+    if match:
+        return f"P{match.group(1)}响应时间（秒）"
+    return METRIC_LABELS.get(metric, metric)
+
+
+def is_supported_metric(metric: str) -> bool:
+    """是否为门禁支持的指标"""
+    return metric in METRIC_LABELS or bool(_PERCENTILE_METRIC.match(metric))
+
+
+def percentile_interval(histogram: LatencyHistogram, q: float, z: float) -> Tuple[float, float, float]:
+    """百分位数的顺序统计量置信区间（取桶边界，偏保守）
+
+    Args:
+        histogram: 响应时间直方图（非空）
+        q: 分位（0-1）
+        z: 正态分布临界值
+
+    Returns:
+        (点估计, 区间下限, 区间上限)
+    """
+    n = histogram.total
+    center = n * q
+    spread = z * math.sqrt(n * q * (1 - q))
+    low_index = histogram.rank_index(math.floor(center - spread))
+    high_index = histogram.rank_index(math.ceil(center + spread) + 1)
+    return histogram.percentile(q * 100), bucket_lower(low_index), bucket_upper(high_index)
+
+
+@dataclass
+class GateRule:
+    """门禁规则
+
+    Attributes:
+        metric: 指标名称（avg_time、p95_time、success_rate、error_rate、tps 等）
+        limit: 阈值（响应时间单位为秒，比率为0-1）
+        case_id: 用例ID，为None时针对全局
+        source: 规则来源（config / excel）
+    """
+    metric: str
+    limit: float
+    case_id: Optional[str] = None
+    source: str = 'config'
+
+    @property
+    def lower_bound(self) -> bool:
+        """阈值是否为下限"""
+        return self.metric in LOWER_BOUND_METRICS
+
+    def describe(self) -> str:
+        scope = self.case_id or '全局'
+        operator = '≥' if self.lower_bound else '≤'
+        return f"[{scope}] {metric_label(self.metric)} {operator} {self.limit:g}"
+
+
+@dataclass
+class GateResult:
+    """单条门禁规则的评估结果"""
+    rule: GateRule
+    status: str
+    estimate: Optional[float] = None
+    ci_low: Optional[float] = None
+    ci_high: Optional[float] = None
+    samples: int = 0
+    message: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'case_id': self.rule.case_id,
+            'metric': self.rule.metric,
+            'limit': self.rule.limit,
+            'lower_bound': self.rule.lower_bound,
+            'source': self.rule.source,
+            'status': self.status,
+            'estimate': self.estimate,
+            'ci_low': self.ci_low,
+            'ci_high': self.ci_high,
+            'samples': self.samples,
+            'message': self.message
+        }
+
+
+@dataclass
+class GateReport:
+    """门禁评估报告"""
+    confidence: float
+    strict: bool
+    results: List[GateResult] = field(default_factory=list)
+
+    @property
+    def failures(self) -> List[GateResult]:
+        """未通过的规则（strict 模式下包含不确定的规则）"""
+        failed = {GATE_FAIL, GATE_INCONCLUSIVE} if self.strict else {GATE_FAIL}
+        return [r for r in self.results if r.status in failed]
+
+    @property
+    def passed(self) -> bool:
+        return not self.failures
+
+    def counts(self) -> Dict[str, int]:
+        """各结论的规则数"""
+        counts = {GATE_PASS: 0, GATE_FAIL: 0, GATE_INCONCLUSIVE: 0}
+        for r in self.results:
+            counts[r.status] += 1
+        return counts
+
+    def summary(self) -> str:
+        """文本摘要（每条规则一行）"""
+        counts = self.counts()
+        lines = [
+            f"性能门禁: 共 {len(self.results)} 条规则，通过 {counts[GATE_PASS]}，"
+            f"失败 {counts[GATE_FAIL]}，不确定 {counts[GATE_INCONCLUSIVE]}"
+            f"（置信水平 {self.confidence:.0%}{'，严格模式' if self.strict else ''}）"
+        ]
+        for r in self.results:
+            estimate = '-' if r.estimate is None else f"{r.estimate:.4g}"
+            interval = '' if r.ci_low is None else f" [{r.ci_low:.4g}, {r.ci_high:.4g}]"
+            lines.append(f"  {GATE_STATUS_LABELS[r.status]:<4} {r.rule.describe()}: "
+                         f"{estimate}{interval}（n={r.samples}）{r.message}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'passed': self.passed,
+            'confidence': self.confidence,
+            'strict': self.strict,
+            'counts': self.counts(),
+            'results': [r.to_dict() for r in self.results]
+        }
+
+
+class GateEngine:
+    """性能门禁评估引擎"""
+
+    def __init__(self, confidence: float = 0.95, interval: int = 5, strict: bool = False):
+        """初始化门禁引擎
+
+        Args:
+            confidence: 置信水平（0-1）
+            interval: 稳定性统计区间（秒）
+            strict: 是否将不确定的规则视为失败
+        """
+        self.confidence = confidence
+        self.interval = max(1, int(interval))
+        self.strict = strict
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self.logger = logger
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any] = None) -> 'GateEngine':
+        """从配置创建（config.yaml 中的 performance.gate）"""
+        config = config or {}
+        return cls(
+            confidence=config.get('confidence', 0.95),
+            interval=config.get('interval', 5),
+            strict=config.get('strict', False)
+        )
+
+    @staticmethod
+    def rules_from_config(thresholds: Dict[str, Any]) -> List[GateRule]:
+        """由 config.yaml 的 performance.thresholds 生成全局规则
+
+        响应时间阈值（response_time_avg、response_time_pNN、response_time_max）单位为毫秒，
+        其余键与指标名称一致
+
+        Args:
+            thresholds: 阈值配置
+
+        Returns:
+            规则列表
+        """
+        rules = []
+        for key, value in (thresholds or {}).items():
+            if value is None:
+                continue
+            match = _CONFIG_PERCENTILE_KEY.match(key)
+            if match:
+                rules.append(GateRule(f"p{match.group(1)}_time", value / 1000.0))
+            elif key in ('response_time_avg', 'response_time_max'):
+                rules.append(GateRule(key.replace('response_time_', '') + '_time', value / 1000.0))
+            elif is_supported_metric(key):
+                rules.append(GateRule(key, float(value)))
+            else:
+                logger.warning(f"未知的性能阈值配置，已忽略: {key}")
+        return rules
+
+    @staticmethod
+    def rules_from_case(case: Any) -> List[GateRule]:
+        """由测试用例的最大响应时间列和性能配置列生成用例级别规则
+
+        Args:
+            case: 测试用例
+
+        Returns:
+            规则列表（性能配置无法解析时只记录警告，不生成阈值规则）
+        """
+        rules = []
+        max_response_time = getattr(case, 'max_response_time', 0) or 0
+        if max_response_time > 0:
+            rules.append(GateRule('avg_time', max_response_time / 1000.0, case.case_id, 'excel'))
+
+        perf_config = getattr(case, 'performance_config', '') or '{}'
+        try:
+            thresholds = json.loads(perf_config).get('thresholds', {}) or {}
+            if not isinstance(thresholds, dict):
+                raise TypeError(f"thresholds 应为对象，实际为 {type(thresholds).__name__}")
+        except (json.JSONDecodeError, AttributeError, TypeError) as e:
+            logger.warning(f"用例 {case.case_id} 性能配置解析失败，已忽略其中的阈值: {e}")
+            return rules
+
+        for metric, value in thresholds.items():
+            if not is_supported_metric(metric):
+                logger.warning(f"用例 {case.case_id} 未知的性能阈值，已忽略: {metric}")
+                continue
+            try:
+                rules.append(GateRule(metric, float(value), case.case_id, 'excel'))
+            except (TypeError, ValueError):
+                logger.warning(f"用例 {case.case_id} 性能阈值不是数值，已忽略: {metric}={value!r}")
+        return rules
+
+    def evaluate(self, result, rules: List[GateRule]) -> GateReport:
+        """评估门禁规则
+
+        Args:
+            result: PerformanceResult（需先调用 calculate_statistics）
+            rules: 门禁规则
+
+        Returns:
+            GateReport: 评估报告
+        """
+        report = GateReport(confidence=self.confidence, strict=self.strict)
+        histograms: Dict[Optional[str], LatencyHistogram] = {}
+
+        for rule in rules:
+            try:
+                estimate, low, high, samples = self._estimate(result, rule, histograms)
+            except _NoData as e:
+                report.results.append(GateResult(rule, GATE_INCONCLUSIVE, message=str(e)))
+                continue
+
+            report.results.append(GateResult(
+                rule=rule,
+                status=self._verdict(rule, estimate, low, high),
+                estimate=estimate,
+                ci_low=low,
+                ci_high=high,
+                samples=samples
+            ))
+
+        for r in report.failures:
+            self.logger.warning(f"性能门禁未通过: {r.rule.describe()}，实际 {r.estimate}")
+        return report
+
+    @staticmethod
+    def _verdict(rule: GateRule, estimate: float, low: Optional[float], high: Optional[float]) -> str:
+        if low is None or high is None:
+            low = high = estimate
+
+        if rule.lower_bound:
+            if low >= rule.limit:
+                return GATE_PASS
+            return GATE_FAIL if high < rule.limit else GATE_INCONCLUSIVE
+
+        if high <= rule.limit:
+            return GATE_PASS
+        return GATE_FAIL if low > rule.limit else GATE_INCONCLUSIVE
+
+    # ==================== 指标估计 ====================
+
+    def _estimate(self, result, rule: GateRule,
+                  histograms: Dict[Optional[str], LatencyHistogram]
+                  ) -> Tuple[float, Optional[float], Optional[float], int]:
+        """计算指标的点估计和置信区间
+
+        Returns:
+            (点估计, 区间下限, 区间上限, 样本数)，没有置信区间的指标区间为None
+        """
+        analytics = result.analytics
+        if analytics is None:
+            raise _NoData("没有采样数据")
+
+        summary = analytics.overall if rule.case_id is None else analytics.cases.get(rule.case_id)
+        if summary is None or summary.count == 0:
+            raise _NoData("用例未执行")
+
+        n = summary.count
+        metric = rule.metric
+        match = _PERCENTILE_METRIC.match(metric)
+
+        if match:
+            histogram = histograms.get(rule.case_id)
+            if histogram is None:
+                histogram = analytics.histogram if rule.case_id is None \
+                    else analytics.case_histogram(rule.case_id)
+                histograms[rule.case_id] = histogram
+            return percentile_interval(histogram, float(match.group(1)) / 100, self.z) + (n,)
+
+        if metric == 'avg_time':
+            margin = self.z * summary.std / math.sqrt(n)
+            return summary.mean, max(summary.mean - margin, 0.0), summary.mean + margin, n
+
+        if metric == 'max_time':
+            return summary.max, None, None, n
+
+        if metric in ('success_rate', 'error_rate'):
+            low, high = self._wilson(summary.success_count, n)
+            if metric == 'success_rate':
+                return summary.success_rate, low, high, n
+            return 1 - summary.success_rate, 1 - high, 1 - low, n
+
+        if metric == 'tps':
+            return self._tps_interval(result, summary)
+
+        # 区间稳定性指标（仅全局）
+        windows = self._interval_windows(analytics.per_second)
+        if not windows:
+            raise _NoData(f"测试时长不足一个统计区间（{self.interval}秒）")
+        tps_values = [success / self.interval for _, success in windows]
+
+        if metric == 'tps_cv':
+            mean = sum(tps_values) / len(tps_values)
+            std = math.sqrt(sum((x - mean) ** 2 for x in tps_values) / len(tps_values))
+            return (std / mean if mean else 0.0), None, None, len(windows)
+        if metric == 'min_interval_tps':
+            return min(tps_values), None, None, len(windows)
+        if metric == 'max_interval_error_rate':
+            return max((count - success) / count if count else 0.0 for count, success in windows), \
+                None, None, len(windows)
+
+        raise _NoData(f"不支持的指标: {metric}")
+
+    def _wilson(self, successes: int, n: int) -> Tuple[float, float]:
+        """Wilson 比例置信区间"""
+        z2 = self.z ** 2
+        p = successes / n
+        center = (p + z2 / (2 * n)) / (1 + z2 / n)
+        margin = self.z * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+        return max(center - margin, 0.0), min(center + margin, 1.0)
+
+    def _tps_interval(self, result, summary) -> Tuple[float, float, float, int]:
+        """TPS置信区间
+
+        全局TPS在统计区间足够时使用区间TPS的波动，否则（以及用例TPS）按泊松近似
+        """
+        duration = result.actual_duration or result.analytics.duration
+        if duration <= 0:
+            raise _NoData("测试时长为0")
+
+        tps = summary.success_count / duration
+        if summary is result.analytics.overall:
+            windows = self._interval_windows(result.analytics.per_second)
+            if len(windows) >= 3:
+                values = [success / self.interval for _, success in windows]
+                mean = sum(values) / len(values)
+                std = math.sqrt(sum((x - mean) ** 2 for x in values) / (len(values) - 1))
+                margin = self.z * std / math.sqrt(len(values))
+                return tps, max(tps - margin, 0.0), tps + margin, len(windows)
+
+        margin = self.z * math.sqrt(summary.success_count) / duration
+        return tps, max(tps - margin, 0.0), tps + margin, summary.count
+
+    def _interval_windows(self, per_second: Dict[str, List[float]]) -> List[Tuple[int, int]]:
+        """将逐秒汇总按统计区间合并为 [(请求数, 成功数)]，去掉最后不完整的区间"""
+        counts = per_second.get('count', [])
+        successes = per_second.get('success', [])
+        # 最后一秒通常不完整
+        full_seconds = max(len(counts) - 1, 0)
+        return [
+            (sum(counts[i:i + self.interval]), sum(successes[i:i + self.interval]))
+            for i in range(0, full_seconds - self.interval + 1, self.interval)
+        ]
+
+
+class _NoData(Exception):
+    """指标缺少数据，无法评估"""
@@ -1,190 +1,465 @@
 """性能测试报告生成器"""
+import html
+import io
 import json
+from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, TextIO, Tuple
 
 from utils.logger import get_logger
-from core.performance_executor import PerformanceResult
+from core.performance_executor import PerformanceResult, TIMING_PHASES
+from utils.perf_compare import ComparisonResult, compare_runs, DEFAULT_ALPHA, DEFAULT_MIN_CHANGE
+from utils.run_history import RunHistory, RunSnapshot
+from utils.performance_gate import GateReport, GATE_STATUS_LABELS, metric_label
+from core.capacity_search import CapacityResult
 
 logger = get_logger(__name__)
 
+# 客户端耗时分解各阶段的显示名称和颜色
+TIMING_PHASE_STYLES = {
+    'build': ('构建请求', '#9C27B0'),
+    'connect': ('TCP连接', '#3F51B5'),
+    'tls': ('TLS握手', '#03A9F4'),
+    'ttfb': ('首字节(TTFB)', '#4CAF50'),
+    'download': ('下载响应体', '#8BC34A'),
+    'decode': ('解析响应体', '#FFC107'),
+    'assert': ('断言', '#FF5722'),
+    'extract': ('数据提取', '#795548'),
+}
 
-class PerformanceReporter:
-    """性能测试报告生成器
-
-    生成 HTML 格式的性能测试报告
-    """
-
-    def __init__(self, output_dir: str = "reports/performance"):
-        """初始化报告生成器
-
-        Args:
-            output_dir: 报告输出目录
-        """
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.logger = logger
+# 回归对比中指标的显示名称
+COMPARISON_METRIC_LABELS = {
+    'tps': 'TPS（每秒）',
+    'latency_p50': 'P50响应时间（秒）',
+    'latency_p95': 'P95响应时间（秒）',
+}
 
-    def generate_html_report(self, result: PerformanceResult,
-                            test_config: Dict[str, Any] = None) -> str:
-        """生成 HTML 性能报告
+# 容量曲线中各响应时间指标的显示名称和颜色
+CAPACITY_LATENCY_SERIES = (
+    ('p50_time', 'P50', '#4CAF50'),
+    ('p95_time', 'P95', '#FF9800'),
+    ('p99_time', 'P99', '#F44336'),
+)
 
-        Args:
-            result: 性能测试结果
-            test_config: 测试配置信息
+# HTML表格默认每页行数
+DEFAULT_PAGE_SIZE = 100
 
-        Returns:
-            报告文件路径
-        """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_file = self.output_dir / f"perf_report_{timestamp}.html"
-
-        # 生成 HTML 内容
-        html_content = self._generate_html_content(result, test_config)
-
-        # 写入文件
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+# 客户端耗时分解最多展示的用例数（按平均总耗时从高到低）
+TIMING_TOP_CASES = 20
 
-        self.logger.info(f"性能报告已生成: {report_file}")
-        return str(report_file)
-
-    def _generate_html_content(self, result: PerformanceResult,
-                               test_config: Dict[str, Any] = None) -> str:
-        """生成 HTML 内容
-
-        Args:
-            result: 性能测试结果
-            test_config: 测试配置
-
-        Returns:
-            HTML 内容
-        """
-        # 计算成功率
-        success_rate = (result.success_count / result.total_requests * 100) if result.total_requests > 0 else 0
-
-        html = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>性能测试报告</title>
-    <style>
-        body {{
+# HTML报告的公共样式
+_REPORT_STYLE = """
+        body {
             font-family: 'Microsoft YaHei', Arial, sans-serif;
             margin: 0;
             padding: 20px;
             background-color: #f5f5f5;
-        }}
-        .container {{
+        }
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background-color: white;
             padding: 30px;
             border-radius: 8px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }}
-        h1 {{
+        }
+        h1 {
             color: #333;
             text-align: center;
             border-bottom: 3px solid #4CAF50;
             padding-bottom: 10px;
-        }}
-        h2 {{
+        }
+        h2 {
             color: #555;
             border-left: 4px solid #4CAF50;
             padding-left: 10px;
             margin-top: 30px;
-        }}
-        .summary {{
+        }
+        .summary {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             margin: 20px 0;
-        }}
-        .metric-card {{
+        }
+        .metric-card {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 20px;
             border-radius: 8px;
             box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-        }}
-        .metric-card.success {{
+        }
+        .metric-card.success {
             background: linear-gradient(135deg, #11998e 0%, #38ef7d 100%);
-        }}
-        .metric-card.warning {{
+        }
+        .metric-card.warning {
             background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-        }}
-        .metric-label {{
+        }
+        .metric-label {
             font-size: 14px;
             opacity: 0.9;
             margin-bottom: 5px;
-        }}
-        .metric-value {{
+        }
+        .metric-value {
             font-size: 32px;
             font-weight: bold;
-        }}
-        .metric-unit {{
+        }
+        .metric-unit {
             font-size: 14px;
             opacity: 0.8;
-        }}
-        table {{
+        }
+        table {
             width: 100%;
             border-collapse: collapse;
             margin: 20px 0;
-        }}
-        th, td {{
+        }
+        th, td {
             padding: 12px;
             text-align: left;
             border-bottom: 1px solid #ddd;
-        }}
-        th {{
+        }
+        th {
             background-color: #4CAF50;
             color: white;
             font-weight: bold;
-        }}
-        tr:hover {{
+        }
+        tr:hover {
             background-color: #f5f5f5;
-        }}
-        .status-pass {{
+        }
+        .status-pass {
             color: #4CAF50;
             font-weight: bold;
-        }}
-        .status-fail {{
+        }
+        .status-fail {
             color: #f44336;
             font-weight: bold;
-        }}
-        .progress-bar {{
+        }
+        .progress-bar {
             width: 100%;
             background-color: #f0f0f0;
             border-radius: 4px;
             overflow: hidden;
-        }}
-        .progress-fill {{
+        }
+        .progress-fill {
             height: 20px;
             background: linear-gradient(90deg, #4CAF50 0%, #8BC34A 100%);
             transition: width 0.3s ease;
-        }}
-        .config-info {{
+        }
+        .config-info {
             background-color: #f9f9f9;
             padding: 15px;
             border-radius: 4px;
             margin: 20px 0;
-        }}
-        .timestamp {{
+        }
+        .stacked-bar {
+            display: flex;
+            width: 100%;
+            height: 20px;
+            border-radius: 4px;
+            overflow: hidden;
+            background-color: #f0f0f0;
+        }
+        .stacked-bar span {
+            display: block;
+            height: 100%;
+        }
+        .legend span {
+            display: inline-block;
+            margin-right: 15px;
+            font-size: 13px;
+        }
+        .legend i {
+            display: inline-block;
+            width: 12px;
+            height: 12px;
+            margin-right: 4px;
+            vertical-align: middle;
+        }
+        .alert-warning {
+            background-color: #fff3e0;
+            border-left: 4px solid #ff9800;
+            color: #e65100;
+            padding: 15px;
+            border-radius: 4px;
+            margin: 20px 0;
+        }
+        table.paged th {
+            cursor: pointer;
+            user-select: none;
+        }
+        .table-search {
+            padding: 6px 10px;
+            width: 260px;
+            border: 1px solid #ddd;
+            border-radius: 4px;
+        }
+        .pager {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+            margin-bottom: 20px;
+            font-size: 13px;
+            color: #666;
+        }
+        .pager button {
+            padding: 4px 10px;
+            border: 1px solid #ddd;
+            background-color: white;
+            border-radius: 4px;
+            cursor: pointer;
+        }
+        .pager button:disabled {
+            color: #ccc;
+            cursor: default;
+        }
+        .timestamp {
             text-align: right;
             color: #999;
             font-size: 12px;
             margin-top: 10px;
-        }}
-    </style>
+        }
+"""
+
+# 分页表格的前端渲染脚本: 行数据以JSON内嵌，按页渲染，支持排序和按首列搜索
+_PAGED_TABLE_SCRIPT = """
+    <script>
+    (function () {
+        var FORMATS = {
+            text: function (v) { return String(v); },
+            int: function (v) { return String(v); },
+            sec: function (v) { return v.toFixed(3) + ' 秒'; },
+            pct: function (v) { return v.toFixed(2) + '%'; },
+            num: function (v) { return v.toFixed(3); },
+            change: function (v) { return (v > 0 ? '+' : '') + (v * 100).toFixed(1) + '%'; },
+            pvalue: function (v) { return v === null ? '-' : v.toExponential(2); },
+            flag: function (v) { return v ? '回退' : ''; },
+            est: function (v) { return v === null ? '-' : String(Number(v.toPrecision(4))); }
+        };
+        document.querySelectorAll('table.paged').forEach(function (table) {
+            var rows = JSON.parse(document.getElementById(table.id + '-data').textContent);
+            var formats = table.dataset.formats.split(',');
+            var classes = (table.dataset.classes || '').split(',');
+            var pageSize = parseInt(table.dataset.pageSize, 10) || 100;
+            var tbody = table.tBodies[0];
+            var pager = document.querySelector('.pager[data-table="' + table.id + '"]');
+            var search = document.querySelector('.table-search[data-table="' + table.id + '"]');
+            var view = rows, page = 0, sortColumn = -1, sortDesc = false;
+
+            function button(label, target, disabled) {
+                var el = document.createElement('button');
+                el.textContent = label;
+                el.disabled = disabled;
+                el.onclick = function () { page = target; render(); };
+                return el;
+            }
+
+            function render() {
+                var pages = Math.max(1, Math.ceil(view.length / pageSize));
+                page = Math.max(0, Math.min(page, pages - 1));
+                var fragment = document.createDocumentFragment();
+                view.slice(page * pageSize, (page + 1) * pageSize).forEach(function (row) {
+                    var tr = document.createElement('tr');
+                    row.forEach(function (value, i) {
+                        var td = document.createElement('td');
+                        td.textContent = FORMATS[formats[i]](value);
+                        if (classes[i]) { td.className = classes[i]; }
+                        tr.appendChild(td);
+                    });
+                    fragment.appendChild(tr);
+                });
+                tbody.replaceChildren(fragment);
+
+                var info = document.createElement('span');
+                info.textContent = '第 ' + (page + 1) + ' / ' + pages + ' 页，共 ' + view.length + ' 行';
+                pager.replaceChildren(
+                    button('« 首页', 0, page === 0),
+                    button('‹ 上一页', page - 1, page === 0),
+                    info,
+                    button('下一页 ›', page + 1, page >= pages - 1),
+                    button('末页 »', pages - 1, page >= pages - 1)
+                );
+            }
+
+            function sort() {
+                if (sortColumn < 0) { return; }
+                view.sort(function (a, b) {
+                    var x = a[sortColumn], y = b[sortColumn];
+                    var order = x < y ? -1 : (x > y ? 1 : 0);
+                    return sortDesc ? -order : order;
+                });
+            }
+
+            Array.prototype.forEach.call(table.tHead.rows[0].cells, function (th, i) {
+                th.onclick = function () {
+                    sortDesc = sortColumn === i ? !sortDesc : formats[i] !== 'text';
+                    sortColumn = i;
+                    if (view === rows) { view = rows.slice(); }
+                    sort();
+                    page = 0;
+                    render();
+                };
+            });
+
+            if (search) {
+                search.oninput = function () {
+                    var keyword = search.value.trim().toLowerCase();
+                    view = keyword ? rows.filter(function (row) {
+                        return String(row[0]).toLowerCase().indexOf(keyword) >= 0;
+                    }) : rows.slice();
+                    sort();
+                    page = 0;
+                    render();
+                };
+            }
+
+            render();
+        });
+    })();
+    </script>
+"""
+
+
+class PerformanceReporter:
+    """性能测试报告生成器
+
+    生成 HTML 和 JSON 格式的性能测试报告，可选另存逐请求原始采样。
+    报告边生成边写入文件；用例和错误表在HTML中分页渲染，JSON中只保存每个用例的汇总指标
+    """
+
+    def __init__(self, output_dir: str = "reports/performance", page_size: int = DEFAULT_PAGE_SIZE):
+        """初始化报告生成器
+
+        Args:
+            output_dir: 报告输出目录
+            page_size: HTML表格每页行数
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.page_size = max(1, page_size)
+        self.logger = logger
+
+    def compare_with_history(self, result: PerformanceResult, history: RunHistory, env: str,
+                             baseline_run_id: int = None, window: int = 1,
+                             alpha: float = DEFAULT_ALPHA,
+                             min_change: float = DEFAULT_MIN_CHANGE) -> Optional[ComparisonResult]:
+        """对比模式：将本次结果与历史基线对比，找出统计显著的性能回退
+
+        需在把本次结果写入历史库之前调用，否则默认基线会包含本次运行
+
+        Args:
+            result: 性能测试结果
+            history: 历史记录库
+            env: 环境名称
+            baseline_run_id: 基线运行ID，为None时使用该环境最近的运行
+            window: 未指定基线时合并最近几次运行作为滚动窗口基线
+            alpha: 显著性水平
+            min_change: 判定为回退的最小相对变化
+
+        Returns:
+            ComparisonResult，没有可用基线时返回None
+        """
+        baseline = history.baseline(env, run_id=baseline_run_id, window=window)
+        if baseline is None:
+            self.logger.info("历史库中没有可对比的基线运行，跳过回归对比")
+            return None
+
+        comparison = compare_runs(RunSnapshot.from_result(result), baseline, alpha, min_change)
+        for change in comparison.regressions:
+            target = change.case_id or '全局'
+            self.logger.warning(
+                f"性能回退 [{target}] {COMPARISON_METRIC_LABELS.get(change.metric, change.metric)}: "
+                f"{change.baseline:.3f} -> {change.current:.3f} ({change.change * 100:+.1f}%, p={change.p_value:.2e})"
+            )
+        self.logger.info(f"与 {baseline.label} 对比完成，发现 {len(comparison.regressions)} 项显著回退")
+        return comparison
+
+    def generate_html_report(self, result: PerformanceResult,
+                            test_config: Dict[str, Any] = None,
+                            comparison: ComparisonResult = None,
+                            gates: GateReport = None) -> str:
+        """生成 HTML 性能报告
+
+        Args:
+            result: 性能测试结果
+            test_config: 测试配置信息
+            comparison: 回归对比结果（可选，见 compare_with_history）
+            gates: 性能门禁评估报告（可选，见 utils/performance_gate.py）
+
+        Returns:
+            报告文件路径
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_file = self.output_dir / f"perf_report_{timestamp}.html"
+
+        # 边生成边写入文件
+        with open(report_file, 'w', encoding='utf-8') as f:
+            self._write_html_content(f, result, test_config, comparison, gates)
+
+        self.logger.info(f"性能报告已生成: {report_file}")
+        return str(report_file)
+
+    def _generate_html_content(self, result: PerformanceResult,
+                               test_config: Dict[str, Any] = None,
+                               comparison: ComparisonResult = None,
+                               gates: GateReport = None) -> str:
+        """生成 HTML 内容
+
+        Args:
+            result: 性能测试结果
+            test_config: 测试配置
+            comparison: 回归对比结果（可选）
+            gates: 性能门禁评估报告（可选）
+
+        Returns:
+            HTML 内容
+        """
+        buffer = io.StringIO()
+        self._write_html_content(buffer, result, test_config, comparison, gates)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _write_html_head(out: TextIO, title: str):
+        """写出 HTML 文档头（公共样式）
+
+        Args:
+            out: 输出流
+            title: 页面标题
+        """
+        out.write(f"""
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{title}</title>
+    <style>
+{_REPORT_STYLE}    </style>
 </head>
+""")
+
+    def _write_html_content(self, out: TextIO, result: PerformanceResult,
+                            test_config: Dict[str, Any] = None,
+                            comparison: ComparisonResult = None,
+                            gates: GateReport = None):
+        """逐段写出 HTML 内容
+
+        Args:
+            out: 输出流
+            result: 性能测试结果
+            test_config: 测试配置
+            comparison: 回归对比结果（可选）
+            gates: 性能门禁评估报告（可选）
+        """
+        # 计算成功率
+        success_rate = (result.success_count / result.total_requests * 100) if result.total_requests > 0 else 0
+
+        self._write_html_head(out, "性能测试报告")
+        out.write(f"""
 <body>
     <div class="container">
         <h1>🚀 性能测试报告</h1>
-
+{self._generate_reliability_alert(result)}
+{self._generate_stop_alert(result)}
         <!-- 测试概要 -->
         <h2>📊 测试概要</h2>
         <div class="summary">
@@ -259,77 +534,68 @@ class PerformanceReporter:
             </div>
         </div>
 
+""")
+
+        # 用例级别统计（分页表格）
+        case_metrics = result.analytics.cases if result.analytics else {}
+        out.write("""
         <!-- 用例级别统计 -->
         <h2>📋 用例级别统计</h2>
-        <table>
-            <tr>
-                <th>用例ID</th>
-                <th>执行次数</th>
-                <th>成功次数</th>
-                <th>失败次数</th>
-                <th>平均响应时间</th>
-                <th>最大响应时间</th>
-                <th>成功率</th>
-            </tr>
-"""
+""")
+        self._write_paged_table(
+            out, 'case-table',
+            columns=[('用例ID', 'text', ''), ('执行次数', 'int', ''), ('成功次数', 'int', 'status-pass'),
+                     ('失败次数', 'int', 'status-fail'), ('平均响应时间', 'sec', ''), ('P95', 'sec', ''),
+                     ('P99', 'sec', ''), ('最大响应时间', 'sec', ''), ('成功率', 'pct', '')],
+            rows=self._case_rows(result.case_stats, case_metrics),
+            searchable=True
+        )
 
-        # 添加每个用例的统计信息
-        for case_id, case_stat in result.case_stats.items():
-            case_total = case_stat['count']
-            case_success = case_stat['success_count']
-            case_fail = case_total - case_success
-            case_response_times = case_stat['response_times']
+        # 场景事务统计
+        if result.transactions is not None:
+            self._write_transaction_section(out, result.transactions)
 
-            if case_response_times:
-                case_avg_time = sum(case_response_times) / len(case_response_times)
-                case_max_time = max(case_response_times)
-            else:
-                case_avg_time = 0
-                case_max_time = 0
+        # 客户端耗时分解
+        if result.timing_count:
+            out.write(self._generate_timing_section(result))
 
-            case_success_rate = (case_success / case_total * 100) if case_total > 0 else 0
+        # 连接缓存
+        if result.connection_stats:
+            out.write(self._generate_connection_section(result))
 
-            html += f"""
-            <tr>
-                <td>{case_id}</td>
-                <td>{case_total}</td>
-                <td class="status-pass">{case_success}</td>
-                <td class="status-fail">{case_fail}</td>
-                <td>{case_avg_time:.3f} 秒</td>
-                <td>{case_max_time:.3f} 秒</td>
-                <td>{case_success_rate:.2f}%</td>
-            </tr>
-"""
+        # 压测机健康度
+        if result.generator_health is not None:
+            out.write(self._generate_health_section(result))
 
-        html += """
-        </table>
+        # 性能门禁
+        if gates is not None:
+            self._write_gate_section(out, gates)
 
-        <!-- 错误统计 -->
-        """
+        # 回归对比
+        if comparison is not None:
+            self._write_comparison_section(out, comparison)
+
+        # 错误分类
+        if result.error_details is not None and result.error_details.categories:
+            out.write(self._generate_error_category_section(result))
 
+        # 错误统计（分页表格，按次数从高到低）
         if result.errors:
-            html += """
+            out.write("""
+        <!-- 错误统计 -->
         <h2>❌ 错误统计</h2>
-        <table>
-            <tr>
-                <th>错误类型</th>
-                <th>次数</th>
-            </tr>
-"""
-            for error_msg, count in result.errors.items():
-                html += f"""
-            <tr>
-                <td>{error_msg}</td>
-                <td>{count}</td>
-            </tr>
-"""
-            html += """
-        </table>
-"""
+""")
+            self._write_paged_table(
+                out, 'error-table',
+                columns=[('错误类型', 'text', ''), ('次数', 'int', '')],
+                rows=sorted(([msg, count] for msg, count in result.errors.items()),
+                            key=lambda row: row[1], reverse=True),
+                searchable=len(result.errors) > self.page_size
+            )
 
         # 测试配置信息
         if test_config:
-            html += f"""
+            out.write(f"""
         <!-- 测试配置 -->
         <h2>⚙️ 测试配置</h2>
         <div class="config-info">
@@ -337,27 +603,419 @@ class PerformanceReporter:
             <p><strong>测试时长:</strong> {test_config.get('duration', 'N/A')} 秒</p>
             <p><strong>启动时间:</strong> {test_config.get('ramp_up', 'N/A')} 秒</p>
         </div>
-"""
+""")
 
         # 时间戳
-        html += f"""
+        out.write(f"""
         <div class="timestamp">
             报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         </div>
     </div>
+{_PAGED_TABLE_SCRIPT}
 </body>
 </html>
+""")
+
+    def _write_comparison_section(self, out: TextIO, comparison: ComparisonResult):
+        """写出回归对比部分
+
+        Args:
+            out: 输出流
+            comparison: 回归对比结果
+        """
+        regressions = comparison.regressions
+        if regressions:
+            verdict = f'<span class="status-fail">发现 {len(regressions)} 项统计显著的性能回退</span>'
+        else:
+            verdict = '<span class="status-pass">未发现统计显著的性能回退</span>'
+
+        out.write(f"""
+        <!-- 回归对比 -->
+        <h2>📉 回归对比</h2>
+        <p>基线: {html.escape(comparison.baseline_label)}，{verdict}
+           （显著性水平 {comparison.alpha}，最小变化 {comparison.min_change * 100:.0f}%）</p>
+""")
+        self._write_paged_table(
+            out, 'comparison-table',
+            columns=[('指标', 'text', ''), ('用例ID', 'text', ''), ('基线', 'num', ''), ('本次', 'num', ''),
+                     ('变化', 'change', ''), ('p值', 'pvalue', ''), ('结论', 'flag', 'status-fail')],
+            rows=(
+                [COMPARISON_METRIC_LABELS.get(c.metric, c.metric), c.case_id or '全局',
+                 c.baseline, c.current, c.change, c.p_value, c.regression]
+                for c in comparison.changes
+            ),
+            searchable=False
+        )
+
+    def _write_transaction_section(self, out: TextIO, transactions: PerformanceResult):
+        """写出场景事务统计部分
+
+        Args:
+            out: 输出流
+            transactions: 事务统计（PerformanceResult.transactions）
+        """
+        out.write(f"""
+        <!-- 场景事务统计 -->
+        <h2>🔗 场景事务统计</h2>
+        <p>每个场景的一次完整执行为一个事务（任一步骤失败即事务失败），耗时不含步骤之间的思考时间。
+           共 {transactions.total_requests} 个事务，TPS {transactions.tps:.2f}</p>
+""")
+        txn_metrics = transactions.analytics.cases if transactions.analytics else {}
+        self._write_paged_table(
+            out, 'transaction-table',
+            columns=[('场景', 'text', ''), ('执行次数', 'int', ''), ('成功次数', 'int', 'status-pass'),
+                     ('失败次数', 'int', 'status-fail'), ('平均耗时', 'sec', ''), ('P95', 'sec', ''),
+                     ('P99', 'sec', ''), ('最大耗时', 'sec', ''), ('成功率', 'pct', ''), ('TPS', 'num', '')],
+            rows=(
+                row + [txn_metrics[row[0]].tps if row[0] in txn_metrics else 0.0]
+                for row in self._case_rows(transactions.case_stats, txn_metrics)
+            ),
+            searchable=len(transactions.case_stats) > self.page_size
+        )
+
+    def _write_gate_section(self, out: TextIO, gates: GateReport):
+        """写出性能门禁部分
+
+        Args:
+            out: 输出流
+            gates: 性能门禁评估报告
+        """
+        counts = gates.counts()
+        if gates.passed:
+            verdict = '<span class="status-pass">性能门禁通过</span>'
+        else:
+            verdict = f'<span class="status-fail">{len(gates.failures)} 条门禁规则未通过</span>'
+
+        out.write(f"""
+        <!-- 性能门禁 -->
+        <h2>🚦 性能门禁</h2>
+        <p>{verdict}（共 {len(gates.results)} 条规则，通过 {counts['pass']}，失败 {counts['fail']}，
+           不确定 {counts['inconclusive']}；置信水平 {gates.confidence:.0%}{'，严格模式' if gates.strict else ''}）</p>
+""")
+        # 未通过的规则排在前面
+        order = {'fail': 0, 'inconclusive': 1, 'pass': 2}
+        self._write_paged_table(
+            out, 'gate-table',
+            columns=[('用例ID', 'text', ''), ('指标', 'text', ''), ('阈值', 'text', ''), ('实际值', 'est', ''),
+                     ('置信区间下限', 'est', ''), ('置信区间上限', 'est', ''), ('样本数', 'int', ''),
+                     ('结论', 'text', '')],
+            rows=(
+                [r.rule.case_id or '全局', metric_label(r.rule.metric),
+                 f"{'≥' if r.rule.lower_bound else '≤'} {r.rule.limit:g}",
+                 r.estimate, r.ci_low, r.ci_high, r.samples,
+                 GATE_STATUS_LABELS[r.status] + (f"（{r.message}）" if r.message else '')]
+                for r in sorted(gates.results, key=lambda r: order[r.status])
+            ),
+            searchable=len(gates.results) > self.page_size
+        )
+
+    @staticmethod
+    def _case_rows(case_stats: Dict[str, Dict[str, Any]],
+                   case_metrics: Dict[str, Any]) -> Iterable[List[Any]]:
+        """逐行生成用例统计表格数据"""
+        for case_id, case_stat in case_stats.items():
+            case_total = case_stat['count']
+            case_success = case_stat['success_count']
+            metrics = case_metrics.get(case_id)
+            yield [
+                case_id,
+                case_total,
+                case_success,
+                case_total - case_success,
+                metrics.mean if metrics else 0.0,
+                metrics.percentile(95) if metrics else 0.0,
+                metrics.percentile(99) if metrics else 0.0,
+                metrics.max if metrics else 0.0,
+                (case_success / case_total * 100) if case_total > 0 else 0.0
+            ]
+
+    def _write_paged_table(self, out: TextIO, table_id: str,
+                           columns: List[Tuple[str, str, str]],
+                           rows: Iterable[List[Any]], searchable: bool = False):
+        """写出分页表格
+
+        表格只包含表头，行数据以紧凑JSON内嵌在页面中，由前端脚本按页渲染，
+        数万行的表格也不会拖慢页面加载
+
+        Args:
+            out: 输出流
+            table_id: 表格ID
+            columns: 列定义 [(列名, 格式, CSS类)]，格式为 text/int/sec/pct
+            rows: 行数据（与列一一对应的原始值）
+            searchable: 是否显示按首列搜索的输入框
+        """
+        headers = "".join(f"<th>{title}</th>" for title, _, _ in columns)
+        formats = ",".join(fmt for _, fmt, _ in columns)
+        classes = ",".join(css for _, _, css in columns)
+
+        if searchable:
+            out.write(f"""
+        <input type="search" class="table-search" data-table="{table_id}" placeholder="搜索{columns[0][0]}">
+""")
+        out.write(f"""
+        <table id="{table_id}" class="paged" data-page-size="{self.page_size}"
+               data-formats="{formats}" data-classes="{classes}">
+            <thead><tr>{headers}</tr></thead>
+            <tbody></tbody>
+        </table>
+        <div class="pager" data-table="{table_id}"></div>
+        <script type="application/json" id="{table_id}-data">[""")
+
+        # 逐行写出，避免拼接整个数据块；转义 "</" 防止提前结束script标签
+        separator = "\n"
+        for row in rows:
+            out.write(separator)
+            out.write(json.dumps(row, ensure_ascii=False).replace("</", "<\\/"))
+            separator = ",\n"
+        out.write("\n]</script>\n")
+
+    def _generate_reliability_alert(self, result: PerformanceResult) -> str:
+        """生成结果不可信的警告（压测机自身成为瓶颈时）
+
+        Args:
+            result: 性能测试结果
+
+        Returns:
+            HTML 片段，结果可信时为空字符串
+        """
+        if result.reliable:
+            return ""
+
+        items = "".join(f"<li>{w}</li>" for w in result.generator_health.warnings)
+        return f"""
+        <div class="alert-warning">
+            <strong>⚠️ 本次测试结果可能不可信：压测机自身达到瓶颈，响应时间被客户端排队放大</strong>
+            <ul>{items}</ul>
+            <p>建议降低单机并发、增加压测机或使用多进程分布式压测后重新测试。</p>
+        </div>
 """
 
-        return html
+    def _generate_stop_alert(self, result: PerformanceResult) -> str:
+        """生成提前终止的提示
+
+        Args:
+            result: 性能测试结果
+
+        Returns:
+            HTML 片段，正常结束时为空字符串
+        """
+        if result.stop_rule is None:
+            return ""
+
+        title = '⛔ 测试被提前终止，以下为部分结果' if result.aborted else '✅ 结果已收敛，测试提前结束'
+        return f"""
+        <div class="alert-warning">
+            <strong>{title}</strong>
+            <p>{html.escape(result.stop_reason or '')}（实际运行 {result.actual_duration:.1f} 秒）</p>
+        </div>
+"""
+
+    def _generate_health_section(self, result: PerformanceResult) -> str:
+        """生成压测机健康度部分
+
+        Args:
+            result: 性能测试结果
+
+        Returns:
+            HTML 片段
+        """
+        health = result.generator_health
+        status = '<span class="status-pass">正常</span>' if health.reliable \
+            else '<span class="status-fail">饱和</span>'
+
+        return f"""
+        <!-- 压测机健康度 -->
+        <h2>🩺 压测机健康度</h2>
+        <table>
+            <tr>
+                <th>指标</th>
+                <th>值</th>
+                <th>说明</th>
+            </tr>
+            <tr>
+                <td>状态</td>
+                <td>{status}</td>
+                <td>共采样 {health.sample_count} 次，间隔 {health.interval:.1f} 秒</td>
+            </tr>
+            <tr>
+                <td>CPU占用（平均/峰值）</td>
+                <td>{health.cpu_avg:.1f}% / {health.cpu_max:.1f}%</td>
+                <td>占单核的百分比，本机共 {health.cpu_count} 核</td>
+            </tr>
+            <tr>
+                <td>GC暂停（总计/最大/占比）</td>
+                <td>{health.gc_pause_total_ms:.1f} ms / {health.gc_pause_max_ms:.1f} ms / {health.gc_pause_ratio * 100:.2f}%</td>
+                <td>共 {health.gc_collections} 次垃圾回收</td>
+            </tr>
+            <tr>
+                <td>线程池积压（平均/峰值）</td>
+                <td>{health.queue_depth_avg:.1f} / {health.queue_depth_max}</td>
+                <td>等待空闲线程的任务数</td>
+            </tr>
+            <tr>
+                <td>调度延迟（平均/P95/最大）</td>
+                <td>{health.lag_avg_ms:.1f} / {health.lag_p95_ms:.1f} / {health.lag_max_ms:.1f} ms</td>
+                <td>采样线程的唤醒延迟，反映GIL和CPU争用</td>
+            </tr>
+        </table>
+"""
+
+    def _generate_timing_section(self, result: PerformanceResult) -> str:
+        """生成客户端耗时分解部分（每个用例一条堆叠条）
+
+        Args:
+            result: 性能测试结果
+
+        Returns:
+            HTML 片段
+        """
+        legend = "".join(
+            f'<span><i style="background:{color}"></i>{label}</span>'
+            for label, color in (TIMING_PHASE_STYLES[p] for p in TIMING_PHASES)
+        )
+
+        # 只展示平均总耗时最高的若干用例，避免数千个用例时生成过长的表格
+        case_rows = [(case_id, result.average_timings(case_id)) for case_id in result.case_stats]
+        case_rows.sort(key=lambda row: sum(row[1].values()), reverse=True)
+        rows = [('全部请求', result.average_timings())] + case_rows[:TIMING_TOP_CASES]
+
+        note = f"（仅显示平均总耗时最高的 {TIMING_TOP_CASES} 个用例）" if len(case_rows) > TIMING_TOP_CASES else ""
+        parts = [f"""
+        <!-- 客户端耗时分解 -->
+        <h2>⏳ 客户端耗时分解</h2>
+        <p>每个请求的平均耗时按阶段拆分，构建请求、解析、断言和数据提取为客户端开销。{note}</p>
+        <div class="legend">{legend}</div>
+        <table>
+            <tr>
+                <th>用例ID</th>
+                <th style="width: 55%">耗时分解</th>
+                <th>平均总耗时</th>
+                <th>客户端开销</th>
+            </tr>
+"""]
+
+        for case_id, timings in rows:
+            total = sum(timings.values())
+            if total <= 0:
+                continue
+
+            client_time = sum(timings[p] for p in ('build', 'decode', 'assert', 'extract'))
+            segments = "".join(
+                f'<span style="width:{timings[p] / total * 100:.2f}%;background:{TIMING_PHASE_STYLES[p][1]}" '
+                f'title="{TIMING_PHASE_STYLES[p][0]}: {timings[p] * 1000:.2f} ms"></span>'
+                for p in TIMING_PHASES if timings[p] > 0
+            )
+
+            parts.append(f"""
+            <tr>
+                <td>{html.escape(str(case_id))}</td>
+                <td><div class="stacked-bar">{segments}</div></td>
+                <td>{total * 1000:.2f} ms</td>
+                <td>{client_time * 1000:.2f} ms ({client_time / total * 100:.1f}%)</td>
+            </tr>
+""")
+
+        parts.append("""
+        </table>
+""")
+        return "".join(parts)
+
+    @staticmethod
+    def _generate_connection_section(result: PerformanceResult) -> str:
+        """生成连接缓存部分（DNS缓存和TLS会话复用的命中情况）
+
+        Args:
+            result: 性能测试结果
+
+        Returns:
+            HTML 片段
+        """
+        rows = "".join(f"""
+            <tr>
+                <td>{label}</td>
+                <td>{stats['hits']}</td>
+                <td>{stats['misses']}</td>
+                <td>{stats['hit_rate'] * 100:.1f}%</td>
+            </tr>
+""" for name, label in (('dns', 'DNS解析缓存'), ('tls', 'TLS会话复用'))
+            for stats in [result.connection_stats.get(name)] if stats)
+
+        return f"""
+        <!-- 连接缓存 -->
+        <h2>🔁 连接缓存</h2>
+        <p>新建连接时的DNS解析缓存和TLS会话恢复情况，未命中即重新解析域名或完成一次完整的TLS握手。</p>
+        <table>
+            <tr>
+                <th>缓存</th>
+                <th>命中</th>
+                <th>未命中</th>
+                <th>命中率</th>
+            </tr>{rows}
+        </table>
+"""
+
+    @staticmethod
+    def _generate_error_category_section(result: PerformanceResult) -> str:
+        """生成错误分类部分（每个类别的次数、签名数、出现时间和最常见签名的示例）
+
+        Args:
+            result: 性能测试结果
+
+        Returns:
+            HTML 片段
+        """
+        details = result.error_details.to_dict()
+        total = result.error_details.total
+        rows = []
+        for category in details['categories'].values():
+            signatures = category['signatures']
+            top = signatures[0]
+            seen = [s[key] for s in signatures for key in ('first_seen', 'last_seen') if s[key] is not None]
+            window = f"{min(seen):.1f}s ~ {max(seen):.1f}s" if seen else '-'
+            exemplars = "<br>".join(html.escape(message) for message in top['exemplars'])
+            rows.append(f"""
+            <tr>
+                <td>{html.escape(category['label'])}</td>
+                <td>{category['count']}</td>
+                <td>{category['count'] / total * 100:.1f}%</td>
+                <td>{len(signatures)}</td>
+                <td>{window}</td>
+                <td>{html.escape(top['signature'])}<br><small>{exemplars}</small></td>
+            </tr>
+""")
+
+        return f"""
+        <!-- 错误分类 -->
+        <h2>🧭 错误分类</h2>
+        <p>失败请求按原因归类，每个类别内的错误信息去除URL、地址和数字后归并为签名，下方错误统计按签名列出。</p>
+        <table>
+            <tr>
+                <th>类别</th>
+                <th>次数</th>
+                <th>占比</th>
+                <th>签名数</th>
+                <th>出现时间</th>
+                <th>最常见签名及示例</th>
+            </tr>{"".join(rows)}
+        </table>
+"""
 
     def generate_json_report(self, result: PerformanceResult,
-                            test_config: Dict[str, Any] = None) -> str:
+                            test_config: Dict[str, Any] = None,
+                            raw_data_file: str = None,
+                            comparison: ComparisonResult = None,
+                            gates: GateReport = None) -> str:
         """生成 JSON 格式的性能报告
 
+        每个用例只保存汇总指标（次数、成功率、响应时间分布、耗时分解），
+        逐请求的原始采样见 generate_raw_data()
+
         Args:
             result: 性能测试结果
             test_config: 测试配置
+            raw_data_file: 原始采样文件路径（可选，写入报告以便关联）
+            comparison: 回归对比结果（可选）
+            gates: 性能门禁评估报告（可选）
 
         Returns:
             报告文件路径
@@ -365,7 +1023,7 @@ class PerformanceReporter:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         report_file = self.output_dir / f"perf_report_{timestamp}.json"
 
-        # 构建报告数据
+        # 构建报告概要（用例和错误明细在写入时逐条生成）
         report_data = {
             'timestamp': datetime.now().isoformat(),
             'test_config': test_config or {},
@@ -383,15 +1041,317 @@ class PerformanceReporter:
                 'avg': result.avg_time,
                 'median': result.median_time,
                 'p95': result.p95_time,
-                'p99': result.p99_time
+                'p99': result.p99_time,
+                'std': result.analytics.overall.std if result.analytics else 0.0
             },
-            'errors': result.errors,
-            'case_stats': result.case_stats
+            'timing_breakdown': result.average_timings(),
+            'connection_cache': result.connection_stats,
+            'error_categories': result.error_details.to_dict() if result.error_details is not None else None,
+            'transactions': {
+                'total': result.transactions.total_requests,
+                'success_count': result.transactions.success_count,
+                'tps': result.transactions.tps,
+                'errors': result.transactions.errors,
+                'scenarios': {
+                    name: metrics.to_dict()
+                    for name, metrics in (result.transactions.analytics.cases.items()
+                                          if result.transactions.analytics else ())
+                }
+            } if result.transactions is not None else None,
+            'reliable': result.reliable,
+            'early_stop': {
+                'rule': result.stop_rule,
+                'reason': result.stop_reason,
+                'aborted': result.aborted
+            } if result.stop_rule is not None else None,
+            'generator_health': asdict(result.generator_health) if result.generator_health else None,
+            'raw_data_file': raw_data_file,
+            'comparison': comparison.to_dict() if comparison is not None else None,
+            'gates': gates.to_dict() if gates is not None else None
         }
 
-        # 写入文件
         with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+            self._write_json_report(f, report_data, {
+                'errors': result.errors.items(),
+                'case_stats': self._case_summaries(result)
+            })
 
         self.logger.info(f"JSON报告已生成: {report_file}")
         return str(report_file)
+
+    @staticmethod
+    def _case_summaries(result: PerformanceResult) -> Iterable[Tuple[str, Dict[str, Any]]]:
+        """逐个生成用例的汇总指标"""
+        case_metrics = result.analytics.cases if result.analytics else {}
+        for case_id, case_stat in result.case_stats.items():
+            metrics = case_metrics.get(case_id)
+            summary = metrics.to_dict() if metrics else {
+                'count': case_stat['count'],
+                'success_count': case_stat['success_count']
+            }
+            if case_stat.get('timing_count'):
+                summary['timings'] = result.average_timings(case_id)
+            yield case_id, summary
+
+    @staticmethod
+    def _write_json_report(out: TextIO, report_data: Dict[str, Any],
+                           sections: Dict[str, Iterable[Tuple[str, Any]]]):
+        """流式写出 JSON 报告
+
+        概要部分保持缩进便于阅读，明细部分每个条目写为一行，
+        不需要在内存中构建完整的报告文档
+
+        Args:
+            out: 输出流
+            report_data: 报告概要
+            sections: 明细部分 {键: 可迭代的(名称, 值)}
+        """
+        out.write("{")
+        separator = "\n"
+        for key, value in report_data.items():
+            body = json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            out.write(f'{separator}  {json.dumps(key)}: {body}')
+            separator = ",\n"
+
+        for key, items in sections.items():
+            out.write(f'{separator}  {json.dumps(key)}: {{')
+            item_separator = "\n"
+            for name, value in items:
+                out.write(f'{item_separator}    {json.dumps(name, ensure_ascii=False)}: '
+                          f'{json.dumps(value, ensure_ascii=False)}')
+                item_separator = ",\n"
+            out.write("\n  }" if item_separator != "\n" else "}")
+            separator = ",\n"
+        out.write("\n}\n")
+
+    def generate_raw_data(self, result: PerformanceResult) -> Optional[str]:
+        """另存逐请求原始采样（NumPy .npz 格式，每个请求17字节）
+
+        包含每个请求的响应时间、用例序号、是否成功和完成时间，
+        可用 load_raw_data() 读取后做离线分析
+
+        Args:
+            result: 性能测试结果
+
+        Returns:
+            文件路径，没有采样时返回None
+        """
+        if not len(result.response_times):
+            return None
+
+        import numpy as np
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        raw_file = self.output_dir / f"perf_raw_{timestamp}.npz"
+
+        # 不压缩: 压缩百万级采样耗时数秒，而收益有限
+        np.savez(
+            raw_file,
+            response_times=np.frombuffer(result.response_times, dtype=np.float64).astype(np.float32),
+            case_indices=np.frombuffer(result.case_indices, dtype=np.uint32),
+            successes=np.frombuffer(result.successes, dtype=np.uint8).astype(bool),
+            timestamps=np.frombuffer(result.timestamps, dtype=np.float64),
+            case_ids=np.array(result.case_ids, dtype=str),
+            start_time=np.float64(result.start_time)
+        )
+
+        self.logger.info(f"原始采样已保存: {raw_file}（{len(result.response_times)} 条）")
+        return str(raw_file)
+
+    def generate_capacity_report(self, capacity: CapacityResult,
+                                 test_config: Dict[str, Any] = None) -> str:
+        """生成容量探测 HTML 报告（吞吐量-并发曲线、吞吐量-响应时间曲线和各级明细）
+
+        Args:
+            capacity: 容量探测结果
+            test_config: 测试配置
+
+        Returns:
+            报告文件路径
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_file = self.output_dir / f"capacity_report_{timestamp}.html"
+
+        knee = capacity.knee
+        if knee is not None:
+            verdict = (f'<span class="status-pass">拐点并发 {knee.users}，'
+                       f'最大可持续吞吐量 {knee.tps:.2f} TPS</span>')
+        else:
+            verdict = '<span class="status-fail">起始并发即不满足SLO</span>'
+        slo = [f"错误率 ≤ {capacity.config.max_error_rate:.2%}"]
+        if capacity.config.p99_ms is not None:
+            slo.append(f"P99 ≤ {capacity.config.p99_ms:g}ms")
+
+        with open(report_file, 'w', encoding='utf-8') as out:
+            self._write_html_head(out, "容量探测报告")
+            out.write(f"""
+<body>
+    <div class="container">
+        <h1>📈 容量探测报告</h1>
+        <p>{verdict}</p>
+        <p>停止原因: {html.escape(capacity.stop_reason)}；SLO: {"，".join(slo)}；
+           最低扩展效率 {capacity.config.min_scaling:g}</p>
+
+        <h2>🚀 吞吐量 - 并发数</h2>
+""")
+            out.write(self._svg_chart(
+                [('TPS', '#2196F3', [(s.users, s.tps) for s in capacity.steps])],
+                x_label='并发数', y_label='TPS', highlight=(knee.users, knee.tps) if knee else None
+            ))
+            out.write("""
+        <h2>⏱️ 响应时间 - 吞吐量</h2>
+""")
+            out.write(self._svg_chart(
+                [(label, color, [(s.tps, getattr(s, attr) * 1000) for s in capacity.steps])
+                 for attr, label, color in CAPACITY_LATENCY_SERIES],
+                x_label='TPS', y_label='响应时间（毫秒）',
+                highlight=(knee.tps, knee.p99_time * 1000) if knee else None
+            ))
+            out.write("""
+        <h2>📋 各级明细</h2>
+""")
+            self._write_paged_table(
+                out, 'capacity-table',
+                columns=[('并发数', 'int', ''), ('请求数', 'int', ''), ('TPS', 'num', ''),
+                         ('错误率', 'pct', ''), ('平均响应时间', 'sec', ''), ('P50', 'sec', ''),
+                         ('P95', 'sec', ''), ('P99', 'sec', ''), ('扩展效率', 'est', ''), ('说明', 'text', '')],
+                rows=(
+                    [s.users, s.total_requests, s.tps, s.error_rate * 100, s.avg_time, s.p50_time,
+                     s.p95_time, s.p99_time, s.scaling,
+                     ('⭐ 拐点 ' if s is knee else '') + ('' if s.slo_ok else '❌ ') + s.note]
+                    for s in capacity.steps
+                ),
+                searchable=False
+            )
+            if test_config:
+                out.write(f"""
+        <h2>⚙️ 测试配置</h2>
+        <div class="config-info">
+            <p><strong>用例数:</strong> {test_config.get('total_cases', 'N/A')}</p>
+            <p><strong>每级时长:</strong> {capacity.config.step_duration} 秒</p>
+        </div>
+""")
+            out.write(f"""
+        <div class="timestamp">
+            报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        </div>
+    </div>
+{_PAGED_TABLE_SCRIPT}
+</body>
+</html>
+""")
+
+        self.logger.info(f"容量探测报告已生成: {report_file}")
+        return str(report_file)
+
+    def generate_capacity_json_report(self, capacity: CapacityResult,
+                                      test_config: Dict[str, Any] = None) -> str:
+        """生成容量探测 JSON 报告
+
+        Args:
+            capacity: 容量探测结果
+            test_config: 测试配置
+
+        Returns:
+            报告文件路径
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_file = self.output_dir / f"capacity_report_{timestamp}.json"
+
+        report_data = {
+            'timestamp': datetime.now().isoformat(),
+            'test_config': test_config or {},
+            **capacity.to_dict()
+        }
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report_data, f, ensure_ascii=False, indent=2)
+
+        self.logger.info(f"容量探测JSON报告已生成: {report_file}")
+        return str(report_file)
+
+    @staticmethod
+    def _svg_chart(series: List[Tuple[str, str, List[Tuple[float, float]]]],
+                   x_label: str, y_label: str,
+                   highlight: Tuple[float, float] = None,
+                   width: int = 760, height: int = 320) -> str:
+        """生成内联 SVG 折线图（不依赖前端图表库）
+
+        Args:
+            series: 数据序列 [(名称, 颜色, [(x, y)])]
+            x_label: X轴名称
+            y_label: Y轴名称
+            highlight: 需要标记的点（拐点）
+            width: 图宽（像素）
+            height: 图高（像素）
+
+        Returns:
+            HTML 片段
+        """
+        points = [p for _, _, data in series for p in data]
+        if not points:
+            return ""
+
+        left, right, top, bottom = 60, 20, 20, 40
+        x_max = max(x for x, _ in points) or 1.0
+        y_max = max(y for _, y in points) or 1.0
+        plot_w, plot_h = width - left - right, height - top - bottom
+
+        def sx(x):
+            return left + x / x_max * plot_w
+
+        def sy(y):
+            return top + plot_h - y / y_max * plot_h
+
+        parts = [f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">']
+        # 坐标轴和刻度
+        parts.append(f'<line x1="{left}" y1="{top + plot_h}" x2="{left + plot_w}" y2="{top + plot_h}" stroke="#999"/>')
+        parts.append(f'<line x1="{left}" y1="{top}" x2="{left}" y2="{top + plot_h}" stroke="#999"/>')
+        for i in range(5):
+            fraction = i / 4
+            parts.append(f'<text x="{left - 6}" y="{sy(y_max * fraction) + 4:.1f}" font-size="11" '
+                         f'text-anchor="end" fill="#666">{y_max * fraction:.4g}</text>')
+            parts.append(f'<text x="{sx(x_max * fraction):.1f}" y="{top + plot_h + 16}" font-size="11" '
+                         f'text-anchor="middle" fill="#666">{x_max * fraction:.4g}</text>')
+        parts.append(f'<text x="{left + plot_w / 2:.0f}" y="{height - 4}" font-size="12" '
+                     f'text-anchor="middle" fill="#333">{html.escape(x_label)}</text>')
+        parts.append(f'<text x="14" y="{top + plot_h / 2:.0f}" font-size="12" text-anchor="middle" fill="#333" '
+                     f'transform="rotate(-90 14 {top + plot_h / 2:.0f})">{html.escape(y_label)}</text>')
+
+        # 折线和数据点
+        for name, color, data in series:
+            polyline = " ".join(f"{sx(x):.1f},{sy(y):.1f}" for x, y in data)
+            parts.append(f'<polyline points="{polyline}" fill="none" stroke="{color}" stroke-width="2"/>')
+            for x, y in data:
+                parts.append(f'<circle cx="{sx(x):.1f}" cy="{sy(y):.1f}" r="3" fill="{color}">'
+                             f'<title>{html.escape(name)}: ({x:.4g}, {y:.4g})</title></circle>')
+
+        if highlight is not None:
+            parts.append(f'<circle cx="{sx(highlight[0]):.1f}" cy="{sy(highlight[1]):.1f}" r="7" '
+                         f'fill="none" stroke="#333" stroke-width="2"><title>拐点</title></circle>')
+        parts.append('</svg>')
+
+        legend = "".join(f'<span><i style="background-color: {color}"></i>{html.escape(name)}</span> '
+                         for name, color, _ in series)
+        return f"""
+        <div class="legend">{legend}</div>
+        {"".join(parts)}
+"""
+
+
+def load_raw_data(path: str) -> Dict[str, Any]:
+    """读取 generate_raw_data() 保存的原始采样
+
+    Args:
+        path: 原始采样文件路径
+
+    Returns:
+        {'response_times', 'case_indices', 'successes', 'timestamps': NumPy数组,
+         'case_ids': 用例ID列表, 'start_time': 测试开始时间}
+    """
+    import numpy as np
+
+    with np.load(path) as data:
+        raw = {key: data[key] for key in ('response_times', 'case_indices', 'successes', 'timestamps')}
+        raw['case_ids'] = data['case_ids'].tolist()
+        raw['start_time'] = float(data['start_time'])
+    return raw
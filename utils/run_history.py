@@ -0,0 +1,358 @@
+"""性能测试历史记录 - 基于SQLite的只追加结果库
+
+每次性能测试追加一条运行记录和每个用例的汇总指标及响应时间直方图，
+按用例ID、环境和Git版本建立索引，用于趋势查看和回归对比（见 utils/perf_compare.py）
+"""
+import json
+import sqlite3
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.histogram import LatencyHistogram
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_at TEXT NOT NULL,
+    env TEXT NOT NULL,
+    git_revision TEXT,
+    total_requests INTEGER NOT NULL,
+    success_count INTEGER NOT NULL,
+    duration REAL NOT NULL,
+    tps REAL NOT NULL,
+    avg_time REAL NOT NULL,
+    p95_time REAL NOT NULL,
+    p99_time REAL NOT NULL,
+    per_second_tps TEXT NOT NULL,
+    histogram TEXT NOT NULL,
+    test_config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS case_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    case_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    success_count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    p95 REAL NOT NULL,
+    p99 REAL NOT NULL,
+    tps REAL NOT NULL,
+    histogram TEXT NOT NULL,
+    PRIMARY KEY (run_id, case_id)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_env ON runs(env, id);
+CREATE INDEX IF NOT EXISTS idx_runs_revision ON runs(git_revision);
+CREATE INDEX IF NOT EXISTS idx_case_results_case ON case_results(case_id, run_id);
+"""
+
+
+def current_git_revision(cwd: str = None) -> Optional[str]:
+    """获取当前Git版本（提交哈希）
+
+    Args:
+        cwd: 仓库目录，默认为项目根目录
+
+    Returns:
+        提交哈希，不在Git仓库中或未安装Git时返回None
+    """
+    try:
+        completed = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=cwd or str(Path(__file__).parent.parent),
+            capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+    if completed.returncode != 0:
+        return None
+    return completed.stdout.strip() or None
+
+
+@dataclass
+class CaseSnapshot:
+    """单个用例在一次运行中的结果"""
+    count: int
+    success_count: int
+    histogram: LatencyHistogram
+    tps: float = 0.0
+
+
+@dataclass
+class RunSnapshot:
+    """一次性能测试运行的可比较快照
+
+    当前运行由 from_result() 构建，历史运行由 RunHistory 读取，
+    多次运行可用 merge() 合并为滚动窗口基线
+    """
+    label: str
+    tps: float
+    per_second_tps: List[float]
+    histogram: LatencyHistogram
+    cases: Dict[str, CaseSnapshot] = field(default_factory=dict)
+    run_id: Optional[int] = None
+    run_at: Optional[str] = None
+    env: Optional[str] = None
+    git_revision: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, result, label: str = "本次运行") -> 'RunSnapshot':
+        """由 PerformanceResult 构建快照（需先调用 calculate_statistics）
+
+        Args:
+            result: 性能测试结果
+            label: 显示名称
+
+        Returns:
+            RunSnapshot 实例
+        """
+        analytics = result.analytics
+        if analytics is None:
+            return cls(label=label, tps=result.tps, per_second_tps=[], histogram=LatencyHistogram())
+
+        cases = {
+            case_id: CaseSnapshot(
+                count=metrics.count,
+                success_count=metrics.success_count,
+                histogram=analytics.case_histogram(case_id),
+                tps=metrics.tps
+            )
+            for case_id, metrics in analytics.cases.items()
+        }
+        return cls(
+            label=label,
+            tps=result.tps,
+            per_second_tps=list(analytics.per_second.get('tps', [])),
+            histogram=analytics.histogram,
+            cases=cases
+        )
+
+    @classmethod
+    def merge(cls, snapshots: List['RunSnapshot'], label: str = None) -> 'RunSnapshot':
+        """合并多次运行（直方图相加、逐秒TPS拼接、TPS取平均，用例TPS只在包含该用例的运行之间平均）
+
+        Args:
+            snapshots: 运行快照列表
+            label: 显示名称
+
+        Returns:
+            合并后的快照
+        """
+        if len(snapshots) == 1:
+            return snapshots[0]
+
+        merged = cls(
+            label=label or f"最近 {len(snapshots)} 次运行",
+            tps=sum(s.tps for s in snapshots) / len(snapshots) if snapshots else 0.0,
+            per_second_tps=[],
+            histogram=LatencyHistogram()
+        )
+        runs: Dict[str, int] = {}  # 用例ID -> 包含该用例的运行次数
+        for snapshot in snapshots:
+            merged.per_second_tps.extend(snapshot.per_second_tps)
+            merged.histogram.merge(snapshot.histogram)
+            for case_id, case in snapshot.cases.items():
+                target = merged.cases.get(case_id)
+                if target is None:
+                    target = merged.cases[case_id] = CaseSnapshot(0, 0, LatencyHistogram())
+                target.count += case.count
+                target.success_count += case.success_count
+                target.histogram.merge(case.histogram)
+                target.tps += case.tps
+                runs[case_id] = runs.get(case_id, 0) + 1
+
+        # 某些运行中没有该用例时（如新增用例），不应按全部运行次数稀释其TPS
+        for case_id, target in merged.cases.items():
+            target.tps /= runs[case_id]
+        return merged
+
+
+class RunHistory:
+    """性能测试历史记录库
+
+    只提供追加和查询接口，已写入的运行记录不会被修改或删除
+    """
+
+    def __init__(self, db_path: str = "reports/performance/history.db"):
+        """打开（或创建）历史记录库
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logger
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def record_run(self, result, env: str, git_revision: str = None,
+                   test_config: Dict[str, Any] = None) -> int:
+        """追加一次运行记录
+
+        Args:
+            result: PerformanceResult（需先调用 calculate_statistics）
+            env: 环境名称
+            git_revision: Git版本，为None时自动获取
+            test_config: 测试配置
+
+        Returns:
+            运行记录ID
+        """
+        snapshot = RunSnapshot.from_result(result)
+        if git_revision is None:
+            git_revision = current_git_revision()
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO runs (run_at, env, git_revision, total_requests, success_count, duration, tps, "
+                "avg_time, p95_time, p99_time, per_second_tps, histogram, test_config) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now().isoformat(timespec='seconds'), env, git_revision,
+                    result.total_requests, result.success_count, result.actual_duration, result.tps,
+                    result.avg_time, result.p95_time, result.p99_time,
+                    json.dumps(snapshot.per_second_tps),
+                    json.dumps(snapshot.histogram.to_dict()),
+                    json.dumps(test_config or {}, ensure_ascii=False, default=str)
+                )
+            )
+            run_id = cursor.lastrowid
+
+            case_metrics = result.analytics.cases if result.analytics else {}
+            self._conn.executemany(
+                "INSERT INTO case_results (run_id, case_id, count, success_count, mean, p95, p99, tps, histogram) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (run_id, case_id, case.count, case.success_count,
+                     case_metrics[case_id].mean, case_metrics[case_id].percentile(95),
+                     case_metrics[case_id].percentile(99), case.tps,
+                     json.dumps(case.histogram.to_dict()))
+                    for case_id, case in snapshot.cases.items()
+                )
+            )
+
+        self.logger.info(f"性能测试结果已记录到历史库: run_id={run_id}, env={env}, revision={git_revision}")
+        return run_id
+
+    def get_run(self, run_id: int) -> Optional[RunSnapshot]:
+        """读取一次运行的快照
+
+        Args:
+            run_id: 运行记录ID
+
+        Returns:
+            RunSnapshot，不存在时返回None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+            if row is None:
+                return None
+            case_rows = self._conn.execute(
+                "SELECT case_id, count, success_count, tps, histogram FROM case_results WHERE run_id = ?",
+                (run_id,)
+            ).fetchall()
+
+        return RunSnapshot(
+            label=f"运行 #{row['id']}（{row['run_at']}）",
+            tps=row['tps'],
+            per_second_tps=json.loads(row['per_second_tps']),
+            histogram=LatencyHistogram.from_dict(json.loads(row['histogram'])),
+            cases={
+                r['case_id']: CaseSnapshot(
+                    count=r['count'],
+                    success_count=r['success_count'],
+                    histogram=LatencyHistogram.from_dict(json.loads(r['histogram'])),
+                    tps=r['tps']
+                )
+                for r in case_rows
+            },
+            run_id=row['id'],
+            run_at=row['run_at'],
+            env=row['env'],
+            git_revision=row['git_revision']
+        )
+
+    def recent_run_ids(self, env: str, limit: int = 1, before: int = None) -> List[int]:
+        """获取某个环境最近的运行记录ID（从新到旧）
+
+        Args:
+            env: 环境名称
+            limit: 数量
+            before: 只返回ID小于此值的记录（可选）
+
+        Returns:
+            运行记录ID列表
+        """
+        sql = "SELECT id FROM runs WHERE env = ?"
+        params: List[Any] = [env]
+        if before is not None:
+            sql += " AND id < ?"
+            params.append(before)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [row['id'] for row in self._conn.execute(sql, params)]
+
+    def baseline(self, env: str, run_id: int = None, window: int = 1) -> Optional[RunSnapshot]:
+        """获取对比基线
+
+        Args:
+            env: 环境名称
+            run_id: 指定的基线运行ID，为None时使用该环境最近的运行
+            window: 未指定run_id时合并最近几次运行作为滚动窗口基线
+
+        Returns:
+            RunSnapshot，没有历史记录时返回None
+        """
+        if run_id is not None:
+            return self.get_run(run_id)
+
+        snapshots = [self.get_run(i) for i in self.recent_run_ids(env, max(window, 1))]
+        snapshots = [s for s in snapshots if s is not None]
+        if not snapshots:
+            return None
+        return RunSnapshot.merge(snapshots)
+
+    def case_trend(self, case_id: str, env: str = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """查询用例的历史趋势（从新到旧）
+
+        Args:
+            case_id: 用例ID
+            env: 环境名称（可选）
+            limit: 最多返回的记录数
+
+        Returns:
+            [{'run_id', 'run_at', 'env', 'git_revision', 'count', 'success_count', 'mean', 'p95', 'p99', 'tps'}]
+        """
+        sql = ("SELECT r.id AS run_id, r.run_at, r.env, r.git_revision, c.count, c.success_count, "
+               "c.mean, c.p95, c.p99, c.tps FROM case_results c JOIN runs r ON r.id = c.run_id "
+               "WHERE c.case_id = ?")
+        params: List[Any] = [case_id]
+        if env is not None:
+            sql += " AND r.env = ?"
+            params.append(env)
+        sql += " ORDER BY r.id DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,113 @@
+"""JSON Schema 校验 - 每个 Schema 只编译一次，按内容哈希缓存
+
+编译时检查 Schema 本身是否合法、选择对应草案版本的校验器并解析 $ref，
+之后每次校验只执行已构建好的校验器:
+    is_valid:    只判断是否通过，不收集错误（压测热路径）
+    first_error: 返回最相关的一处错误（路径和说明），用于断言消息
+
+内容相同的 Schema（不论键的顺序和来源用例）共用一个校验器。
+依赖 jsonschema（pip install jsonschema），在首次编译时才导入
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple, Union
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SchemaValidator:
+    """编译后的 JSON Schema 校验器"""
+
+    def __init__(self, schema: Dict[str, Any], digest: str):
+        """编译 Schema
+
+        Args:
+            schema: JSON Schema
+            digest: Schema 的内容哈希
+
+        Raises:
+            ImportError: 未安装 jsonschema
+            ValueError: Schema 不合法
+        """
+        try:
+            import jsonschema
+        except ImportError:
+            raise ImportError("JSON Schema 校验需要安装 jsonschema: pip install jsonschema")
+
+        cls = jsonschema.validators.validator_for(schema)
+        try:
+            cls.check_schema(schema)
+        except jsonschema.SchemaError as e:
+            raise ValueError(f"JSON Schema 不合法: {e.message}")
+
+        self.schema = schema
+        self.digest = digest
+        self._validator = cls(schema, format_checker=cls.FORMAT_CHECKER)
+        self._best_match = jsonschema.exceptions.best_match
+
+    def is_valid(self, instance: Any) -> bool:
+        """是否符合 Schema"""
+        return self._validator.is_valid(instance)
+
+    def first_error(self, instance: Any) -> Optional[Tuple[Tuple[Any, ...], str, str]]:
+        """最相关的一处错误
+
+        Returns:
+            (键和下标组成的路径, 说明, 未通过的关键字如 type / required)，符合 Schema 时返回None
+        """
+        error = self._best_match(self._validator.iter_errors(instance))
+        if error is None:
+            return None
+        return tuple(error.absolute_path), error.message, error.validator
+
+
+_cache: Dict[str, SchemaValidator] = {}
+_text_cache: Dict[str, SchemaValidator] = {}
+_cache_lock = threading.Lock()
+
+
+def schema_digest(schema: Dict[str, Any]) -> str:
+    """Schema 的内容哈希（键排序后的规范JSON的 SHA-256）"""
+    canonical = json.dumps(schema, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def compile_schema(schema: Union[str, Dict[str, Any]]) -> SchemaValidator:
+    """获取 Schema 的校验器（已编译时直接返回缓存）
+
+    Args:
+        schema: JSON Schema（字典或JSON文本）
+
+    Returns:
+        SchemaValidator 实例
+
+    Raises:
+        ImportError: 未安装 jsonschema
+        ValueError: 不是合法的JSON或 Schema 不合法
+    """
+    if isinstance(schema, str):
+        validator = _text_cache.get(schema)
+        if validator is not None:
+            return validator
+        try:
+            parsed = json.loads(schema)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON Schema 解析失败: {e}")
+        if not isinstance(parsed, dict):
+            raise ValueError("JSON Schema 必须是JSON对象")
+        validator = compile_schema(parsed)
+        with _cache_lock:
+            _text_cache[schema] = validator
+        return validator
+
+    digest = schema_digest(schema)
+    validator = _cache.get(digest)
+    if validator is None:
+        validator = SchemaValidator(schema, digest)
+        with _cache_lock:
+            validator = _cache.setdefault(digest, validator)
+            logger.debug(f"编译JSON Schema: {digest[:12]}")
+    return validator